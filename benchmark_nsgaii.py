@@ -0,0 +1,127 @@
+# coding=utf-8
+"""
+Created on 19.10.2026
+
+Potku is a graphical user interface for analyzation and
+visualization of measurement data collected from a ToF-ERD
+telescope. For physics calculations Potku uses external
+analyzation components.
+Copyright (C) 2026 Potku developers
+
+This program is free software; you can redistribute it and/or
+modify it under the terms of the GNU General Public License
+as published by the Free Software Foundation; either version 2
+of the License, or (at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program (file named 'LICENCE').
+
+benchmark_nsgaii.py measures how long the non-dominated sorting, crowding
+distance and new population selection of NSGA-II take with large
+populations.
+
+The vectorized implementations in modules.nsgaii are compared with the loop
+based reference implementations that the integration tests use to check
+that their results are identical. Nothing is asserted; the times are only
+printed. Usage:
+
+    python benchmark_nsgaii.py
+    python benchmark_nsgaii.py --pop-sizes 100 400 --objectives 2 5
+"""
+__author__ = "Potku developers"
+__version__ = "2.0"
+
+import argparse
+import statistics
+import sys
+import time
+
+import numpy as np
+
+from typing import Callable
+from typing import Sequence
+
+from modules.nsgaii import Nsgaii
+from tests.integration.test_nsgaii import get_population
+from tests.integration.test_nsgaii import reference_crowding_distance
+from tests.integration.test_nsgaii import reference_nd_sort
+from tests.integration.test_nsgaii import reference_new_population_selection
+
+
+def measure(func: Callable, repeat: int) -> float:
+    """Calls the function repeatedly and returns the median time in
+    seconds.
+    """
+    times = []
+    for _ in range(repeat):
+        # Populations contain infinite objective values like failed
+        # evaluations do, which cause warnings in the distance calculations
+        with np.errstate(divide="ignore", invalid="ignore"):
+            start = time.perf_counter()
+            func()
+            times.append(time.perf_counter() - start)
+    return statistics.median(times)
+
+
+def main(args: Sequence[str] = None) -> int:
+    """Runs the benchmark and prints the results.
+    """
+    parser = argparse.ArgumentParser(
+        description="Compares the vectorized sorting and selection of "
+                    "NSGA-II with the loop based reference implementations.")
+    parser.add_argument(
+        "--pop-sizes", type=int, nargs="+", default=[100, 200, 400],
+        help="population sizes; populations joined with their offspring "
+             "have twice as many solutions (default: 100 200 400)")
+    parser.add_argument(
+        "--objectives", type=int, nargs="+", default=[2, 3, 5],
+        help="numbers of objectives (default: 2 3 5)")
+    parser.add_argument(
+        "--repeat", type=int, default=3,
+        help="number of measurements; medians are reported (default: 3)")
+    parser.add_argument(
+        "--seed", type=int, default=0,
+        help="seed of the random populations (default: 0)")
+    parsed = parser.parse_args(args)
+    repeat = max(parsed.repeat, 1)
+    rng = np.random.default_rng(parsed.seed)
+
+    print(f"{'function':>26} {'pop_size':>8} {'obj.':>4} "
+          f"{'reference ms':>12} {'vectorized ms':>13} {'speedup':>8}")
+    for pop_size in parsed.pop_sizes:
+        for m in parsed.objectives:
+            population = get_population(rng, 2 * pop_size, m)
+            objs = population[1]
+            n = len(objs)
+            front_no, _ = Nsgaii.nd_sort(objs, n)
+            cases = [
+                ("nd_sort",
+                 lambda: reference_nd_sort(objs, n),
+                 lambda: Nsgaii.nd_sort(objs, n)),
+                ("crowding_distance",
+                 lambda: reference_crowding_distance(front_no, objs),
+                 lambda: Nsgaii.crowding_distance(front_no, objs)),
+                ("new_population_selection",
+                 lambda: reference_new_population_selection(
+                     population, pop_size),
+                 lambda: Nsgaii.new_population_selection(
+                     population, pop_size)),
+            ]
+            for name, reference, vectorized in cases:
+                reference_time = measure(reference, repeat)
+                vectorized_time = measure(vectorized, repeat)
+                speedup = reference_time / vectorized_time \
+                    if vectorized_time else float("inf")
+                print(f"{name:>26} {pop_size:>8} {m:>4} "
+                      f"{reference_time * 1000:>12.2f} "
+                      f"{vectorized_time * 1000:>13.2f} {speedup:>7.1f}x")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,214 @@
+# coding=utf-8
+"""
+Created on 18.10.2026
+
+Potku is a graphical user interface for analyzation and
+visualization of measurement data collected from a ToF-ERD
+telescope. For physics calculations Potku uses external
+analyzation components.
+Copyright (C) 2026 Potku developers
+
+This program is free software; you can redistribute it and/or
+modify it under the terms of the GNU General Public License
+as published by the Free Software Foundation; either version 2
+of the License, or (at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program (file named 'LICENCE').
+
+benchmark_startup.py measures how long it takes to start Potku.
+
+Each measurement is done in a new Python process so that modules imported
+by earlier measurements do not affect the results. Import costs are read
+from the output of 'python -X importtime'. Usage:
+
+    python benchmark_startup.py                 # import cost of potku.py
+    python benchmark_startup.py --module modules.request --top 20
+    python benchmark_startup.py --window        # also time to first window
+"""
+__author__ = "Potku developers"
+__version__ = "2.0"
+
+import argparse
+import statistics
+import subprocess
+import sys
+import time
+
+from collections import defaultdict
+from pathlib import Path
+from typing import Dict
+from typing import List
+from typing import NamedTuple
+from typing import Sequence
+
+ROOT_DIR = Path(__file__).resolve().parent
+
+# Run in a new process. Prints a line when the main window has been shown
+# and the event loop has processed the resulting events.
+_WINDOW_SCRIPT = """
+import sys
+from PyQt5 import QtCore, QtWidgets
+app = QtWidgets.QApplication(sys.argv)
+import potku
+window = potku.Potku()
+window.show()
+def shown():
+    print("shown", flush=True)
+    app.quit()
+QtCore.QTimer.singleShot(0, shown)
+app.exec_()
+"""
+
+
+class ImportTime(NamedTuple):
+    """Import time of a module in microseconds as reported by
+    'python -X importtime'.
+    """
+    module: str
+    self_us: int
+    cumulative_us: int
+    # Nesting level of the import, 0 for modules imported by the script
+    level: int
+
+
+def parse_import_times(output: str) -> List[ImportTime]:
+    """Parses the output of 'python -X importtime'.
+
+    Args:
+        output: standard error of the Python process
+
+    Return:
+        ImportTime of each module in the order of the output
+    """
+    times = []
+    for line in output.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        try:
+            self_us, cumulative_us, name = line[len("import time:"):].split(
+                "|")
+            self_us, cumulative_us = int(self_us), int(cumulative_us)
+        except ValueError:
+            # The header line
+            continue
+        module = name.strip()
+        level = (len(name) - len(name.lstrip()) - 1) // 2
+        times.append(ImportTime(module, self_us, cumulative_us, level))
+    return times
+
+
+def measure_imports(module: str) -> List[ImportTime]:
+    """Imports a module in a new Python process and returns the import
+    times of all modules it imported.
+    """
+    process = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=ROOT_DIR, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE,
+        universal_newlines=True)
+    if process.returncode != 0:
+        raise RuntimeError(
+            f"Importing {module} failed:\n{process.stderr[-2000:]}")
+    return parse_import_times(process.stderr)
+
+
+def measure_window() -> float:
+    """Starts Potku in a new Python process and returns the number of
+    seconds it took to show the main window.
+    """
+    start = time.perf_counter()
+    process = subprocess.Popen(
+        [sys.executable, "-c", _WINDOW_SCRIPT], cwd=ROOT_DIR,
+        stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+        universal_newlines=True)
+    for line in process.stdout:
+        if line.strip() == "shown":
+            elapsed = time.perf_counter() - start
+            process.wait()
+            return elapsed
+    raise RuntimeError(
+        f"Potku was not started:\n{process.stderr.read()[-2000:]}")
+
+
+def get_package_times(times: Sequence[ImportTime]) -> Dict[str, int]:
+    """Sums the self times of the modules of each top level package.
+    """
+    packages = defaultdict(int)
+    for t in times:
+        packages[t.module.split(".")[0]] += t.self_us
+    return dict(packages)
+
+
+def _print_table(title: str, headers: Sequence[str],
+                 rows: Sequence[Sequence[str]]):
+    """Prints rows whose last column is left aligned.
+    """
+    print(f"\n{title}")
+    for row in [headers, *rows]:
+        print(" ".join(f"{cell:>10}" for cell in row[:-1]), "", row[-1])
+
+
+def main(args: Sequence[str] = None) -> int:
+    """Runs the benchmark and prints the results.
+    """
+    parser = argparse.ArgumentParser(
+        description="Measures the import cost of Potku's modules and the "
+                    "time it takes to show the main window.")
+    parser.add_argument(
+        "--module", default="potku",
+        help="module whose import is measured (default: potku)")
+    parser.add_argument(
+        "--top", type=int, default=30,
+        help="number of modules listed (default: 30)")
+    parser.add_argument(
+        "--repeat", type=int, default=3,
+        help="number of measurements; medians are reported (default: 3)")
+    parser.add_argument(
+        "--window", action="store_true",
+        help="also measure the time to show the main window")
+    parsed = parser.parse_args(args)
+    repeat = max(parsed.repeat, 1)
+
+    runs = [measure_imports(parsed.module) for _ in range(repeat)]
+    # Imports are in the same order in each run
+    times = [
+        ImportTime(
+            ts[0].module,
+            int(statistics.median(t.self_us for t in ts)),
+            int(statistics.median(t.cumulative_us for t in ts)),
+            ts[0].level)
+        for ts in zip(*runs)
+    ]
+    total = sum(t.cumulative_us for t in times if t.level == 0)
+    print(f"Importing {parsed.module} took {total / 1000:.1f} ms "
+          f"({len(times)} modules, median of {repeat} runs)")
+
+    _print_table(
+        "Slowest modules including their imports",
+        ("cumul. ms", "self ms", "module"),
+        [(f"{t.cumulative_us / 1000:.1f}", f"{t.self_us / 1000:.1f}",
+          "  " * t.level + t.module)
+         for t in sorted(times, key=lambda t: -t.cumulative_us)[:parsed.top]])
+
+    packages = sorted(
+        get_package_times(times).items(), key=lambda p: -p[1])
+    _print_table(
+        "Import cost of each top level package",
+        ("self ms", "share", "package"),
+        [(f"{us / 1000:.1f}", f"{us / total:.1%}" if total else "-", package)
+         for package, us in packages[:parsed.top]])
+
+    if parsed.window:
+        seconds = statistics.median(measure_window() for _ in range(repeat))
+        print(f"\nTime to show the main window: {seconds * 1000:.0f} ms "
+              f"(median of {repeat} runs)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -38,7 +38,6 @@ from math import sin
 from PyQt5 import QtWidgets
 from PyQt5 import QtCore
 from PyQt5 import QtGui
-from PyQt5 import uic
 
 
 class AboutDialog(QtWidgets.QDialog):
@@ -50,7 +49,7 @@ class AboutDialog(QtWidgets.QDialog):
         """
 
         super().__init__()
-        uic.loadUi(gutils.get_ui_dir() / "ui_about.ui", self)
+        gutils.load_ui(gutils.get_ui_dir() / "ui_about.ui", self)
 
         self.OKButton.clicked.connect(self.close)
         self.DiscoButton.clicked.connect(self.__disco)
@@ -33,7 +33,6 @@ __version__ = "2.0"
 
 import widgets.gui_utils as gutils
 
-from PyQt5 import uic
 from PyQt5 import QtWidgets
 
 
@@ -48,7 +47,7 @@ class ElementSelectionDialog(QtWidgets.QDialog):
         # TODO this could show the elements with same color scheme as defined in
         #      global settings
         super().__init__()
-        uic.loadUi(gutils.get_ui_dir() / "ui_element_selection.ui", self)
+        gutils.load_ui(gutils.get_ui_dir() / "ui_element_selection.ui", self)
         buttons = self.findChild(QtWidgets.QButtonGroup, "elementButtons")
         buttons.buttonClicked.connect(self.__set_element)
         self.pushButton_Cancel.clicked.connect(self.close)
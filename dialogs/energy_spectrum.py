@@ -53,7 +53,6 @@ from modules.enums import OptimizationType
 from modules.element_simulation import ElementSimulation
 from modules.simulation import Simulation
 
-from PyQt5 import uic
 from PyQt5 import QtCore
 from PyQt5 import QtWidgets
 from PyQt5.QtCore import QLocale
@@ -100,7 +99,8 @@ class EnergySpectrumParamsDialog(QtWidgets.QDialog):
                 distribution is changed.
         """
         super().__init__()
-        uic.loadUi(gutils.get_ui_dir() / "ui_energy_spectrum_params.ui", self)
+        gutils.load_ui(
+            gutils.get_ui_dir() / "ui_energy_spectrum_params.ui", self)
 
         self.parent = parent
         if spectrum_type == EnergySpectrumWidget.MEASUREMENT:
@@ -488,7 +488,7 @@ class EnergySpectrumWidget(QtWidgets.QWidget):
         """
         sbh = None
         super().__init__()
-        uic.loadUi(gutils.get_ui_dir() / "ui_energy_spectrum.ui", self)
+        gutils.load_ui(gutils.get_ui_dir() / "ui_energy_spectrum.ui", self)
         try:
             self.parent = parent
             self.icon_manager = parent.icon_manager
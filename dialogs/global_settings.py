@@ -43,7 +43,6 @@ from modules.enums import CrossSection
 from modules.enums import ToFEColorScheme
 
 from PyQt5 import QtCore
-from PyQt5 import uic
 from PyQt5 import QtGui
 from PyQt5 import QtWidgets
 
@@ -71,10 +70,12 @@ class GlobalSettingsDialog(QtWidgets.QDialog):
 
     presim_ions = bnd.bind("presim_spinbox")
     sim_ions = bnd.bind("sim_spinbox")
+    target_precision = bnd.bind("target_precision_spinbox")
     ion_division = bnd.bind("ion_division_radios")
     min_concentration = bnd.bind("min_conc_spinbox")
 
     coinc_count = bnd.bind("line_coinc_count")
+    import_workers = bnd.bind("import_workers_spinbox")
 
     cross_section = bnd.bind("cross_section_radios")
 
@@ -86,7 +87,7 @@ class GlobalSettingsDialog(QtWidgets.QDialog):
         """Constructor for the program
         """
         super().__init__()
-        uic.loadUi(gutils.get_ui_dir() / "ui_global_settings.ui", self)
+        gutils.load_ui(gutils.get_ui_dir() / "ui_global_settings.ui", self)
 
         self.settings = settings
         self.__added_timings = {}  # Placeholder for timings
@@ -148,6 +149,7 @@ class GlobalSettingsDialog(QtWidgets.QDialog):
             self.grid_timing.addWidget(spin_low, 1, i + 1)
             self.grid_timing.addWidget(spin_high, 2, i + 1)
         self.coinc_count = self.settings.get_import_coinc_count()
+        self.import_workers = self.settings.get_import_workers()
         # self.__set_cross_sections()
         self.cross_section = self.settings.get_cross_sections()
 
@@ -170,6 +172,8 @@ class GlobalSettingsDialog(QtWidgets.QDialog):
 
         self.presim_ions = self.settings.get_min_presim_ions()
         self.sim_ions = self.settings.get_min_simulation_ions()
+        self.target_precision = \
+            self.settings.get_simulation_target_precision()
         self.ion_division = self.settings.get_ion_division()
         self.min_conc_spinbox.setMinimum(GlobalSettings.MIN_CONC_LIMIT)
         self.min_concentration = self.settings.get_minimum_concentration()
@@ -200,6 +204,7 @@ class GlobalSettingsDialog(QtWidgets.QDialog):
             self.settings.set_import_timing(
                 key, coinc_timing.low.value(), coinc_timing.high.value())
         self.settings.set_import_coinc_count(self.coinc_count)
+        self.settings.set_import_workers(self.import_workers)
 
         self.settings.set_cross_sections(self.cross_section)
 
@@ -220,6 +225,7 @@ class GlobalSettingsDialog(QtWidgets.QDialog):
         self.settings.set_num_iterations(self.depth_iters)
         self.settings.set_min_presim_ions(self.presim_ions)
         self.settings.set_min_simulation_ions(self.sim_ions)
+        self.settings.set_simulation_target_precision(self.target_precision)
         self.settings.set_ion_division(self.ion_division)
         self.settings.set_minimum_concentration(self.min_concentration)
 
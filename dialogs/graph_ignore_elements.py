@@ -33,7 +33,7 @@ __version__ = "1.0"
 
 import widgets.gui_utils as gutils
 
-from PyQt5 import QtCore, uic
+from PyQt5 import QtCore
 from PyQt5 import QtWidgets
 
 
@@ -50,7 +50,7 @@ class GraphIgnoreElements(QtWidgets.QDialog):
             calculation.
         """
         super().__init__()
-        uic.loadUi(
+        gutils.load_ui(
             gutils.get_ui_dir() / "ui_graph_ignored_elements.ui", self)
 
         self.__elements = elements
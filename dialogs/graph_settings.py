@@ -34,7 +34,6 @@ import widgets.binding as bnd
 import widgets.gui_utils as gutils
 
 from PyQt5 import QtCore
-from PyQt5 import uic
 from PyQt5 import QtWidgets
 
 
@@ -50,7 +49,7 @@ class TofeGraphSettingsWidget(QtWidgets.QDialog):
             parent: MatplotlibHistogramWidget which settings are being changed.
         """
         super().__init__()
-        uic.loadUi(gutils.get_ui_dir() / "ui_tofe_graph_settings.ui", self)
+        gutils.load_ui(gutils.get_ui_dir() / "ui_tofe_graph_settings.ui", self)
         self.setAttribute(QtCore.Qt.WA_DeleteOnClose)
 
         self.parent = parent
@@ -34,6 +34,7 @@ import widgets.gui_utils as gutils
 import widgets.binding as bnd
 
 from typing import List
+from typing import Optional
 
 from modules.cut_file import CutFile
 from modules.calibration import TOFCalibration
@@ -44,7 +45,6 @@ from modules.measurement import Measurement
 from PyQt5 import QtCore
 from PyQt5 import QtGui
 from PyQt5 import QtWidgets
-from PyQt5 import uic
 
 from widgets.matplotlib.calibration.curve_fitting \
     import MatplotlibCalibrationCurveFittingWidget
@@ -56,7 +56,7 @@ class CalibrationDialog(QtWidgets.QDialog):
     """A dialog for the time of flight calibration
     """
     bin_width = bnd.bind("binWidthSpinBox")
-    selected_cut_file = bnd.bind(
+    selected_cut_file_path = bnd.bind(
         "cutFilesTreeWidget", fget=bnd.get_selected_tree_item,
         fset=bnd.set_selected_tree_item)
 
@@ -71,7 +71,7 @@ class CalibrationDialog(QtWidgets.QDialog):
             parent_settings_widget: A widget this dialog was opened from.
         """
         super().__init__()
-        uic.loadUi(gutils.get_ui_dir() / "ui_calibration_dialog.ui", self)
+        gutils.load_ui(gutils.get_ui_dir() / "ui_calibration_dialog.ui", self)
 
         self.measurements = measurements
         self.run = run
@@ -79,14 +79,14 @@ class CalibrationDialog(QtWidgets.QDialog):
 
         self.parent_settings_widget = parent_settings_widget
         self.tof_calibration = TOFCalibration()
+        # Cut files are read when they are selected for the first time
+        self.__cut_files = {}
         
         # Go through all the measurements and their cut files and list them.
         for measurement in self.measurements:
             item = QtWidgets.QTreeWidgetItem([measurement.name])
             cuts, _ = measurement.get_cut_files()
-            gutils.fill_tree(
-                item, cuts, data_func=lambda fp: CutFile(cut_file_path=fp),
-                text_func=lambda fp: fp.name)
+            gutils.fill_tree(item, cuts, text_func=lambda fp: fp.name)
             self.cutFilesTreeWidget.addTopLevelItem(item)
             item.setExpanded(True)
         # Resize columns to fit the content nicely
@@ -136,6 +136,18 @@ class CalibrationDialog(QtWidgets.QDialog):
 
         self.exec_()
 
+    @property
+    def selected_cut_file(self) -> Optional[CutFile]:
+        """Returns the selected cut file or None if no cut file is selected.
+        """
+        cut_file_path = self.selected_cut_file_path
+        if cut_file_path is None:
+            return None
+        if cut_file_path not in self.__cut_files:
+            self.__cut_files[cut_file_path] = CutFile(
+                cut_file_path=cut_file_path)
+        return self.__cut_files[cut_file_path]
+
     def showEvent(self, _):
         """Called after dialog is shown. Size is adjusted so that all elements
         fit nicely on screen.
@@ -196,7 +208,7 @@ class CalibrationDialog(QtWidgets.QDialog):
         too.
         """
         self.__change_accept_point_label("")
-        if self.selected_cut_file is not None:
+        if self.selected_cut_file_path is not None:
             self.curveFittingWidget.matplotlib.change_bin_width(self.bin_width)
             try:
                 self.curveFittingWidget.matplotlib.change_cut(
@@ -288,7 +300,8 @@ class CalibrationCurveFittingWidget(QtWidgets.QWidget):
             run: Run object.
         """
         super().__init__()
-        uic.loadUi(gutils.get_ui_dir() / "ui_tof_curve_fitting_widget.ui", self)
+        gutils.load_ui(
+            gutils.get_ui_dir() / "ui_tof_curve_fitting_widget.ui", self)
         # NOTE: One of these should always be there. Could probably use "else"
         if hasattr(dialog.parent_settings_widget, "request"):
             self.img_dir = dialog.parent_settings_widget.request.directory
@@ -312,7 +325,7 @@ class CalibrationLinearFittingWidget(QtWidgets.QWidget):
             old_params: Old calibration parameters in tuple (slope, offset).
         """
         super().__init__()
-        uic.loadUi(
+        gutils.load_ui(
             gutils.get_ui_dir() / "ui_tof_linear_fitting_widget.ui", self)
         # NOTE: One of these should always be there. Could probably use "else"
         if hasattr(dialog.parent_settings_widget, "request"):
@@ -50,7 +50,6 @@ from modules.observing import ProgressReporter
 from modules.enums import DepthProfileUnit
 
 from PyQt5 import QtWidgets
-from PyQt5 import uic
 from PyQt5.QtCore import QLocale
 
 from widgets.matplotlib.measurement.depth_profile import \
@@ -97,7 +96,8 @@ class DepthProfileDialog(QtWidgets.QDialog):
             statusbar: a QStatusBar object
         """
         super().__init__()
-        uic.loadUi(gutils.get_ui_dir() / "ui_depth_profile_params.ui", self)
+        gutils.load_ui(
+            gutils.get_ui_dir() / "ui_depth_profile_params.ui", self)
 
         self.parent = parent
         self.measurement = measurement
@@ -275,7 +275,7 @@ class DepthProfileWidget(QtWidgets.QWidget):
         """
         try:
             super().__init__()
-            uic.loadUi(gutils.get_ui_dir() / "ui_depth_profile.ui", self)
+            gutils.load_ui(gutils.get_ui_dir() / "ui_depth_profile.ui", self)
 
             self.parent = parent
             self.measurement: Measurement = parent.obj
@@ -39,7 +39,6 @@ from modules.element import Element
 from typing import Set
 from typing import List
 
-from PyQt5 import uic
 from PyQt5 import QtWidgets
 
 
@@ -81,7 +80,8 @@ class DepthProfileIgnoreElements(QtWidgets.QDialog):
                 calculation.
         """
         super().__init__()
-        uic.loadUi(gutils.get_ui_dir() / "ui_depth_profile_ignored.ui", self)
+        gutils.load_ui(
+            gutils.get_ui_dir() / "ui_depth_profile_ignored.ui", self)
 
         self._elements = sorted(set(elements))
         self.button_ok.clicked.connect(self.accept)
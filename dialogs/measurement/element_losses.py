@@ -48,7 +48,6 @@ from modules.element_losses import ElementLosses
 from modules.measurement import Measurement
 
 from PyQt5 import QtWidgets
-from PyQt5 import uic
 
 from widgets.matplotlib.measurement.element_losses \
     import MatplotlibElementLossesWidget
@@ -75,7 +74,8 @@ class ElementLossesDialog(QtWidgets.QDialog):
             
         """
         super().__init__()
-        uic.loadUi(gutils.get_ui_dir() / "ui_element_losses_params.ui", self)
+        gutils.load_ui(
+            gutils.get_ui_dir() / "ui_element_losses_params.ui", self)
         self.parent = parent
         self.measurement = measurement
         self.statusbar = statusbar
@@ -200,7 +200,7 @@ class ElementLossesWidget(QtWidgets.QWidget):
         """
         try:
             super().__init__()
-            uic.loadUi(gutils.get_ui_dir() / "ui_element_losses.ui", self)
+            gutils.load_ui(gutils.get_ui_dir() / "ui_element_losses.ui", self)
 
             self.parent = parent
             self.icon_manager = parent.icon_manager
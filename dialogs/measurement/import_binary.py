@@ -42,7 +42,6 @@ from modules.request import Request
 
 from PyQt5 import QtCore
 from PyQt5 import QtWidgets
-from PyQt5 import uic
 
 
 class ImportDialogBinary(QtWidgets.QDialog):
@@ -53,7 +52,8 @@ class ImportDialogBinary(QtWidgets.QDialog):
         """Init binary measurement import dialog.
         """
         super().__init__()
-        uic.loadUi(gutils.get_ui_dir() / "ui_import_dialog_binary.ui", self)
+        gutils.load_ui(
+            gutils.get_ui_dir() / "ui_import_dialog_binary.ui", self)
 
         self.request = request
         self.__icon_manager = icon_manager
@@ -31,6 +31,8 @@ __version__ = "2.0"
 import logging
 import os
 import re
+import shutil
+import tempfile
 
 import dialogs.dialog_functions as df
 import modules.general_functions as gf
@@ -46,7 +48,6 @@ from dialogs.file_dialogs import open_files_dialog
 from modules.request import Request
 from widgets.icon_manager import IconManager
 
-from PyQt5 import uic
 from PyQt5 import QtCore
 from PyQt5 import QtWidgets
 
@@ -68,7 +69,7 @@ class ImportMeasurementsDialog(QtWidgets.QDialog):
             parent: A QtGui.QMainWindow of Potku.
         """
         super().__init__()
-        uic.loadUi(gutils.get_ui_dir() / "ui_import_dialog.ui", self)
+        gutils.load_ui(gutils.get_ui_dir() / "ui_import_dialog.ui", self)
 
         self.request = request
         self.__icon_manager = icon_manager
@@ -172,25 +173,39 @@ class ImportMeasurementsDialog(QtWidgets.QDialog):
         start_time = timer()
 
         sbh.reporter.report(10)
-        
+
+        # Coincidences are calculated into temporary files and each
+        # measurement is created when its file is finished.
+        items = [root.child(i) for i in range(root_child_count)]
         filename_list = []
-        for i in range(root_child_count):
-            item = root.child(i)
-            filename_list.append(item.filename)
-
-            output_file = df.import_new_measurement(
-                self.request, self.parent, item)
-            gf.coinc(Path(item.file),
-                     output_file=output_file,
-                     skip_lines=self.spin_skiplines.value(),
-                     tablesize=10,
-                     trigger=self.spin_adctrigger.value(),
-                     adc_count=self.spin_adccount.value(),
-                     timing=timing,
-                     columns=string_column,
-                     nevents=self.spin_eventcount.value())
-
-            sbh.reporter.report(10 + (i + 1) / root_child_count * 90)
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            tmp_files = [Path(tmp_dir, f"{i}.asc") for i in range(len(items))]
+            finished_files = gf.coinc_files(
+                [Path(item.file) for item in items], tmp_files,
+                workers=self.global_settings.get_import_workers(),
+                skip_lines=self.spin_skiplines.value(),
+                tablesize=10,
+                trigger=self.spin_adctrigger.value(),
+                adc_count=self.spin_adccount.value(),
+                timing=timing,
+                columns=string_column,
+                nevents=self.spin_eventcount.value())
+
+            for count, (i, success) in enumerate(finished_files, 1):
+                item = items[i]
+                if success:
+                    output_file = df.import_new_measurement(
+                        self.request, self.parent, item)
+                    shutil.move(str(tmp_files[i]), str(output_file))
+                    filename_list.append(item.filename)
+                    sbh.show_message(f"Imported {item.filename}.")
+                else:
+                    msg = f"Could not calculate coincidences of " \
+                          f"{item.filename}."
+                    logging.getLogger("request").error(msg)
+                    sbh.show_message(msg)
+
+                sbh.reporter.report(10 + count / root_child_count * 90)
 
         filenames = ", ".join(filename_list)
         elapsed = timer() - start_time
@@ -31,9 +31,9 @@ __version__ = "2.0"
 import modules.general_functions as gf
 import widgets.gui_utils as gutils
 
-from PyQt5 import uic
 from PyQt5 import QtWidgets
 
+from modules.histogram import IntegerHistogram
 from widgets.matplotlib.import_timing import MatplotlibImportTimingWidget
 
 
@@ -60,7 +60,7 @@ class ImportTimingGraphDialog(QtWidgets.QDialog):
                          captured from input_file.
         """
         super().__init__()
-        uic.loadUi(gutils.get_ui_dir() / "ui_import_graph_dialog.ui", self)
+        gutils.load_ui(gutils.get_ui_dir() / "ui_import_graph_dialog.ui", self)
 
         self.parent = parent
         self.img_dir = self.parent.request.directory
@@ -68,16 +68,27 @@ class ImportTimingGraphDialog(QtWidgets.QDialog):
         self.timing_high = adc_timing_spin[1]
 
         self.button_close.clicked.connect(self.close)
-        data = gf.coinc(
-            input_file, skip_lines=skip_lines, tablesize=10, trigger=trigger,
-            adc_count=adc_count, timing=timing, nevents=coinc_count,
-            columns="$4", timediff=True, output_file=output_file)
-        if not data:
+        # Time differences are counted into the histogram as coinc outputs
+        # them so that they do not need to be stored.
+        histogram = IntegerHistogram()
+        message = "No coincidence events were found."
+        try:
+            for timediffs in gf.iter_coinc(
+                    input_file, skip_lines=skip_lines, tablesize=10,
+                    trigger=trigger, adc_count=adc_count, timing=timing,
+                    nevents=coinc_count, columns="$4", timediff=True,
+                    output_file=output_file):
+                histogram.add(timediffs)
+        except ValueError:
+            histogram = IntegerHistogram()
+            message = "Time differences could not be read from the " \
+                      "coincidence events."
+        if not len(histogram):
             QtWidgets.QMessageBox.question(
-                self, "No data", "No coincidence events were found.",
+                self, "No data", message,
                 QtWidgets.QMessageBox.Ok, QtWidgets.QMessageBox.Ok)
             self.close()
         else:
             self.matplotlib = MatplotlibImportTimingWidget(
-                self, data, icon_manager, timing)
+                self, histogram, icon_manager, timing)
             self.exec_()
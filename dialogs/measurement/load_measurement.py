@@ -32,7 +32,6 @@ import widgets.input_validation as iv
 import dialogs.file_dialogs as fdialogs
 import widgets.gui_utils as gutils
 
-from PyQt5 import uic
 from PyQt5 import QtWidgets
 
 from dialogs.new_sample import NewSampleDialog
@@ -49,7 +48,7 @@ class LoadMeasurementDialog(QtWidgets.QDialog):
             directory: Directory where to open the file browser.
         """
         super().__init__()
-        uic.loadUi(gutils.get_ui_dir() / "ui_new_measurement.ui", self)
+        gutils.load_ui(gutils.get_ui_dir() / "ui_new_measurement.ui", self)
 
         self.browseButton.clicked.connect(self.__browse_files)
         self.addSampleButton.clicked.connect(self.__add_sample)
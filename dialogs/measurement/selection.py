@@ -43,7 +43,6 @@ from modules.element import Element
 
 from PyQt5 import QtCore
 from PyQt5 import QtGui
-from PyQt5 import uic
 from PyQt5 import QtWidgets
 
 
@@ -58,7 +57,7 @@ class SelectionSettingsDialog(QtWidgets.QDialog):
             selection: Selection class object.
         """
         super().__init__()
-        uic.loadUi(gutils.get_ui_dir() / "ui_selection_settings.ui", self)
+        gutils.load_ui(gutils.get_ui_dir() / "ui_selection_settings.ui", self)
 
         self.setAttribute(QtCore.Qt.WA_DeleteOnClose)
 
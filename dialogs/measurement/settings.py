@@ -40,7 +40,6 @@ from modules.measurement import Measurement
 
 from PyQt5 import QtCore
 from PyQt5 import QtWidgets
-from PyQt5 import uic
 
 from widgets.detector_settings import DetectorSettingsWidget
 from widgets.measurement.settings import MeasurementSettingsWidget
@@ -62,7 +61,7 @@ class MeasurementSettingsDialog(QtWidgets.QDialog):
             icon_manager: An icon manager.
         """
         super().__init__()
-        uic.loadUi(gutils.get_ui_dir() / "ui_specific_settings.ui", self)
+        gutils.load_ui(gutils.get_ui_dir() / "ui_specific_settings.ui", self)
 
         self.measurement = measurement
         self.icon_manager = icon_manager
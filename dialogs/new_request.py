@@ -38,7 +38,6 @@ import widgets.gui_utils as gutils
 
 from pathlib import Path
 
-from PyQt5 import uic
 from PyQt5 import QtWidgets
 
 
@@ -53,7 +52,7 @@ class RequestNewDialog(QtWidgets.QDialog):
             parent: Ibasoft class object.
         """
         super().__init__()
-        uic.loadUi(gutils.get_ui_dir() / "ui_new_request.ui", self)
+        gutils.load_ui(gutils.get_ui_dir() / "ui_new_request.ui", self)
 
         self.parent = parent
         self.folder = None  # Temporary for browsing folder
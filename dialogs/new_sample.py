@@ -31,7 +31,6 @@ __version__ = "2.0"
 import widgets.input_validation as iv
 import widgets.gui_utils as gutils
 
-from PyQt5 import uic
 from PyQt5 import QtWidgets
 
 
@@ -45,7 +44,7 @@ class NewSampleDialog(QtWidgets.QDialog):
             samples: List of samples.
         """
         super().__init__()
-        uic.loadUi(gutils.get_ui_dir() / "ui_new_sample.ui", self)
+        gutils.load_ui(gutils.get_ui_dir() / "ui_new_sample.ui", self)
 
         self.createButton.clicked.connect(self.__create_sample)
         self.cancelButton.clicked.connect(self.close)
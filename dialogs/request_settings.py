@@ -43,7 +43,6 @@ from pathlib import Path
 
 from PyQt5 import QtCore
 from PyQt5 import QtWidgets
-from PyQt5 import uic
 from PyQt5.QtWidgets import QDesktopWidget
 from PyQt5.QtWidgets import QApplication
 
@@ -69,7 +68,7 @@ class RequestSettingsDialog(QtWidgets.QDialog):
             icon_manager: IconManager object.
         """
         super().__init__()
-        uic.loadUi(gutils.get_ui_dir() / "ui_settings.ui", self)
+        gutils.load_ui(gutils.get_ui_dir() / "ui_settings.ui", self)
         self.setAttribute(QtCore.Qt.WA_DeleteOnClose)
         screen_geometry = \
             QDesktopWidget.availableGeometry(QApplication.desktop())
@@ -33,7 +33,6 @@ import dialogs.dialog_functions as df
 
 from widgets.simulation.settings import SimulationSettingsWidget
 
-from PyQt5 import uic
 from PyQt5 import QtWidgets
 from PyQt5 import QtCore
 from PyQt5.QtWidgets import QDesktopWidget
@@ -59,7 +58,7 @@ class ElementSimulationSettingsDialog(QtWidgets.QDialog,
             tab: A SimulationTabWidget.
         """
         super().__init__()
-        uic.loadUi(gutils.get_ui_dir() / "ui_specific_settings.ui", self)
+        gutils.load_ui(gutils.get_ui_dir() / "ui_specific_settings.ui", self)
         self.setWindowTitle("Element Settings")
 
         self.element_simulation = element_simulation
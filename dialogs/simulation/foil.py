@@ -37,7 +37,6 @@ from modules.foil import CircularFoil
 from modules.foil import RectangularFoil
 
 from PyQt5 import QtWidgets
-from PyQt5 import uic
 from PyQt5.QtCore import QLocale
 
 from widgets.matplotlib.simulation.composition import FoilCompositionWidget
@@ -54,7 +53,7 @@ class FoilDialog(QtWidgets.QDialog):
             icon_manager: Icon manager for TargetCompositionWidget.
         """
         super().__init__()
-        uic.loadUi(gutils.get_ui_dir() / "ui_composition_dialog.ui", self)
+        gutils.load_ui(gutils.get_ui_dir() / "ui_composition_dialog.ui", self)
 
         self.icon_manager = icon_manager
         self.foils = tmp_foils
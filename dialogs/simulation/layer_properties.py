@@ -43,7 +43,6 @@ from modules.element import Element
 from modules.layer import Layer
 
 from PyQt5 import QtWidgets
-from PyQt5 import uic
 from PyQt5.QtCore import QLocale
 
 
@@ -67,7 +66,7 @@ class LayerPropertiesDialog(QtWidgets.QDialog, bnd.PropertyTrackingWidget,
             first_layer: Whether the dialog is used to add the first layer.
         """
         super().__init__()
-        uic.loadUi(gutils.get_ui_dir() / "ui_layer_dialog.ui", self)
+        gutils.load_ui(gutils.get_ui_dir() / "ui_layer_dialog.ui", self)
 
         self.tab = tab
         self.layer = layer
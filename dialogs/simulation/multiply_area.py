@@ -32,7 +32,6 @@ from typing import Optional
 from modules.recoil_element import RecoilElement
 
 from PyQt5 import QtWidgets
-from PyQt5 import uic
 from PyQt5.QtCore import QLocale
 
 
@@ -48,7 +47,8 @@ class MultiplyAreaDialog(QtWidgets.QDialog):
             main_recoil: Main RecoilElement object.
         """
         super().__init__()
-        uic.loadUi(gutils.get_ui_dir() / "ui_multiply_area_dialog.ui", self)
+        gutils.load_ui(
+            gutils.get_ui_dir() / "ui_multiply_area_dialog.ui", self)
 
         self.main_recoil = main_recoil
 
@@ -27,7 +27,6 @@ __version__ = "2.0"
 import widgets.gui_utils as gutils
 
 from PyQt5 import QtWidgets
-from PyQt5 import uic
 from PyQt5.QtCore import QLocale
 
 
@@ -43,7 +42,7 @@ class MultiplyCoordinateDialog(QtWidgets.QDialog):
             clipboard_ratio: Text that is in clipboard.
         """
         super().__init__()
-        uic.loadUi(
+        gutils.load_ui(
             gutils.get_ui_dir() / "ui_multiply_coordinate_dialog.ui", self)
 
         self.ratio_str = clipboard_ratio
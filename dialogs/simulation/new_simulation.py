@@ -37,7 +37,6 @@ import widgets.gui_utils as gutils
 from dialogs.new_sample import NewSampleDialog
 
 from PyQt5 import QtWidgets
-from PyQt5 import uic
 
 
 class SimulationNewDialog(QtWidgets.QDialog):
@@ -50,7 +49,7 @@ class SimulationNewDialog(QtWidgets.QDialog):
             samples: Samples of request.
         """
         super().__init__()
-        uic.loadUi(gutils.get_ui_dir() / "ui_new_simulation.ui", self)
+        gutils.load_ui(gutils.get_ui_dir() / "ui_new_simulation.ui", self)
 
         # Add existing samples to view.
         self.samples = samples
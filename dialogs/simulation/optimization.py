@@ -35,8 +35,10 @@ import widgets.gui_utils as gutils
 from pathlib import Path
 from typing import Dict
 from typing import Any
+from typing import Optional
 
 from modules.nsgaii import Nsgaii
+from modules.nsgaii import Checkpoint
 from modules.concurrency import CancellationToken
 from modules.simulation import Simulation
 from modules.element_simulation import ElementSimulation
@@ -49,7 +51,6 @@ from widgets.simulation.optimization_parameters import \
 from widgets.simulation.optimization_parameters import \
     OptimizationRecoilParameterWidget
 
-from PyQt5 import uic
 from PyQt5.QtCore import QLocale
 from PyQt5 import QtWidgets
 
@@ -98,7 +99,7 @@ class OptimizationDialog(QtWidgets.QDialog, PropertySavingWidget,
         self.tab = parent
         self.current_mode = OptimizationType.RECOIL
 
-        uic.loadUi(gutils.get_ui_dir() / "ui_optimization_params.ui", self)
+        gutils.load_ui(gutils.get_ui_dir() / "ui_optimization_params.ui", self)
 
         self.recoil_widget = OptimizationRecoilParameterWidget()
         self.fluence_widget = OptimizationFluenceParameterWidget()
@@ -236,22 +237,36 @@ class OptimizationDialog(QtWidgets.QDialog, PropertySavingWidget,
                 self.fluence_widget.show()
                 self.current_mode = OptimizationType.FLUENCE
 
+    def _ask_resume(self, nsgaii: Nsgaii) -> Optional[Checkpoint]:
+        """Asks whether an unfinished optimization that has a checkpoint
+        should be continued instead of starting a new one.
+
+        Return:
+            checkpoint to continue from or None
+        """
+        try:
+            checkpoint = nsgaii.load_checkpoint()
+        except (OSError, ValueError):
+            return None
+        if checkpoint is None or checkpoint.evaluations_left <= 0:
+            return None
+        reply = QtWidgets.QMessageBox.question(
+            self, "Unfinished optimization",
+            f"A previous optimization was stopped with "
+            f"{checkpoint.evaluations_left} evaluations left.\n\n"
+            f"Do you want to continue it?",
+            QtWidgets.QMessageBox.Yes | QtWidgets.QMessageBox.No,
+            QtWidgets.QMessageBox.Yes)
+        if reply == QtWidgets.QMessageBox.Yes:
+            return checkpoint
+        return None
+
     def start_optimization(self):
         """Find necessary cut file and make energy spectrum with it, and start
         optimization with given parameters.
         """
         elem_sim = self.selected_element_simulation
         cut, measurement = self.selected_cut_file
-        # Delete previous results widget if it exists
-        if self.tab.optimization_result_widget:
-            self.tab.del_widget(
-                self.tab.optimization_result_widget)
-            self.tab.optimization_result_widget = None
-
-            # Delete previous energy spectra if there are any
-            df.delete_optim_espe(self, elem_sim)
-
-        self.close()
 
         if self.current_mode == OptimizationType.RECOIL:
             params = self.recoil_widget.get_properties()
@@ -262,11 +277,28 @@ class OptimizationDialog(QtWidgets.QDialog, PropertySavingWidget,
         nsgaii = Nsgaii(
             element_simulation=elem_sim, measurement=measurement, cut_file=cut,
             ch=self.ch, **params, use_efficiency=self.use_efficiency)
+        # Checkpoint is read before previous results are deleted
+        checkpoint = self._ask_resume(nsgaii)
+
+        # Delete previous results widget if it exists
+        if self.tab.optimization_result_widget:
+            # Resumed optimization needs its files and checkpoint
+            self.tab.optimization_result_widget.delete_results_on_close = \
+                checkpoint is None
+            self.tab.del_widget(
+                self.tab.optimization_result_widget)
+            self.tab.optimization_result_widget = None
+
+            # Delete previous energy spectra if there are any
+            df.delete_optim_espe(self, elem_sim)
+
+        self.close()
 
         # Optimization running thread
         ct = CancellationToken()
         optimization_thread = threading.Thread(
-            target=nsgaii.start_optimization, kwargs={"cancellation_token": ct})
+            target=nsgaii.start_optimization,
+            kwargs={"cancellation_token": ct, "checkpoint": checkpoint})
 
         # Create necessary results widget
         result_widget = self.tab.add_optimization_results_widget(
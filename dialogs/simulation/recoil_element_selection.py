@@ -41,7 +41,6 @@ from dialogs.element_selection import ElementSelectionDialog
 from PyQt5 import QtCore
 from PyQt5 import QtGui
 from PyQt5 import QtWidgets
-from PyQt5 import uic
 
 
 class RecoilElementSelectionDialog(QtWidgets.QDialog):
@@ -53,7 +52,7 @@ class RecoilElementSelectionDialog(QtWidgets.QDialog):
         """Inits simulation element selection dialog.
         """
         super().__init__()
-        uic.loadUi(
+        gutils.load_ui(
             gutils.get_ui_dir() / "ui_recoil_element_selection_dialog.ui", self)
         self.setAttribute(QtCore.Qt.WA_DeleteOnClose)
         self.recoil_atom_distribution = recoil_atom_distribution
@@ -39,7 +39,6 @@ from modules.element_simulation import ElementSimulation
 from modules.recoil_element import RecoilElement
 
 from PyQt5 import QtWidgets
-from PyQt5 import uic
 from PyQt5.QtGui import QColor
 
 from widgets.scientific_spinbox import ScientificSpinBox
@@ -79,7 +78,7 @@ class RecoilInfoDialog(QtWidgets.QDialog, bnd.PropertyBindingWidget,
         self.scientific_spinbox = ScientificSpinBox(
             value=value, minimum=0.01, maximum=9.99e23)
 
-        uic.loadUi(gutils.get_ui_dir() / "ui_recoil_info_dialog.ui", self)
+        gutils.load_ui(gutils.get_ui_dir() / "ui_recoil_info_dialog.ui", self)
 
         self.okPushButton.clicked.connect(self.__accept_settings)
         self.cancelPushButton.clicked.connect(self.close)
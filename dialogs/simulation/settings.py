@@ -37,7 +37,6 @@ from modules.simulation import Simulation
 
 from PyQt5 import QtCore
 from PyQt5 import QtWidgets
-from PyQt5 import uic
 
 from widgets.detector_settings import DetectorSettingsWidget
 from widgets.measurement.settings import MeasurementSettingsWidget
@@ -59,7 +58,7 @@ class SimulationSettingsDialog(QtWidgets.QDialog):
             icon_manager: An icon manager.
         """
         super().__init__()
-        uic.loadUi(gutils.get_ui_dir() / "ui_specific_settings.ui", self)
+        gutils.load_ui(gutils.get_ui_dir() / "ui_specific_settings.ui", self)
 
         self.tab = tab
         self.simulation = simulation
@@ -29,7 +29,6 @@ import time
 import widgets.input_validation as iv
 import widgets.gui_utils as gutils
 
-from PyQt5 import uic
 from PyQt5 import QtWidgets
 
 
@@ -46,7 +45,7 @@ class TargetInfoDialog(QtWidgets.QDialog):
             target: Target object.
         """
         super().__init__()
-        uic.loadUi(gutils.get_ui_dir() / "ui_target_info.ui", self)
+        gutils.load_ui(gutils.get_ui_dir() / "ui_target_info.ui", self)
 
         self.target = target
 
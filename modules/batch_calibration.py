@@ -0,0 +1,254 @@
+# coding=utf-8
+"""
+Created on 18.10.2026
+
+Potku is a graphical user interface for analyzation and
+visualization of measurement data collected from a ToF-ERD
+telescope. For physics calculations Potku uses external
+analyzation components.
+Copyright (C) 2026 Potku developers
+
+This program is free software; you can redistribute it and/or
+modify it under the terms of the GNU General Public License
+as published by the Free Software Foundation; either version 2
+of the License, or (at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program (file named 'LICENCE').
+
+batch_calibration.py calibrates the time of flight of several measurements
+at once. It does what CalibrationDialog does for each cut file without
+user interaction: the leading edge of each cut's histogram is fitted, the
+middle point of the edge is used as a TOFCalibrationPoint and a line is
+fitted to the points of each measurement.
+"""
+__author__ = "Potku developers"
+__version__ = "2.0"
+
+import math
+import os
+import warnings
+
+import numpy as np
+
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Dict
+from typing import Iterable
+from typing import List
+from typing import NamedTuple
+from typing import Optional
+from typing import Sequence
+from typing import Tuple
+
+from .calibration import LeadingEdgeFit
+from .calibration import TOFCalibration
+from .calibration import TOFCalibrationHistogram
+from .calibration import TOFCalibrationPoint
+from .calibration import get_r_squared
+from .cut_file import CutFile
+from .detector import Detector
+from .measurement import Measurement
+from .run import Run
+
+
+class CutCalibration(NamedTuple):
+    """Calibration point obtained from a single cut file.
+    """
+    cut_file: Path
+    cut: CutFile
+    # None if the leading edge could not be fitted
+    edge_fit: Optional[LeadingEdgeFit]
+    # None if the edge could not be fitted or the time of flight could not
+    # be calculated for the cut
+    point: Optional[TOFCalibrationPoint]
+
+
+class CalibrationResult(NamedTuple):
+    """Time of flight calibration of a measurement. Fitted values are None
+    and statistics NaN if there are less than two calibration points.
+    Standard errors require at least three points.
+    """
+    slope: Optional[float]
+    offset: Optional[float]
+    slope_error: float
+    offset_error: float
+    # Coefficient of determination of the linear fit
+    r_squared: float
+    # Root mean square of the residuals of the linear fit in seconds
+    rms_residual: float
+    tof_calibration: TOFCalibration
+    cuts: List[CutCalibration]
+
+    def get_points(self) -> List[TOFCalibrationPoint]:
+        """Returns the calibration points that were used in the fit.
+        """
+        return [cut.point for cut in self.cuts if cut.point is not None]
+
+
+def calibrate_measurements(
+        measurements: Iterable[Measurement],
+        cut_files: Optional[Dict[Measurement, Sequence[Path]]] = None,
+        bin_width: float = 2.0, column: int = 0,
+        workers: Optional[int] = None, detector: Optional[Detector] = None,
+        run: Optional[Run] = None) -> Dict[Measurement, CalibrationResult]:
+    """Calibrates the time of flight of each measurement. The histograms
+    of all cut files are built and fitted in parallel.
+
+    Args:
+        measurements: measurements to calibrate
+        cut_files: cut files to use for each measurement. By default all
+            cut files in the Cuts directory of the measurement are used.
+        bin_width: bin width of the histograms
+        column: column of the cut file data that contains the time of
+            flight channels
+        workers: maximum number of threads that fit the cut files.
+            Defaults to the number of processors. If 1, the cut files are
+            fitted in the calling thread.
+        detector: detector used to calculate the times of flight. Defaults
+            to the detector used by each measurement.
+        run: run used to calculate the times of flight. Defaults to the run
+            used by each measurement.
+
+    Return:
+        CalibrationResult for each measurement
+    """
+    measurements = list(measurements)
+    if cut_files is None:
+        cut_files = {
+            measurement: measurement.get_cut_files()[0]
+            for measurement in measurements
+        }
+    all_files = [
+        file for measurement in measurements
+        for file in cut_files.get(measurement, ())
+    ]
+    fits = dict(zip(all_files, fit_cut_files(
+        all_files, bin_width=bin_width, column=column, workers=workers)))
+
+    results = {}
+    for measurement in measurements:
+        used_detector, used_run, *_ = measurement.get_used_settings()
+        results[measurement] = calibrate(
+            [(file, *fits[file]) for file in cut_files.get(measurement, ())],
+            detector or used_detector, run or used_run)
+    return results
+
+
+def fit_cut_files(cut_files: Sequence[Path], bin_width: float = 2.0,
+                  column: int = 0, workers: Optional[int] = None) \
+        -> List[Tuple[CutFile, Optional[LeadingEdgeFit]]]:
+    """Reads cut files and fits the leading edges of their histograms.
+
+    Args:
+        cut_files: paths to cut files
+        bin_width: bin width of the histograms
+        column: column of the cut file data that is histogrammed
+        workers: maximum number of threads. Defaults to the number of
+            processors. If 1, the files are fitted in the calling thread.
+            NumPy and SciPy release the GIL for most of the fitting.
+
+    Return:
+        cut file and the fit of its leading edge (or None) for each file in
+        the given order. The data of the returned cut files is empty.
+    """
+    import scipy.optimize as optimize
+
+    if workers is None:
+        workers = os.cpu_count() or 1
+    workers = min(workers, len(cut_files))
+    args = cut_files, [bin_width] * len(cut_files), [column] * len(cut_files)
+
+    # Warning filters are shared by all threads, so they are set here
+    # instead of in each thread
+    with warnings.catch_warnings():
+        # Covariance cannot be estimated for fits of only a few bins
+        warnings.simplefilter("ignore", optimize.OptimizeWarning)
+        if workers <= 1:
+            return list(map(_fit_cut_file, *args))
+        with ThreadPoolExecutor(workers) as executor:
+            return list(executor.map(_fit_cut_file, *args))
+
+
+def calibrate(
+        cut_fits: Iterable[Tuple[Path, CutFile, Optional[LeadingEdgeFit]]],
+        detector: Detector, run: Run) -> CalibrationResult:
+    """Calculates the calibration points of fitted cut files and fits a
+    line to them.
+
+    Args:
+        cut_fits: path, cut file and leading edge fit of each cut
+        detector: detector used to calculate the times of flight
+        run: run used to calculate the times of flight
+
+    Return:
+        CalibrationResult
+    """
+    tof_calibration = TOFCalibration()
+    cuts = []
+    for file, cut, edge_fit in cut_fits:
+        point = None
+        if edge_fit is not None and cut.element:
+            try:
+                point = TOFCalibrationPoint(edge_fit.x0, cut, detector, run)
+            except (ValueError, ZeroDivisionError):
+                # Impossible kinematics for the cut
+                pass
+            else:
+                tof_calibration.add_point(point)
+        cuts.append(CutCalibration(file, cut, edge_fit, point))
+
+    x, y, _ = tof_calibration.get_points()
+    slope, offset = tof_calibration.fit_linear_function(x, y, 0, 0)
+    slope_error, offset_error, r_squared, rms = _get_linear_fit_statistics(
+        x, y, slope, offset)
+    return CalibrationResult(
+        slope=slope, offset=offset, slope_error=slope_error,
+        offset_error=offset_error, r_squared=r_squared, rms_residual=rms,
+        tof_calibration=tof_calibration, cuts=cuts)
+
+
+def _fit_cut_file(cut_file: Path, bin_width: float, column: int) \
+        -> Tuple[CutFile, Optional[LeadingEdgeFit]]:
+    """Reads a cut file and fits the leading edge of its histogram. The data
+    of the cut is cleared so that the data of all cut files is not kept in
+    memory at once.
+    """
+    cut = CutFile(cut_file_path=Path(cut_file))
+    edge_fit = TOFCalibrationHistogram(
+        cut, bin_width, column).fit_leading_edge()
+    cut.data = []
+    return cut, edge_fit
+
+
+def _get_linear_fit_statistics(x: Sequence[float], y: Sequence[float],
+                               slope: Optional[float],
+                               offset: Optional[float]) \
+        -> Tuple[float, float, float, float]:
+    """Returns the standard errors of the slope and offset, the coefficient
+    of determination and the root mean square of the residuals of a linear
+    fit.
+    """
+    nan = float("nan")
+    if slope is None or offset is None:
+        return nan, nan, nan, nan
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    fitted = slope * x + offset
+    residuals = y - fitted
+    rms = math.sqrt(float(np.mean(residuals ** 2)))
+    r_squared = get_r_squared(y, fitted)
+
+    n = x.size
+    s_xx = float(np.sum((x - x.mean()) ** 2))
+    if n < 3 or not s_xx:
+        return nan, nan, r_squared, rms
+    variance = float(np.sum(residuals ** 2)) / (n - 2)
+    slope_error = math.sqrt(variance / s_xx)
+    offset_error = math.sqrt(variance * (1 / n + x.mean() ** 2 / s_xx))
+    return slope_error, offset_error, r_squared, rms
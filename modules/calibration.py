@@ -29,18 +29,21 @@ __author__ = "Jarkko Aalto \n Timo Konu \n Samuli Kärkkäinen " \
 __version__ = "2.0"
 
 import collections
-import scipy.optimize as optimize
+
+import numpy as np
 
 from . import general_functions as gf
 
 from numpy import array
+from numpy import cos
 from numpy import linspace
+from numpy import pi
+from numpy import sin
+from numpy import sqrt
 
-from scipy import cos
-from scipy import sin
-from scipy import sqrt
-from scipy import pi
-from scipy.special import erf
+from typing import NamedTuple
+from typing import Optional
+from typing import Tuple
 
 
 class TOFCalibrationHistogram:
@@ -60,11 +63,12 @@ class TOFCalibrationHistogram:
         self.cut = cut
         self.bin_width = bin_width
         self.use_column = use_column
-        histed_file = gf.hist(
-            self.cut.data, width=self.bin_width, col=self.use_column)
+        values = np.fromiter(
+            (row[self.use_column] for row in self.cut.data), dtype=float,
+            count=len(self.cut.data))
 
-        self.histogram_x = [float(pair[0]) for pair in histed_file]
-        self.histogram_y = [float(pair[1]) for pair in histed_file]
+        self.histogram_x, self.histogram_y = get_histogram(
+            values, self.bin_width)
 
     def get_error_function_parameters(self, end_of_front_edge,
                                       start_of_front_edge=0):
@@ -80,6 +84,8 @@ class TOFCalibrationHistogram:
         """
         list_x = self.histogram_x[start_of_front_edge:end_of_front_edge]
         list_y = self.histogram_y[start_of_front_edge:end_of_front_edge]
+        if len(list_x) < 2:
+            return None
 
         # Guess that x0 is the
         # Returns parameters as a tuple(x0, A, k)
@@ -101,11 +107,30 @@ class TOFCalibrationHistogram:
         Return:
             Returns calculated error function value for x.
         """
+        from scipy.special import erf
+
         x0, a, k = params
         return a * (erf((x - x0) / k) + 1) / 2
 
-    def __residuals(self, p, x, y):
-        return y - self.error_function(x, p)
+    def error_function_jacobian(self, x, params):
+        """Partial derivatives of the error function with respect to its
+        parameters.
+
+        Args:
+            x: array of values on X axis.
+            params: namedtuple or tuple that brings the used parameters
+            ("x0 A k").
+
+        Return:
+            array whose columns are the derivatives with respect to x0, A
+            and k.
+        """
+        from scipy.special import erf
+
+        x0, a, k = params
+        u = (x - x0) / k
+        gauss = a * np.exp(-u ** 2) / (np.sqrt(np.pi) * k)
+        return np.column_stack((-gauss, (erf(u) + 1) / 2, -gauss * u))
 
     def fit_error_function(self, x, y, guess_x0, guess_a, guess_k):
         """Fits a error function to the given data.
@@ -118,25 +143,65 @@ class TOFCalibrationHistogram:
             guess_k: Guess for the k's value
 
         Return:
-            tuple(x0, A, k) of parameters of a fitted error function.
+            tuple(x0, A, k) of parameters of a fitted error function or None
+            if the fit failed.
         """
-        if len(x) < 2 or len(y) < 2:
+        fit = self.__curve_fit(x, y, (guess_x0, guess_a, guess_k))
+        if fit is None:
             return None
+        Param = collections.namedtuple("Param", "x0 a k")
+        p = Param(*fit[0])
 
-        x = array(x)  # Numpy array
-        y = array(y)
+        return p.x0, p.a, p.k
 
-        Param = collections.namedtuple("Param", "x0 a k")
-        p_guess = Param(x0=guess_x0, a=guess_a, k=guess_k)
+    def __curve_fit(self, x, y, p0):
+        """Fits the error function to the given data starting from
+        parameters p0.
+
+        Return:
+            fitted parameters and their covariance matrix as arrays or None
+            if the fit failed.
+        """
+        import scipy.optimize as optimize
+
+        if len(x) < 2 or len(y) < 2:
+            return None
+
+        x = np.asarray(x, dtype=float)
+        y = np.asarray(y, dtype=float)
         try:
-            p, unused_cov, unused_infodict, unused_mesg, unused_ier = \
-                optimize.leastsq(self.__residuals, p_guess, args=(x, y),
-                                 full_output=True)
-            p = Param(*p)
+            with np.errstate(all="ignore"):
+                return optimize.curve_fit(
+                    lambda x_, *p_: self.error_function(x_, p_), x, y, p0=p0,
+                    jac=lambda x_, *p_: self.error_function_jacobian(x_, p_))
+        except (RuntimeError, ValueError, TypeError):
+            # No convergence or invalid values in the data
+            return None
 
-            return p.x0, p.a, p.k
-        except TypeError:
+    def fit_leading_edge(self) -> Optional["LeadingEdgeFit"]:
+        """Fits the error function to the leading edge like
+        get_error_function_parameters with the borders given by
+        find_leading_edge_borders.
+
+        Return:
+            LeadingEdgeFit or None if the fit failed.
+        """
+        start, end = self.find_leading_edge_borders()
+        x = self.histogram_x[start:end]
+        y = self.histogram_y[start:end]
+        if len(x) < 2:
             return None
+        fit = self.__curve_fit(x, y, (x[-1], y[-1], 10))
+        if fit is None:
+            return None
+        params, cov = fit
+        with np.errstate(invalid="ignore"):
+            errors = np.sqrt(np.diag(cov))
+        return LeadingEdgeFit(
+            params=tuple(map(float, params)),
+            errors=tuple(map(float, errors)),
+            r_squared=get_r_squared(y, self.error_function(x, params)),
+            start=start, end=end)
 
     def find_leading_edge_borders(self):
         """Finds the beginning and the end of the leading edge.
@@ -145,57 +210,51 @@ class TOFCalibrationHistogram:
             Returns a tuple of the beginning and end indexes of the leading
             edge.
         """
-        # return self.histogram_y.index(max(self.histogram_y))
+        histogram_y = self.histogram_y
+        if not histogram_y.size:
+            return 0, 0
         # Find the "actual" beginning of the file, ignoring low values at the
         # beginning. Cut the size when using large amounts of data, since the
         # leading edge is in the first half of the data.
-        threshold_mix = max(self.histogram_y) * 0.025
-        threshold_min = max(self.histogram_y) * 0.05
-        t_mix = 0
-        for y in self.histogram_y:
-            if y >= threshold_mix and t_mix == 0:
-                if y >= threshold_min:
-                    break
-                t_mix = self.histogram_y.index(y)
-        size = len(self.histogram_y)
+        threshold_mix = histogram_y.max() * 0.025
+        threshold_min = histogram_y.max() * 0.05
+        t_mix = int(np.argmax(histogram_y >= threshold_mix))
+        if histogram_y[t_mix] >= threshold_min:
+            t_mix = 0
+        size = histogram_y.size
         if size > 50:
-            list_y = self.histogram_y[t_mix:t_mix + int(size / 4)]
+            list_y = histogram_y[t_mix:t_mix + int(size / 4)]
+        else:
+            t_mix = 0
+            list_y = histogram_y
+        threshold_max = list_y.max() * 0.95
+
+        # The leading edge begins where the values last rise over the
+        # minimum threshold before they reach the maximum threshold. The
+        # first value of a rise is never taken as the end of the edge.
+        over_min = list_y >= threshold_min
+        rises = over_min.copy()
+        rises[1:] &= ~over_min[:-1]
+        over_max = (list_y >= threshold_max) & ~rises
+        rise_indexes = np.flatnonzero(rises)
+        if over_max.any():
+            t_max = int(np.argmax(over_max))
         else:
-            list_y = self.histogram_y
-        y_max = max(list_y)
-        threshold_max = y_max * 0.95
-        t_min_over = False
-        t_max_over = False
-        t_min = 0  # Temporary indexes
-        t_max = len(list_y) - 1  # Temporary indexes
-        # Try to find index of which's value exceeds threshold minimum and
-        # maximum to get the beginning and end of the leading edge.
-        for y in list_y:
-            if threshold_mix <= y <= threshold_min and t_mix == 0:
-                t_mix = self.histogram_y.index(y)
-            if y >= threshold_min and not t_min_over:
-                t_min_over = True
-                t_min = self.histogram_y.index(y)
-            elif y <= threshold_min and not t_max_over:
-                # Keep pushing min threshold until we've passed max threshold.
-                t_min_over = False
-            elif y >= threshold_max and not t_max_over:
-                if not t_min_over:
-                    t_min_over = True
-                t_max_over = True
-                t_max = self.histogram_y.index(y)
-                break
+            t_max = list_y.size - 1
+        previous_rises = rise_indexes[rise_indexes <= t_max]
+        t_min = int(previous_rises[-1]) if previous_rises.size else 0
+
         # If the data happens to be extremely small, we might need to increase
         # index values since SciPy will not appreciate when distance between
         # index values is under three. Error function requires a list with at
         # least three values.
         if t_min + 2 >= t_max:
-            if t_max + 2 < len(list_y):
+            if t_max + 2 < list_y.size:
                 t_max += 2
-                t_min -= 1  # Always at least 1, this is fine.
+                t_min = max(t_min - 1, 0)
             elif t_min - 2 > 0:
                 t_min -= 2
-        return t_min, t_max
+        return t_mix + t_min, t_mix + t_max
 
     def get_curve_fit_points(self, params, points_in_range):
         """Generates points from the error function with the histogram's range
@@ -214,6 +273,63 @@ class TOFCalibrationHistogram:
         return x_values, y_values
 
 
+class LeadingEdgeFit(NamedTuple):
+    """Error function fitted to the leading edge of a histogram.
+    """
+    # Parameters (x0, A, k) of the error function
+    params: Tuple[float, float, float]
+    # Standard errors of the parameters
+    errors: Tuple[float, float, float]
+    # Coefficient of determination of the fit
+    r_squared: float
+    # Indexes of the histogram bins that the fit was made to
+    start: int
+    end: int
+
+    @property
+    def x0(self) -> float:
+        """Middle point of the leading edge, i.e. the time of flight
+        channel of the calibration point.
+        """
+        return self.params[0]
+
+
+def get_r_squared(y: np.ndarray, fitted: np.ndarray) -> float:
+    """Returns the coefficient of determination of fitted values. If the
+    values are all equal, NaN is returned.
+    """
+    y = np.asarray(y, dtype=float)
+    ss_res = float(np.sum((y - fitted) ** 2))
+    ss_tot = float(np.sum((y - y.mean()) ** 2))
+    if not ss_tot:
+        return float("nan")
+    return 1 - ss_res / ss_tot
+
+
+def get_histogram(values: np.ndarray, width: float) \
+        -> Tuple[np.ndarray, np.ndarray]:
+    """Divides values into bins of given width like general_functions.hist.
+
+    Bins are [a, a + width) where a is a multiple of width. An empty bin
+    is added before the first value.
+
+    Args:
+        values: array of values
+        width: width of the bins
+
+    Return:
+        centers of the bins and the number of values in each bin as arrays
+    """
+    values = np.asarray(values, dtype=float)
+    if not values.size:
+        return np.zeros(0), np.zeros(0)
+    first = int(values.min() / width) * width
+    indexes = np.floor((values - first) / width).astype(np.int64) + 1
+    counts = np.bincount(indexes).astype(float)
+    centers = first + (np.arange(counts.size) - 0.5) * width
+    return centers, counts
+
+
 class TOFCalibration:
     """Class for holding list of TOFCalibrationPoints and creating a linear fit
     of their values.
@@ -313,6 +429,8 @@ class TOFCalibration:
         Returns:
             tuple(a, b) of parameters of a fitted linear function.
         """
+        import scipy.optimize as optimize
+
         if len(x) < 2 or len(y) < 2:
             self.slope = None
             self.offset = None
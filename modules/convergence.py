@@ -0,0 +1,191 @@
+# coding=utf-8
+"""
+Created on 18.10.2026
+
+Potku is a graphical user interface for analyzation and
+visualization of measurement data collected from a ToF-ERD
+telescope. For physics calculations Potku uses external
+analyzation components.
+Copyright (C) 2026 Potku developers
+
+This program is free software; you can redistribute it and/or
+modify it under the terms of the GNU General Public License
+as published by the Free Software Foundation; either version 2
+of the License, or (at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program (file named 'LICENCE').
+
+convergence.py follows the statistical precision of a simulated energy
+spectrum while the simulation is running so that the simulation can be
+stopped once the spectrum is precise enough.
+"""
+__author__ = "Potku developers"
+__version__ = "2.0"
+
+import math
+
+import numpy as np
+
+from pathlib import Path
+from typing import Callable
+from typing import Dict
+from typing import Iterable
+from typing import List
+from typing import Optional
+from typing import Tuple
+
+from .base import Espe
+from .reweighting import parse_recoil_events
+from .reweighting import tof_to_energy
+
+
+class SpectrumConvergenceMonitor:
+    """Histograms the recoil events of running simulations into energy
+    channels and estimates the statistical uncertainty of each channel.
+
+    Each update only reads the lines that have been appended to the .erd
+    files since the previous update. Events are weighted by the recoil
+    distribution like in get_espe, but the time resolution broadening is
+    left out. A channel keeps the sum of its event weights and the sum of
+    the squared weights, and its relative uncertainty is
+    sqrt(sum of squared weights) / sum of weights.
+    """
+
+    def __init__(self, erd_files: Callable[[], Iterable[Path]],
+                 toflen: float, channel_width: float,
+                 distribution: Tuple[np.ndarray, np.ndarray],
+                 intensity_limit: float = 0.1):
+        """Initializes a new SpectrumConvergenceMonitor.
+
+        Args:
+            erd_files: function that returns the .erd files of the
+                simulation. It is called on each update so that files of
+                new processes are included.
+            toflen: time-of-flight length (m)
+            channel_width: channel width (MeV) of the spectrum
+            distribution: depths (nm) and concentrations of the recoil
+                distribution
+            intensity_limit: only channels whose intensity is at least this
+                fraction of the highest intensity are used to determine
+                the precision of the spectrum
+        """
+        self._erd_files = erd_files
+        self.toflen = toflen
+        self.channel_width = channel_width
+        self.dist_x, self.dist_y = distribution
+        self.intensity_limit = intensity_limit
+        self.mass: Optional[float] = None
+        self._offsets: Dict[Path, int] = {}
+        self._sums = np.zeros(0)
+        self._squares = np.zeros(0)
+
+    def update(self) -> float:
+        """Reads new events from the .erd files and adds them to the
+        spectrum.
+
+        Return:
+            precision of the spectrum after the update
+        """
+        for erd_file in self._erd_files():
+            lines = self._read_new_lines(Path(erd_file))
+            if lines:
+                self.add_events(*parse_recoil_events(lines))
+        return self.get_precision()
+
+    def _read_new_lines(self, erd_file: Path) -> List[bytes]:
+        """Returns the complete lines that have been written into the file
+        since it was last read. A line that is still being written is read
+        on a later update.
+        """
+        offset = self._offsets.get(erd_file, 0)
+        try:
+            with erd_file.open("rb") as file:
+                file.seek(offset)
+                data = file.read()
+        except OSError:
+            return []
+        end = data.rfind(b"\n") + 1
+        self._offsets[erd_file] = offset + end
+        return data[:end].splitlines()
+
+    def add_events(self, masses: np.ndarray, depths: np.ndarray,
+                   weights: np.ndarray, tofs: np.ndarray):
+        """Adds recoil events to the spectrum.
+
+        The average mass of the first events is used to convert
+        times-of-flight into energies for all events.
+
+        Args:
+            masses: masses (u) of the recoils
+            depths: depths (nm) from which the recoils originated
+            weights: simulated weights of the events
+            tofs: times-of-flight (ns) of the recoils
+        """
+        if not masses.size:
+            return
+        if self.mass is None:
+            self.mass = float(masses.mean())
+        energies = tof_to_energy(self.mass, self.toflen, tofs)
+        valid = np.isfinite(energies)
+        channels = np.rint(energies[valid] / self.channel_width).astype(
+            np.int64)
+        if len(self.dist_x):
+            weights = weights[valid] * np.interp(
+                depths[valid], self.dist_x, self.dist_y, left=0.0, right=0.0)
+        else:
+            weights = np.zeros(channels.size)
+        if not channels.size:
+            return
+
+        length = max(self._sums.size, int(channels.max()) + 1)
+        self._sums = _add(self._sums, channels, weights, length)
+        self._squares = _add(self._squares, channels, weights ** 2, length)
+
+    def get_spectrum(self) -> Espe:
+        """Returns the current spectrum as a list of (energy, intensity)
+        tuples. Intensities are not normalized.
+        """
+        return [
+            (round(float(k * self.channel_width), 10), float(v))
+            for k, v in enumerate(self._sums) if v
+        ]
+
+    def get_uncertainties(self) -> np.ndarray:
+        """Returns the relative statistical uncertainty of each channel.
+        Empty channels have infinite uncertainty.
+        """
+        with np.errstate(divide="ignore", invalid="ignore"):
+            return np.where(
+                self._sums > 0, np.sqrt(self._squares) / self._sums, np.inf)
+
+    def get_precision(self) -> float:
+        """Returns the highest relative uncertainty of the channels whose
+        intensity is significant compared to the highest intensity. Returns
+        infinity if the spectrum is empty.
+        """
+        if not self._sums.size or self._sums.max() <= 0:
+            return math.inf
+        significant = self._sums >= self.intensity_limit * self._sums.max()
+        return float(self.get_uncertainties()[significant].max())
+
+    def is_converged(self, target_precision: float) -> bool:
+        """Whether the precision of the spectrum has reached the target.
+        """
+        return self.get_precision() <= target_precision
+
+
+def _add(values: np.ndarray, channels: np.ndarray, weights: np.ndarray,
+         length: int) -> np.ndarray:
+    """Adds weighted channel counts to the values, growing the array to the
+    given length.
+    """
+    counts = np.bincount(channels[channels >= 0],
+                         weights=weights[channels >= 0], minlength=length)
+    counts[:values.size] += values
+    return counts
@@ -153,6 +153,9 @@ class CutFile:
             total count of same element and isotope selection. This is so
             that we do not overwrite first 2H selection with other
             2H selection.
+
+        Return:
+            path to the saved file or None if nothing was saved.
         """
         element = self.element
         if element and self.directory and self.data:
@@ -198,6 +201,8 @@ class CutFile:
                 for p in self.data:  # Write all points
                     my_file.write(" ".join(map(str, p)))
                     my_file.write("\n")
+            return file
+        return None
          
     def split(self, reference_cut, splits=10, save=True):
         """Splits cut file into X splits based on reference cut.
@@ -27,7 +27,6 @@ __author__ = "Severi Jääskeläinen \n Samuel Kaiponen \n Heta Rekilä \n " \
              "Sinikka Siironen \n Juhani Sundell \n Tuomas Pitkänen"
 __version__ = "2.0"
 
-import json
 import shutil
 import time
 from typing import Iterable
@@ -37,6 +36,7 @@ from typing import Tuple
 from pathlib import Path
 
 from . import general_functions as gf
+from . import persistence
 
 from .base import Serializable
 from .base import AdjustableSettings
@@ -245,8 +245,7 @@ class Detector(MCERDParameterContainer, Serializable, AdjustableSettings):
         Return:
             Detector object.
         """
-        with detector_file.open("r") as dfp:
-            detector = json.load(dfp)
+        detector = persistence.read_json(detector_file)
 
         detector["modification_time"] = detector.pop("modification_time_unix")
         detector["virtual_size"] = tuple(detector["virtual_size"])
@@ -282,8 +281,7 @@ class Detector(MCERDParameterContainer, Serializable, AdjustableSettings):
             "detector_theta": self.detector_theta
         }
 
-        with detector_file.open("w") as file:
-            json.dump(obj, file, indent=4)
+        persistence.write_json(detector_file, obj)
 
     def get_mcerd_params(self):
         """Returns a list of strings that are passed as parameters for MCERD.
@@ -37,6 +37,7 @@ import rx
 
 from . import file_paths as fp
 from . import general_functions as gf
+from . import persistence
 
 from typing import Optional
 from typing import List
@@ -49,9 +50,12 @@ from typing import Any
 from rx import operators as ops
 from pathlib import Path
 from collections import deque
+from collections import OrderedDict
 from threading import Event
+from threading import Lock
 
 from .concurrency import CancellationToken
+from .convergence import SpectrumConvergenceMonitor
 from .base import Serializable
 from .base import AdjustableSettings
 from .base import MCERDParameterContainer
@@ -65,9 +69,14 @@ from .enums import IonDivision
 from .enums import SimulationType
 from .enums import SimulationMode
 from .run import Run
+from .spool import JobSpool
+from .spool import SpoolJob
+from .spool import WORK_DIR
 from .detector import Detector
 from .element import Element
 from .profile import Profile
+from .project_index import ProjectIndex
+from .reweighting import get_recoil_distribution
 
 
 # Mappings between the names of the MCERD parameters (keys) and
@@ -109,7 +118,8 @@ class ElementSimulation(Observable, Serializable, AdjustableSettings,
                 "use_default_settings", "simulation", "__full_edit_on", \
                 "optimization_recoils", "optimization_widget", \
                 "_optimization_running", "optimized_fluence", \
-                "_cts", "_simulation_running", "_running_event"
+                "_cts", "_simulation_running", "_running_event", \
+                "_has_spooled_jobs"
 
     def __init__(self, directory: Path, request: "Request",
                  recoil_elements: List[RecoilElement],
@@ -231,7 +241,10 @@ class ElementSimulation(Observable, Serializable, AdjustableSettings,
         self._cts: Set[CancellationToken] = set()
 
         self._erd_filehandler = ERDFileHandler.from_directory(
-            self.directory, self.get_main_recoil())
+            self.directory, self.get_main_recoil(),
+            index=self.request.project_index)
+        # Whether spooled jobs were unfinished at the last status check
+        self._has_spooled_jobs = False
 
         # TODO there should be a clearer boundary between optimization stuff
         #   and simulation stuff. Everything should not just be contained in
@@ -379,8 +392,7 @@ class ElementSimulation(Observable, Serializable, AdjustableSettings,
         Return:
             ElementSimulation object
         """
-        with mcsimu_file.open("r") as mcsimu_file:
-            mcsimu = json.load(mcsimu_file)
+        mcsimu = persistence.read_json(mcsimu_file)
 
         # Pop the recoil name so it can be converted to a RecoilElement
         main_recoil_name = mcsimu.pop("main_recoil")
@@ -407,12 +419,12 @@ class ElementSimulation(Observable, Serializable, AdjustableSettings,
         #       Because of this, they cannot be loaded with
         #       Profile.from_file. Unify them?
         try:
-            with profile_file.open("r") as prof_file:
-                prof = json.load(prof_file)
+            prof = persistence.read_json(profile_file)
             kwargs = {
                 "channel_width": prof["energy_spectra"]["channel_width"]
             }
-        except (json.JSONDecodeError, OSError, KeyError, AttributeError) as e:
+        except (json.JSONDecodeError, OSError, KeyError, AttributeError,
+                TypeError) as e:
             logging.getLogger("request").error(
                 f"Failed to read data from element simulation .profile file "
                 f"{profile_file}: {e}."
@@ -522,13 +534,15 @@ class ElementSimulation(Observable, Serializable, AdjustableSettings,
         return Path(self.directory, f"{self.get_full_name()}.mcsimu")
 
     def to_file(self, file_path: Optional[Path] = None,
-                save_optim_results=False):
+                save_optim_results=False, delay: Optional[float] = None):
         """Save mcsimu settings to file.
 
         Args:
             file_path: File in which the mcsimu settings will be saved.
             save_optim_results: whether to save optimization results or not (
                 nothing is saved if no results exist)
+            delay: if given, the file is written after this many seconds
+                unless it is saved again before that.
         """
         # TODO call profile_to_file and recoil.to_file in here instead of having
         #   the caller call each function separately
@@ -536,20 +550,22 @@ class ElementSimulation(Observable, Serializable, AdjustableSettings,
             file_path = self.get_default_file_path()
         if save_optim_results:
             self.optimization_results_to_file()
-        with file_path.open("w") as file:
-            json.dump(self.get_json_content(), file, indent=4)
+        persistence.write_json(
+            file_path, self.get_json_content(), delay=delay)
 
-    def profile_to_file(self, file_path: Path):
+    def profile_to_file(self, file_path: Path,
+                        delay: Optional[float] = None):
         """Save profile settings (only channel width) to file.
 
         Args:
             file_path: File in which the channel width will be saved.
+            delay: if given, the file is written after this many seconds
+                unless it is saved again before that.
         """
         # Read .profile to obj to update only channel width
         time_stamp = time.time()
         try:
-            with file_path.open("r") as file:
-                obj_profile = json.load(file)
+            obj_profile = persistence.read_json(file_path)
 
             obj_profile["modification_time"] = time.strftime(
                 "%c %z %Z", time.localtime(time_stamp))
@@ -563,14 +579,15 @@ class ElementSimulation(Observable, Serializable, AdjustableSettings,
                 "modification_time_unix": time_stamp}
             obj_profile["energy_spectra"]["channel_width"] = self.channel_width
 
-        with file_path.open("w") as file:
-            json.dump(obj_profile, file, indent=4)
+        persistence.write_json(file_path, obj_profile, delay=delay)
 
     def start(self, number_of_processes: int, start_value=None,
               use_old_erd_files=True, optimization_type=None,
               ion_division=IonDivision.NONE,
               ct: Optional[CancellationToken] = None,
               start_interval=5, status_check_interval=1,
+              target_precision: Optional[float] = None,
+              precision_check_interval=10,
               **kwargs) -> Optional[rx.Observable]:
         """
         Start the simulation.
@@ -589,6 +606,12 @@ class ElementSimulation(Observable, Serializable, AdjustableSettings,
                 (ensures that MCERD's startup files are not being
                 overwritten by later processes)
             status_check_interval: seconds between each observed atoms count.
+            target_precision: if given, the simulation is stopped once the
+                relative statistical uncertainty of the significant
+                channels of the simulated energy spectrum is at most this
+                value. Only used when optimization_type is None.
+            precision_check_interval: seconds between each check of the
+                precision of the spectrum
             kwargs: keyword arguments passed down to MCERD's run method
 
         Return:
@@ -606,17 +629,6 @@ class ElementSimulation(Observable, Serializable, AdjustableSettings,
             self._erd_filehandler.clear()
             self.delete_simulation_results()
 
-        settings, run, detector = self.get_mcerd_params()
-
-        # Set seed to either the value provided as parameter or use the one
-        # stored in current element simulation.
-        max_seed = self.get_max_seed()
-        seed_number = settings.pop("seed_number")
-        if start_value is not None:
-            seed_number = start_value
-        if max_seed is not None and seed_number <= max_seed:
-            seed_number = max_seed + 1
-
         if optimization_type is OptimizationType.RECOIL:
             recoil = self.optimization_recoils[0]
         else:
@@ -625,26 +637,21 @@ class ElementSimulation(Observable, Serializable, AdjustableSettings,
         if number_of_processes < 1:
             number_of_processes = 1
 
-        # Update ion counts depending on the ion_division mode
-        presim_ions, sim_ions = ion_division.get_ion_counts(
-            settings["number_of_ions_in_presimu"], settings["number_of_ions"],
-            number_of_processes)
-
-        settings.update({
-            "number_of_ions_in_presimu": presim_ions,
-            "number_of_ions": sim_ions,
-            "beam": run.beam,
-            "target": self.simulation.target,
-            "detector": detector,
-            "recoil_element": recoil,
-            "sim_dir": self.directory
-        })
+        settings, seed_number = self._get_run_settings(
+            recoil, number_of_processes, start_value, ion_division,
+            self.get_max_seed())
 
         if ct is None:
             ct = CancellationToken()
 
         self._cts.add(ct)
 
+        if target_precision is not None and optimization_type is None:
+            convergence_chk = self._get_convergence_check(
+                recoil, ct, target_precision, precision_check_interval)
+        else:
+            convergence_chk = rx.empty()
+
         # New MCERD process is started every five seconds until number of
         # processes is reached or cancellation has been requested.
         # Seed is incremented for each new process.
@@ -671,6 +678,7 @@ class ElementSimulation(Observable, Serializable, AdjustableSettings,
                     inclusive=True),
             )),
             ops.starmap(lambda x, y: {**x, **y}),
+            ops.merge(convergence_chk),
             ops.take_while(
                 lambda x: x[ElementSimulation.FINISHED] < x[
                     ElementSimulation.TOTAL] and
@@ -682,6 +690,149 @@ class ElementSimulation(Observable, Serializable, AdjustableSettings,
             )
         )
 
+    def _get_run_settings(
+            self, recoil: RecoilElement, number_of_processes: int,
+            start_value: Optional[int], ion_division: IonDivision,
+            max_seed: Optional[int]) -> Tuple[Dict, int]:
+        """Returns the settings of the MCERD processes of a simulation and
+        the seed of the first process.
+
+        Args:
+            recoil: simulated recoil element
+            number_of_processes: number of MCERD processes
+            start_value: seed of the first process or None to use the seed
+                of the settings
+            ion_division: ion division mode that determines how ions are
+                divided per process
+            max_seed: largest seed that has already been used or None
+        """
+        settings, run, detector = self.get_mcerd_params()
+
+        # Set seed to either the value provided as parameter or use the one
+        # stored in current element simulation.
+        seed_number = settings.pop("seed_number")
+        if start_value is not None:
+            seed_number = start_value
+        if max_seed is not None and seed_number <= max_seed:
+            seed_number = max_seed + 1
+
+        # Update ion counts depending on the ion_division mode
+        presim_ions, sim_ions = ion_division.get_ion_counts(
+            settings["number_of_ions_in_presimu"], settings["number_of_ions"],
+            number_of_processes)
+
+        settings.update({
+            "number_of_ions_in_presimu": presim_ions,
+            "number_of_ions": sim_ions,
+            "beam": run.beam,
+            "target": self.simulation.target,
+            "detector": detector,
+            "recoil_element": recoil,
+            "sim_dir": self.directory
+        })
+        return settings, seed_number
+
+    def get_spool(self) -> JobSpool:
+        """Returns the spool into which simulation jobs of this
+        ElementSimulation are written.
+        """
+        return JobSpool.for_simulation(self.directory)
+
+    def spool_simulation(self, number_of_jobs: int, start_value=None,
+                         ion_division=IonDivision.NONE) -> List[Path]:
+        """Writes MCERD jobs into the spool directory instead of running
+        them. The jobs are run by spool workers and their results are
+        collected with collect_spooled_results. Seeds continue from the
+        largest seed of the existing results and jobs.
+
+        Args:
+            number_of_jobs: number of MCERD processes
+            start_value: seed of the first job
+            ion_division: ion division mode that determines how ions are
+                divided per job
+
+        Return:
+            paths to the job files
+        """
+        recoil = self.get_main_recoil()
+        spool = self.get_spool()
+        number_of_jobs = max(number_of_jobs, 1)
+        max_seed = max((
+            seed for seed in (self.get_max_seed(), spool.get_max_seed(recoil))
+            if seed is not None
+        ), default=None)
+        settings, seed_number = self._get_run_settings(
+            recoil, number_of_jobs, start_value, ion_division, max_seed)
+        settings["sim_dir"] = Path(WORK_DIR)
+
+        jobs = []
+        for seed in range(seed_number, seed_number + number_of_jobs):
+            mcerd = MCERD(seed, settings, self.get_full_name())
+            job = SpoolJob.from_mcerd(
+                mcerd, seed, fp.get_erd_file_name(recoil, seed), settings)
+            jobs.append(spool.submit(job))
+        self._has_spooled_jobs = True
+
+        if self.simulation is not None:
+            logging.getLogger(self.simulation.name).info(
+                f"Wrote {len(jobs)} simulation jobs of "
+                f"{recoil.get_full_name()} into {spool.directory}.")
+        return jobs
+
+    def collect_spooled_results(self) -> int:
+        """Adds the .erd files that spool workers have finished into the
+        simulation results.
+
+        Return:
+            number of new .erd files
+        """
+        try:
+            erd_files = gf.find_files_by_extension(
+                self.directory, ".erd")[".erd"]
+        except OSError:
+            return 0
+        return len(self._erd_filehandler.add_finished_files(erd_files))
+
+    def _get_convergence_check(
+            self, recoil: RecoilElement, ct: CancellationToken,
+            target_precision: float, interval: float) -> rx.Observable:
+        """Returns an observable that periodically estimates the
+        statistical precision of the simulated spectrum of the recoil and
+        requests cancellation once the target precision has been reached.
+        The observable does not emit any items.
+        """
+        monitor = self.get_convergence_monitor(recoil)
+
+        def stop(precision):
+            if self.simulation is not None:
+                logging.getLogger(self.simulation.name).info(
+                    f"Simulation of {recoil.get_full_name()} reached the "
+                    f"target precision ({precision:.3g}). Stopping "
+                    f"simulation.")
+            ct.request_cancellation()
+
+        return rx.timer(interval, interval).pipe(
+            ops.take_while(lambda _: not ct.is_cancellation_requested()),
+            ops.map(lambda _: monitor.update()),
+            ops.filter(lambda precision: precision <= target_precision),
+            ops.take(1),
+            ops.do_action(on_next=stop),
+            ops.ignore_elements()
+        )
+
+    def get_convergence_monitor(self, recoil: RecoilElement) \
+            -> SpectrumConvergenceMonitor:
+        """Returns a SpectrumConvergenceMonitor that follows the spectrum
+        that is simulated for the given recoil.
+        """
+        _, _, detector = self.get_mcerd_params()
+        erd_file = Path(self.directory, fp.get_erd_file_name(recoil, "*"))
+        return SpectrumConvergenceMonitor(
+            lambda: sorted(erd_file.parent.glob(erd_file.name)),
+            toflen=detector.calculate_tof_length(),
+            channel_width=self.channel_width,
+            distribution=get_recoil_distribution(recoil))
+
     def _start(self, recoil, seed_number, optimization_type, settings, ct,
                **kwargs) -> rx.Observable:
         """Inner method that creates an MCERD instance and runs it.
@@ -752,6 +903,13 @@ class ElementSimulation(Observable, Serializable, AdjustableSettings,
         Return:
             dictionary
         """
+        # Results are collected while spooled jobs are unfinished and once
+        # more after the last of them has finished
+        has_spooled_jobs = bool(self.get_spool().get_unfinished_jobs(
+            self.get_main_recoil()))
+        if has_spooled_jobs or self._has_spooled_jobs:
+            self.collect_spooled_results()
+        self._has_spooled_jobs = has_spooled_jobs
         atom_count = self.get_atom_count()
 
         if self.is_simulation_running():
@@ -853,7 +1011,9 @@ class ElementSimulation(Observable, Serializable, AdjustableSettings,
             ch: Optional[float] = None,
             fluence: Optional[float] = None,
             optimization_type: Optional[OptimizationType] = None,
-            write_to_file: bool = True) -> Tuple[List, Optional[Path]]:
+            write_to_file: bool = True,
+            recoil_file: Optional[Path] = None) \
+            -> Tuple[List, Optional[Path]]:
         """Calculate the energy spectrum from the MCERD result file.
 
         Args:
@@ -862,6 +1022,9 @@ class ElementSimulation(Observable, Serializable, AdjustableSettings,
             fluence: Fluence to use.
             optimization_type: either recoil, fluence or None
             write_to_file: whether spectrum is written to file
+            recoil_file: path to the file where the recoil distribution is
+                written for get_espe. If None, the file is written to the
+                simulation directory.
 
         Return:
             tuple consisting of spectrum data and espe file
@@ -875,10 +1038,10 @@ class ElementSimulation(Observable, Serializable, AdjustableSettings,
 
         if optimization_type is OptimizationType.FLUENCE:
             output_file = f"{recoil_element.prefix}-optfl.simu"
-            recoil_file = f"{recoil_element.prefix}-optfl.{suffix}"
+            default_recoil_file = f"{recoil_element.prefix}-optfl.{suffix}"
         else:
             output_file = f"{recoil_element.get_full_name()}.simu"
-            recoil_file = f"{recoil_element.get_full_name()}.{suffix}"
+            default_recoil_file = f"{recoil_element.get_full_name()}.{suffix}"
 
         erd_file = Path(
             self.directory,
@@ -888,10 +1051,12 @@ class ElementSimulation(Observable, Serializable, AdjustableSettings,
             output_file = Path(self.directory, output_file)
         else:
             output_file = None
-        recoil_file = Path(self.directory, recoil_file)
+        if recoil_file is None:
+            recoil_file = Path(self.directory, default_recoil_file)
 
+        recoil_params = tuple(recoil_element.get_mcerd_params())
         with recoil_file.open("w") as rec_file:
-            rec_file.write("\n".join(recoil_element.get_mcerd_params()))
+            rec_file.write("\n".join(recoil_params))
 
         ch = ch or self.channel_width
 
@@ -902,17 +1067,29 @@ class ElementSimulation(Observable, Serializable, AdjustableSettings,
         else:
             used_fluence = run.fluence
 
-        spectrum = GetEspe.calculate_simulated_spectrum(
-            beam=run.beam,
-            detector=detector,
-            target=self.simulation.target,
-            ch=ch,
-            reference_density=recoil_element.reference_density,
-            fluence=used_fluence,
-            erd_file=erd_file,
-            output_file=output_file,
-            recoil_file=recoil_file
-        )
+        espe_kwargs = {
+            "ch": ch,
+            "reference_density": recoil_element.reference_density,
+            "fluence": used_fluence,
+            "erd_file": erd_file,
+            "recoil_file": recoil_file
+        }
+        key = SpectrumCache.get_key(
+            GetEspe.get_parameters(
+                run.beam, detector, self.simulation.target, **espe_kwargs),
+            recoil_params)
+        spectrum = _spectrum_cache.get(key)
+        if spectrum is None:
+            spectrum = GetEspe.calculate_simulated_spectrum(
+                beam=run.beam,
+                detector=detector,
+                target=self.simulation.target,
+                output_file=output_file,
+                **espe_kwargs
+            )
+            _spectrum_cache.put(key, spectrum)
+        elif output_file is not None:
+            GetEspe.write_espe_file(spectrum, output_file)
         # TODO returning espe_file is a bit pointless if write_to_file is
         #   False
         return spectrum, output_file
@@ -986,7 +1163,8 @@ class ElementSimulation(Observable, Serializable, AdjustableSettings,
 
         gf.remove_matching_files(
             self.directory,
-            exts={".recoil", ".erd", ".simu", ".scatter", ".rec"},
+            exts={".recoil", ".erd", ".simu", ".scatter", ".rec",
+                  ".npz"},
             filter_func=filter_func)
 
         self.optimization_recoils = []
@@ -1006,6 +1184,12 @@ class ElementSimulation(Observable, Serializable, AdjustableSettings,
             exts={".recoil", ".erd", ".simu", ".scatter"},
             filter_func=filter_func)
 
+        # Jobs that have not been claimed by workers would bring results
+        # back later.
+        spool = self.get_spool()
+        for recoil in self.recoil_elements:
+            spool.remove_pending(recoil)
+
     def delete_all_files(self):
         """Stops simulation and removes all simulation files.
         """
@@ -1051,6 +1235,7 @@ class ERDFileHandler:
         """
         self.recoil_element = recoil_element
         self.__active_files = {}
+        self.__line_counters = {}
 
         self.__old_files = {
             file: seed
@@ -1059,7 +1244,8 @@ class ERDFileHandler:
         }
 
     @classmethod
-    def from_directory(cls, directory: Path, recoil_element: RecoilElement) \
+    def from_directory(cls, directory: Path, recoil_element: RecoilElement,
+                       index: Optional[ProjectIndex] = None) \
             -> "ERDFileHandler":
         """Initializes a new ERDFileHandler by reading ERD files
         from a directory.
@@ -1068,12 +1254,14 @@ class ERDFileHandler:
             directory: path to a directory
             recoil_element: recoil element for which the ERD files belong
                             to
+            index: ProjectIndex used to list the directory
 
         Return:
             new ERDFileHandler.
         """
         try:
-            full_paths = gf.find_files_by_extension(directory, ".erd")[".erd"]
+            full_paths = gf.find_files_by_extension(
+                directory, ".erd", index=index)[".erd"]
         except OSError:
             full_paths = []
         return cls(full_paths, recoil_element)
@@ -1119,9 +1307,39 @@ class ERDFileHandler:
                 **self.__active_files,
                 tpl[0]: tpl[1]
             }
+            self.__line_counters = {
+                **self.__line_counters,
+                tpl[0]: LineCounter(tpl[0])
+            }
         else:
             raise ValueError("Given file was not a valid .erd file")
 
+    def add_finished_files(self, files: Iterable[Union[Path, str]]) \
+            -> List[Tuple[Path, int]]:
+        """Adds .erd files that have been simulated elsewhere, such as by
+        spool workers, to the already simulated files. Files that are not
+        valid for the recoil element or are already in the handler are
+        skipped.
+
+        Args:
+            files: paths to .erd files
+
+        Return:
+            list of the added files and their seeds
+        """
+        new_files = [
+            (file, seed)
+            for file, seed in fp.validate_erd_file_names(
+                files, self.recoil_element)
+            if file not in self.__active_files and file not in self.__old_files
+        ]
+        if new_files:
+            self.__old_files = {
+                **self.__old_files,
+                **dict(new_files)
+            }
+        return new_files
+
     def get_max_seed(self) -> Optional[int]:
         """Returns the largest seed in current .erd file collection or None
         if no .erd files are stored in the handler.
@@ -1130,9 +1348,13 @@ class ERDFileHandler:
 
     def get_active_atom_count(self) -> int:
         """Returns the number of atoms in currently active .erd files.
+
+        Only the data that has been appended to the files since the
+        previous call is read.
         """
-        return sum(self.__get_atom_count(file)
-                   for file in self.__active_files)
+        counters = self.__line_counters
+        return sum(counters[file].count()
+                   for file in self.__active_files if file in counters)
 
     def get_old_atom_count(self) -> int:
         """Returns the number of atoms in already simulated .erd files.
@@ -1169,11 +1391,13 @@ class ERDFileHandler:
             **self.__active_files
         }
         self.__active_files = {}
+        self.__line_counters = {}
 
     def clear(self):
         """Removes existing ERD files from handler.
         """
         self.__active_files = {}
+        self.__line_counters = {}
         self.__old_files = {}
         self.__get_atom_count_cached.cache_clear()
 
@@ -1181,3 +1405,156 @@ class ERDFileHandler:
         """Returns True if ERD files exist.
         """
         return any(self.__old_files) or any(self.__active_files)
+
+
+class LineCounter:
+    """Counts the lines in a file that is being appended to, such as an
+    .erd file of a running simulation.
+
+    The byte offset and line count of the previous count are stored so that
+    each count only reads the bytes that have been appended since.
+    """
+    __slots__ = "file", "_offset", "_newlines", "_last_byte", "_lock"
+
+    BLOCK_SIZE = 2 ** 20
+
+    def __init__(self, file: Path):
+        """Initializes a new LineCounter.
+
+        Args:
+            file: path to the file whose lines are counted. The file does
+                not need to exist yet.
+        """
+        self.file = Path(file)
+        self._offset = 0
+        self._newlines = 0
+        self._last_byte = b""
+        self._lock = Lock()
+
+    def count(self) -> int:
+        """Returns the number of lines in the file. A non-empty last line
+        without a newline character is counted as a line, like in
+        general_functions.count_lines_in_file. Returns 0 if the file does not
+        exist.
+        """
+        with self._lock:
+            try:
+                size = self.file.stat().st_size
+            except FileNotFoundError:
+                self._reset()
+                return 0
+            if size < self._offset:
+                # File has been truncated or replaced, start over
+                self._reset()
+            if size > self._offset:
+                self._read_new_bytes()
+            partial_line = int(bool(self._last_byte) and
+                               self._last_byte != b"\n")
+            return self._newlines + partial_line
+
+    def _read_new_bytes(self):
+        """Counts the newline characters in the bytes appended after the
+        stored offset.
+        """
+        try:
+            with self.file.open("rb") as f:
+                f.seek(self._offset)
+                for block in iter(lambda: f.read(self.BLOCK_SIZE), b""):
+                    self._newlines += block.count(b"\n")
+                    self._offset += len(block)
+                    self._last_byte = block[-1:]
+        except FileNotFoundError:
+            self._reset()
+
+    def _reset(self):
+        """Forgets the previous count.
+        """
+        self._offset = 0
+        self._newlines = 0
+        self._last_byte = b""
+
+
+class SpectrumCache:
+    """Bounded least-recently-used cache for simulated energy spectra.
+
+    Keys contain the get_espe parameters, the contents of the recoil file
+    and the names, sizes and modification times of the .erd files that
+    are used. New ERD data therefore results in a new key so stale
+    spectra are never returned.
+    """
+    __slots__ = "maxsize", "_spectra", "_lock"
+
+    def __init__(self, maxsize: int = 32):
+        """Initializes a new SpectrumCache.
+
+        Args:
+            maxsize: maximum number of spectra held in the cache
+        """
+        self.maxsize = maxsize
+        self._spectra = OrderedDict()
+        self._lock = Lock()
+
+    @staticmethod
+    def get_key(espe_params: Dict[str, Any], recoil_params: Iterable[str]) \
+            -> Tuple:
+        """Returns a cache key for the given get_espe parameters.
+
+        Args:
+            espe_params: keyword arguments used to initialize GetEspe
+            recoil_params: lines written to the recoil file
+
+        Return:
+            hashable key
+        """
+        erd_file = Path(espe_params["erd_file"])
+        erd_files = []
+        for file in sorted(erd_file.parent.glob(erd_file.name)):
+            try:
+                stat = file.stat()
+            except OSError:
+                continue
+            erd_files.append((file.name, stat.st_size, stat.st_mtime_ns))
+
+        # The contents of the recoil file are part of the key so its path
+        # is left out
+        return (
+            tuple(sorted((k, str(v)) for k, v in espe_params.items()
+                         if k != "recoil_file")),
+            tuple(recoil_params),
+            tuple(erd_files)
+        )
+
+    def get(self, key: Tuple) -> Optional[List]:
+        """Returns a copy of the cached spectrum or None if the key is not
+        in the cache.
+        """
+        with self._lock:
+            try:
+                self._spectra.move_to_end(key)
+            except KeyError:
+                return None
+            return list(self._spectra[key])
+
+    def put(self, key: Tuple, spectrum: Optional[List]):
+        """Adds a copy of the spectrum to the cache. If the cache is full,
+        the least recently used spectrum is discarded.
+        """
+        if spectrum is None:
+            return
+        with self._lock:
+            self._spectra[key] = list(spectrum)
+            self._spectra.move_to_end(key)
+            while len(self._spectra) > self.maxsize:
+                self._spectra.popitem(last=False)
+
+    def clear(self):
+        """Removes all spectra from the cache.
+        """
+        with self._lock:
+            self._spectra.clear()
+
+    def __len__(self):
+        return len(self._spectra)
+
+
+_spectrum_cache = SpectrumCache()
@@ -60,6 +60,26 @@ def get_erd_file_name(recoil_element: "RecoilElement", seed: Union[int, str],
     raise ValueError(f"Unknown optimization mode '{optim_mode}'")
 
 
+def get_checkpoint_file_name(recoil_element: "RecoilElement",
+                             optim_mode: OptimizationType) -> str:
+    """Returns the name of the checkpoint file of an optimization that
+    concerns the given recoil element.
+
+    Args:
+        recoil_element: recoil element
+        optim_mode: either 'recoil' or 'fluence'
+
+    Return:
+        checkpoint file name
+    """
+    if optim_mode is OptimizationType.FLUENCE:
+        return f"{recoil_element.prefix}-optfl.checkpoint.npz"
+    if optim_mode is OptimizationType.RECOIL:
+        return f"{recoil_element.prefix}-opt.checkpoint.npz"
+
+    raise ValueError(f"Unknown optimization mode '{optim_mode}'")
+
+
 def get_seed(erd_file: Path) -> Optional[int]:
     """Returns seed value from given .erd file path.
 
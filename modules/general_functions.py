@@ -41,7 +41,12 @@ import tempfile
 import time
 import functools
 import sys
+import traceback
 
+import numpy as np
+
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import as_completed
 from timeit import default_timer as timer
 from pathlib import Path
 from decimal import Decimal
@@ -52,9 +57,12 @@ from typing import Callable
 from typing import Optional
 from typing import Union
 from typing import Iterable
+from typing import Iterator
+from typing import Sequence
 from typing import Tuple
 from typing import TypeVar
 
+from . import persistence
 from . import subprocess_utils as sutils
 
 T = TypeVar("T")
@@ -109,7 +117,8 @@ def profile(func):
 
 
 def rename_file(old_path: Path, new_name: Union[str, Path]) -> Path:
-    """Renames file or directory and returns new path.
+    """Renames file or directory and returns new path. Delayed writes are
+    flushed first so that they are not written to the old path.
 
     Args:
         old_path: Path of file or directory to rename.
@@ -117,6 +126,7 @@ def rename_file(old_path: Path, new_name: Union[str, Path]) -> Path:
     """
     if not new_name:
         return
+    persistence.flush()
     dir_path = old_path.parent
     new_file = Path(dir_path, new_name)
     old_path.rename(new_file)
@@ -124,12 +134,13 @@ def rename_file(old_path: Path, new_name: Union[str, Path]) -> Path:
 
 
 def remove_files(*file_paths):
-    """Removes files.
+    """Removes files. Delayed writes to the files are cancelled.
 
     Args:
         *file_paths: file paths to remove
     """
     for f in file_paths:
+        persistence.cancel(f)
         try:
             f.unlink()
         except OSError:
@@ -166,17 +177,23 @@ def remove_matching_files(directory: Path, exts: Optional[Set[str]] = None,
         pass
 
 
-def find_files_by_extension(directory: Path, *exts) -> Dict[str, List[Path]]:
+def find_files_by_extension(directory: Path, *exts,
+                            index: Optional["ProjectIndex"] = None) \
+        -> Dict[str, List[Path]]:
     """Searches given directory and returns files that have given extensions.
 
     Args:
         directory: a Path object
         exts: collection of files extensions to look for
+        index: ProjectIndex whose cached listing of the directory is used
+            instead of listing the directory
 
     Return:
         dictionary where keys are strings (file extensions) and values are
         lists of Path objects.
     """
+    if index is not None:
+        return index.find_files_by_extension(directory, *exts)
     search_dict = {
         ext: [] for ext in exts
     }
@@ -346,43 +363,112 @@ def coinc(input_file: Path, skip_lines: int, tablesize: int,
                 timings.
         output_file: Path to destination file. If None, the results will not
             be written to file.
-        columns: Columns to parse from output.
+        columns: awk style references to the columns that are selected
+            from the output, such as '$3,$5'.
         nevents: An integer representing limit of how many events will the
                  program look for. 0 means no limit.
         timediff: A boolean representing whether timediff is output or not.
         verbose: Whether errors are printed to console or not.
 
     Return:
-        The output of coinc as a list
+        The output of coinc as a list. If coinc fails, the list is empty and
+        the output file is removed.
+    """
+    try:
+        column_indexes = parse_columns(columns)
+    except ValueError:
+        return []
+    coinc_cmd = _get_coinc_command(
+        input_file, skip_lines, tablesize, trigger, adc_count, timing,
+        nevents, timediff)
+    if coinc_cmd is None:
+        return []
+
+    try:
+        with subprocess.Popen(
+                coinc_cmd, cwd=get_bin_dir(), stdout=subprocess.PIPE,
+                stderr=None if verbose else subprocess.DEVNULL) as coinc_proc:
+            output = sutils.process_columns(
+                coinc_proc, column_indexes, file=output_file)
+    except OSError:
+        return []
+    if coinc_proc.returncode:
+        # Output of a failed run is incomplete
+        if output_file is not None:
+            try:
+                Path(output_file).unlink()
+            except FileNotFoundError:
+                pass
+        return []
+    return output
+
+
+def iter_coinc(input_file: Path, skip_lines: int, tablesize: int,
+               trigger: int, adc_count: int,
+               timing: Dict[str, Tuple[int, int]],
+               output_file: Optional[Path] = None, columns: str = "$3,$5",
+               nevents: int = 0, timediff: bool = True,
+               verbose: bool = True) -> Iterator[np.ndarray]:
+    """Calculates coincidences of file like coinc does, but yields the
+    selected columns as integer arrays while coinc is running.
+
+    Nothing is yielded if the parameters are invalid or coinc cannot be
+    started. Raises ValueError if the selected columns are not integers.
+
+    Args:
+        See coinc.
+
+    Yield:
+        2D arrays with a row for each coincidence event and a column for
+        each selected column
+    """
+    try:
+        column_indexes = parse_columns(columns)
+    except ValueError:
+        return
+    coinc_cmd = _get_coinc_command(
+        input_file, skip_lines, tablesize, trigger, adc_count, timing,
+        nevents, timediff)
+    if coinc_cmd is None:
+        return
+
+    try:
+        coinc_proc = subprocess.Popen(
+            coinc_cmd, cwd=get_bin_dir(), stdout=subprocess.PIPE,
+            stderr=None if verbose else subprocess.DEVNULL)
+    except OSError:
+        return
+    with coinc_proc:
+        yield from sutils.iter_column_arrays(
+            coinc_proc, column_indexes, file=output_file)
+
+
+def _get_coinc_command(input_file: Path, skip_lines: int, tablesize: int,
+                       trigger: int, adc_count: int,
+                       timing: Dict[str, Tuple[int, int]], nevents: int,
+                       timediff: bool) -> Optional[Tuple[str, ...]]:
+    """Returns the command that runs coinc with the given parameters or None
+    if no timings are given.
     """
-    # TODO consider replacing awk with something else so there is no need to
-    #   rely on an external dependency. Parsing individual lines with CSVParser
-    #   is too slow.
     timings = (
         (f"--low={key},{low}", f"--high={key},{high}")
         for key, (low, high) in timing.items()
     )
     timings = [s for tpl in timings for s in tpl]
-
-    col_split = columns.split(',')
-    if not (all(col_split) and timings):
-        return []
+    if not timings:
+        return None
 
     if timediff:
         timediff_str = "--timediff"
     else:
         timediff_str = ""
 
-    bin_dir = get_bin_dir()
-
     if platform.system() != "Windows":
         executable = "./coinc"
-        awk_cmd = "awk", f"{{print {columns}}}"
     else:
-        executable = bin_dir / "coinc.exe"
-        awk_cmd = str(get_bin_dir() / "awk.exe"), f"{{print {columns}}}"
+        executable = get_bin_dir() / "coinc.exe"
 
-    coinc_cmd = (
+    return (
         str(executable),
         "--silent",
         f"--skip={skip_lines}",
@@ -395,21 +481,64 @@ def coinc(input_file: Path, skip_lines: int, tablesize: int,
         str(input_file),
     )
 
-    kwargs = {
-        "cwd": bin_dir,
-        "stdout": subprocess.PIPE,
-        "stderr": None if verbose else subprocess.DEVNULL,
-        "universal_newlines": True,
-    }
 
-    try:
-        with subprocess.Popen(coinc_cmd, **kwargs) as coinc_proc:
-            with subprocess.Popen(
-                    awk_cmd, stdin=coinc_proc.stdout, **kwargs) as awk_proc:
-                data = sutils.process_output(awk_proc, file=output_file)
-                return data
-    except OSError:
-        return []
+def coinc_files(input_files: Sequence[Path], output_files: Sequence[Path],
+                workers: int = 1, **kwargs) -> Iterator[Tuple[int, bool]]:
+    """Calculates coincidences of several files concurrently. Each file is
+    processed by its own coinc process.
+
+    Args:
+        input_files: paths to input files
+        output_files: paths to destination files, one for each input file
+        workers: maximum number of files processed at the same time
+        kwargs: keyword arguments passed down to coinc
+
+    Yield:
+        index of a file and whether its coincidences were calculated, in
+        the order in which the files are finished. Files whose processing
+        raises an exception are not calculated.
+    """
+    if len(input_files) != len(output_files):
+        raise ValueError("Each input file must have an output file.")
+
+    def run(index: int) -> int:
+        # A file left from earlier would be mistaken for a result
+        try:
+            Path(output_files[index]).unlink()
+        except FileNotFoundError:
+            pass
+        coinc(input_files[index], output_file=output_files[index], **kwargs)
+        return index
+
+    with ThreadPoolExecutor(max(workers, 1)) as executor:
+        futures = {
+            executor.submit(run, i): i for i in range(len(input_files))
+        }
+        for future in as_completed(futures):
+            index = futures[future]
+            try:
+                future.result()
+            except Exception:
+                # Other files are still processed
+                traceback.print_exc()
+                yield index, False
+            else:
+                yield index, Path(output_files[index]).exists()
+
+
+def parse_columns(columns: str) -> List[int]:
+    """Parses awk style column references, such as '$3,$5', into zero-based
+    column indexes. Raises ValueError if the string does not consist of
+    column references.
+    """
+    indexes = []
+    for column in columns.split(","):
+        column = column.strip()
+        if not column.startswith("$") or not column[1:].isdigit() or \
+                int(column[1:]) < 1:
+            raise ValueError(f"Invalid column: '{column}'")
+        indexes.append(int(column[1:]) - 1)
+    return indexes
 
 
 def md5_for_file(f, block_size=2 ** 20):
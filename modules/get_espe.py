@@ -32,8 +32,10 @@ import subprocess
 import glob
 
 from pathlib import Path
+from typing import Any
+from typing import Dict
 from typing import Optional
-from typing import Iterable
+from typing import List
 from typing import Tuple
 
 from . import general_functions as gf
@@ -113,16 +115,54 @@ class GetEspe:
             spectrum data as a list of parsed tuples
         """
         get_espe = GetEspe(
-            beam_ion=beam.ion.get_prefix(),
-            energy=beam.energy,
-            theta=detector.detector_theta,
-            timeres=detector.timeres,
-            toflen=detector.calculate_tof_length(),
-            solid=detector.calculate_solid(),
-            tangle=target.target_theta,
-            **kwargs)
+            **GetEspe.get_parameters(beam, detector, target, **kwargs))
         return get_espe.run(output_file=output_file, verbose=verbose)
 
+    @staticmethod
+    def get_parameters(beam: Beam, detector: Detector, target: Target,
+                       **kwargs) -> Dict[str, Any]:
+        """Returns the keyword arguments that are used to initialize a
+        GetEspe object from the given beam, detector and target.
+
+        Args:
+            beam: provides ion and energy data
+            detector: provides tof-length, solid angle, scattering angle
+                and time resolution data
+            target: provides target theta data
+            kwargs: additional keyword arguments passed down to GetEspe
+
+        Return:
+            keyword arguments as a dictionary
+        """
+        return {
+            "beam_ion": beam.ion.get_prefix(),
+            "energy": beam.energy,
+            "theta": detector.detector_theta,
+            "timeres": detector.timeres,
+            "toflen": detector.calculate_tof_length(),
+            "solid": detector.calculate_solid(),
+            "tangle": target.target_theta,
+            **kwargs
+        }
+
+    @staticmethod
+    def write_espe_file(espe: Espe, espe_file: Path):
+        """Writes energy spectrum data into a file in the same format that
+        get_espe outputs.
+
+        Args:
+            espe: energy spectrum data
+            espe_file: path to the file
+        """
+        with espe_file.open("w") as file:
+            file.writelines(GetEspe._espe_line(x) for x in espe)
+
+    @staticmethod
+    def _espe_line(point: Tuple[float, float]) -> str:
+        """Formats a single point of the energy spectrum as a line.
+        """
+        return f"{point[0]} {point[1]}\n"
+
     @staticmethod
     def read_espe_file(espe_file: Path) -> Espe:
         """Reads a file generated by get_espe.
@@ -164,28 +204,22 @@ class GetEspe:
                 stderr=stderr) as espe_process:
 
             with espe_process.stdin as stdin:
-                for line in self.read_erd_files():
-                    stdin.write(line)
+                # ERD data is passed on as raw bytes rather than decoded
+                # line by line
+                sutils.copy_files_to_pipe(self.get_erd_files(), stdin.buffer)
 
             espe = sutils.process_output(
                 espe_process,
                 parse_func=self._output_parser.parse_str,
                 file=output_file,
-                text_func=lambda x: f"{x[0]} {x[1]}\n")
+                text_func=self._espe_line)
 
         return espe
 
-    def read_erd_files(self) -> Iterable[str]:
-        """Yields lines from ERD files.
-
-        Yield:
-            each line as a string
+    def get_erd_files(self) -> List[Path]:
+        """Returns the ERD files that match the erd_file pattern.
         """
-        # TODO this could be a function in some utility module
-        for f in glob.glob(str(self.erd_file)):
-            with open(f, "r") as file:
-                for line in file:
-                    yield line
+        return [Path(f) for f in glob.glob(str(self.erd_file))]
 
     def get_command(self) -> Tuple[str, ...]:
         """Returns the command to run get_espe executable.
@@ -32,6 +32,7 @@ __version__ = "2.0"
 
 import configparser
 import functools
+import os
 
 from .enums import CrossSection
 from .enums import IonDivision
@@ -83,6 +84,10 @@ class GlobalSettings:
     MIN_CONC_LIMIT = 1e-6
     _DEFAULT_CONC_LIMIT = 1e-4
 
+    # Coincidences of imported files are calculated in parallel on all cores
+    # by default
+    _DEFAULT_IMPORT_WORKERS = os.cpu_count() or 1
+
     def __init__(self, config_dir=None, save_on_creation=True):
         """Inits GlobalSettings class.
         """
@@ -258,6 +263,19 @@ class GlobalSettings:
         """
         self._config[self._DEFAULT]["preview_coincidence_count"] = str(count)
 
+    @handle_exceptions(return_value=_DEFAULT_IMPORT_WORKERS)
+    def get_import_workers(self) -> int:
+        """Returns the number of files whose coincidences are calculated
+        concurrently when measurements are imported.
+        """
+        return max(self._config.getint(self._DEFAULT, "import_workers"), 1)
+
+    def set_import_workers(self, value: int):
+        """Sets the number of files whose coincidences are calculated
+        concurrently when measurements are imported.
+        """
+        self._config[self._DEFAULT]["import_workers"] = str(max(value, 1))
+
     @handle_exceptions(return_value=CrossSection.ANDERSEN)
     def get_cross_sections(self) -> CrossSection:
         """Get cross section model to be used in depth profile.
@@ -537,6 +555,23 @@ class GlobalSettings:
         self._config[self._SIMULATION]["min_concentration"] = str(
             max(value, GlobalSettings.MIN_CONC_LIMIT))
 
+    @handle_exceptions(return_value=0.0)
+    def get_simulation_target_precision(self) -> float:
+        """Returns the relative statistical uncertainty of the simulated
+        spectrum at which simulations are stopped automatically. 0 means
+        that simulations are not stopped automatically.
+        """
+        return max(
+            self._config.getfloat(self._SIMULATION, "target_precision"), 0.0)
+
+    def set_simulation_target_precision(self, value: float):
+        """Sets the relative statistical uncertainty of the simulated
+        spectrum at which simulations are stopped automatically. 0 disables
+        the automatic stopping.
+        """
+        self._config[self._SIMULATION]["target_precision"] = str(
+            max(value, 0.0))
+
     @staticmethod
     def get_default_colors():
         """Returns a dictionary containing default color values for all
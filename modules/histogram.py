@@ -0,0 +1,108 @@
+# coding=utf-8
+"""
+Created on 18.10.2026
+
+Potku is a graphical user interface for analyzation and
+visualization of measurement data collected from a ToF-ERD
+telescope. For physics calculations Potku uses external
+analyzation components.
+Copyright (C) 2026 Potku developers
+
+This program is free software; you can redistribute it and/or
+modify it under the terms of the GNU General Public License
+as published by the Free Software Foundation; either version 2
+of the License, or (at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program (file named 'LICENCE').
+
+histogram.py contains a histogram of integer values, such as coincidence
+timing differences, that can be filled while the values are being read.
+"""
+__author__ = "Potku developers"
+__version__ = "2.0"
+
+import numpy as np
+
+from typing import Dict
+from typing import Iterable
+from typing import Tuple
+
+
+class IntegerHistogram:
+    """Histogram of integer values that is filled incrementally.
+
+    The number of occurrences of each value between the smallest and the
+    largest value is stored, so adding values does not require keeping the
+    values themselves. Binned counts are cached until new values are added.
+    """
+
+    def __init__(self, values: Iterable[int] = ()):
+        """Initializes a new IntegerHistogram.
+
+        Args:
+            values: initial values
+        """
+        # Number of occurrences of each value starting from self._offset
+        self._counts = np.zeros(0, dtype=np.int64)
+        self._offset = 0
+        self._bins: Dict[int, Tuple[np.ndarray, np.ndarray]] = {}
+        self.add(values)
+
+    def __len__(self) -> int:
+        """Returns the number of added values.
+        """
+        return int(self._counts.sum())
+
+    def add(self, values: Iterable[int]):
+        """Adds values to the histogram.
+
+        Args:
+            values: integer values as an array or iterable
+        """
+        values = np.asarray(values, dtype=np.int64).ravel()
+        if not values.size:
+            return
+        low, high = int(values.min()), int(values.max())
+        if self._counts.size:
+            old_high = self._offset + self._counts.size - 1
+            low, high = min(low, self._offset), max(high, old_high)
+
+        counts = np.bincount(values - low, minlength=high - low + 1)
+        start = self._offset - low
+        counts[start:start + self._counts.size] += self._counts
+        self._counts, self._offset = counts, low
+        self._bins = {}
+
+    def get_range(self) -> Tuple[int, int]:
+        """Returns the smallest and largest value. Raises ValueError if the
+        histogram is empty.
+        """
+        if not self._counts.size:
+            raise ValueError("Histogram is empty.")
+        return self._offset, self._offset + self._counts.size - 1
+
+    def get_bins(self, bin_count: int = 200) \
+            -> Tuple[np.ndarray, np.ndarray]:
+        """Divides the range of the values into equally wide bins like
+        np.histogram(values, bin_count) does.
+
+        Args:
+            bin_count: number of bins
+
+        Return:
+            bin edges (one more than bins) and the number of values in each
+            bin
+        """
+        if bin_count not in self._bins:
+            values = np.arange(self._offset, self._offset + self._counts.size)
+            nonzero = self._counts > 0
+            counts, edges = np.histogram(
+                values[nonzero], bins=bin_count, weights=self._counts[nonzero])
+            self._bins[bin_count] = edges, counts.astype(np.int64)
+        return self._bins[bin_count]
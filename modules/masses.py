@@ -33,36 +33,90 @@ __author__ = "Jarkko Aalto \n Timo Konu \n Samuli Kärkkäinen \n " \
 __version__ = "2.0"
 
 from collections import defaultdict
+from typing import Dict
+from typing import Optional
+from typing import Tuple
 
 from . import general_functions as gf
 from .parsing import CSVParser
 
-_ISOTOPES = defaultdict(list)
 NUMBER_KEY = "number"
 ABUNDANCE_KEY = "abundance"
 MASS_KEY = "mass"
 
-masses_file = gf.get_data_dir() / "masses.dat"
+# Isotope as a tuple of (number, abundance, mass). Abundances are given in
+# percents and masses in micro-u as in masses.dat.
+_Isotope = Tuple[int, float, float]
 
-# Parser to parse data from masses.dat. Empty rows are ignored, first line
-# is skipped.
-parser = CSVParser((3, str), (2, int), (5, float), (4, float))
-data = parser.parse_file(masses_file, ignore="e", method="row", skip=1)
 
-for elem, n, a, m in data:
-    _ISOTOPES[elem].append({
+def _read_isotopes(masses_file) -> Dict[str, Tuple[_Isotope, ...]]:
+    """Reads the isotopes of each element from masses.dat in the order
+    they are given in the file.
+    """
+    # Parser to parse data from masses.dat. Empty rows are ignored, first
+    # line is skipped.
+    parser = CSVParser((3, str), (2, int), (5, float), (4, float))
+    isotopes = defaultdict(list)
+    for elem, n, a, m in parser.parse_file(
+            masses_file, ignore="e", method="row", skip=1):
+        isotopes[elem].append((n, a, m))
+    return {elem: tuple(isos) for elem, isos in isotopes.items()}
+
+
+def _get_isotope_table(sort_by_abundance: bool, filter_unlikely: bool) \
+        -> Dict[str, Tuple[_Isotope, ...]]:
+    """Returns the isotopes of each element sorted and filtered like
+    get_isotopes does.
+    """
+    table = {}
+    for elem, isos in _ISOTOPES.items():
+        if filter_unlikely:
+            isos = tuple(iso for iso in isos if iso[1])
+        if sort_by_abundance:
+            isos = tuple(sorted(isos, key=lambda iso: iso[1], reverse=True))
+        table[elem] = isos
+    return table
+
+
+# All the tables are built once when the module is imported and never
+# modified afterwards. Functions of this module return copies of the values.
+_ISOTOPES = _read_isotopes(gf.get_data_dir() / "masses.dat")
+
+# Isotopes of each element for each (sort_by_abundance, filter_unlikely)
+# combination of get_isotopes
+_ISOTOPE_TABLES = {
+    (sort, filter_): _get_isotope_table(sort, filter_)
+    for sort in (False, True) for filter_ in (False, True)
+}
+
+# Masses (u) of the isotopes that have a natural abundance by
+# (symbol, number). If masses.dat contains an isotope twice, the one with the
+# higher abundance is used.
+_ISOTOPE_MASSES: Dict[Tuple[str, int], float] = {}
+for _elem, _isos in _ISOTOPE_TABLES[True, True].items():
+    for _n, _, _m in _isos:
+        _ISOTOPE_MASSES.setdefault((_elem, _n), _m / 1_000_000)
+
+# Standard masses (u) by symbol
+_STANDARD_MASSES: Dict[str, float] = {
+    _elem: sum(n * a for n, a, _ in _isos) / 100
+    for _elem, _isos in _ISOTOPE_TABLES[False, True].items()
+}
+
+# Remove extra variables
+del _elem, _isos, _n, _m
+
+
+def _to_dict(isotope: _Isotope) -> dict:
+    """Converts an isotope tuple to the dictionary returned by the public
+    functions of this module.
+    """
+    n, a, m = isotope
+    return {
         NUMBER_KEY: n,
         ABUNDANCE_KEY: a,
         MASS_KEY: m
-    })
-
-# TODO maybe sort the isotopes by abundance already at this point. Most of the
-#  time we need them sorted anyway
-
-# Remove extra variables
-del elem, n, a, m
-del masses_file
-del parser, data
+    }
 
 
 def get_isotopes(symbol, sort_by_abundance=True, filter_unlikely=True):
@@ -79,18 +133,8 @@ def get_isotopes(symbol, sort_by_abundance=True, filter_unlikely=True):
         'number', 'natural_abundance' and 'exact_mass'. Dictionaries are
         copies of the original values so it is safe to mutate them.
     """
-    # Note: as _ISOTOPES is a defaultdict, we could just use _ISOTOPES[symbol]
-    # without risking a KeyError. However this would also add the symbol as a
-    # key to the dictionary which we want to avoid. get method can be used to
-    # return a default value without adding new keys.
-    isos = (dict(iso) for iso in _ISOTOPES.get(symbol, []))
-
-    if filter_unlikely:
-        isos = filter(lambda iso: iso[ABUNDANCE_KEY], isos)
-    if sort_by_abundance:
-        return sorted(isos, key=lambda iso: iso[ABUNDANCE_KEY],
-                      reverse=True)
-    return list(isos)
+    table = _ISOTOPE_TABLES[bool(sort_by_abundance), bool(filter_unlikely)]
+    return [_to_dict(iso) for iso in table.get(symbol, ())]
 
 
 def find_mass_of_isotope(symbol, isotope):
@@ -101,12 +145,10 @@ def find_mass_of_isotope(symbol, isotope):
          isotope: number representation of the isotope
 
     Return:
-         Returns the mass of the wanted isotope.
+         Returns the mass of the wanted isotope or None if the isotope has
+         no natural abundance or is unknown.
     """
-    rounded_isotope = round(isotope)
-    for isotope in get_isotopes(symbol):
-        if rounded_isotope == isotope[NUMBER_KEY]:
-            return isotope[MASS_KEY] / 1_000_000
+    return _ISOTOPE_MASSES.get((symbol, round(isotope)))
 
 
 def get_standard_isotope(symbol):
@@ -120,11 +162,10 @@ def get_standard_isotope(symbol):
         unknown, 0 is returned.
     """
     # TODO should this be called get_standard_mass?
-    return sum(iso[NUMBER_KEY] * iso[ABUNDANCE_KEY]
-               for iso in get_isotopes(symbol, sort_by_abundance=False)) / 100
+    return _STANDARD_MASSES.get(symbol, 0.0)
 
 
-def get_most_common_isotope(symbol: str) -> dict:
+def get_most_common_isotope(symbol: str) -> Optional[dict]:
     """Get the most common isotope for an element.
 
     Args:
@@ -134,6 +175,5 @@ def get_most_common_isotope(symbol: str) -> dict:
         dictionary representing the isotope or None if the symbol is unknown.
         Keys are 'number', 'natural_abundance' and 'exact_mass.
     """
-    isotopes = get_isotopes(symbol, sort_by_abundance=True,
-                            filter_unlikely=True)
-    return isotopes[0] if isotopes else None
+    isotopes = _ISOTOPE_TABLES[True, True].get(symbol)
+    return _to_dict(isotopes[0]) if isotopes else None
@@ -31,7 +31,6 @@ import math
 
 from decimal import Decimal
 from typing import Tuple
-from shapely.geometry import Polygon
 
 
 def integrate_bins(x_axis, y_axis, a=-math.inf, b=math.inf,
@@ -284,6 +283,8 @@ def calculate_area(line1, line2=None):
     Return:
         area as a float.
     """
+    from shapely.geometry import Polygon
+
     # If points are empty, return 0
     if not line1:
         return 0.0
@@ -31,7 +31,6 @@ __version__ = "2.0"
 import platform
 import subprocess
 import re
-import multiprocessing
 import rx
 
 from . import general_functions as gf
@@ -45,7 +44,7 @@ from typing import Mapping
 from typing import Any
 from pathlib import Path
 from rx import operators as ops
-from rx.scheduler import ThreadPoolScheduler
+from rx.subject import Subject
 
 from .layer import Layer
 from .concurrency import CancellationToken
@@ -124,30 +123,33 @@ class MCERD:
         self.foils_file = self.sim_dir / f"{self._filename}.foils"
         self.presimulation_file = self.sim_dir / f"{self._filename}.pre"
 
-    def get_command(self) -> StrTuple:
-        """Returns the command that is used to start the MCERD process.
+    @staticmethod
+    def get_executable() -> str:
+        """Returns the MCERD executable. The executable is run in Potku's
+        bin directory.
         """
         if platform.system() == "Windows":
-            cmd = str(gf.get_bin_dir() / "mcerd.exe")
-        else:
-            cmd = "./mcerd"
+            return str(gf.get_bin_dir() / "mcerd.exe")
+        return "./mcerd"
 
-        return cmd, str(self.command_file)
+    def get_command(self) -> StrTuple:
+        """Returns the command that is used to start the MCERD process.
+        """
+        return MCERD.get_executable(), str(self.command_file)
 
     def run(self, print_output=True, ct: Optional[CancellationToken] = None,
-            poll_interval=10, first_check=0.2, max_time=None,
-            ct_check=0.2) -> rx.Observable:
+            max_time=None) -> rx.Observable:
         """Starts the MCERD process.
 
+        The output of the process is read by the OutputReactor that is shared
+        by all MCERD processes. The reactor also kills the process if
+        cancellation is requested or max_time is exceeded.
+
         Args:
             print_output: whether MCERD output is also printed to console
             ct: token that is checked periodically to see if
                 the simulation should be stopped.
-            poll_interval: seconds between each check to see if the simulation
-                process is still running.
-            first_check: seconds until the first time mcerd is polled.
             max_time: maximum running time in seconds.
-            ct_check: how often cancellation is checked in seconds.
 
         Return:
             observable stream where each item is a dictionary. All dictionaries
@@ -160,75 +162,81 @@ class MCERD:
 
         process = subprocess.Popen(
             cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE,
-            cwd=gf.get_bin_dir(), universal_newlines=True)
-
-        errs = rx.from_iterable(iter(process.stderr.readline, ""))
-        outs = rx.from_iterable(iter(process.stdout.readline, ""))
-
-        is_running = MCERD.running_check(process, first_check, poll_interval)
-        ct_check = MCERD.cancellation_check(process, ct_check, ct)
-
-        if max_time is not None:
-            timeout = MCERD.timeout_check(process, max_time, ct)
-        else:
-            timeout = rx.empty()
-
-        thread_count = multiprocessing.cpu_count()
-        pool_scheduler = ThreadPoolScheduler(thread_count)
-
-        merged = rx.merge(errs, outs).pipe(
-            ops.subscribe_on(pool_scheduler),
-            MCERD.get_pipeline(
-                self._seed, self._rec_filename, print_output=print_output),
-            ops.combine_latest(rx.merge(
-                is_running, ct_check, timeout
-            )),
-            ops.starmap(lambda x, y: {
-                **x, **y,
-                MCERD.IS_RUNNING: x[MCERD.IS_RUNNING] and y[MCERD.IS_RUNNING]
-            }),
-            ops.take_while(lambda x: x[MCERD.IS_RUNNING], inclusive=True),
-        )
-
-        # on_completed does not get called if the take_while condition is
-        # inclusive so this is a quick fix to get the files deleted.
-        # TODO surely there is a way to get the on_completed called?
-        def del_if_not_running(x):
-            if not x[MCERD.IS_RUNNING]:
-                self.delete_unneeded_files()
-
-        return merged.pipe(
+            cwd=gf.get_bin_dir())
+
+        def subscribe(observer, _=None):
+            lines = Subject()
+            # Holds the latest parsed output so that the exit status can be
+            # combined with it.
+            latest = [{
+                MCERD.SEED: self._seed,
+                MCERD.NAME: self._rec_filename,
+                MCERD.MSG: "",
+                MCERD.CALCULATED: 0,
+                MCERD.TOTAL: 0,
+                MCERD.PERCENTAGE: 0,
+                MCERD.PRESIM: True,
+                MCERD.IS_RUNNING: True
+            }]
+
+            def on_output(x):
+                latest[0] = x
+                observer.on_next(x)
+                if not x[MCERD.IS_RUNNING]:
+                    observer.on_completed()
+
+            def on_exit(returncode, reason):
+                lines.on_completed()
+                try:
+                    status = MCERD.get_exit_status(returncode, reason)
+                except subprocess.SubprocessError as e:
+                    observer.on_error(e)
+                    return
+                observer.on_next({**latest[0], **status})
+                observer.on_completed()
+
+            lines.pipe(
+                MCERD.get_pipeline(
+                    self._seed, self._rec_filename, print_output=print_output)
+            ).subscribe(on_next=on_output, on_error=observer.on_error)
+
+            sutils.get_output_reactor().register(
+                process, on_line=lines.on_next, on_exit=on_exit, ct=ct,
+                max_time=max_time)
+
+        return rx.create(subscribe).pipe(
             ops.do_action(
-                on_next=del_if_not_running,
                 on_error=lambda _: self.delete_unneeded_files(),
                 on_completed=self.delete_unneeded_files)
         )
 
     @staticmethod
-    def _stop_if_cancelled(
-            process: subprocess.Popen,
-            ct: CancellationToken) -> bool:
-        """Stops the process if cancellation has been requested. Returns
-        True if cancellation has not been requested and simulation is still
-        running, False otherwise.
-        """
-        if ct.is_cancellation_requested():
-            sutils.kill_process(process)
-            return False
-        return True
+    def get_exit_status(returncode: int, reason: str) -> Dict[str, Any]:
+        """Returns a dictionary that describes how the MCERD process
+        ended. Raises SubprocessError if the process ended on its own with an
+        error code.
 
-    @staticmethod
-    def is_running(process: subprocess.Popen) -> bool:
-        """Checks if the given process is running. Raises SubprocessError if
-        the process returns an error code.
+        Args:
+            returncode: return code of the process
+            reason: reason for the termination as reported by the
+                OutputReactor
         """
-        res = process.poll()
-        if res == 0:
-            return False
-        if res is None:
-            return True
-        raise subprocess.SubprocessError(
-            f"MCERD stopped with an error code {res}.")
+        if reason == sutils.OutputReactor.CANCELLED:
+            return {
+                MCERD.IS_RUNNING: False,
+                MCERD.MSG: MCERD.SIM_STOPPED
+            }
+        if reason == sutils.OutputReactor.TIMED_OUT:
+            return {
+                MCERD.IS_RUNNING: False,
+                MCERD.MSG: MCERD.SIM_TIMEOUT
+            }
+        if returncode != 0:
+            raise subprocess.SubprocessError(
+                f"MCERD stopped with an error code {returncode}.")
+        return {
+            MCERD.IS_RUNNING: False
+        }
 
     @staticmethod
     def get_pipeline(seed: int, name: str, print_output=False) -> rx.pipe:
@@ -290,116 +298,24 @@ class MCERD:
             pass
         return ops.do_action(passer)
 
-    @staticmethod
-    def running_check(
-            process: subprocess.Popen,
-            first_check: float,
-            interval: float) -> rx.Observable:
-        """Periodically checks if the given process is running.
-
-        Args:
-            process: process to be monitored
-            first_check: seconds until the first check
-            interval: interval between each check
-
-        Return:
-            rx.Observable that fires dictionaries after each check
-        """
-        return rx.timer(first_check, interval).pipe(
-            # TODO change this to run at an increasing interval, i.e:
-            #       - first check after 0.0 seconds,
-            #       - second check after 0.2 seconds,
-            #       - third after 1.0, ... etc.
-            #   MCERD is likely to crash early (?) so it makes sense to
-            #   run the check more frequently at the beginning.
-            ops.map(lambda _: {
-                MCERD.IS_RUNNING: MCERD.is_running(process)
-            }),
-            ops.take_while(lambda x: x[MCERD.IS_RUNNING], inclusive=True)
-        )
-
-    @staticmethod
-    def cancellation_check(
-            process: subprocess.Popen,
-            interval: float,
-            ct: CancellationToken) -> rx.Observable:
-        """Kills the given process if cancellation is requested from the
-        CancellationToken.
-
-        Args:
-            process: process that will killed if cancellation is requested
-            interval: cancellation check interval in seconds
-            ct: CancellationToken that is being checked
-
-        Return:
-            rx.Observable that fires a single dictionary after cancellation is
-            requested
-        """
-        return rx.timer(0, interval).pipe(
-            ops.map(
-                lambda _: MCERD._stop_if_cancelled(process, ct)),
-            ops.first(lambda x: not x),
-            ops.map(lambda _: {
-                MCERD.IS_RUNNING: False,
-                MCERD.MSG: MCERD.SIM_STOPPED
-            }),
-        )
-
-    @staticmethod
-    def timeout_check(
-            process: subprocess.Popen,
-            timeout: float,
-            ct: CancellationToken) -> rx.Observable:
-        """Kills the given process after timeout has passed.
-
-        Args:
-            process: process to be killed
-            timeout: termination time in seconds
-            ct: CancellationToken
-
-        Return:
-            rx.Observable that fires only a single dictionary after the timeout
-            has passed.
-        """
-        return rx.timer(timeout).pipe(
-            ops.do_action(
-                # Request cancellation so all simulation processes that
-                # share the same cancellation_token are also stopped.
-                # TODO not working as intended if simulation is short enough
-                #   to stop before max_time has elapsed. Maybe let caller
-                #   implement its own timeout check when multiple processes
-                #   are being run.
-                on_next=lambda _: ct.request_cancellation()),
-            ops.map(lambda _: {
-                # sutils.kill_process returns None, which can be casted to bool
-                MCERD.IS_RUNNING: bool(sutils.kill_process(process)),
-                MCERD.MSG: MCERD.SIM_TIMEOUT
-            }),
-            ops.first()
-        )
-
     def create_mcerd_files(self):
         """Creates the temporary files needed for running MCERD.
         """
-        # Create the main MCERD command file
-        with open(self.command_file, "w") as file:
-            file.write(self.get_command_file_contents())
-
-        # Create the MCERD detector file
-        with open(self.detector_file, "w") as file:
-            file.write(self.get_detector_file_contents())
-
-        # Create the MCERD target file
-        with open(self.target_file, "w") as file:
-            file.write(self.get_target_file_contents())
+        for file_path, contents in self.get_input_files().items():
+            with open(file_path, "w") as file:
+                file.write(contents)
 
-        # Create the MCERD foils file
-        with open(self.foils_file, "w") as file:
-            file.write(self.get_foils_file_contents())
-
-        # Create the recoil file
-        with open(self.recoil_file, "w") as file:
-            file.write(self.get_recoil_file_contents())
+    def get_input_files(self) -> Dict[Path, str]:
+        """Returns the input files of MCERD and their contents. The first
+        file is the command file that is given to MCERD as an argument.
+        """
+        return {
+            self.command_file: self.get_command_file_contents(),
+            self.detector_file: self.get_detector_file_contents(),
+            self.target_file: self.get_target_file_contents(),
+            self.foils_file: self.get_foils_file_contents(),
+            self.recoil_file: self.get_recoil_file_contents(),
+        }
 
     def get_recoil_file_contents(self) -> str:
         """Returns the contents of the recoil file.
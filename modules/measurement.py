@@ -32,7 +32,6 @@ __author__ = "Jarkko Aalto \n Timo Konu \n Samuli Kärkkäinen " \
 __version__ = "2.0"
 
 import hashlib
-import json
 import logging
 import os
 import shutil
@@ -47,9 +46,11 @@ from typing import Tuple
 
 from . import general_functions as gf
 from . import file_paths as fpaths
+from . import persistence
 from .cut_file import CutFile
 from .detector import Detector
 from .profile import Profile
+from .project_index import ProjectIndex
 from .run import Run
 from .target import Target
 from .ui_log_handlers import Logger
@@ -138,48 +139,11 @@ class Measurements:
             file_name = file_path.name
             file_directory = file_path.parent
 
-            profile_file, mesu_file, tgt_file, det_file = \
-                Measurement.find_measurement_files(file_directory)
-
-            if tgt_file is not None:
-                target = Target.from_file(tgt_file, self.request)
-            else:
-                target = None
-
-            if det_file is not None:
-                detector = Detector.from_file(
-                    det_file, self.request, save_on_creation=False)
-                detector.update_directories(det_file.parent)
-            else:
-                detector = None
-
-            if mesu_file is not None:
-                run = Run.from_file(mesu_file)
-            else:
-                run = None
-
-            if profile_file is not None:
-                profile = Profile.from_file(profile_file)
-            else:
-                profile = None
-
             # Create Measurement from file
             if file_path.exists() and file_path.suffix == ".info":
-                measurement = Measurement.from_file(
-                    file_path, mesu_file, self.request, sample=sample,
-                    target=target, detector=detector, run=run, profile=profile)
-
-                measurement_folder_name = file_directory.name
-                serial_number = int(measurement_folder_name[
-                                    len(directory_prefix):len(
-                                        directory_prefix) + 2])
-                measurement.serial_number = serial_number
-                measurement.tab_id = tab_id
-                measurement.update_folders_and_selector(
-                    selector_cls=selector_cls)
-
-                self.request.samples.measurements.measurements[tab_id] = \
-                    measurement
+                measurement = self.read_measurement_file(sample, file_path)
+                return self.add_measurement(
+                    sample, measurement, tab_id, selector_cls=selector_cls)
 
             # Create new Measurement object.
             else:
@@ -227,6 +191,81 @@ class Measurements:
             sample.measurements.measurements[tab_id] = measurement
         return measurement
 
+    def read_measurement_file(self, sample: "Sample",
+                              info_file: Path) -> "Measurement":
+        """Reads a Measurement and its settings from the files in the
+        directory of an existing .info file. The Measurement is not added to
+        measurements, so this can be called from other threads than the
+        main thread.
+
+        Args:
+            sample: The sample under which the measurement is put.
+            info_file: Path of the .info measurement file.
+
+        Return:
+            Measurement that has not been added to measurements.
+        """
+        directory_prefix = "Measurement_"
+        file_directory = info_file.parent
+
+        profile_file, mesu_file, tgt_file, det_file = \
+            Measurement.find_measurement_files(
+                file_directory, index=self.request.project_index)
+
+        if tgt_file is not None:
+            target = Target.from_file(tgt_file, self.request)
+        else:
+            target = None
+
+        if det_file is not None:
+            detector = Detector.from_file(
+                det_file, self.request, save_on_creation=False)
+            detector.update_directories(det_file.parent)
+        else:
+            detector = None
+
+        if mesu_file is not None:
+            run = Run.from_file(mesu_file)
+        else:
+            run = None
+
+        if profile_file is not None:
+            profile = Profile.from_file(profile_file)
+        else:
+            profile = None
+
+        measurement = Measurement.from_file(
+            info_file, mesu_file, self.request, sample=sample,
+            target=target, detector=detector, run=run, profile=profile)
+
+        measurement_folder_name = file_directory.name
+        measurement.serial_number = int(measurement_folder_name[
+                                        len(directory_prefix):len(
+                                            directory_prefix) + 2])
+        return measurement
+
+    def add_measurement(self, sample: "Sample", measurement: "Measurement",
+                        tab_id, selector_cls=None) -> "Measurement":
+        """Adds a Measurement that has been read with read_measurement_file
+        to measurements. If selector_cls is given, selector will be
+        initialized as an object of that class.
+
+        Args:
+            sample: The sample under which the measurement is put.
+            measurement: Measurement to add.
+            tab_id: Integer representing identifier for measurement's tab.
+            selector_cls: class of the selector.
+
+        Return:
+            The added measurement.
+        """
+        measurement.tab_id = tab_id
+        measurement.update_folders_and_selector(selector_cls=selector_cls)
+
+        self.request.samples.measurements.measurements[tab_id] = measurement
+        sample.measurements.measurements[tab_id] = measurement
+        return measurement
+
     def remove_obj(self, removed_obj):
         """Removes given measurement.
         """
@@ -395,12 +434,13 @@ class Measurement(Logger, Serializable):
         self.set_loggers(self.directory, self.request.directory)
 
     @staticmethod
-    def find_measurement_files(directory: Path):
+    def find_measurement_files(directory: Path,
+                               index: Optional[ProjectIndex] = None):
         res = gf.find_files_by_extension(
-            directory, ".profile", ".measurement", ".target")
+            directory, ".profile", ".measurement", ".target", index=index)
         try:
             det_res = gf.find_files_by_extension(
-                directory / "Detector", ".detector")
+                directory / "Detector", ".detector", index=index)
         except OSError:
             det_res = {".detector": []}
 
@@ -456,14 +496,12 @@ class Measurement(Logger, Serializable):
         Return:
             Measurement object.
         """
-        with info_file.open("r") as mesu_info:
-            obj_info = json.load(mesu_info)
+        obj_info = persistence.read_json(info_file)
         obj_info["modification_time"] = obj_info.pop("modification_time_unix")
 
         if measurement_file is not None:
             try:
-                with measurement_file.open("r") as mesu_file:
-                    obj_gen = json.load(mesu_file)["general"]
+                obj_gen = persistence.read_json(measurement_file)["general"]
 
                 mesu_general = {
                     "measurement_setting_file_name": obj_gen["name"],
@@ -567,10 +605,9 @@ class Measurement(Logger, Serializable):
         if measurement_file is None:
             measurement_file = self._get_measurement_file()
 
-        if measurement_file.exists():
-            with measurement_file.open("r") as mesu:
-                obj_measurement = json.load(mesu)
-        else:
+        try:
+            obj_measurement = persistence.read_json(measurement_file)
+        except OSError:
             obj_measurement = {}
 
         time_stamp = time.time()
@@ -583,8 +620,7 @@ class Measurement(Logger, Serializable):
             time.strftime("%c %z %Z", time.localtime(time_stamp))
         obj_measurement["general"]["modification_time_unix"] = time_stamp
 
-        with measurement_file.open("w") as file:
-            json.dump(obj_measurement, file, indent=4)
+        persistence.write_json(measurement_file, obj_measurement)
 
     def _info_to_file(self, info_file: Optional[Path] = None):
         """Write an .info file.
@@ -606,8 +642,7 @@ class Measurement(Logger, Serializable):
             "use_request_settings": self.use_request_settings
         }
 
-        with info_file.open("w") as file:
-            json.dump(obj_info, file, indent=4)
+        persistence.write_json(info_file, obj_info)
 
     def create_folder_structure(self, measurement_folder: Path,
                                 measurement_file: Path = None,
@@ -875,7 +910,9 @@ class Measurement(Logger, Serializable):
     def save_cuts(self, progress=None):
         """Save cut files
         
-        Saves data points within selections into cut files.
+        Saves data points within selections into cut files. Nothing is
+        saved if the cut files have been made from the current measurement
+        data and selections and have not been changed since.
         """
         if self.selector.is_empty():
             self.__remove_old_cut_files()
@@ -884,10 +921,26 @@ class Measurement(Logger, Serializable):
             gf.remove_files(selection_file)
             return 0
 
-        self.__make_directories(self.get_cuts_dir())
+        cuts_dir = self.get_cuts_dir()
+        self.__make_directories(cuts_dir)
 
         starttime = time.time()
 
+        self.selector.update_selection_beams()
+        # Cut files are recorded as made from the selection file, so it is
+        # saved now. Unchanged selections are not written again, which
+        # keeps the cut files up to date.
+        self.selector.save()
+        sources = self.measurement_file, self.selector.selection_file
+        index = self.request.project_index
+        if index.is_up_to_date(cuts_dir):
+            if progress is not None:
+                progress.report(100)
+            logging.getLogger(self.name).info(
+                "Cut files are up to date with the measurement data and "
+                "selections.")
+            return
+
         self.__remove_old_cut_files()
 
         # Initializes the list size to match the number of selections.
@@ -909,9 +962,6 @@ class Measurement(Logger, Serializable):
                 if selection.point_inside(point):
                     points_in_selection[i].append(point)
 
-        self.selector.update_selection_beams()
-        self.selector.auto_save()
-
         # Save all found data points into appropriate element cut files
         # Firstly clear old cut files so those won't be accidentally
         # left there.
@@ -919,14 +969,21 @@ class Measurement(Logger, Serializable):
             progress.report(80)
 
         content_length = len(points_in_selection)
+        cut_files = []
         for i, points in enumerate(points_in_selection):
             if points:  # If not empty selection -> save
                 selection = self.selector.get_at(i)
-                cut_file = CutFile(self.get_cuts_dir())
+                cut_file = CutFile(cuts_dir)
                 cut_file.set_info(selection, points)
-                cut_file.save()
+                file = cut_file.save()
+                if file is not None:
+                    index.record_derived(file, sources)
+                    cut_files.append(file)
             if progress is not None:
                 progress.report(80 + (i / content_length) * 0.2)
+        # The cut files are sources of the directory so that it is not up to
+        # date if any of them is changed or removed.
+        index.record_derived(cuts_dir, (*sources, *cut_files))
 
         if progress is not None:
             progress.report(100)
@@ -940,10 +997,10 @@ class Measurement(Logger, Serializable):
         gf.remove_matching_files(self.get_cuts_dir(), exts={".cut"})
         gf.remove_matching_files(self.get_changes_dir(), exts={".cut"})
 
-    @staticmethod
-    def _get_cut_files(directory: Path) -> List[Path]:
+    def _get_cut_files(self, directory: Path) -> List[Path]:
         try:
-            return gf.find_files_by_extension(directory, ".cut")[".cut"]
+            return gf.find_files_by_extension(
+                directory, ".cut", index=self.request.project_index)[".cut"]
         except OSError:
             return []
 
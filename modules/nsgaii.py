@@ -30,16 +30,19 @@ import os
 import collections
 import rx
 import subprocess
-import math
+import tempfile
+import logging
 
 from . import optimization as opt
 from . import general_functions as gf
 from . import file_paths as fp
-from . import math_functions as mf
+from . import objectives
 
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from timeit import default_timer as timer
 from rx import operators as ops
+from typing import NamedTuple
 
 from .recoil_element import RecoilElement
 from .element_simulation import ElementSimulation
@@ -52,6 +55,10 @@ from .concurrency import CancellationToken
 from .enums import OptimizationType
 from .enums import OptimizationState
 from .enums import IonDivision
+from .enums import SimulationType
+from .reweighting import EspeReweighter
+from .reweighting import get_recoil_distribution
+from .objectives import calculate_change
 
 
 class Nsgaii(Observable):
@@ -63,6 +70,9 @@ class Nsgaii(Observable):
     2002), a paper by Seshadri (2006) and a Python implementation by Hust
     (https://github.com/ChengHust/NSGA-II).
     """
+    # Fluence that is used to calculate the spectrum that is scaled during
+    # fluence optimization
+    REFERENCE_FLUENCE = 1.0e12
 
     def __init__(self, gen: int, element_simulation: ElementSimulation = None,
                  pop_size=100, sol_size=5, upper_limits=None, lower_limits=None,
@@ -71,7 +81,9 @@ class Nsgaii(Observable):
                  stop_percent=0.3, check_time=20, ch=0.025,
                  measurement=None, cut_file=None, dis_c=20,
                  dis_m=20, check_max=900, check_min=0, skip_simulation=False,
-                 use_efficiency=False):
+                 use_efficiency=False, use_reweighting=False,
+                 evaluation_workers=None, checkpoint_interval=1, islands=1,
+                 migration_interval=5, migration_size=2):
         """
         Initialize the NSGA-II algorithm with needed parameters and start
         running it.
@@ -104,10 +116,36 @@ class Nsgaii(Observable):
             skip_simulation: whether simulation is skipped altogether
             use_efficiency: whether to use efficiency for pre-calculated
                 spectrum.
+            use_reweighting: whether spectra of recoil candidates are
+                calculated in-process by reweighting simulated events
+                instead of running get_espe for each candidate. get_espe is
+                run once to calibrate the total intensity of the reweighted
+                spectra. All candidates, including the one used in the
+                calibration, are then scored with reweighted spectra.
+            evaluation_workers: maximum number of get_espe processes that are
+                run concurrently when evaluating a population. Defaults to
+                the number of CPUs.
+            checkpoint_interval: number of generations between checkpoints
+                that are written into the simulation directory so that the
+                optimization can be resumed. If 0, no checkpoints are
+                written.
+            islands: number of subpopulations of size pop_size that evolve
+                separately. Each island does gen generations and the
+                islands are merged into one Pareto front at the end. The
+                offspring of all islands are evaluated together, so up to
+                evaluation_workers get_espe processes run concurrently.
+            migration_interval: number of generations between migrations
+                of solutions from one island to the next.
+            migration_size: number of best solutions of each island that
+                replace the worst solutions of the next island in a
+                migration.
         """
         # TODO separate the two optimization types into two classes
         Observable.__init__(self)
-        self.evaluations = gen * pop_size
+        self.islands = max(1, islands)
+        self.migration_interval = max(1, migration_interval)
+        self.migration_size = migration_size
+        self.evaluations = gen * pop_size * self.islands
         self.element_simulation = element_simulation  # Holds other needed
         # information including recoil points and access to simulation settings
         self.pop_size = pop_size
@@ -146,11 +184,30 @@ class Nsgaii(Observable):
         self.population = None
         self.measured_espe = None
         self.use_efficiency = use_efficiency
+        self.use_reweighting = use_reweighting
+        self._reweighter = None
+        self._evaluation_cache = {}
+        self.cache_hits = 0
+        self.cache_misses = 0
+        if evaluation_workers is None:
+            evaluation_workers = os.cpu_count() or 1
+        self.evaluation_workers = max(1, evaluation_workers)
+        self.checkpoint_interval = checkpoint_interval
 
     def __prepare_optimization(self, initial_pop=None,
                                cancellation_token=None,
-                               ion_division=IonDivision.BOTH):
+                               ion_division=IonDivision.BOTH,
+                               checkpoint=None):
         """Performs internal preparation before optimization begins.
+
+        If a checkpoint is given, the population is restored from it
+        instead of evaluating the initial population. Simulation is skipped
+        if the simulated events of the checkpointed optimization still
+        exist. Otherwise the restored population is evaluated again, as its
+        objective values were calculated from events that no longer exist.
+
+        Return:
+            whether the objective values of the checkpoint were restored
         """
         self.element_simulation.optimization_recoils = []
         # Calculate the energy spectrum that the optimized solutions are
@@ -188,9 +245,22 @@ class Nsgaii(Observable):
         # counting
         self.modify_measurement()
 
-        # Create initial population
+        # Create initial population. Each island gets its own initial
+        # population.
+        total_size = self.pop_size * self.islands
+        if initial_pop is None or checkpoint is not None:
+            new_pop = self.initialize_islands()
+        elif len(initial_pop) < total_size:
+            # Starting solutions, such as a previous Pareto front, are
+            # completed with new solutions. The first new solution is kept
+            # first as it covers the whole x axis range.
+            new_pop = self.initialize_islands()
+            initial_pop = np.vstack(
+                (new_pop[:1], initial_pop, new_pop[1:]))[:total_size]
+        else:
+            new_pop = initial_pop
         if initial_pop is None:
-            initial_pop = self.initialize_population()
+            initial_pop = new_pop
 
         # Find bit variable lengths if necessary
         if self.optimization_type is OptimizationType.RECOIL:
@@ -201,10 +271,14 @@ class Nsgaii(Observable):
             # population will always cover the whole x axis range between
             # lower and upper values -> mcerd never needs to be run again
             self.element_simulation.optimization_recoils = [
-                self.form_recoil(initial_pop[0])
+                self.form_recoil(new_pop[0])
             ]
 
-        if not self._skip_simulation:
+        simulate = not self._skip_simulation
+        if checkpoint is not None and self.has_simulated_events():
+            simulate = False
+
+        if simulate:
             def stop_if_cancelled(
                     optim_ct: CancellationToken, mcerd_ct: CancellationToken):
                 optim_ct.stop_if_cancelled(mcerd_ct)
@@ -263,7 +337,81 @@ class Nsgaii(Observable):
                     "Could not start simulation. Check that simulation is not "
                     "currently running.")
 
-        self.population = self.evaluate_solutions(initial_pop)
+        # Simulated events have changed so the reweighter has to be created
+        # again and previous evaluations are no longer valid
+        self._reweighter = None
+        self._evaluation_cache = {}
+        self.cache_hits = 0
+        self.cache_misses = 0
+        if checkpoint is not None:
+            np.random.set_state(checkpoint.rng_state)
+            if not simulate:
+                self.population = [
+                    checkpoint.solutions, checkpoint.objective_values]
+                return True
+            initial_pop = checkpoint.solutions
+        self.population = self.evaluate_solutions(
+            initial_pop, cancellation_token=cancellation_token)
+        return False
+
+    def has_simulated_events(self):
+        """Whether .erd files simulated for the optimization exist.
+        """
+        erd_file = Path(
+            self.element_simulation.directory,
+            fp.get_erd_file_name(
+                self.element_simulation.get_main_recoil(), "*",
+                optim_mode=self.optimization_type))
+        return any(erd_file.parent.glob(erd_file.name))
+
+    def get_checkpoint_file(self):
+        """Returns the path to the checkpoint file of the optimization.
+        """
+        return Path(
+            self.element_simulation.directory,
+            fp.get_checkpoint_file_name(
+                self.element_simulation.get_main_recoil(),
+                self.optimization_type))
+
+    def load_checkpoint(self):
+        """Loads the checkpoint of a previous optimization.
+
+        Raises ValueError if the checkpoint is not compatible with the
+        parameters of this optimization.
+
+        Return:
+            Checkpoint object or None if there is no checkpoint
+        """
+        file = self.get_checkpoint_file()
+        if not file.exists():
+            return None
+        checkpoint = load_checkpoint(file)
+        if checkpoint.optimization_type is not self.optimization_type or \
+                np.shape(checkpoint.solutions) != \
+                (self.pop_size * self.islands, self.sol_size):
+            raise ValueError(
+                "Checkpoint does not match the optimization parameters.")
+        return checkpoint
+
+    def save_checkpoint(self, front_no, crowd_dis, evaluations_left):
+        """Saves the current population, its front numbers and crowding
+        distances, remaining evaluations and the state of the random number
+        generator into the checkpoint file. Failures are logged but do not
+        stop the optimization.
+        """
+        checkpoint = Checkpoint(
+            optimization_type=self.optimization_type,
+            solutions=self.population[0],
+            objective_values=self.population[1],
+            front_no=front_no,
+            crowd_dis=crowd_dis,
+            evaluations_left=evaluations_left,
+            rng_state=np.random.get_state())
+        try:
+            save_checkpoint(self.get_checkpoint_file(), checkpoint)
+        except OSError as e:
+            logging.getLogger("request").warning(
+                f"Could not save optimization checkpoint: {e}")
 
     @staticmethod
     def _get_message(state, **kwargs):
@@ -274,6 +422,76 @@ class Nsgaii(Observable):
             **kwargs
         }
 
+    def initialize_islands(self):
+        """Creates a new starting population for each island.
+
+        Return:
+            solutions of the islands one after another
+        """
+        return np.vstack(
+            [self.initialize_population() for _ in range(self.islands)])
+
+    def get_island_slices(self):
+        """Returns slices that select the solutions of each island from
+        the population.
+        """
+        return [
+            slice(i * self.pop_size, (i + 1) * self.pop_size)
+            for i in range(self.islands)
+        ]
+
+    def sort_islands(self, objective_values):
+        """Sorts each island according to non-domination and calculates
+        crowding distances within the islands.
+
+        Args:
+            objective_values: objective values of the islands one after
+                another
+
+        Return:
+            front numbers and crowding distances of all solutions
+        """
+        objective_values = np.asarray(objective_values)
+        front_no, crowd_dis = [], []
+        for island in self.get_island_slices():
+            island_front_no, _ = self.nd_sort(
+                objective_values[island], self.pop_size)
+            front_no.append(island_front_no)
+            crowd_dis.append(self.crowding_distance(
+                island_front_no, objective_values[island]))
+        return np.concatenate(front_no), np.concatenate(crowd_dis)
+
+    def migrate(self, solutions, objective_values, front_no, crowd_dis):
+        """Copies the best solutions of each island to the next island
+        (the last island sends to the first one) where they replace the
+        worst solutions. Solutions are ranked by front number and crowding
+        distance. The arrays are modified in place.
+
+        Args:
+            solutions: solutions of the islands one after another
+            objective_values: objective values of the solutions
+            front_no: front numbers of the solutions within their islands
+            crowd_dis: crowding distances of the solutions within their
+                islands
+
+        Return:
+            front numbers and crowding distances after the migration
+        """
+        n = min(self.migration_size, self.pop_size)
+        if n <= 0:
+            return front_no, crowd_dis
+        ranked = [
+            island.start + np.lexsort((-crowd_dis[island], front_no[island]))
+            for island in self.get_island_slices()
+        ]
+        emigrant_sols = [solutions[idx[:n]] for idx in ranked]
+        emigrant_objs = [objective_values[idx[:n]] for idx in ranked]
+        for i, idx in enumerate(ranked):
+            worst = idx[-n:]
+            solutions[worst] = emigrant_sols[i - 1]
+            objective_values[worst] = emigrant_objs[i - 1]
+        return self.sort_islands(objective_values)
+
     @staticmethod
     def crowding_distance(front_no, objective_values):
         """Calculate crowding distance for each solution in the population, by
@@ -292,100 +510,254 @@ class Nsgaii(Observable):
         # Get all front numbers.
         front_unique = np.unique(front_no)
         fronts = front_unique[front_unique != np.inf]
-        for f in range(len(fronts)):
+        for f in fronts:
             # All the indices corresponding to solutions belonging to front f
-            front = np.array(
-                [k for k in range(len(front_no)) if front_no[k] == fronts[f]])
+            front = np.flatnonzero(front_no == f)
+            front_obj = pop_obj[front, :]
             # Find min and max values for objective functions
-            f_max = pop_obj[front, :].max(0)
-            f_min = pop_obj[front, :].min(0)
+            f_max = front_obj.max(0)
+            f_min = front_obj.min(0)
             for i in range(m):
                 # Sort the front's solutions according to its ith objective.
-                # rank[i] tells the index in front -> front[rank[i]] tells the
-                # index in pop_obj
-                rank = np.argsort(pop_obj[front, i])
+                sorted_front = front[np.argsort(front_obj[:, i])]
+                values = pop_obj[sorted_front, i]
+                # Normalized distance between the neighbours of each
+                # solution
+                # TODO raises RuntimeWarning here if simulation time
+                #  outs before presim ends
+                dist = values[2:] - values[:-2]
+                with np.errstate(divide="ignore", invalid="ignore"):
+                    current_distance = np.where(
+                        dist == 0, 0, dist / (f_max[i] - f_min[i]))
                 # Current front's first and last get infinitive crowding
                 # distance values
-                crowd_dis[front[rank[0]]] = np.inf
-                crowd_dis[front[rank[-1]]] = np.inf
-                for j in range(1, len(front) - 1):
-                    ind_pop = front[rank[j]]
-                    ind_front_next = front[rank[j + 1]]
-                    ind_front_prev = front[rank[j - 1]]
-                    # Normalize the objective function values
-                    dist = pop_obj[(ind_front_next, i)] - \
-                        pop_obj[(ind_front_prev, i)]
-                    if dist == 0:
-                        current_distance = 0
-                    else:
-                        # TODO raises RuntimeWarning here if simulation time
-                        #  outs before presim ends
-                        current_distance = dist / (f_max[i] - f_min[i])
-                    crowd_dis[ind_pop] = crowd_dis[ind_pop] + current_distance
+                crowd_dis[sorted_front[0]] = np.inf
+                crowd_dis[sorted_front[-1]] = np.inf
+                crowd_dis[sorted_front[1:-1]] += current_distance
         return crowd_dis
 
-    def evaluate_solutions(self, sols):
+    def evaluate_solutions(self, sols, cancellation_token=None):
         """
         Calculate objective function values for given solutions.
 
         Args:
              sols: List of solutions.
+             cancellation_token: CancellationToken. If cancellation is
+                requested, solutions that have not yet been evaluated get
+                infinite objective values.
 
         Return:
             Solutions and their objective function values.
         """
-        objective_values = []
         if self.optimization_type is OptimizationType.RECOIL:
-            self.element_simulation.optimization_recoils = [
-                self.form_recoil(solution) for solution in sols
-            ]
-
-            for recoil in self.element_simulation.optimization_recoils:
-                # Run get_espe
-                espe, _ = self.element_simulation.calculate_espe(
-                    recoil, optimization_type=self.optimization_type,
-                    ch=self.channel_width, write_to_file=False)
-                objective_values.append(self.get_objective_values(espe))
+            recoils = [self.form_recoil(solution) for solution in sols]
+            self.element_simulation.optimization_recoils = recoils
+            keys = [get_recoil_key(recoil) for recoil in recoils]
+            uncached = self._get_uncached(keys, recoils)
+
+            espes = self.calculate_recoil_espes(
+                list(uncached.values()),
+                cancellation_token=cancellation_token)
+            new_values = {
+                key: self.get_objective_values(espe)
+                for key, espe in zip(uncached, espes)
+            }
 
         else:  # Evaluate fluence
-            recoil = self.element_simulation.get_main_recoil()
-            for solution in sols:
-                # Round solution appropriately
-                sol_fluence = gf.round_value_by_four_biggest(solution[0])
-                # Run get_espe
-                espe, _ = self.element_simulation.calculate_espe(
+            # Round solutions appropriately
+            keys = [
+                gf.round_value_by_four_biggest(solution[0])
+                for solution in sols
+            ]
+            uncached = self._get_uncached(keys, keys)
+            new_values = {}
+            if uncached:
+                # Fluence only scales the intensity of the spectrum so
+                # get_espe is run once with a reference fluence and the
+                # spectrum is scaled for each solution.
+                recoil = self.element_simulation.get_main_recoil()
+                reference_espe, _ = self.element_simulation.calculate_espe(
                     recoil, optimization_type=self.optimization_type,
-                    ch=self.channel_width, fluence=sol_fluence,
+                    ch=self.channel_width, fluence=self.REFERENCE_FLUENCE,
                     write_to_file=False)
-                objective_values.append(self.get_objective_values(espe))
+                for sol_fluence in uncached:
+                    espe = scale_espe(
+                        reference_espe, sol_fluence / self.REFERENCE_FLUENCE)
+                    new_values[sol_fluence] = self.get_objective_values(espe)
 
+        objective_values = self._get_objective_values_by_keys(
+            keys, new_values)
         pop = collections.namedtuple("Population",
                                      ("solutions", "objective_values"))
         return pop(sols, objective_values)
 
+    def _get_uncached(self, keys, items):
+        """Returns the items whose keys are not in the evaluation cache.
+        Items with duplicate keys are only returned once.
+
+        Return:
+            OrderedDict of keys and items
+        """
+        uncached = collections.OrderedDict()
+        for key, item in zip(keys, items):
+            if key not in self._evaluation_cache and key not in uncached:
+                uncached[key] = item
+        return uncached
+
+    def _get_objective_values_by_keys(self, keys, new_values):
+        """Adds newly evaluated objective values to the evaluation cache
+        and returns objective values for each key. Infinite values (failed
+        or cancelled evaluations) are not cached.
+
+        Args:
+            keys: keys of the evaluated solutions
+            new_values: dictionary of keys and newly evaluated values
+
+        Return:
+            list of objective values in the same order as the keys
+        """
+        for key, values in new_values.items():
+            if np.isfinite(values).all():
+                self._evaluation_cache[key] = values
+        self.cache_misses += len(new_values)
+        self.cache_hits += len(keys) - len(new_values)
+        return [
+            new_values[key] if key in new_values else
+            self._evaluation_cache[key]
+            for key in keys
+        ]
+
+    def calculate_recoil_espes(self, recoils, cancellation_token=None):
+        """Calculates the energy spectra of candidate recoils.
+
+        If reweighting is used but the reweighter has not been calibrated
+        yet, the first spectrum is calculated on its own as it calibrates
+        the reweighter. If the rest of the spectra need get_espe, the
+        get_espe processes are run concurrently, each with its own recoil
+        file.
+
+        Args:
+            recoils: list of RecoilElement objects.
+            cancellation_token: CancellationToken. Spectra that have not been
+                calculated when cancellation is requested are left empty.
+
+        Return:
+            energy spectra in the same order as the recoils
+        """
+        def is_cancelled():
+            return cancellation_token is not None and \
+                cancellation_token.is_cancellation_requested()
+
+        if not recoils:
+            return []
+        if is_cancelled():
+            return [[] for _ in recoils]
+
+        espes = []
+        if self.use_reweighting and self._reweighter is None:
+            espes.append(self.calculate_recoil_espe(recoils[0]))
+        rest = recoils[len(espes):]
+        if self._reweighter is not None or self.evaluation_workers == 1:
+            for recoil in rest:
+                espes.append(
+                    [] if is_cancelled() else
+                    self.calculate_recoil_espe(recoil))
+            return espes
+
+        suffix = self.element_simulation.simulation_type.get_recoil_suffix()
+        with tempfile.TemporaryDirectory() as tmp_dir, \
+                ThreadPoolExecutor(self.evaluation_workers) as executor:
+            futures = [
+                executor.submit(
+                    self._run_get_espe, recoil,
+                    Path(tmp_dir, f"candidate-{i}.{suffix}"))
+                for i, recoil in enumerate(rest)
+            ]
+            for future in futures:
+                if is_cancelled():
+                    future.cancel()
+                    espes.append([])
+                else:
+                    espes.append(future.result())
+        return espes
+
+    def calculate_recoil_espe(self, recoil):
+        """Calculates the energy spectrum of a candidate recoil.
+
+        If reweighting is used, the first spectrum is calculated with
+        get_espe and it is used to calibrate a reweighter that calculates
+        all spectra in-process, including the spectrum of the calibration
+        recoil. Spectra that are compared with each other then come from
+        the same estimator. If reweighting is not used or the reweighter
+        cannot be created, get_espe is run for each recoil.
+
+        Args:
+            recoil: RecoilElement object.
+
+        Return:
+            energy spectrum as a list of tuples
+        """
+        if self._reweighter is not None:
+            return self._reweighter.calculate_espe(
+                *get_recoil_distribution(recoil))
+
+        espe = self._run_get_espe(recoil)
+
+        if self.use_reweighting and espe and \
+                self.element_simulation.simulation_type is SimulationType.ERD:
+            self._reweighter = self._create_reweighter(recoil, espe)
+            if self._reweighter is None:
+                # Do not try again
+                self.use_reweighting = False
+            else:
+                return self._reweighter.calculate_espe(
+                    *get_recoil_distribution(recoil))
+        return espe
+
+    def _run_get_espe(self, recoil, recoil_file=None):
+        """Calculates the energy spectrum of a recoil with get_espe.
+
+        Args:
+            recoil: RecoilElement object.
+            recoil_file: file where the recoil distribution is written. If
+                None, the default recoil file of the recoil is used.
+        """
+        espe, _ = self.element_simulation.calculate_espe(
+            recoil, optimization_type=self.optimization_type,
+            ch=self.channel_width, write_to_file=False,
+            recoil_file=recoil_file)
+        return espe
+
+    def _create_reweighter(self, recoil, espe):
+        """Reads simulated events into an EspeReweighter and calibrates it
+        with a spectrum that get_espe calculated for the given recoil.
+        Returns None if the reweighter could not be created.
+        """
+        _, _, detector = self.element_simulation.get_mcerd_params()
+        erd_file = Path(
+            self.element_simulation.directory,
+            fp.get_erd_file_name(
+                recoil, "*", optim_mode=self.optimization_type))
+        try:
+            reweighter = EspeReweighter.from_erd_files(
+                erd_file.parent.glob(erd_file.name),
+                toflen=detector.calculate_tof_length(),
+                timeres=detector.timeres,
+                channel_width=self.channel_width)
+        except (OSError, ValueError):
+            return None
+        if reweighter.calibrate(espe, *get_recoil_distribution(recoil)):
+            return reweighter
+        return None
+
     def get_objective_values(self, optim_espe):
-        """Calculates the objective values and returns them as a np.array.
+        """Calculates the objective values, i.e. the area between the
+        simulated and measured energy spectra and the summed distance
+        between their points.
         """
-        obj_values = collections.namedtuple(
-            "ObjectiveValues", ("area", "sum_distance"))
-        if optim_espe:
-            # Make spectra the same size
-            optim_espe, measured_espe = gf.uniform_espe_lists(
-                optim_espe, self.measured_espe,
-                channel_width=self.element_simulation.channel_width)
-
-            # Find the area between simulated and measured energy
-            # spectra
-            area = mf.calculate_area(optim_espe, measured_espe)
-
-            # Find the summed distance between thw points of these two
-            # spectra
-            sum_diff = sum(abs(opt_p[1] - mesu_p[1])
-                           for opt_p, mesu_p in zip(optim_espe, measured_espe))
-
-            return obj_values(area, sum_diff)
-        # If failed to create energy spectrum
-        return obj_values(np.inf, np.inf)
+        return objectives.get_objective_values(
+            optim_espe, self.measured_espe,
+            channel_width=self.element_simulation.channel_width)
 
     def find_bit_variable_lengths(self):
         # Find needed size to hold x and y in binary
@@ -755,15 +1127,16 @@ class Nsgaii(Observable):
         else:  # Initialize a population for fluence
             # Change upper and lower limits to have individual indices
             #  for each solution (makes variation easier for real values)
-            upper_limits = np.zeros((1, self.sol_size))
-            lower_limits = np.zeros((1, self.sol_size))
-            k = 0
-            while k in range(self.sol_size):
-                upper_limits[k] = self.upper_limits
-                lower_limits[k] = self.lower_limits
-                k += 1
-            self.lower_limits = lower_limits
-            self.upper_limits = upper_limits
+            if np.ndim(self.upper_limits) < 2:
+                upper_limits = np.zeros((1, self.sol_size))
+                lower_limits = np.zeros((1, self.sol_size))
+                k = 0
+                while k in range(self.sol_size):
+                    upper_limits[k] = self.upper_limits
+                    lower_limits[k] = self.lower_limits
+                    k += 1
+                self.lower_limits = lower_limits
+                self.upper_limits = upper_limits
 
             # Create a random population
             init_sols = np.random.random_sample(
@@ -817,60 +1190,56 @@ class Nsgaii(Observable):
         if r_n == np.inf:
             r_n = n
         # Coded according to algorithm given by Deb(2002)
-        # Go through all solutions
+        pop_obj = np.asarray(pop_obj)
+        # dominates[i, j] tells whether solution i dominates solution j
+        dominates = Nsgaii.domination_matrix(pop_obj)
+        # Number of solutions that dominate each solution
+        n_i = dominates.sum(axis=0)
+
         front_no = np.inf * np.ones(n)
-        fronts = 0
-        front_1 = []  # Holds pop_obj and index in one element
-        added_solutions = 0
-        s_i = [i for i in range(n)]  # s_p holds pop_obj and its index in one
-        # element
-        n_i = np.zeros(n)
-        # front_no, pop_obj and s_i plus n_i -> all have corresponding indices
-        for i in range(len(pop_obj)):
-            p = pop_obj[i]
-            s_p = []
-            n_p = 0
-            for h in range(len(pop_obj)):
-                q = pop_obj[h]
-                if np.array_equal(p, q):
-                    continue
-                if opt.dominates(p, q):
-                    s_p.append((q, h))
-                elif opt.dominates(q, p):
-                    n_p += 1
-            if n_p == 0:
-                front_no[i] = 1
-                front_1.append((p, i))
-                added_solutions += 1
-            s_i[i] = s_p
-            n_i[i] = n_p
-        fronts += 1
-
-        current_front = front_1
+        current_front = n_i == 0
+        front_no[current_front] = 1
+        added_solutions = np.count_nonzero(current_front)
+        fronts = 1
         f_n = 1
-        while current_front:
+        while current_front.any():
             if added_solutions >= r_n:
                 break
-            new_front = []
-            for j in range(len(current_front)):
-                p = current_front[j]
-                p_i = p[1]
-                s_p = s_i[p_i]
-                for k in range(len(s_p)):
-                    q = s_p[k][0]
-                    index = s_p[k][1]
-                    n_q = n_i[index]
-                    n_q -= 1
-                    n_i[index] = n_q
-                    if n_q == 0:
-                        front_no[index] = f_n + 1
-                        new_front.append((q, index))
-                        added_solutions += 1
+            # Solutions dominated by the current front are no longer
+            # dominated by it
+            prev_n_i = n_i
+            n_i = n_i - dominates[current_front].sum(axis=0)
+            new_front = (n_i == 0) & (prev_n_i > 0)
+            front_no[new_front] = f_n + 1
+            added_solutions += np.count_nonzero(new_front)
             f_n += 1
             current_front = new_front
             fronts += 1
         return front_no, fronts
 
+    @staticmethod
+    def domination_matrix(pop_obj):
+        """Returns a boolean matrix that tells which solutions dominate each
+        other. Element [i, j] is True if solution i dominates solution j,
+        i.e. solution i is not worse than j in any objective and better in
+        at least one (minimization).
+
+        Args:
+            pop_obj: objective values as a 2D array.
+
+        Return:
+            n x n boolean array
+        """
+        pop_obj = np.asarray(pop_obj)
+        n = len(pop_obj)
+        not_worse = np.ones((n, n), dtype=bool)
+        better = np.zeros((n, n), dtype=bool)
+        for values in pop_obj.T:
+            column, row = values[:, np.newaxis], values[np.newaxis, :]
+            not_worse &= ~(column > row)
+            better |= column < row
+        return not_worse & better
+
     @staticmethod
     def new_population_selection(population, pop_size):
         """
@@ -887,35 +1256,29 @@ class Nsgaii(Observable):
         pop_n, t = np.shape(population[0])
         # Sort intermediate population based on non-domination
         front_no, last_front_no = Nsgaii.nd_sort(population[1], pop_n, pop_size)
-        include_in_next = [False for _ in range(front_no.size)]
         # Find all individuals that belong to better fronts, except the last one
         # that doesn't fit
-        for i in range(front_no.size):
-            if front_no[i] < last_front_no:
-                include_in_next[i] = True
+        include_in_next = front_no < last_front_no
         # Calculate crowding distance for all individuals
         crowd_dis = Nsgaii.crowding_distance(front_no, population[1])
 
         # Find last front that maybe doesn't fit properly
-        last = [i for i in range(len(front_no)) if front_no[i] == last_front_no]
+        last = np.flatnonzero(front_no == last_front_no)
         # Rank holds the indices corresponding to last that have crowding
         # distance from biggest to smallest
         rank = np.argsort(-crowd_dis[last])
         delta_n = rank[: (pop_size - int(np.sum(include_in_next)))]
-        # Get indices corresponding to population for individuals to be included
-        #  in the next generation.
-        rest = [last[i] for i in delta_n]
-        for i in rest:
-            include_in_next[i] = True
-        index = np.array(
-            [i for i in range(len(include_in_next)) if include_in_next[i]])
+        # Include individuals with the biggest crowding distances in the next
+        # generation.
+        include_in_next[last[delta_n]] = True
+        index = np.flatnonzero(include_in_next)
         next_pop = [population[0][index, :], population[1][index, :]]
 
         return next_pop, front_no[index], crowd_dis[index]
 
     def start_optimization(self, starting_solutions=None,
                            cancellation_token=None,
-                           ion_division=IonDivision.BOTH):
+                           ion_division=IonDivision.BOTH, checkpoint=None):
         """
         Start the optimization. This includes sorting based on
         non-domination and crowding distance, creating offspring population
@@ -924,16 +1287,22 @@ class Nsgaii(Observable):
 
         Args:
             starting_solutions: First solutions used in optimization. If
-                None, initialize new solutions.
+                None, initialize new solutions. If there are fewer solutions
+                than the population size (for example the Pareto front of a
+                previous optimization), new solutions are added.
             cancellation_token: CancellationToken that is used to stop the
                 optimization before all evaluations have been evaluated.
             ion_division: ion division mode used when simulating
+            checkpoint: Checkpoint of a previous optimization (see
+                load_checkpoint). If given, the optimization continues from
+                the checkpoint instead of starting from a new population.
         """
         self.on_next(self._get_message(
             OptimizationState.PREPARING, evaluations_left=self.evaluations))
         try:
-            self.__prepare_optimization(
-                starting_solutions, cancellation_token, ion_division)
+            restored = self.__prepare_optimization(
+                starting_solutions, cancellation_token, ion_division,
+                checkpoint=checkpoint)
         except (OSError, ValueError, subprocess.SubprocessError) as e:
             self.on_error(self._get_message(
                 OptimizationState.FINISHED,
@@ -943,123 +1312,185 @@ class Nsgaii(Observable):
 
         start_time = timer()
 
+        # Islands are stored one after another in the population
+        solutions = np.array(self.population[0])
+        objective_values = np.array(self.population[1])
+        if restored:
+            front_no, crowd_dis = checkpoint.front_no, checkpoint.crowd_dis
+            evaluations = checkpoint.evaluations_left
+        else:
+            # Initial population is sorted according to non-domination,
+            # without crowding distance. crowd_dis is still needed when
+            # initial population is joined with the offspring population.
+            front_no, crowd_dis = self.sort_islands(objective_values)
+            if checkpoint is not None:
+                evaluations = checkpoint.evaluations_left
+            else:
+                evaluations = self.evaluations
+            if self.checkpoint_interval:
+                self.save_checkpoint(front_no, crowd_dis, evaluations)
+
         self.on_next(self._get_message(
-            OptimizationState.RUNNING, evaluations_left=self.evaluations))
-
-        # Sort the initial population according to non-domination
-        front_no, last_front_no = self.nd_sort(self.population[1],
-                                               self.pop_size)
-        # Initial population is sorted according to non-domination, without
-        # crowding distance. crowd_dis is still needed when initial population
-        # is joined with the offspring population.
-        crowd_dis = self.crowding_distance(front_no, self.population[1])
-        # In a loop until number of evaluations is reached:
-        evaluations = self.evaluations
-        while evaluations > 0:
-            if cancellation_token is not None:
-                if cancellation_token.is_cancellation_requested():
-                    break
-            # Join front_no and crowd_dis with transpose to get one array
-            fit = np.vstack((front_no, crowd_dis)).T
-            # Select group of parents (mating pool) by binary_tournament,
-            # usually number of parents is half of population.
-            pool_size = round(self.pop_size / 2)
+            OptimizationState.RUNNING, evaluations_left=evaluations))
 
+        generation_size = self.pop_size * self.islands
+        generation = (self.evaluations - evaluations) // generation_size
+        try:
+            # In a loop until number of evaluations is reached:
+            while evaluations > 0:
+                if cancellation_token is not None:
+                    if cancellation_token.is_cancellation_requested():
+                        break
+                offspring = []
+                for island in self.get_island_slices():
+                    # Join front_no and crowd_dis with transpose to get one
+                    # array
+                    fit = np.vstack((front_no[island], crowd_dis[island])).T
+                    # Select group of parents (mating pool) by
+                    # binary_tournament, usually number of parents is half of
+                    # population.
+                    pool_size = round(self.pop_size / 2)
+
+                    try:
+                        pool_ind = opt.tournament_allow_doubles(
+                            2, pool_size, fit)
+                    except IndexError:
+                        self.on_error(self._get_message(
+                            OptimizationState.FINISHED,
+                            error="Ensure that there is simulated data for "
+                                  "this recoil element before starting "
+                                  "optimization."))
+                        return
+                    pool = solutions[island][pool_ind, :]
+                    # Form offspring solutions with this pool, and do
+                    # variation on them
+                    try:
+                        # FIXME using automatically adjusted upper limit for x
+                        #  may cause an IndexError here. Find out why and
+                        #  handle it properly
+                        offspring.append(self.variation(pool))
+                    except IndexError as e:
+                        self.on_error(self._get_message(
+                            OptimizationState.FINISHED,
+                            error=f"Failed to process offspring: {e}"))
+                        return
+                # Offspring of all islands are evaluated together so that their
+                # spectra can be calculated concurrently
+                offspring_pop = self.evaluate_solutions(
+                    np.vstack(offspring), cancellation_token=cancellation_token)
+                offspring_objs = np.array(offspring_pop[1])
+
+                new_solutions, new_objs, new_front_no, new_crowd_dis = \
+                    [], [], [], []
+                for i, island in enumerate(self.get_island_slices()):
+                    # Join parent population and offspring population
+                    joined_sols = np.vstack(
+                        (solutions[island], offspring[i]))
+                    joined_objs = np.vstack(
+                        (objective_values[island], offspring_objs[island]))
+                    intermediate_population = [joined_sols, joined_objs]
+                    # Select solutions (and objective function values) to new
+                    # population (size self.pop_size) based on non-domination
+                    # and crowding distance
+                    new_population, island_front_no, island_crowd_dis = \
+                        self.new_population_selection(
+                            intermediate_population, self.pop_size)
+                    new_solutions.append(new_population[0])
+                    new_objs.append(new_population[1])
+                    new_front_no.append(island_front_no)
+                    new_crowd_dis.append(island_crowd_dis)
+                solutions = np.vstack(new_solutions)
+                objective_values = np.vstack(new_objs)
+                front_no = np.concatenate(new_front_no)
+                crowd_dis = np.concatenate(new_crowd_dis)
+
+                # Update the amount of evaluation left
+                evaluations -= generation_size
+                generation += 1
+
+                if self.islands > 1 and \
+                        generation % self.migration_interval == 0:
+                    front_no, crowd_dis = self.migrate(
+                        solutions, objective_values, front_no, crowd_dis)
+
+                # Change current population to new population
+                self.population = [solutions, objective_values]
+
+                # Checkpoints are only saved from generations whose evaluation
+                # was not cancelled
+                if self.checkpoint_interval and not (
+                        cancellation_token is not None and
+                        cancellation_token.is_cancellation_requested()) and (
+                        generation % self.checkpoint_interval == 0 or
+                        evaluations <= 0):
+                    self.save_checkpoint(front_no, crowd_dis, evaluations)
+
+                if self.islands > 1:
+                    pareto_front_no, _ = self.nd_sort(
+                        objective_values, len(objective_values))
+                else:
+                    pareto_front_no = front_no
+                elapsed_time = timer() - start_time
+                self.on_next(self._get_message(
+                    OptimizationState.RUNNING, evaluations_left=evaluations,
+                    pareto_front=objective_values[pareto_front_no == 1, :],
+                    elapsed=elapsed_time, cache_hits=self.cache_hits,
+                    cache_misses=self.cache_misses))
+
+                # Temporary prints
+                if evaluations % (10*self.evaluations/self.pop_size) == 0:
+                    percent = 100 * (self.evaluations - evaluations) / \
+                        self.evaluations
+                    print(
+                        'Running time %10.2f, percentage %s, done %f' % (
+                            elapsed_time - start_time, percent,
+                            self.evaluations - evaluations))
+
+            # Finally, sort by non-domination. Populations of the islands are
+            # merged into one Pareto front.
+            front_no, last_front_no = self.nd_sort(self.population[1],
+                                                   len(self.population[1]))
+            # Find first front
             try:
-                pool_ind = opt.tournament_allow_doubles(2, pool_size, fit)
-            except IndexError:
-                self.on_error(self._get_message(
-                    OptimizationState.FINISHED,
-                    error="Ensure that there is simulated data for this recoil "
-                          "element before starting optimization."))
-                self.clean_up(cancellation_token)
-                return
-            pop_sol, pop_obj = np.array(self.population[0]), \
-                np.array(self.population[1])
-            pool = [pop_sol[pool_ind, :], pop_obj[pool_ind, :]]
-            # Form offspring solutions with this pool, and do variation on them
-            try:
-                # FIXME using automatically adjusted upper limit for x may
-                #  cause an IndexError here. Find out why and handle it properly
-                offspring = self.variation(pool[0])
-            except IndexError as e:
+                pareto_optimal_sols = self.population[0][front_no == 1, :]
+                pareto_optimal_objs = self.population[1][front_no == 1, :]
+            except TypeError:
                 self.on_error(self._get_message(
                     OptimizationState.FINISHED,
-                    error=f"Failed to process offspring: {e}"))
-                self.clean_up(cancellation_token)
+                    error="Could not form the Pareto front. Optimization "
+                          "may have been stopped before any solutions were "
+                          "evaluated."))
                 return
-            # Evaluate offspring solutions to get offspring population
-            offspring_pop = self.evaluate_solutions(offspring)
-            # Join parent population and offspring population
-            joined_sols = np.vstack((self.population[0], offspring_pop[0]))
-            joined_objs = np.vstack((self.population[1], offspring_pop[1]))
-            intermediate_population = [joined_sols, joined_objs]
-            # Select solutions (and objective function values) to new
-            # population (size self.pop_size) based on non-domination and
-            # crowding distance
-            new_population, front_no, crowd_dis = self.new_population_selection(
-                intermediate_population, self.pop_size)
-            # Change surrent population to new population
-            self.population = new_population
-
-            # Update the amount of evaluation left
-            evaluations -= self.pop_size
-
-            elapsed_time = timer() - start_time
-            self.on_next(self._get_message(
-                OptimizationState.RUNNING, evaluations_left=evaluations,
-                pareto_front=self.population[1][front_no == 1, :],
-                elapsed=elapsed_time))
-
-            # Temporary prints
-            if evaluations % (10*self.evaluations/self.pop_size) == 0:
-                percent = 100*(self.evaluations - evaluations)/self.evaluations
-                print(
-                    'Running time %10.2f, percentage %s, done %f' % (
-                        elapsed_time - start_time, percent, self.evaluations -
-                        evaluations))
-
-        # Finally, sort by non-domination
-        front_no, last_front_no = self.nd_sort(self.population[1],
-                                               self.pop_size)
-        # Find first front
-        try:
-            pareto_optimal_sols = self.population[0][front_no == 1, :]
-            pareto_optimal_objs = self.population[1][front_no == 1, :]
-        except TypeError:
-            self.on_error(self._get_message(
-                OptimizationState.FINISHED,
-                error="Could not form the Pareto front. Optimization may have "
-                      "been stopped before any solutions were evaluated."))
+
+            if self.optimization_type is OptimizationType.RECOIL:
+                first_sol, med_sol, last_sol = pick_final_solutions(
+                    pareto_optimal_objs, pareto_optimal_sols, count=3)
+
+                # Save the three pareto solutions as recoils
+                self.element_simulation.optimization_recoils = []
+                first_recoil = self.form_recoil(first_sol, "optfirst")
+                self.element_simulation.optimization_recoils.append(
+                    first_recoil)
+                med_recoil = self.form_recoil(med_sol, "optmed")
+                self.element_simulation.optimization_recoils.append(med_recoil)
+                last_recoil = self.form_recoil(last_sol, "optlast")
+                self.element_simulation.optimization_recoils.append(last_recoil)
+            else:
+                # Calculate average of found fluences
+                f_sum = 0
+                for sol in pareto_optimal_sols:
+                    f_sum += sol[0]
+                avg = f_sum / len(pareto_optimal_sols)
+                self.element_simulation.optimized_fluence = avg
+        finally:
             self.clean_up(cancellation_token)
-            return
 
-        if self.optimization_type is OptimizationType.RECOIL:
-            first_sol, med_sol, last_sol = pick_final_solutions(
-                pareto_optimal_objs, pareto_optimal_sols, count=3)
-
-            # Save the three pareto solutions as recoils
-            self.element_simulation.optimization_recoils = []
-            first_recoil = self.form_recoil(first_sol, "optfirst")
-            self.element_simulation.optimization_recoils.append(first_recoil)
-            med_recoil = self.form_recoil(med_sol, "optmed")
-            self.element_simulation.optimization_recoils.append(med_recoil)
-            last_recoil = self.form_recoil(last_sol, "optlast")
-            self.element_simulation.optimization_recoils.append(last_recoil)
-        else:
-            # Calculate average of found fluences
-            f_sum = 0
-            for sol in pareto_optimal_sols:
-                f_sum += sol[0]
-            avg = f_sum / len(pareto_optimal_sols)
-            self.element_simulation.optimized_fluence = avg
-
-        self.clean_up(cancellation_token)
         self.element_simulation.optimization_results_to_file(self.cut_file)
 
         self.on_completed(self._get_message(
             OptimizationState.FINISHED,
-            evaluations_done=self.evaluations - evaluations))
+            evaluations_done=self.evaluations - evaluations,
+            cache_hits=self.cache_hits, cache_misses=self.cache_misses))
 
     def clean_up(self, cancellation_token):
         if cancellation_token is not None:
@@ -1068,8 +1499,11 @@ class Nsgaii(Observable):
 
     def delete_temp_files(self):
         # Remove unnecessary opt.recoil file
+        checkpoint_file = self.get_checkpoint_file().name
         for file in os.listdir(self.element_simulation.directory):
             # TODO better method for determining which files to delete
+            if file == checkpoint_file:
+                continue
             if file.endswith("opt.recoil") or "optfl" in file:
                 try:
                     os.remove(Path(self.element_simulation.directory, file))
@@ -1099,7 +1533,10 @@ class Nsgaii(Observable):
             p_2 = np.random.randint(pop_dec_n)
             parent_1 = pop_sols[p_1]
             parent_2 = pop_sols[p_2]
-            while (parent_1 == parent_2).all():
+            # Pool may consist of copies of a single solution (for example
+            # when migrated solutions take over an island)
+            has_other_parent = (pop_sols != parent_1).any()
+            while has_other_parent and (parent_1 == parent_2).all():
                 p_2 = np.random.randint(pop_dec_n)
                 parent_2 = pop_sols[p_2]
 
@@ -1242,8 +1679,9 @@ class Nsgaii(Observable):
             upper = np.tile(self.upper_limits[0], (self.pop_size, 1))
             lower = np.tile(self.lower_limits[0], (self.pop_size, 1))
 
-            # Change offspring to numpy array
-            off = [np.array([item]) for item in offspring]
+            # Change offspring to numpy array. Children that were clipped to
+            # the limits during crossover are arrays instead of scalars.
+            off = [np.ravel(item) for item in offspring]
             offspring = np.array(off)
 
             # delta = np.power(2*r[use_r_smaller], (1 / (self.dis_m + 1))) - 1
@@ -1396,22 +1834,101 @@ def get_optim_espe(elem_sim: ElementSimulation,
     return espe
 
 
-def calculate_change(espe1, espe2, channel_width):
-    if not espe1 or not espe2:
-        return math.inf
-    uniespe1, uniespe2 = gf.uniform_espe_lists(
-        espe1, espe2, channel_width=channel_width)
-
-    # Calculate distance between energy spectra
-    # TODO move this to math_functions
-    sum_diff = 0
-    amount = 0
-    for point1, point2 in zip(uniespe1, uniespe2):
-        if point1[1] != 0 or point2[1] != 0:
-            amount += 1
-            sum_diff += abs(point1[1] - point2[1])
-    # Take average of sum_diff (non-zero diffs)
-    if amount:
-        return sum_diff / amount
-    else:
-        return math.inf
+def scale_espe(espe, factor):
+    """Returns a copy of the energy spectrum with its intensities multiplied
+    by the given factor.
+
+    Args:
+        espe: energy spectrum as a list of (energy, intensity) pairs.
+        factor: factor by which the intensities are multiplied.
+
+    Return:
+        scaled energy spectrum as a list of tuples
+    """
+    return [(x, y * factor) for x, y in espe]
+
+
+def get_recoil_key(recoil):
+    """Returns a key that identifies a candidate recoil by its points.
+
+    Args:
+        recoil: RecoilElement object.
+
+    Return:
+        tuple of point coordinates
+    """
+    return tuple((p.get_x(), p.get_y()) for p in recoil.get_points())
+
+
+class Checkpoint(NamedTuple):
+    """State of an optimization between two generations.
+    """
+    optimization_type: OptimizationType
+    solutions: np.ndarray
+    objective_values: np.ndarray
+    front_no: np.ndarray
+    crowd_dis: np.ndarray
+    evaluations_left: int
+    rng_state: tuple
+
+    def get_pareto_front(self):
+        """Returns the solutions that belong to the first front.
+        """
+        return self.solutions[self.front_no == 1]
+
+
+def save_checkpoint(file, checkpoint):
+    """Writes a checkpoint into a temporary file and replaces the old
+    checkpoint file with it so that an interrupted write does not destroy
+    the previous checkpoint.
+
+    Args:
+        file: path to the checkpoint file
+        checkpoint: Checkpoint object
+    """
+    file = Path(file)
+    tmp_file = file.with_name(f".{file.name}.tmp")
+    name, keys, pos, has_gauss, cached_gaussian = checkpoint.rng_state
+    with tmp_file.open("wb") as f:
+        np.savez(
+            f, optimization_type=int(checkpoint.optimization_type),
+            solutions=np.asarray(checkpoint.solutions, dtype=float),
+            objective_values=np.asarray(
+                checkpoint.objective_values, dtype=float),
+            front_no=np.asarray(checkpoint.front_no, dtype=float),
+            crowd_dis=np.asarray(checkpoint.crowd_dis, dtype=float),
+            evaluations_left=checkpoint.evaluations_left,
+            rng_name=name, rng_keys=keys, rng_pos=pos,
+            rng_has_gauss=has_gauss, rng_cached_gaussian=cached_gaussian)
+    os.replace(tmp_file, file)
+
+
+def load_checkpoint(file):
+    """Reads a checkpoint from a file.
+
+    Raises OSError if the file cannot be read and ValueError if it is not a
+    valid checkpoint file.
+
+    Args:
+        file: path to the checkpoint file
+
+    Return:
+        Checkpoint object
+    """
+    try:
+        with np.load(file) as data:
+            rng_state = (
+                str(data["rng_name"]), data["rng_keys"],
+                int(data["rng_pos"]), int(data["rng_has_gauss"]),
+                float(data["rng_cached_gaussian"]))
+            return Checkpoint(
+                optimization_type=OptimizationType(
+                    int(data["optimization_type"])),
+                solutions=data["solutions"],
+                objective_values=data["objective_values"],
+                front_no=data["front_no"],
+                crowd_dis=data["crowd_dis"],
+                evaluations_left=int(data["evaluations_left"]),
+                rng_state=rng_state)
+    except KeyError as e:
+        raise ValueError(f"Invalid checkpoint file {file}: {e}")
@@ -0,0 +1,179 @@
+# coding=utf-8
+"""
+Created on 18.10.2026
+
+Potku is a graphical user interface for analyzation and
+visualization of measurement data collected from a ToF-ERD
+telescope. For physics calculations Potku uses external
+analyzation components.
+Copyright (C) 2026 Potku developers
+
+This program is free software; you can redistribute it and/or
+modify it under the terms of the GNU General Public License
+as published by the Free Software Foundation; either version 2
+of the License, or (at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program (file named 'LICENCE').
+
+objectives.py contains array based functions that compare simulated energy
+spectra to measured ones, or to each other, during optimization.
+"""
+__author__ = "Potku developers"
+__version__ = "2.0"
+
+import math
+
+import numpy as np
+
+from typing import NamedTuple
+from typing import Tuple
+
+from .base import Espe
+
+# Coordinates are rounded to this many decimals when spectra are padded
+_DECIMALS = 4
+
+
+class ObjectiveValues(NamedTuple):
+    """Objective values of a simulated spectrum.
+    """
+    area: float
+    sum_distance: float
+
+
+def to_arrays(espe: Espe) -> Tuple[np.ndarray, np.ndarray]:
+    """Returns the x and y values of an energy spectrum as arrays.
+    """
+    if not len(espe):
+        return np.zeros(0), np.zeros(0)
+    x, y = np.asarray(espe, dtype=float).T
+    return x, y
+
+
+def align_spectra(espe1: Espe, espe2: Espe, channel_width: float = 0.025) \
+        -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """Pads the given energy spectra with zero intensity channels so that
+    both spectra cover the same energy range. This gives the same result
+    as general_functions.uniform_espe_lists but does not modify the
+    spectra.
+
+    Args:
+        espe1: energy spectrum as a collection of (x, y) pairs
+        espe2: energy spectrum as a collection of (x, y) pairs
+        channel_width: width of a channel
+
+    Return:
+        x and y values of the first spectrum followed by x and y values of
+        the second spectrum
+    """
+    x1, y1 = to_arrays(espe1)
+    x2, y2 = to_arrays(espe2)
+
+    if x2[0] < x1[0]:
+        x1, y1 = _pad(x1, y1, x1[0], x2[0], -channel_width)
+    elif x1[0] < x2[0]:
+        x2, y2 = _pad(x2, y2, x2[0], x1[0], -channel_width)
+
+    if x2[-1] < x1[-1]:
+        x2, y2 = _pad(x2, y2, x2[-1], x1[-1], channel_width)
+    elif x1[-1] < x2[-1]:
+        x1, y1 = _pad(x1, y1, x1[-1], x2[-1], channel_width)
+
+    return x1, y1, x2, y2
+
+
+def _pad(x: np.ndarray, y: np.ndarray, start: float, limit: float,
+         step: float) -> Tuple[np.ndarray, np.ndarray]:
+    """Adds zero points to the start (negative step) or end (positive step)
+    of the spectrum, one step at a time from start until the rounded x
+    value would exceed the limit.
+    """
+    count = int(math.floor(abs(limit - start) / abs(step))) + 1
+    pad_x = np.round(start + step * np.arange(1, count + 1), _DECIMALS)
+    if step < 0:
+        pad_x = pad_x[pad_x >= limit][::-1]
+        return np.concatenate((pad_x, x)), \
+            np.concatenate((np.zeros(pad_x.size), y))
+    pad_x = pad_x[pad_x <= limit]
+    return np.concatenate((x, pad_x)), \
+        np.concatenate((y, np.zeros(pad_x.size)))
+
+
+def calculate_area(x1: np.ndarray, y1: np.ndarray, x2: np.ndarray,
+                   y2: np.ndarray) -> float:
+    """Calculates the area of the polygon that is formed by the first curve
+    and the reversed second curve, like math_functions.calculate_area does.
+
+    Note that if the curves cross each other, the areas on opposite sides
+    of the crossing cancel each other out.
+
+    Return:
+        area as a float
+    """
+    if not x1.size:
+        return 0.0
+    xs = np.concatenate((x1, x2[::-1]))
+    ys = np.concatenate((y1, y2[::-1]))
+    # Shoelace formula
+    return 0.5 * abs(np.dot(xs, np.roll(ys, -1)) - np.dot(ys, np.roll(xs, -1)))
+
+
+def calculate_sum_distance(y1: np.ndarray, y2: np.ndarray) -> float:
+    """Returns the summed distance between the y values of two aligned
+    curves. Extra values of the longer curve are ignored.
+    """
+    n = min(y1.size, y2.size)
+    return float(np.abs(y1[:n] - y2[:n]).sum())
+
+
+def get_objective_values(espe: Espe, measured_espe: Espe,
+                         channel_width: float = 0.025) -> ObjectiveValues:
+    """Calculates the objective values of a simulated energy spectrum
+    compared to the measured energy spectrum.
+
+    Args:
+        espe: simulated energy spectrum
+        measured_espe: measured energy spectrum
+        channel_width: channel width of the spectra
+
+    Return:
+        area between the spectra and summed distance between the points of
+        the spectra. Both are infinite if the simulated spectrum is empty.
+    """
+    if not len(espe):
+        return ObjectiveValues(np.inf, np.inf)
+    x1, y1, x2, y2 = align_spectra(espe, measured_espe, channel_width)
+    return ObjectiveValues(
+        calculate_area(x1, y1, x2, y2), calculate_sum_distance(y1, y2))
+
+
+def calculate_change(espe1: Espe, espe2: Espe, channel_width: float) \
+        -> float:
+    """Calculates the average distance between the points of two energy
+    spectra. Channels that are empty in both spectra are ignored.
+
+    Args:
+        espe1: energy spectrum
+        espe2: energy spectrum
+        channel_width: channel width of the spectra
+
+    Return:
+        average distance or infinity if either spectrum is empty or all
+        channels are empty
+    """
+    if not espe1 or not espe2:
+        return math.inf
+    _, y1, _, y2 = align_spectra(espe1, espe2, channel_width)
+    n = min(y1.size, y2.size)
+    y1, y2 = y1[:n], y2[:n]
+    nonzero = (y1 != 0) | (y2 != 0)
+    amount = np.count_nonzero(nonzero)
+    if amount:
+        return float(np.abs(y1[nonzero] - y2[nonzero]).sum() / amount)
+    return math.inf
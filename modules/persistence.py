@@ -0,0 +1,371 @@
+# coding=utf-8
+"""
+Created on 18.10.2026
+
+Potku is a graphical user interface for analyzation and
+visualization of measurement data collected from a ToF-ERD
+telescope. For physics calculations Potku uses external
+analyzation components.
+Copyright (C) 2026 Potku developers
+
+This program is free software; you can redistribute it and/or
+modify it under the terms of the GNU General Public License
+as published by the Free Software Foundation; either version 2
+of the License, or (at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program (file named 'LICENCE').
+
+persistence.py writes the files of a request (.measurement, .target,
+.mcsimu and other JSON files as well as selection files).
+
+Files are written atomically: the content is first written to a temporary
+file in the same directory, which then replaces the old file. A file is
+therefore never left half written if Potku crashes while saving.
+
+Writes whose content has not changed since the file was last written are
+skipped. Modification times stored in JSON files are ignored when the
+contents are compared, as they change every time an object is saved.
+
+Files that change often, such as selection files and the files of a
+target that is being edited, can be written with a delay. Writes to the
+same file within the delay are coalesced so that only the latest content is
+written. Files should be read with read_text or read_json so that pending
+content is returned instead of the content on disk. Pending writes are
+flushed when Potku exits and before files are renamed, and cancelled when
+files are removed with general_functions.remove_files.
+"""
+__author__ = "Potku developers"
+__version__ = "2.0"
+
+import atexit
+import hashlib
+import json
+import logging
+import os
+import tempfile
+import threading
+import time
+
+from pathlib import Path
+from typing import Any
+from typing import Dict
+from typing import Iterable
+from typing import Optional
+from typing import Tuple
+
+# Keys that are not compared when deciding whether a JSON file has changed
+IGNORED_KEYS = frozenset({"modification_time", "modification_time_unix"})
+
+
+def content_hash(obj: Any, ignored_keys: Iterable[str] = IGNORED_KEYS) \
+        -> str:
+    """Returns a hash of a JSON serializable object. Values of the ignored
+    keys are left out in all nested dictionaries.
+    """
+    return hashlib.sha1(json.dumps(
+        _without_keys(obj, frozenset(ignored_keys)),
+        sort_keys=True).encode()).hexdigest()
+
+
+def _without_keys(obj: Any, keys: frozenset) -> Any:
+    """Returns a copy of the object without the given dictionary keys.
+    """
+    if isinstance(obj, dict):
+        return {
+            k: _without_keys(v, keys) for k, v in obj.items()
+            if k not in keys
+        }
+    if isinstance(obj, (list, tuple)):
+        return [_without_keys(v, keys) for v in obj]
+    return obj
+
+
+def write_atomically(file: Path, text: str):
+    """Writes text to a temporary file and renames it to the given file.
+
+    Args:
+        file: path to the file
+        text: new content of the file
+    """
+    file = Path(file)
+    fd, tmp = tempfile.mkstemp(
+        dir=file.parent, prefix=f".{file.name}.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w") as f:
+            f.write(text)
+        try:
+            # mkstemp creates the file readable only by the user
+            os.chmod(tmp, os.stat(file).st_mode & 0o777)
+        except OSError:
+            os.chmod(tmp, 0o666 & ~_get_umask())
+        os.replace(tmp, file)
+    except BaseException:
+        try:
+            os.remove(tmp)
+        except OSError:
+            pass
+        raise
+
+
+def _get_umask() -> int:
+    """Returns the umask of the process.
+    """
+    umask = os.umask(0)
+    os.umask(umask)
+    return umask
+
+
+class Persistence:
+    """Writes files atomically, skips writes of unchanged content and
+    coalesces delayed writes.
+    """
+    def __init__(self):
+        """Initializes a new Persistence.
+        """
+        self._lock = threading.RLock()
+        self._condition = threading.Condition(self._lock)
+        self._thread: Optional[threading.Thread] = None
+        # Hash, size and modification time of each file when it was last
+        # written
+        self._written: Dict[Path, Tuple[str, int, int]] = {}
+        # Delayed writes by file: time to write, content and its hash
+        self._pending: Dict[Path, Tuple[float, str, str]] = {}
+
+    def write_json(self, file: Path, obj: Any, indent: int = 4,
+                   delay: Optional[float] = None) -> bool:
+        """Writes an object into a JSON file unless the file already
+        contains the same object. Ignored keys (modification times) are
+        not compared.
+
+        Args:
+            file: path to the file
+            obj: JSON serializable object
+            indent: indentation of the JSON file
+            delay: if given, the file is written after this many seconds
+                unless the write is replaced by another one.
+
+        Return:
+            whether the file was (or will be) written
+        """
+        return self._write(
+            file, json.dumps(obj, indent=indent), content_hash(obj), delay)
+
+    def write_text(self, file: Path, text: str,
+                   delay: Optional[float] = None) -> bool:
+        """Writes text into a file unless the file already contains it.
+
+        Args:
+            file: path to the file
+            text: new content of the file
+            delay: if given, the file is written after this many seconds
+                unless the write is replaced by another one.
+
+        Return:
+            whether the file was (or will be) written
+        """
+        return self._write(
+            file, text, hashlib.sha1(text.encode()).hexdigest(), delay)
+
+    def _write(self, file: Path, text: str, digest: str,
+               delay: Optional[float]) -> bool:
+        """Writes the file now or later unless it is up to date.
+        """
+        file = Path(file).absolute()
+        with self._lock:
+            pending = self._pending.get(file)
+            if pending is not None and pending[2] == digest:
+                # The same content is already waiting to be written
+                if delay is None:
+                    del self._pending[file]
+                    self._write_now(file, text, digest)
+                return True
+            if self._is_up_to_date(file, digest):
+                # Content on disk replaces the pending content
+                self._pending.pop(file, None)
+                return False
+            if delay is None:
+                self._pending.pop(file, None)
+                self._write_now(file, text, digest)
+                return True
+            # Writes that are replaced keep their original time so that a
+            # file that changes continuously is still written regularly.
+            due = self._pending.get(file, (time.monotonic() + delay,))[0]
+            self._pending[file] = due, text, digest
+            self._start_thread()
+            self._condition.notify()
+            return True
+
+    def _is_up_to_date(self, file: Path, digest: str) -> bool:
+        """Returns whether the last written content of the file has the
+        given hash. Files that have been modified by others since they were
+        written are never up to date.
+        """
+        written = self._written.get(file)
+        if written is None or written[0] != digest:
+            return False
+        try:
+            stat = os.stat(file)
+        except OSError:
+            return False
+        return (stat.st_size, stat.st_mtime_ns) == written[1:]
+
+    def _write_now(self, file: Path, text: str, digest: str):
+        """Writes the file and records its hash.
+        """
+        self._written.pop(file, None)
+        write_atomically(file, text)
+        stat = os.stat(file)
+        self._written[file] = digest, stat.st_size, stat.st_mtime_ns
+
+    def read_text(self, file: Path) -> str:
+        """Returns the content of the file. If a delayed write to the file
+        is waiting, its content is returned. Raises OSError if the file
+        cannot be read.
+        """
+        with self._lock:
+            pending = self._pending.get(Path(file).absolute())
+        if pending is not None:
+            return pending[1]
+        with Path(file).open("r") as f:
+            return f.read()
+
+    def read_json(self, file: Path) -> Any:
+        """Returns the object in a JSON file, taking delayed writes into
+        account like read_text. Raises OSError if the file cannot be read
+        and ValueError if it does not contain JSON.
+        """
+        return json.loads(self.read_text(file))
+
+    def forget(self, file: Path):
+        """Forgets the last written content of the file so that the next
+        write is not skipped.
+        """
+        with self._lock:
+            self._written.pop(Path(file).absolute(), None)
+
+    def is_pending(self, file: Path) -> bool:
+        """Returns whether a delayed write to the file is waiting.
+        """
+        with self._lock:
+            return Path(file).absolute() in self._pending
+
+    def cancel(self, file: Path):
+        """Cancels a delayed write to the file.
+        """
+        with self._lock:
+            self._pending.pop(Path(file).absolute(), None)
+
+    def flush(self, file: Optional[Path] = None):
+        """Writes delayed writes immediately.
+
+        Args:
+            file: file to write. If None, all pending writes are written.
+        """
+        with self._lock:
+            if file is None:
+                files = list(self._pending)
+            else:
+                files = [Path(file).absolute()]
+            for f in files:
+                self._flush_file(f)
+
+    def _flush_file(self, file: Path):
+        """Writes a pending file. Errors are logged as there is no caller
+        to report them to.
+        """
+        pending = self._pending.pop(file, None)
+        if pending is None:
+            return
+        _, text, digest = pending
+        if not file.parent.exists():
+            # The directory was removed after the write was delayed
+            return
+        try:
+            self._write_now(file, text, digest)
+        except OSError as e:
+            logging.getLogger(__name__).error(
+                f"Failed to write {file}: {e}")
+
+    def _start_thread(self):
+        """Starts the thread that writes delayed files.
+        """
+        if self._thread is None or not self._thread.is_alive():
+            self._thread = threading.Thread(
+                target=self._run, name="persistence", daemon=True)
+            self._thread.start()
+
+    def _run(self):
+        """Writes delayed files when they are due.
+        """
+        with self._lock:
+            while True:
+                if not self._pending:
+                    self._condition.wait()
+                    continue
+                now = time.monotonic()
+                due = [
+                    file for file, (t, _, _) in self._pending.items()
+                    if t <= now
+                ]
+                for file in due:
+                    self._flush_file(file)
+                if not due:
+                    self._condition.wait(
+                        min(t for t, _, _ in self._pending.values()) - now)
+
+
+_PERSISTENCE = Persistence()
+atexit.register(_PERSISTENCE.flush)
+
+
+def get_persistence() -> Persistence:
+    """Returns the Persistence used by Potku.
+    """
+    return _PERSISTENCE
+
+
+def write_json(file: Path, obj: Any, indent: int = 4,
+               delay: Optional[float] = None) -> bool:
+    """Writes an object into a JSON file using the Persistence of Potku.
+    See Persistence.write_json.
+    """
+    return _PERSISTENCE.write_json(file, obj, indent=indent, delay=delay)
+
+
+def write_text(file: Path, text: str, delay: Optional[float] = None) -> bool:
+    """Writes text into a file using the Persistence of Potku. See
+    Persistence.write_text.
+    """
+    return _PERSISTENCE.write_text(file, text, delay=delay)
+
+
+def read_text(file: Path) -> str:
+    """Returns the content of the file using the Persistence of Potku. See
+    Persistence.read_text.
+    """
+    return _PERSISTENCE.read_text(file)
+
+
+def read_json(file: Path) -> Any:
+    """Returns the object in a JSON file using the Persistence of Potku.
+    See Persistence.read_json.
+    """
+    return _PERSISTENCE.read_json(file)
+
+
+def cancel(file: Path):
+    """Cancels a delayed write of Potku. See Persistence.cancel.
+    """
+    _PERSISTENCE.cancel(file)
+
+
+def flush(file: Optional[Path] = None):
+    """Writes delayed writes of Potku immediately. See Persistence.flush.
+    """
+    _PERSISTENCE.flush(file)
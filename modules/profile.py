@@ -34,6 +34,8 @@ import time
 from pathlib import Path
 from typing import Set
 
+from . import persistence
+
 from .base import AdjustableSettings, Serializable
 
 
@@ -79,8 +81,7 @@ class Profile(AdjustableSettings, Serializable):
     def from_file(cls, profile_file: Path) -> "Profile":
         # TODO: Copy from measurement.from_file (lines 502 to 556)
         try:
-            with profile_file.open("r") as prof_file:
-                profile = json.load(prof_file)
+            profile = persistence.read_json(profile_file)
 
             general = {
                 "name": profile["general"]["name"],
@@ -141,8 +142,7 @@ class Profile(AdjustableSettings, Serializable):
             self.number_of_splits
         obj["composition_changes"]["normalization"] = self.normalization
 
-        with profile_file.open("w") as file:
-            json.dump(obj, file, indent=4)
+        persistence.write_json(profile_file, obj)
 
     def _get_attrs(self) -> Set[str]:
         return set(self.__slots__)
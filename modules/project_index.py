@@ -0,0 +1,378 @@
+# coding=utf-8
+"""
+Created on 18.10.2026
+
+Potku is a graphical user interface for analyzation and
+visualization of measurement data collected from a ToF-ERD
+telescope. For physics calculations Potku uses external
+analyzation components.
+Copyright (C) 2026 Potku developers
+
+This program is free software; you can redistribute it and/or
+modify it under the terms of the GNU General Public License
+as published by the Free Software Foundation; either version 2
+of the License, or (at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program (file named 'LICENCE').
+
+project_index.py contains an on-disk index of the directories of a request.
+
+The index stores the contents of each directory that has been listed
+(names, types, sizes and modification times of the entries) in an SQLite
+database in the request directory. Adding, removing or renaming an entry
+changes the modification time of its directory, so a directory only needs
+to be listed again when its modification time has changed. Loading a
+request therefore costs a stat call per directory instead of a listing,
+which matters on network file systems and in requests that contain
+hundreds of samples, measurements and simulations.
+
+The index also records from which files derived files, such as cut files,
+were made, so that it can be checked whether a derived file is up to date.
+
+The index is only a cache. If the database cannot be read or written, the
+index keeps working in memory, and the database file can be deleted at
+any time.
+"""
+__author__ = "Potku developers"
+__version__ = "2.0"
+
+import logging
+import os
+import sqlite3
+import threading
+import time
+
+from pathlib import Path
+from pathlib import PurePosixPath
+from typing import Dict
+from typing import Iterable
+from typing import List
+from typing import NamedTuple
+from typing import Optional
+from typing import Tuple
+
+
+class IndexEntry(NamedTuple):
+    """Entry of a directory at the time the directory was listed.
+    """
+    name: str
+    is_dir: bool
+    is_file: bool
+    size: int
+    mtime_ns: int
+
+
+class ProjectIndex:
+    """Index of the directories and derived files of a request.
+    """
+    FILE_NAME = ".potku_index.sqlite"
+    SCHEMA_VERSION = 1
+
+    # Directories whose modification time is this close to the time they
+    # were listed are listed again the next time. File systems store
+    # modification times with a limited resolution, so a change made right
+    # after listing could leave the modification time unchanged.
+    RACY_INTERVAL_NS = 2 * 10 ** 9
+
+    _SCHEMA = (
+        """CREATE TABLE IF NOT EXISTS directories (
+            path TEXT PRIMARY KEY,
+            mtime_ns INTEGER NOT NULL)""",
+        """CREATE TABLE IF NOT EXISTS entries (
+            directory TEXT NOT NULL,
+            name TEXT NOT NULL,
+            is_dir INTEGER NOT NULL,
+            is_file INTEGER NOT NULL,
+            size INTEGER NOT NULL,
+            mtime_ns INTEGER NOT NULL,
+            PRIMARY KEY (directory, name))""",
+        """CREATE TABLE IF NOT EXISTS derived (
+            artifact TEXT NOT NULL,
+            source TEXT NOT NULL,
+            size INTEGER NOT NULL,
+            mtime_ns INTEGER NOT NULL,
+            PRIMARY KEY (artifact, source))""",
+    )
+
+    def __init__(self, directory: Path, file: Optional[Path] = None):
+        """Initializes a new ProjectIndex. The database is opened when the
+        index is first used.
+
+        Args:
+            directory: root directory of the index, i.e. the request
+                directory. Directories outside of it are not cached.
+            file: path to the database. Defaults to FILE_NAME in the root
+                directory.
+        """
+        self.directory = Path(directory).resolve()
+        self.file = Path(file) if file is not None else \
+            self.directory / self.FILE_NAME
+        self._lock = threading.RLock()
+        self._connection: Optional[sqlite3.Connection] = None
+        self._connection_failed = False
+        # Modification times and entries of the listed directories by
+        # their relative paths
+        self._listings: Optional[
+            Dict[str, Tuple[int, Tuple[IndexEntry, ...]]]] = None
+
+    def close(self):
+        """Closes the database. The index can still be used afterwards.
+        """
+        with self._lock:
+            if self._connection is not None:
+                self._connection.close()
+                self._connection = None
+
+    def _get_connection(self) -> Optional[sqlite3.Connection]:
+        """Returns the connection to the database or None if the database
+        cannot be used.
+        """
+        if self._connection is None and not self._connection_failed:
+            try:
+                self._connection = self._connect()
+            except (sqlite3.Error, OSError) as e:
+                logging.getLogger(__name__).warning(
+                    f"Project index {self.file} is not used: {e}")
+                self._connection_failed = True
+        return self._connection
+
+    def _connect(self) -> sqlite3.Connection:
+        """Opens the database and creates the tables. A database with an
+        older schema or unreadable contents is recreated.
+        """
+        connection = sqlite3.connect(
+            str(self.file), timeout=10, check_same_thread=False)
+        try:
+            version = connection.execute("PRAGMA user_version").fetchone()[0]
+            if version not in (0, self.SCHEMA_VERSION):
+                raise sqlite3.DatabaseError(f"Unknown version {version}")
+        except sqlite3.DatabaseError:
+            connection.close()
+            self.file.unlink()
+            connection = sqlite3.connect(
+                str(self.file), timeout=10, check_same_thread=False)
+        # The index is a cache that is recreated if it is found to be
+        # corrupted, so writes are not waited to reach the disk and no
+        # journal file is created for each transaction.
+        connection.execute("PRAGMA synchronous = OFF")
+        connection.execute("PRAGMA journal_mode = MEMORY")
+        with connection:
+            for statement in self._SCHEMA:
+                connection.execute(statement)
+            connection.execute(f"PRAGMA user_version = {self.SCHEMA_VERSION}")
+        return connection
+
+    def _write(self, statements: Iterable[Tuple[str, Iterable]]):
+        """Executes the given statements in a single transaction. If
+        writing fails, the database is no longer used.
+        """
+        with self._lock:
+            connection = self._get_connection()
+            if connection is None:
+                return
+            try:
+                with connection:
+                    for sql, params in statements:
+                        connection.executemany(sql, params)
+            except sqlite3.Error as e:
+                logging.getLogger(__name__).warning(
+                    f"Failed to update project index {self.file}: {e}")
+                self.close()
+                self._connection_failed = True
+
+    def _get_listings(self) -> Dict[str, Tuple[int, Tuple[IndexEntry, ...]]]:
+        """Returns the directory listings. They are read from the database
+        when first needed.
+        """
+        with self._lock:
+            if self._listings is not None:
+                return self._listings
+            self._listings = {}
+            connection = self._get_connection()
+            if connection is None:
+                return self._listings
+            try:
+                mtimes = dict(connection.execute(
+                    "SELECT path, mtime_ns FROM directories"))
+                entries = {path: [] for path in mtimes}
+                for directory, *entry in connection.execute(
+                        "SELECT directory, name, is_dir, is_file, size, "
+                        "mtime_ns FROM entries ORDER BY directory, name"):
+                    if directory in entries:
+                        entries[directory].append(IndexEntry(
+                            entry[0], bool(entry[1]), bool(entry[2]),
+                            *entry[3:]))
+            except sqlite3.Error as e:
+                logging.getLogger(__name__).warning(
+                    f"Failed to read project index {self.file}: {e}")
+                return self._listings
+            self._listings = {
+                path: (mtime_ns, tuple(entries[path]))
+                for path, mtime_ns in mtimes.items()
+            }
+            return self._listings
+
+    def _to_key(self, path: Path) -> Optional[str]:
+        """Returns the path relative to the root directory in POSIX form so
+        that the request can be moved or opened on another platform. Returns
+        None for paths outside of the root directory.
+        """
+        path = os.path.abspath(path)
+        root = str(self.directory)
+        if path == root:
+            return "."
+        if not path.startswith(os.path.join(root, "")):
+            return None
+        return path[len(root) + 1:].replace(os.sep, "/")
+
+    def _to_path(self, key: str) -> Path:
+        """Inverse of _to_key.
+        """
+        return self.directory.joinpath(*PurePosixPath(key).parts)
+
+    def get_entries(self, directory: Path) -> Tuple[IndexEntry, ...]:
+        """Returns the entries of a directory sorted by name. The directory
+        is listed only if it has changed since it was last listed.
+
+        Raises OSError if the directory cannot be listed.
+        """
+        key = self._to_key(directory)
+        if key is None:
+            return _list_directory(directory)
+        mtime_ns = os.stat(directory).st_mtime_ns
+        with self._lock:
+            cached = self._get_listings().get(key)
+        if cached is not None and cached[0] == mtime_ns:
+            return cached[1]
+
+        entries = _list_directory(directory)
+        if time.time() * 1e9 - mtime_ns < self.RACY_INTERVAL_NS:
+            # Not trusted, list again next time
+            mtime_ns = -1
+        with self._lock:
+            self._get_listings()[key] = mtime_ns, entries
+        self._write((
+            ("DELETE FROM entries WHERE directory = ?", [(key,)]),
+            ("INSERT INTO entries VALUES (?, ?, ?, ?, ?, ?)", [
+                (key, *entry) for entry in entries
+            ]),
+            ("INSERT OR REPLACE INTO directories VALUES (?, ?)", [
+                (key, mtime_ns)
+            ]),
+        ))
+        return entries
+
+    def list_dir(self, directory: Path) -> List[str]:
+        """Returns the names of the entries of a directory like os.listdir
+        but sorted.
+        """
+        return [entry.name for entry in self.get_entries(directory)]
+
+    def find_files_by_extension(self, directory: Path, *exts) \
+            -> Dict[str, List[Path]]:
+        """Returns the files of a directory that have the given extensions
+        like general_functions.find_files_by_extension.
+        """
+        search_dict = {
+            ext: [] for ext in exts
+        }
+        for entry in self.get_entries(directory):
+            suffix = os.path.splitext(entry.name)[1]
+            if suffix in search_dict and entry.is_file:
+                search_dict[suffix].append(Path(directory, entry.name))
+        return search_dict
+
+    def record_derived(self, artifact: Path, sources: Iterable[Path]):
+        """Records that the artifact was made from the given source files
+        as they are now. Earlier records of the artifact are replaced.
+        Sources that are None or do not exist are not recorded.
+        """
+        artifact_key = self._to_key(artifact) or str(artifact)
+        rows = []
+        for source in sources:
+            if source is None:
+                continue
+            try:
+                stat = os.stat(source)
+            except OSError:
+                continue
+            rows.append((artifact_key, self._to_key(source) or str(source),
+                         stat.st_size, stat.st_mtime_ns))
+        self._write((
+            ("DELETE FROM derived WHERE artifact = ?", [(artifact_key,)]),
+            ("INSERT INTO derived VALUES (?, ?, ?, ?)", rows),
+        ))
+
+    def _get_derived(self, artifact: Path) -> List[Tuple[str, int, int]]:
+        """Returns the recorded sources, sizes and modification times of
+        the artifact.
+        """
+        artifact_key = self._to_key(artifact) or str(artifact)
+        with self._lock:
+            connection = self._get_connection()
+            if connection is None:
+                return []
+            try:
+                return connection.execute(
+                    "SELECT source, size, mtime_ns FROM derived "
+                    "WHERE artifact = ? ORDER BY source",
+                    (artifact_key,)).fetchall()
+            except sqlite3.Error:
+                return []
+
+    def _to_source_path(self, source: str) -> Path:
+        """Converts a recorded source into a path.
+        """
+        if Path(source).is_absolute():
+            return Path(source)
+        return self._to_path(source)
+
+    def get_sources(self, artifact: Path) -> List[Path]:
+        """Returns the files from which the artifact was made or an empty
+        list if unknown.
+        """
+        return [
+            self._to_source_path(source)
+            for source, _, _ in self._get_derived(artifact)
+        ]
+
+    def is_up_to_date(self, artifact: Path) -> bool:
+        """Returns whether the artifact exists and none of its sources have
+        changed since it was made. Returns False if the sources of the
+        artifact are unknown.
+        """
+        derived = self._get_derived(artifact)
+        if not derived or not Path(artifact).exists():
+            return False
+        for source, size, mtime_ns in derived:
+            try:
+                stat = os.stat(self._to_source_path(source))
+            except OSError:
+                return False
+            if stat.st_size != size or stat.st_mtime_ns != mtime_ns:
+                return False
+        return True
+
+
+def _list_directory(directory: Path) -> Tuple[IndexEntry, ...]:
+    """Lists a directory into IndexEntries sorted by name.
+    """
+    entries = []
+    with os.scandir(directory) as scdir:
+        for entry in scdir:
+            try:
+                is_file = entry.is_file()
+                stat = entry.stat()
+                size, mtime_ns = stat.st_size, stat.st_mtime_ns
+            except OSError:
+                # Removed while listing or a broken link
+                is_file, size, mtime_ns = False, 0, 0
+            entries.append(IndexEntry(
+                entry.name, entry.is_dir(), is_file, size, mtime_ns))
+    return tuple(sorted(entries))
@@ -29,7 +29,6 @@ __author__ = "Severi Jääskeläinen \n Samuel Kaiponen \n Heta Rekilä \n " \
 __version__ = "2.0"
 
 import copy
-import json
 import itertools
 import time
 
@@ -40,6 +39,7 @@ from typing import Tuple
 
 from . import file_paths as fp
 from . import math_functions as mf
+from . import persistence
 
 from .base import Serializable
 from .base import MCERDParameterContainer
@@ -446,12 +446,15 @@ class RecoilElement(MCERDParameterContainer, Serializable):
         except KeyError:
             raise
 
-    def to_file(self, simulation_folder: Path):
+    def to_file(self, simulation_folder: Path,
+                delay: Optional[float] = None):
         """Save recoil settings to file.
 
         Args:
             simulation_folder: Path to simulation folder in which ".rec" or
                                ".sct" files are stored.
+            delay: if given, the file is written after this many seconds
+                unless it is saved again before that.
         """
         # TODO is it necessary to have the recoil type ('rec' or 'sct') in the
         #  file extension? Currently Potku always has to delete the other types
@@ -481,8 +484,7 @@ class RecoilElement(MCERDParameterContainer, Serializable):
             "color": self.color
         }
 
-        with recoil_file_path.open("w") as file:
-            json.dump(obj, file, indent=4)
+        persistence.write_json(recoil_file_path, obj, delay=delay)
 
     @classmethod
     def from_file(cls, file_path: Path, channel_width=None, rec_type="rec") \
@@ -497,8 +499,7 @@ class RecoilElement(MCERDParameterContainer, Serializable):
         Return:
             RecoilElement object
         """
-        with file_path.open("r") as rec_file:
-            reco = json.load(rec_file)
+        reco = persistence.read_json(file_path)
 
         # Pop the values that need conversion and/or are provided as positional
         # arguments.
@@ -32,7 +32,6 @@ __version__ = "2.0"
 
 import configparser
 import logging
-import os
 import re
 import time
 
@@ -46,6 +45,7 @@ from .element import Element
 from .element_simulation import ElementSimulation
 from .measurement import Measurement
 from .profile import Profile
+from .project_index import ProjectIndex
 from .run import Run
 from .sample import Samples
 from .simulation import Simulation
@@ -72,6 +72,8 @@ class Request(ElementSimulationContainer):
         """
         self.directory = Path(directory).resolve()
         self.default_folder = Path(self.directory, "Default")
+        # Cached directory listings of the request
+        self.project_index = ProjectIndex(self.directory)
 
         self.request_name = name
         self.global_settings = global_settings
@@ -406,9 +408,9 @@ class Request(ElementSimulationContainer):
             Returns all the paths for these samples.
         """
         samples = []
-        for item in os.listdir(self.directory):
-            if os.path.isdir(Path(self.directory, item)) and \
-                    item.startswith("Sample_"):
+        for entry in self.project_index.get_entries(self.directory):
+            item = entry.name
+            if entry.is_dir and item.startswith("Sample_"):
                 samples.append(Path(self.directory, item))
                 # It is presumed that the sample numbers are of format
                 # '01', '02',...,'10', '11',...
@@ -600,16 +602,15 @@ class Request(ElementSimulationContainer):
     def get_imported_files(self) -> List[Path]:
         """Returns a list of file paths from imported files directory.
         """
-        files = []
+        folder = self.get_imported_files_folder()
         try:
-            with os.scandir(self.get_imported_files_folder()) as scdir:
-                for entry in scdir:
-                    path = Path(entry)
-                    if path.is_file():
-                        files.append(path)
+            return [
+                Path(folder, entry.name)
+                for entry in self.project_index.get_entries(folder)
+                if entry.is_file
+            ]
         except OSError:
-            pass
-        return files
+            return []
 
     def _get_simulations(self):
         return (
@@ -0,0 +1,306 @@
+# coding=utf-8
+"""
+Created on 18.10.2026
+
+Potku is a graphical user interface for analyzation and
+visualization of measurement data collected from a ToF-ERD
+telescope. For physics calculations Potku uses external
+analyzation components.
+Copyright (C) 2026 Potku developers
+
+This program is free software; you can redistribute it and/or
+modify it under the terms of the GNU General Public License
+as published by the Free Software Foundation; either version 2
+of the License, or (at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program (file named 'LICENCE').
+
+reweighting.py calculates simulated energy spectra in-process by
+reweighting the recoil events of already simulated .erd files with a
+depth distribution. This gives the same result as running get_espe with a
+different -dist file but without re-reading the .erd files.
+"""
+__author__ = "Potku developers"
+__version__ = "2.0"
+
+import math
+
+import numpy as np
+
+from pathlib import Path
+from typing import Iterable
+from typing import Tuple
+
+from .base import Espe
+
+# Conversion factors from u * (m / ns) ** 2 / 2 to MeV
+_U = 1.66053906660e-27
+_MEV = 1.602176634e-13
+_TOF_ENERGY_FACTOR = 0.5 * _U * 1e18 / _MEV
+
+# Conversion factor from FWHM to standard deviation
+_FWHM_TO_SIGMA = 1 / (2 * math.sqrt(2 * math.log(2)))
+
+
+class EspeReweighter:
+    """Calculates energy spectra of recoil distributions from simulated
+    recoil events.
+
+    get_espe converts the time-of-flight of each recoil event into an energy
+    channel and weights the event by the concentration of the depth
+    distribution at the depth where the recoil originated. The conversion
+    does not depend on the distribution, so the channels are calculated
+    once and each distribution only needs a weighted histogram.
+
+    The random time resolution broadening of get_espe is replaced by its
+    expectation: each event is spread over the neighbouring channels with
+    a Gaussian. Intensities are scaled by a factor that is calibrated
+    against a spectrum calculated by get_espe.
+    """
+    __slots__ = "depths", "weights", "energies", "sigmas", "channel_width", \
+                "scale"
+
+    # Events whose energy deviation is larger than this many channels are
+    # left out. Such events have an unphysically short time-of-flight and
+    # spreading them over the spectrum would need a huge amount of memory.
+    MAX_SIGMA_CHANNELS = 1000
+
+    def __init__(self, depths: np.ndarray, weights: np.ndarray,
+                 energies: np.ndarray, sigmas: np.ndarray,
+                 channel_width: float, scale: float = 1.0):
+        """Initializes a new EspeReweighter.
+
+        Args:
+            depths: depths (nm) from which the recoils originated
+            weights: simulated weights of the events
+            energies: energies (MeV) calculated from the time-of-flight
+            sigmas: standard deviations (MeV) of the energies caused by the
+                time resolution of the detector
+            channel_width: channel width (MeV) of the spectra
+            scale: factor by which the spectra are multiplied
+        """
+        self.depths = np.asarray(depths, dtype=float)
+        self.weights = np.asarray(weights, dtype=float)
+        self.energies = np.asarray(energies, dtype=float)
+        self.sigmas = np.asarray(sigmas, dtype=float)
+        self.channel_width = channel_width
+        self.scale = scale
+
+    @classmethod
+    def from_erd_files(cls, erd_files: Iterable[Path], toflen: float,
+                       timeres: float, channel_width: float) \
+            -> "EspeReweighter":
+        """Reads the recoil events from the given .erd files.
+
+        Args:
+            erd_files: .erd files produced by MCERD
+            toflen: time-of-flight length (m)
+            timeres: time resolution of the TOF-detector (ps, FWHM)
+            channel_width: channel width (MeV) of the spectra
+
+        Return:
+            EspeReweighter
+        """
+        lines = []
+        for erd_file in erd_files:
+            with open(erd_file, "rb") as file:
+                lines.extend(file)
+        masses, depths, weights, tofs = parse_recoil_events(lines)
+
+        # get_espe is run with -avemass so the average mass is used to
+        # calculate energies from time-of-flight.
+        mass = masses.mean() if masses.size else 0.0
+        energies = tof_to_energy(mass, toflen, tofs)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            sigma_t = timeres * 1e-3 * _FWHM_TO_SIGMA
+            sigmas = 2 * energies * sigma_t / tofs
+        with np.errstate(invalid="ignore"):
+            valid = np.isfinite(energies) & np.isfinite(sigmas) & \
+                (sigmas <= cls.MAX_SIGMA_CHANNELS * channel_width)
+
+        return cls(depths[valid], weights[valid], energies[valid],
+                   sigmas[valid], channel_width)
+
+    @staticmethod
+    def parse_distribution(lines: Iterable[str]) \
+            -> Tuple[np.ndarray, np.ndarray]:
+        """Parses a depth distribution in the format that is given to
+        get_espe with -dist (such as RecoilElement.get_mcerd_params).
+
+        Args:
+            lines: lines of 'depth concentration' pairs. A single string may
+                contain multiple lines.
+
+        Return:
+            depths and concentrations as arrays
+        """
+        values = [
+            tuple(map(float, line.split()))
+            for line in "\n".join(lines).splitlines() if line.strip()
+        ]
+        if not values:
+            return np.zeros(0), np.zeros(0)
+        return tuple(np.array(values, dtype=float).T)
+
+    def get_event_weights(self, dist_x: np.ndarray, dist_y: np.ndarray) \
+            -> np.ndarray:
+        """Returns the weight of each event for the given depth
+        distribution. Concentrations are interpolated linearly and are zero
+        outside of the distribution.
+        """
+        if not len(dist_x):
+            return np.zeros_like(self.weights)
+        return self.weights * np.interp(
+            self.depths, dist_x, dist_y, left=0.0, right=0.0)
+
+    def calibrate(self, espe: Espe, dist_x: np.ndarray, dist_y: np.ndarray) \
+            -> bool:
+        """Calibrates the scale of the spectra so that the total intensity
+        matches a spectrum calculated by get_espe for the same distribution.
+
+        Args:
+            espe: spectrum calculated by get_espe
+            dist_x: depths of the distribution used to calculate espe
+            dist_y: concentrations of the distribution used to calculate
+                espe
+
+        Return:
+            whether the calibration succeeded
+        """
+        total = self.get_event_weights(dist_x, dist_y).sum()
+        espe_total = sum(y for _, y in espe)
+        if not total or not espe_total or not math.isfinite(espe_total):
+            return False
+        self.scale = espe_total / total
+        return True
+
+    def calculate_espe(self, dist_x: np.ndarray, dist_y: np.ndarray) \
+            -> Espe:
+        """Calculates the energy spectrum for the given depth distribution.
+
+        Like get_espe, the spectrum contains the channels between the first
+        and last non-empty channel and one empty channel at both ends.
+
+        Args:
+            dist_x: depths (nm) of the distribution
+            dist_y: concentrations of the distribution
+
+        Return:
+            spectrum as a list of (energy, intensity) tuples
+        """
+        channels, values = self.get_histogram(
+            self.get_event_weights(dist_x, dist_y))
+        if not channels.size:
+            return []
+        values = values * self.scale
+        return [
+            (round(float(k * self.channel_width), 10), float(v))
+            for k, v in zip(channels, values)
+        ]
+
+    def get_histogram(self, event_weights: np.ndarray) \
+            -> Tuple[np.ndarray, np.ndarray]:
+        """Returns a histogram of the event energies with given weights.
+
+        Return:
+            channel numbers and intensities as arrays
+        """
+        nonzero = event_weights != 0
+        if not nonzero.any():
+            return np.zeros(0, dtype=int), np.zeros(0)
+        energies = self.energies[nonzero] / self.channel_width
+        sigmas = self.sigmas[nonzero] / self.channel_width
+        event_weights = event_weights[nonzero]
+
+        centers = np.rint(energies).astype(np.int64)
+        # Each event is spread over the channels within 4 deviations of it.
+        # Events are handled in groups whose window widths are rounded up
+        # to powers of two, so a few wide events do not widen the window
+        # of all events.
+        half_widths = 2 ** np.ceil(
+            np.log2(np.ceil(4 * sigmas) + 1)).astype(np.int64)
+        first = (centers - half_widths).min()
+        values = np.zeros((centers + half_widths).max() - first + 1)
+        for half_width in np.unique(half_widths):
+            group = half_widths == half_width
+            offsets = np.arange(-half_width, half_width + 1)
+            channels = centers[group, np.newaxis] + offsets
+            probabilities = _get_channel_probabilities(
+                channels, energies[group, np.newaxis],
+                sigmas[group, np.newaxis])
+            values += np.bincount(
+                (channels - first).ravel(),
+                weights=(probabilities *
+                         event_weights[group, np.newaxis]).ravel(),
+                minlength=values.size)
+
+        filled = np.flatnonzero(values)
+        start, stop = filled[0], filled[-1] + 1
+        values = np.concatenate(([0.0], values[start:stop], [0.0]))
+        channels = np.arange(first + start - 1, first + stop + 1)
+        return channels, values
+
+
+def parse_recoil_events(lines: Iterable[bytes]) \
+        -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """Parses recoil events from lines of an .erd file. Only recoils are
+    counted into spectra so scattered primary ions are left out.
+
+    Args:
+        lines: lines of an .erd file as bytes
+
+    Return:
+        masses (u), depths (nm), weights and times-of-flight (ns) of the
+        recoil events as arrays
+    """
+    rows = [
+        row[5:9] for row in map(bytes.split, lines)
+        if row and row[0] == b"R"
+    ]
+    if not rows:
+        return tuple(np.zeros((4, 0)))
+    return tuple(np.array(rows, dtype=float).T)
+
+
+def tof_to_energy(mass: float, toflen: float, tofs: np.ndarray) \
+        -> np.ndarray:
+    """Converts times-of-flight (ns) over the given time-of-flight length
+    (m) to energies (MeV) of particles of the given mass (u). Zero
+    times-of-flight give non-finite energies.
+    """
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return _TOF_ENERGY_FACTOR * mass * (toflen / tofs) ** 2
+
+
+def _get_channel_probabilities(channels: np.ndarray, energies: np.ndarray,
+                               sigmas: np.ndarray) -> np.ndarray:
+    """Returns the probabilities of events falling into the given channels
+    when event energies are normally distributed. All values are given in
+    channel units. Events with zero deviation fall into the nearest channel.
+    """
+    from scipy.special import erf
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        scale = math.sqrt(2) * sigmas
+        upper = erf((channels + 0.5 - energies) / scale)
+        lower = erf((channels - 0.5 - energies) / scale)
+        probabilities = 0.5 * (upper - lower)
+    exact = np.broadcast_to(sigmas == 0, channels.shape)
+    nearest = channels == np.rint(energies)
+    return np.where(exact, nearest, probabilities)
+
+
+def get_recoil_distribution(recoil_element: "RecoilElement") \
+        -> Tuple[np.ndarray, np.ndarray]:
+    """Returns the depth distribution of a recoil element in the same form
+    that is written to the recoil file given to get_espe.
+    """
+    return EspeReweighter.parse_distribution(
+        recoil_element.get_mcerd_params())
+
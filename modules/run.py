@@ -27,12 +27,13 @@ __author__ = "Severi Jääskeläinen \n Samuel Kaiponen \n Heta Rekilä \n" \
              "Sinikka Siironen \n Juhani Sundell \n Tuomas Pitkänen"
 __version__ = "2.0"
 
-import json
 import time
 
 from pathlib import Path
 from typing import Set
 
+from . import persistence
+
 from .base import Serializable
 from .base import AdjustableSettings
 from .beam import Beam
@@ -93,8 +94,7 @@ class Run(Serializable, AdjustableSettings):
         }
 
         try:
-            with measurement_file.open("r") as mesu:
-                obj = json.load(mesu)
+            obj = persistence.read_json(measurement_file)
             timestamp = time.time()
             obj["general"]["modification_time"] = time.strftime(
                 "%c %z %Z", time.localtime(timestamp))
@@ -105,8 +105,7 @@ class Run(Serializable, AdjustableSettings):
         obj["run"] = run_obj
         obj["beam"] = beam_obj
 
-        with measurement_file.open("w") as file:
-            json.dump(obj, file, indent=4)
+        persistence.write_json(measurement_file, obj)
 
     @classmethod
     def from_file(cls, measurement_file: Path):
@@ -118,8 +117,7 @@ class Run(Serializable, AdjustableSettings):
         Return:
             Returns the created Run object.
         """
-        with measurement_file.open("r") as mesu:
-            mesu = json.load(mesu)
+        mesu = persistence.read_json(measurement_file)
 
         try:
             run = mesu["run"]
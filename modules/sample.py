@@ -27,10 +27,11 @@ __author__ = "Severi Jääskeläinen \n Samuel Kaiponen \n Heta Rekilä " \
              "\n Sinikka Siironen"
 __version__ = "2.0"
 
-import os
-
+from concurrent.futures import Executor
+from concurrent.futures import Future
 from pathlib import Path
 from typing import Optional
+from typing import Tuple
 from typing import Union
 from typing import Dict
 from typing import List
@@ -117,6 +118,47 @@ class Samples:
             all_samples_and_simulations[sample] = sample.get_simulation_files()
         return all_samples_and_simulations
 
+    def read_measurements(self, executor: Executor) \
+            -> List[Tuple["Sample", Path, Future]]:
+        """Submits the reading of all the measurements under the samples to
+        an executor. The Measurements are not added to the samples, that is
+        left to the caller (see Measurements.add_measurement).
+
+        Args:
+            executor: executor that reads the measurement files
+
+        Return:
+            sample, .info file and a Future that results in the Measurement
+            for each measurement in the order of get_samples_and_measurements
+        """
+        return [
+            (sample, file, executor.submit(
+                sample.measurements.read_measurement_file, sample, file))
+            for sample, files in self.get_samples_and_measurements().items()
+            for file in files
+        ]
+
+    def read_simulations(self, executor: Executor) \
+            -> List[Tuple["Sample", Path, Future]]:
+        """Submits the reading of all the simulations under the samples to
+        an executor. The Simulations are not added to the samples, that is
+        left to the caller (see Simulations.add_simulation).
+
+        Args:
+            executor: executor that reads the simulation files
+
+        Return:
+            sample, .simulation file and a Future that results in the
+            Simulation for each simulation in the order of
+            get_samples_and_simulations
+        """
+        return [
+            (sample, file, executor.submit(
+                sample.simulations.read_simulation_file, sample, file))
+            for sample, files in self.get_samples_and_simulations().items()
+            for file in files
+        ]
+
 
 class Sample:
     """Class for a sample.
@@ -179,8 +221,9 @@ class Sample:
         """
         all_measurements = []   # TODO refactor
         name_prefix = Measurement.DIRECTORY_PREFIX
-        all_dirs = os.listdir(Path(self.request.directory, self.directory))
-        all_dirs.sort()
+        index = self.request.project_index
+        all_dirs = index.list_dir(
+            Path(self.request.directory, self.directory))
 
         for directory in all_dirs:
             # Only handle directories that start with name_prefix
@@ -189,7 +232,7 @@ class Sample:
                     # Read measurment number from directory name
                     self._running_int_measurement = int(
                         directory[len(name_prefix):len(name_prefix) + 2])
-                    for file in os.listdir(Path(
+                    for file in index.list_dir(Path(
                             self.request.directory, self.directory, directory)):
                         if file.endswith(".info"):  # TODO break?
                             all_measurements.append(Path(
@@ -213,8 +256,9 @@ class Sample:
         """
         all_simulations = []    # TODO refactor
         name_prefix = Simulation.DIRECTORY_PREFIX
-        all_dirs = os.listdir(Path(self.request.directory, self.directory))
-        all_dirs.sort()     # TODO why sort here?
+        index = self.request.project_index
+        all_dirs = index.list_dir(
+            Path(self.request.directory, self.directory))
 
         for directory in all_dirs:
             # Only handle directories that start with name_prefix
@@ -223,7 +267,7 @@ class Sample:
                     # Read simulation number from directory name
                     self._running_int_simulation = int(
                         directory[len(name_prefix):len(name_prefix) + 2])
-                    for file in os.listdir(Path(
+                    for file in index.list_dir(Path(
                             self.request.directory, self.directory, directory)):
                         if file.endswith(".simulation"):
                             all_simulations.append(Path(
@@ -39,8 +39,7 @@ import itertools
 
 from . import math_functions as mf
 from . import general_functions as gf
-
-import matplotlib as mpl
+from . import persistence
 
 from dialogs.measurement.selection import SelectionSettingsDialog
 
@@ -105,6 +104,9 @@ class AxesLimits:
 class Selector:
     """Selector objects handles all selections within measurement.
     """
+    # Seconds to wait for further changes before selections are saved
+    AUTO_SAVE_DELAY = 1.0
+
     def __init__(self, measurement: "Measurement", element_colormap):
         """Inits Selector.
         
@@ -366,8 +368,10 @@ class Selector:
             1: If point is within selection.
             0: If point is not within selection.
         """
+        import matplotlib.path
+
         for selection in self.selections:
-            path = mpl.path.Path(selection.get_points())
+            path = matplotlib.path.Path(selection.get_points())
             if path.contains_point(point):
                 self.selected_id = selection.id
                 if highlight:
@@ -443,14 +447,23 @@ class Selector:
                 sel.set_color("grey")
 
     def auto_save(self):
+        """Save all selections into a file after a short delay. Changes made
+        within the delay are saved together.
+        """
+        self.save(delay=self.AUTO_SAVE_DELAY)
+
+    def save(self, delay=None):
         """Save all selections into a file.
+
+        Args:
+            delay: if given, the file is written after this many seconds.
         """
         if not self.directory.exists():
             os.makedirs(self.directory)
-        # Truncate old .sel and write new one
-        with open(self.selection_file, "wt+") as fp:
-            for sel in self.selections:
-                fp.write(sel.save_string(self.is_transposed) + "\n")
+        text = "".join(
+            sel.save_string(self.is_transposed) + "\n"
+            for sel in self.selections)
+        persistence.write_text(self.selection_file, text, delay=delay)
 
     def load(self, filename, progress=None):
         """Load selections from a file.
@@ -462,6 +475,7 @@ class Selector:
             progress: ProgressReporter object.
         """
         self.remove_all()
+        persistence.flush(filename)
         try:
             with open(filename) as fp:
                 for line in fp:
@@ -642,11 +656,13 @@ class Selection:
             0: Point was added.
             -1: If selection is closed.
         """
+        import matplotlib.lines
+
         if self.is_closed:
             return -1
         else:
             if self.points is None:
-                self.points = mpl.lines.Line2D(
+                self.points = matplotlib.lines.Line2D(
                     [point[0]], [point[1]],
                     linestyle=Selection.LINE_STYLE,
                     marker=Selection.LINE_MARKER,
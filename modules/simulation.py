@@ -30,7 +30,6 @@ __author__ = "Severi Jääskeläinen \n Samuel Kaiponen \n Heta Rekilä " \
              "\n Sinikka Siironen \n Juhani Sundell \n Tuomas Pitkänen"
 __version__ = "2.0"
 
-import json
 import logging
 import time
 
@@ -40,6 +39,7 @@ from typing import Optional
 from typing import List
 
 from . import general_functions as gf
+from . import persistence
 
 from .recoil_element import RecoilElement
 from .element import Element
@@ -48,6 +48,7 @@ from .base import Serializable
 from .enums import SimulationType
 from .detector import Detector
 from .element_simulation import ElementSimulation
+from .project_index import ProjectIndex
 from .run import Run
 from .target import Target
 from .ui_log_handlers import Logger
@@ -105,52 +106,8 @@ class Simulations:
 
         # Create simulation from file
         if simulation_file.exists():
-            (target_file, mesu_file,
-             elem_sim_files, profile_files,
-             detector_file) = Simulation.find_simulation_files(
-                simulation_folder)
-
-            if target_file is not None:
-                target = Target.from_file(
-                    target_file, sample.request)
-            else:
-                target = None
-
-            if detector_file is not None:
-                detector = Detector.from_file(
-                    detector_file, sample.request, save_on_creation=False)
-                detector.update_directories(detector_file.parent)
-            else:
-                detector = None
-
-            simulation = Simulation.from_file(
-                sample.request, simulation_file, measurement_file=mesu_file,
-                sample=sample, target=target, detector=detector)
-
-            serial_number = int(
-                simulation_folder.name[
-                    len(directory_prefix):len(directory_prefix) + 2])
-            simulation.serial_number = serial_number
-            simulation.tab_id = tab_id
-
-            for mcsimu_file in elem_sim_files:
-                element_str_with_name = mcsimu_file.stem
-
-                prefix, name = element_str_with_name.split("-")
-
-                profile_file = next(
-                    p for p in profile_files if p.name.startswith(prefix)
-                )
-
-                if profile_file is not None:
-                    # Create ElementSimulation from files
-                    element_simulation = ElementSimulation.from_file(
-                        self.request, prefix, simulation_folder,
-                        mcsimu_file, profile_file, simulation=simulation
-                    )
-                    # TODO need to check that element simulation can be added
-                    simulation.element_simulations.append(
-                        element_simulation)
+            simulation = self.read_simulation_file(sample, simulation_file)
+            return self.add_simulation(sample, simulation, tab_id)
 
         # Create a new simulation
         else:
@@ -177,6 +134,87 @@ class Simulations:
             sample.simulations.simulations[tab_id] = simulation
         return simulation
 
+    def read_simulation_file(self, sample: "Sample",
+                             simulation_file: Path) -> "Simulation":
+        """Reads a Simulation and its element simulations from the files in
+        the directory of an existing .simulation file. The Simulation is not
+        added to simulations, so this can be called from other threads than
+        the main thread.
+
+        Args:
+            sample: The sample under which the simulation is put.
+            simulation_file: Path of the .simulation file.
+
+        Return:
+            Simulation that has not been added to simulations.
+        """
+        simulation_folder = simulation_file.parent
+        directory_prefix = Simulation.DIRECTORY_PREFIX
+
+        (target_file, mesu_file,
+         elem_sim_files, profile_files,
+         detector_file) = Simulation.find_simulation_files(
+            simulation_folder, index=self.request.project_index)
+
+        if target_file is not None:
+            target = Target.from_file(
+                target_file, sample.request)
+        else:
+            target = None
+
+        if detector_file is not None:
+            detector = Detector.from_file(
+                detector_file, sample.request, save_on_creation=False)
+            detector.update_directories(detector_file.parent)
+        else:
+            detector = None
+
+        simulation = Simulation.from_file(
+            sample.request, simulation_file, measurement_file=mesu_file,
+            sample=sample, target=target, detector=detector)
+
+        serial_number = int(
+            simulation_folder.name[
+                len(directory_prefix):len(directory_prefix) + 2])
+        simulation.serial_number = serial_number
+
+        for mcsimu_file in elem_sim_files:
+            element_str_with_name = mcsimu_file.stem
+
+            prefix, name = element_str_with_name.split("-")
+
+            profile_file = next(
+                p for p in profile_files if p.name.startswith(prefix)
+            )
+
+            if profile_file is not None:
+                # Create ElementSimulation from files
+                element_simulation = ElementSimulation.from_file(
+                    self.request, prefix, simulation_folder,
+                    mcsimu_file, profile_file, simulation=simulation
+                )
+                # TODO need to check that element simulation can be added
+                simulation.element_simulations.append(
+                    element_simulation)
+        return simulation
+
+    def add_simulation(self, sample: "Sample", simulation: "Simulation",
+                       tab_id: int) -> "Simulation":
+        """Adds a Simulation that has been read with read_simulation_file to
+        simulations.
+
+        Args:
+            sample: The sample under which the simulation is put.
+            simulation: Simulation to add.
+            tab_id: Integer representing identifier for simulation's tab.
+
+        Return:
+            The added simulation.
+        """
+        simulation.tab_id = tab_id
+        sample.simulations.simulations[tab_id] = simulation
+        return simulation
+
     def remove_obj(self, removed_obj: "Simulation"):
         """Removes given simulation.
 
@@ -340,14 +378,17 @@ class Simulation(Logger, ElementSimulationContainer, Serializable):
             break
 
     @staticmethod
-    def find_simulation_files(simulation_dir: Path) -> namedtuple:
+    def find_simulation_files(simulation_dir: Path,
+                              index: Optional[ProjectIndex] = None) \
+            -> namedtuple:
         """Returns a tuple of all simulation files.
         """
         res = gf.find_files_by_extension(
-            simulation_dir, ".mcsimu", ".target", ".measurement", ".profile")
+            simulation_dir, ".mcsimu", ".target", ".measurement", ".profile",
+            index=index)
         try:
             det_res = gf.find_files_by_extension(
-                simulation_dir / "Detector", ".detector")
+                simulation_dir / "Detector", ".detector", index=index)
         except OSError:
             det_res = {".detector": []}
 
@@ -433,8 +474,7 @@ class Simulation(Logger, ElementSimulationContainer, Serializable):
                 after initialization
             enable_logging: whether logging is enabled
         """
-        with simulation_file.open("r") as file:
-            simu_obj = json.load(file)
+        simu_obj = persistence.read_json(simulation_file)
 
         # Overwrite the human readable time stamp with unix time stamp, as
         # that is what the Simulation object uses internally
@@ -442,8 +482,7 @@ class Simulation(Logger, ElementSimulationContainer, Serializable):
 
         if measurement_file is not None:
             run = Run.from_file(measurement_file)
-            with measurement_file.open("r") as mesu_f:
-                mesu_settings = json.load(mesu_f)
+            mesu_settings = persistence.read_json(measurement_file)
 
             try:
                 general = {
@@ -483,8 +522,7 @@ class Simulation(Logger, ElementSimulationContainer, Serializable):
             "modification_time_unix": time_stamp,
             "use_request_settings": self.use_request_settings
         }
-        with simulation_file.open("w") as file:
-            json.dump(obj, file, indent=4)
+        persistence.write_json(simulation_file, obj)
 
         if not self.use_request_settings:
             # Save measurement settings parameters.
@@ -500,18 +538,16 @@ class Simulation(Logger, ElementSimulationContainer, Serializable):
                 "modification_time_unix": time_stamp,
             }
 
-            if measurement_file.exists():
-                with measurement_file.open("r") as mesu:
-                    obj = json.load(mesu)
+            try:
+                obj = persistence.read_json(measurement_file)
                 obj["general"] = general_obj
-            else:
+            except OSError:
                 obj = {
                     "general": general_obj
                 }
 
             # Write measurement settings to file
-            with measurement_file.open("w") as file:
-                json.dump(obj, file, indent=4)
+            persistence.write_json(measurement_file, obj)
 
             # Save Run object to file
             self.run.to_file(measurement_file)
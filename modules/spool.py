@@ -0,0 +1,466 @@
+# coding=utf-8
+"""
+Created on 18.10.2026
+
+Potku is a graphical user interface for analyzation and
+visualization of measurement data collected from a ToF-ERD
+telescope. For physics calculations Potku uses external
+analyzation components.
+Copyright (C) 2026 Potku developers
+
+This program is free software; you can redistribute it and/or
+modify it under the terms of the GNU General Public License
+as published by the Free Software Foundation; either version 2
+of the License, or (at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program (file named 'LICENCE').
+
+spool.py distributes MCERD simulations to worker processes through a spool
+directory. Each job describes one MCERD process. Workers may run on any
+machine that can access the spool directory, for example over a shared
+network drive. A worker is started with
+
+    python -m modules.spool <spool directory>
+
+Jobs move between the subdirectories of the spool directory:
+'pending' -> 'claimed' -> 'done' (or 'failed'). A job is claimed by
+renaming it, which is atomic, so each job is run by exactly one worker.
+The results of the jobs are written into the parent directory of the spool
+directory, i.e. the simulation directory.
+
+Workers update the modification time of the job they are running
+regularly. Claimed jobs that have not been updated for a while belonged to
+workers that crashed or were killed, and they are moved back to the pending
+jobs by the next worker that looks for a job.
+"""
+__author__ = "Potku developers"
+__version__ = "2.0"
+
+import argparse
+import json
+import logging
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+from . import file_paths as fp
+from . import general_functions as gf
+
+from pathlib import Path
+from typing import Dict
+from typing import List
+from typing import NamedTuple
+from typing import Optional
+from typing import Sequence
+
+from .mcerd import MCERD
+
+# Placeholder for the working directory of the worker in the contents of
+# the MCERD input files.
+WORK_DIR = "@POTKU_WORK_DIR@"
+
+
+class SpoolJob(NamedTuple):
+    """Description of a single MCERD process.
+    """
+    seed: int
+    number_of_ions: int
+    number_of_ions_in_presimu: int
+    # Name of the command file that is given to MCERD
+    command_file: str
+    # Name of the .erd file that MCERD writes into the working directory
+    output_file: str
+    # Name of the .erd file in the simulation directory
+    result_file: str
+    # Names and contents of the input files of MCERD
+    files: Dict[str, str]
+
+    @classmethod
+    def from_mcerd(cls, mcerd: MCERD, seed: int, result_file: str,
+                   settings: Dict) -> "SpoolJob":
+        """Returns a job that runs the given MCERD process. The MCERD object
+        must have been created with WORK_DIR as its simulation directory.
+
+        Args:
+            mcerd: MCERD object
+            seed: seed of the MCERD object
+            result_file: name of the result .erd file
+            settings: settings of the MCERD object
+        """
+        return cls(
+            seed=seed,
+            number_of_ions=settings["number_of_ions"],
+            number_of_ions_in_presimu=settings["number_of_ions_in_presimu"],
+            command_file=mcerd.command_file.name,
+            output_file=mcerd.result_file.name,
+            result_file=result_file,
+            files={
+                file.name: contents
+                for file, contents in mcerd.get_input_files().items()
+            })
+
+    @classmethod
+    def from_file(cls, file: Path) -> "SpoolJob":
+        """Reads a job from a file. Raises OSError if the file cannot be
+        read and ValueError if it is not a valid job file.
+        """
+        with Path(file).open("r") as f:
+            try:
+                return cls(**json.load(f))
+            except TypeError as e:
+                raise ValueError(f"Invalid job file {file}: {e}")
+
+    def to_file(self, file: Path):
+        """Writes the job into a file.
+        """
+        with Path(file).open("w") as f:
+            json.dump(self._asdict(), f, indent=4)
+
+    def get_file_name(self) -> str:
+        """Returns the name of the job file.
+        """
+        return f"{self.result_file}.json"
+
+    def write_input_files(self, work_dir: Path) -> Path:
+        """Writes the input files of MCERD into the given working directory.
+
+        Return:
+            path to the command file
+        """
+        work_dir = Path(work_dir).resolve()
+        for name, contents in self.files.items():
+            # Paths in the contents may have been written on a platform
+            # that uses a different separator
+            for sep in ("/", "\\"):
+                contents = contents.replace(
+                    f"{WORK_DIR}{sep}", f"{work_dir}{os.sep}")
+            with Path(work_dir, name).open("w") as file:
+                file.write(contents)
+        return work_dir / self.command_file
+
+
+class JobSpool:
+    """Spool directory that holds MCERD jobs.
+    """
+    DIRECTORY_NAME = "spool"
+
+    PENDING = "pending"
+    CLAIMED = "claimed"
+    DONE = "done"
+    FAILED = "failed"
+
+    # Seconds between updates of the modification time of a running job
+    HEARTBEAT_INTERVAL = 30.0
+    # Seconds after which a claimed job that has not been updated is
+    # considered abandoned
+    STALE_AFTER = 300.0
+
+    def __init__(self, directory: Path):
+        """Initializes a new JobSpool. Directories are created when jobs
+        are submitted or claimed.
+
+        Args:
+            directory: path to the spool directory
+        """
+        self.directory = Path(directory)
+
+    @classmethod
+    def for_simulation(cls, simulation_dir: Path) -> "JobSpool":
+        """Returns the spool of the given simulation directory.
+        """
+        return cls(Path(simulation_dir, cls.DIRECTORY_NAME))
+
+    @property
+    def results_dir(self) -> Path:
+        """Directory into which the results of the jobs are written.
+        """
+        return self.directory.parent
+
+    def get_dir(self, state: str) -> Path:
+        """Returns the directory of jobs in the given state.
+        """
+        return self.directory / state
+
+    def get_jobs(self, state: str = PENDING) -> List[Path]:
+        """Returns the job files in the given state in the order in which
+        workers claim them.
+        """
+        try:
+            return sorted(self.get_dir(state).glob("*.json"))
+        except OSError:
+            return []
+
+    def get_max_seed(self, recoil_element: "RecoilElement") -> Optional[int]:
+        """Returns the largest seed of the jobs of the given recoil element
+        or None if there are no jobs.
+        """
+        result_files = (
+            job.with_suffix("")
+            for state in (self.PENDING, self.CLAIMED, self.DONE, self.FAILED)
+            for job in self.get_jobs(state)
+        )
+        return max((
+            seed for _, seed in fp.validate_erd_file_names(
+                result_files, recoil_element)
+        ), default=None)
+
+    def get_unfinished_jobs(self, recoil_element: "RecoilElement") \
+            -> List[Path]:
+        """Returns the pending and claimed jobs of the given recoil
+        element.
+        """
+        jobs = self.get_jobs(self.PENDING) + self.get_jobs(self.CLAIMED)
+        return [
+            Path(f"{job}.json") for job, _ in fp.validate_erd_file_names(
+                (job.with_suffix("") for job in jobs), recoil_element)
+        ]
+
+    def submit(self, job: SpoolJob) -> Path:
+        """Adds a job to the pending jobs. The job file is written under a
+        temporary name first so that workers never claim incomplete jobs.
+
+        Return:
+            path to the job file
+        """
+        pending = self.get_dir(self.PENDING)
+        pending.mkdir(parents=True, exist_ok=True)
+        file = pending / job.get_file_name()
+        tmp_file = pending / f".{file.name}.tmp"
+        job.to_file(tmp_file)
+        os.replace(tmp_file, file)
+        return file
+
+    def remove_pending(self, recoil_element: "RecoilElement") -> int:
+        """Removes the pending jobs of the given recoil element.
+
+        Return:
+            number of removed jobs
+        """
+        jobs = self.get_jobs(self.PENDING)
+        removed = 0
+        for job, _ in fp.validate_erd_file_names(
+                (job.with_suffix("") for job in jobs), recoil_element):
+            try:
+                Path(f"{job}.json").unlink()
+                removed += 1
+            except OSError:
+                # Already claimed by a worker
+                pass
+        return removed
+
+    def claim(self) -> Optional[Path]:
+        """Claims the next pending job by moving it to the claimed jobs.
+        If another worker claims the same job first, the next one is tried.
+
+        Return:
+            path to the claimed job file or None if there are no pending
+            jobs
+        """
+        claimed = self.get_dir(self.CLAIMED)
+        claimed.mkdir(parents=True, exist_ok=True)
+        for job in self.get_jobs(self.PENDING):
+            target = claimed / job.name
+            try:
+                os.rename(job, target)
+            except OSError:
+                continue
+            # Renaming keeps the time at which the job was submitted
+            _touch(target)
+            return target
+        return None
+
+    def requeue_stale_jobs(self, stale_after: float = STALE_AFTER) -> int:
+        """Moves claimed jobs whose worker has not updated them within the
+        given time back to the pending jobs.
+
+        Args:
+            stale_after: seconds after which a claimed job is considered
+                abandoned
+
+        Return:
+            number of jobs that were moved
+        """
+        pending = self.get_dir(self.PENDING)
+        deadline = time.time() - stale_after
+        moved = 0
+        for job in self.get_jobs(self.CLAIMED):
+            try:
+                if os.stat(job).st_mtime >= deadline:
+                    continue
+                pending.mkdir(parents=True, exist_ok=True)
+                os.rename(job, pending / job.name)
+                moved += 1
+            except OSError:
+                # Finished or moved by another worker
+                continue
+        return moved
+
+    def finish(self, job_file: Path, success: bool = True) -> Path:
+        """Moves a claimed job to the done or failed jobs.
+
+        Return:
+            new path of the job file
+        """
+        directory = self.get_dir(self.DONE if success else self.FAILED)
+        directory.mkdir(parents=True, exist_ok=True)
+        target = directory / Path(job_file).name
+        try:
+            os.replace(job_file, target)
+        except FileNotFoundError:
+            # The job was considered abandoned and moved back to the pending
+            # jobs while it was running. Its pending copy is moved instead so
+            # that another worker does not run the same seed again.
+            try:
+                os.replace(self.get_dir(self.PENDING) / target.name, target)
+            except FileNotFoundError:
+                # Another worker has already claimed the copy
+                pass
+        return target
+
+    def run_job(self, job_file: Path,
+                command: Optional[Sequence[str]] = None,
+                heartbeat_interval: float = HEARTBEAT_INTERVAL) -> Path:
+        """Runs a claimed job in a temporary working directory and moves
+        its result into the results directory. The result appears under its
+        final name only when it is complete. The modification time of the
+        job file is updated while the job runs so that it is not considered
+        abandoned.
+
+        Raises OSError or ValueError if the job cannot be read and
+        SubprocessError if MCERD fails.
+
+        Args:
+            job_file: path to the job file
+            command: command that starts MCERD. The path to the command
+                file is appended to it. Defaults to the MCERD executable
+                of Potku.
+            heartbeat_interval: seconds between updates of the
+                modification time of the job file
+
+        Return:
+            path to the result file
+        """
+        job = SpoolJob.from_file(job_file)
+        if command is None:
+            command = MCERD.get_executable(),
+        with tempfile.TemporaryDirectory(prefix="potku-mcerd-") as work_dir:
+            command_file = job.write_input_files(Path(work_dir))
+            args = (*command, str(command_file))
+            with subprocess.Popen(
+                    args, cwd=gf.get_bin_dir(), stdout=subprocess.DEVNULL,
+                    stderr=subprocess.PIPE) as process:
+                while True:
+                    try:
+                        _, stderr = process.communicate(
+                            timeout=heartbeat_interval)
+                        break
+                    except subprocess.TimeoutExpired:
+                        _touch(job_file)
+            if process.returncode:
+                raise subprocess.CalledProcessError(
+                    process.returncode, args, stderr=stderr)
+
+            result = self.results_dir / job.result_file
+            tmp_file = result.with_name(f".{result.name}.tmp")
+            shutil.copyfile(Path(work_dir, job.output_file), tmp_file)
+            os.replace(tmp_file, result)
+        return result
+
+
+def _touch(file: Path):
+    """Updates the modification time of the file if it still exists.
+    """
+    try:
+        os.utime(file)
+    except OSError:
+        pass
+
+
+def run_worker(spool_dir: Path, max_jobs: Optional[int] = None,
+               poll_interval: Optional[float] = None,
+               command: Optional[Sequence[str]] = None,
+               stale_after: float = JobSpool.STALE_AFTER) -> int:
+    """Claims and runs jobs from the spool directory. Jobs abandoned by
+    other workers are moved back to the pending jobs before a job is
+    claimed.
+
+    Args:
+        spool_dir: path to the spool directory
+        max_jobs: maximum number of jobs to run. None means no limit.
+        poll_interval: seconds to wait for new jobs when there are no
+            pending jobs. If None, the worker stops when there are no
+            pending jobs.
+        command: command that starts MCERD
+        stale_after: seconds after which a claimed job that has not been
+            updated by its worker is considered abandoned
+
+    Return:
+        number of jobs that were run, including failed ones
+    """
+    spool = JobSpool(spool_dir)
+    logger = logging.getLogger(__name__)
+    count = 0
+    while max_jobs is None or count < max_jobs:
+        requeued = spool.requeue_stale_jobs(stale_after)
+        if requeued:
+            logger.info(f"Moved {requeued} abandoned jobs back to pending.")
+        job_file = spool.claim()
+        if job_file is None:
+            if poll_interval is None:
+                break
+            time.sleep(poll_interval)
+            continue
+        try:
+            result = spool.run_job(job_file, command=command)
+        except (OSError, ValueError, subprocess.SubprocessError) as e:
+            logger.error(f"Job {job_file.name} failed: {e}")
+            spool.finish(job_file, success=False)
+        else:
+            logger.info(f"Job {job_file.name} finished: {result}")
+            spool.finish(job_file)
+        count += 1
+    return count
+
+
+def main(args: Optional[Sequence[str]] = None) -> int:
+    """Runs a spool worker from the command line.
+    """
+    parser = argparse.ArgumentParser(
+        prog="python -m modules.spool",
+        description="Runs MCERD jobs from a Potku spool directory.")
+    parser.add_argument(
+        "spool_dir", type=Path, help="path to the spool directory")
+    parser.add_argument(
+        "--max-jobs", type=int, default=None,
+        help="maximum number of jobs to run")
+    parser.add_argument(
+        "--poll", type=float, default=None, metavar="SECONDS",
+        help="keep waiting for new jobs, checking every SECONDS seconds")
+    parser.add_argument(
+        "--mcerd", nargs="+", default=None, metavar="COMMAND",
+        help="command that starts MCERD instead of Potku's executable")
+    parser.add_argument(
+        "--stale-after", type=float, default=JobSpool.STALE_AFTER,
+        metavar="SECONDS",
+        help="move jobs claimed by workers that have not updated them in "
+             "SECONDS seconds back to pending (default: %(default)s)")
+    parsed = parser.parse_args(args)
+
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    run_worker(parsed.spool_dir, max_jobs=parsed.max_jobs,
+               poll_interval=parsed.poll, command=parsed.mcerd,
+               stale_after=parsed.stale_after)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
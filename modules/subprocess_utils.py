@@ -25,17 +25,45 @@ __author__ = "Juhani Sundell"
 __version__ = "2.0"
 
 
+import codecs
+import contextlib
+import errno
+import locale
+import operator
+import os
+import queue
+import re
+import selectors
+import shutil
 import subprocess
 import platform
+import threading
+import traceback
+
+import numpy as np
+
 from pathlib import Path
+from timeit import default_timer as timer
+from typing import BinaryIO
 from typing import Callable
 from typing import Iterable
+from typing import Iterator
+from typing import List
 from typing import Optional
+from typing import Sequence
+from typing import Tuple
 from typing import TypeVar
 
+from .concurrency import CancellationToken
+
 T0 = TypeVar("T0")
 T1 = TypeVar("T1")
 
+# Number of bytes read from a pipe at a time
+_CHUNK_SIZE = 2 ** 16
+# Line that only contains whitespace
+_EMPTY_LINE = re.compile(rb"^[^\S\n]*\n", re.MULTILINE)
+
 
 class StdoutStream:
     """Class for processing stdout of a subprocess.Popen. Can be used as a
@@ -128,6 +156,170 @@ def process_output(
         return output_func(stream)
 
 
+def process_columns(
+        process: subprocess.Popen, columns: Sequence[int],
+        file: Optional[Path] = None) -> List[str]:
+    """Selects whitespace separated columns from the output of a subprocess
+    like awk '{print $a,$b}' does. The output is read in large blocks
+    rather than line by line.
+
+    Args:
+        process: a subprocess.Popen object whose stdout is a binary pipe
+        columns: zero-based indexes of the selected columns
+        file: optional path to a file in which the selected columns are
+            written
+
+    Return:
+        selected columns of each line joined by spaces. Each line ends
+        with a newline.
+    """
+    return [
+        line
+        for block in _iter_selected_blocks(process.stdout, columns, file)
+        for line in block.decode().splitlines(keepends=True)
+    ]
+
+
+def iter_column_arrays(
+        process: subprocess.Popen, columns: Sequence[int],
+        file: Optional[Path] = None, dtype=np.int64) -> Iterator[np.ndarray]:
+    """Selects whitespace separated columns from the output of a subprocess
+    and yields them as arrays while the process is running. Empty lines are
+    skipped. Raises ValueError if a line is missing some of the columns or a
+    value cannot be converted to dtype.
+
+    Args:
+        process: a subprocess.Popen object whose stdout is a binary pipe
+        columns: zero-based indexes of the selected columns
+        file: optional path to a file in which the selected columns are
+            written as text
+        dtype: data type of the arrays
+
+    Yield:
+        2D arrays with a row for each line and a column for each selected
+        column
+    """
+    for block in _iter_selected_blocks(
+            process.stdout, columns, file, skip_empty_lines=True):
+        values = np.array(block.split(), dtype=dtype)
+        if values.size != block.count(b"\n") * len(columns):
+            raise ValueError("Some lines are missing selected columns.")
+        yield values.reshape(-1, len(columns))
+
+
+def _iter_selected_blocks(
+        stream: BinaryIO, columns: Sequence[int],
+        file: Optional[Path] = None,
+        skip_empty_lines: bool = False) -> Iterator[bytes]:
+    """Yields blocks of lines of selected columns from a binary stream and
+    writes them to the file if one is given. Lines that only contain
+    whitespace are left out if skip_empty_lines is True.
+    """
+    with contextlib.ExitStack() as stack:
+        output_file = None
+        if file is not None:
+            output_file = stack.enter_context(file.open("wb"))
+        for block in iter_line_blocks(stream):
+            if skip_empty_lines:
+                block = _EMPTY_LINE.sub(b"", block)
+            selected = select_columns(block, columns)
+            if output_file is not None:
+                output_file.write(selected)
+            yield selected
+
+
+def iter_line_blocks(stream: BinaryIO, block_size: int = _CHUNK_SIZE * 16) \
+        -> Iterator[bytes]:
+    """Reads a binary stream in large blocks. Each yielded block consists
+    of complete lines. A line that ends the stream without a newline gets
+    one.
+
+    Args:
+        stream: binary stream
+        block_size: number of bytes to read at a time
+
+    Yield:
+        blocks of lines as bytes
+    """
+    remainder = b""
+    for data in iter(lambda: stream.read(block_size), b""):
+        data = remainder + data
+        end = data.rfind(b"\n") + 1
+        remainder = data[end:]
+        if end:
+            yield data[:end]
+    if remainder:
+        yield remainder + b"\n"
+
+
+def select_columns(lines: bytes, columns: Sequence[int]) -> bytes:
+    """Selects whitespace separated columns from lines like awk
+    '{print $a,$b}' does. Missing columns are left empty.
+
+    Args:
+        lines: lines as bytes, each ending with a newline
+        columns: zero-based indexes of the selected columns
+
+    Return:
+        selected columns of each line joined by spaces, each line ending
+        with a newline
+    """
+    if not lines:
+        return b""
+    rows = map(bytes.split, lines.splitlines())
+    if len(columns) == 1:
+        selected = map(operator.itemgetter(*columns), rows)
+    else:
+        selected = map(b" ".join, map(operator.itemgetter(*columns), rows))
+    try:
+        return b"\n".join(selected) + b"\n"
+    except IndexError:
+        # Some lines are shorter than the others. This is slower but
+        # handles every line separately.
+        return b"".join(
+            b" ".join(row[c] if c < len(row) else b"" for c in columns) +
+            b"\n"
+            for row in map(bytes.split, lines.splitlines()))
+
+
+def copy_files_to_pipe(files: Iterable[Path], pipe: BinaryIO):
+    """Writes the raw contents of the given files into a pipe (such as the
+    stdin of a subprocess) without decoding them.
+
+    os.sendfile is used where available so that the data is copied by the
+    kernel. Otherwise the data is copied in large blocks.
+
+    Args:
+        files: files to copy
+        pipe: binary file object open for writing
+    """
+    pipe.flush()
+    for file in files:
+        with open(file, "rb") as src:
+            _copy_to_pipe(src, pipe)
+
+
+def _copy_to_pipe(src: BinaryIO, pipe: BinaryIO):
+    """Copies a single open file into a pipe.
+    """
+    if hasattr(os, "sendfile"):
+        out_fd, in_fd = pipe.fileno(), src.fileno()
+        offset = 0
+        try:
+            while True:
+                sent = os.sendfile(out_fd, in_fd, offset, _CHUNK_SIZE * 16)
+                if not sent:
+                    return
+                offset += sent
+        except OSError as e:
+            # sendfile does not support this kind of pipe on every platform.
+            # Fall back to copying whatever is left.
+            if e.errno not in (errno.EINVAL, errno.ENOSYS, errno.ENOTSOCK):
+                raise
+            src.seek(offset)
+    shutil.copyfileobj(src, pipe, _CHUNK_SIZE * 16)
+
+
 def kill_process(process: subprocess.Popen):
     """Kills the given process.
     """
@@ -139,3 +331,256 @@ def kill_process(process: subprocess.Popen):
             cmd, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
     else:
         process.kill()
+
+
+class OutputReactor:
+    """Multiplexes the output of multiple subprocesses on a single thread.
+
+    Each registered process is given a callback that is invoked with every
+    line the process writes to its stdout or stderr, and a callback that is
+    invoked once after the process has exited. The reactor also kills
+    processes whose CancellationToken has been cancelled or whose maximum
+    running time has elapsed, so callers do not need timers of their own.
+
+    Windows cannot wait for pipes with select, so there each output stream is
+    read by a daemon thread that hands the data over to the reactor thread.
+    """
+    # Reasons for the termination of a process, passed to the exit callback
+    EXITED = "exited"
+    CANCELLED = "cancelled"
+    TIMED_OUT = "timed_out"
+
+    def __init__(self, check_interval: float = 0.2):
+        """Initializes a new OutputReactor. The reactor thread is started
+        when the first process is registered.
+
+        Args:
+            check_interval: seconds between cancellation and timeout checks
+        """
+        self._check_interval = check_interval
+        self._lock = threading.Lock()
+        self._new_entries: List[_ProcessEntry] = []
+        self._entries: List[_ProcessEntry] = []
+        self._thread: Optional[threading.Thread] = None
+
+        if platform.system() == "Windows":
+            self._selector = None
+            self._queue = queue.Queue()
+        else:
+            self._selector = selectors.DefaultSelector()
+            self._wake_r, self._wake_w = os.pipe()
+            self._selector.register(self._wake_r, selectors.EVENT_READ)
+
+    def register(self, process: subprocess.Popen,
+                 on_line: Callable[[str], None],
+                 on_exit: Callable[[int, str], None],
+                 ct: Optional[CancellationToken] = None,
+                 max_time: Optional[float] = None):
+        """Starts monitoring the given process.
+
+        Args:
+            process: process whose stdout and stderr are binary pipes (either
+                one can also be None)
+            on_line: function that is called with each line of output
+                without the trailing newline
+            on_exit: function that is called with the return code and the
+                reason for termination (EXITED, CANCELLED or TIMED_OUT) after
+                the process has exited and its output has been read
+            ct: the process is killed if cancellation is requested from
+                this token
+            max_time: maximum running time in seconds. If the time is
+                exceeded, cancellation is requested from ct and the process
+                is killed.
+        """
+        deadline = None if max_time is None else timer() + max_time
+        entry = _ProcessEntry(process, on_line, on_exit, ct, deadline)
+        with self._lock:
+            self._new_entries.append(entry)
+            if self._thread is None or not self._thread.is_alive():
+                # The thread is started again if an unexpected error has
+                # stopped it. Processes registered earlier are kept.
+                self._thread = threading.Thread(
+                    target=self._run, name="OutputReactor", daemon=True)
+                self._thread.start()
+        self._wake_up()
+
+    def _wake_up(self):
+        """Interrupts the reactor thread's wait.
+        """
+        if self._selector is None:
+            self._queue.put(None)
+        else:
+            os.write(self._wake_w, b"\0")
+
+    def _run(self):
+        """Main loop of the reactor thread.
+        """
+        while True:
+            self._add_new_entries()
+            for stream, data in self._wait():
+                stream.feed(data)
+            self._check_entries()
+
+    def _add_new_entries(self):
+        """Starts reading the output of newly registered processes.
+        """
+        with self._lock:
+            new_entries, self._new_entries = self._new_entries, []
+        for entry in new_entries:
+            self._entries.append(entry)
+            for stream in entry.streams:
+                if self._selector is None:
+                    threading.Thread(
+                        target=self._read_in_thread, args=(stream,),
+                        daemon=True).start()
+                else:
+                    self._selector.register(
+                        stream.file, selectors.EVENT_READ, stream)
+
+    def _wait(self) -> List[Tuple["_Stream", bytes]]:
+        """Waits until output is available or the check interval has
+        passed. Returns a list of streams and the data read from them. Empty
+        data means that the stream has reached its end.
+        """
+        timeout = self._check_interval if self._entries else None
+        if self._selector is None:
+            try:
+                items = [self._queue.get(timeout=timeout)]
+            except queue.Empty:
+                return []
+            while not self._queue.empty():
+                items.append(self._queue.get_nowait())
+            return [item for item in items if item is not None]
+
+        results = []
+        for key, _ in self._selector.select(timeout):
+            if key.data is None:
+                os.read(self._wake_r, _CHUNK_SIZE)
+                continue
+            try:
+                data = os.read(key.fd, _CHUNK_SIZE)
+            except OSError:
+                # The stream cannot be read anymore, so it is ended.
+                traceback.print_exc()
+                data = b""
+            if not data:
+                self._selector.unregister(key.fileobj)
+            results.append((key.data, data))
+        return results
+
+    def _read_in_thread(self, stream: "_Stream"):
+        """Reads the given stream until it ends and passes the data to the
+        reactor thread. Only used on Windows.
+        """
+        try:
+            for data in iter(lambda: stream.file.read1(_CHUNK_SIZE), b""):
+                self._queue.put((stream, data))
+        except (OSError, ValueError):
+            traceback.print_exc()
+        self._queue.put((stream, b""))
+
+    def _check_entries(self):
+        """Kills cancelled and timed out processes and notifies about
+        processes that have exited.
+        """
+        now = timer()
+        for entry in list(self._entries):
+            if entry.reason is None:
+                if entry.ct is not None and \
+                        entry.ct.is_cancellation_requested():
+                    entry.reason = OutputReactor.CANCELLED
+                    kill_process(entry.process)
+                elif entry.deadline is not None and now >= entry.deadline:
+                    entry.reason = OutputReactor.TIMED_OUT
+                    if entry.ct is not None:
+                        # Request cancellation so all processes that share
+                        # the same token are also stopped.
+                        entry.ct.request_cancellation()
+                    kill_process(entry.process)
+
+            if any(not stream.file.closed for stream in entry.streams):
+                continue
+            returncode = entry.process.poll()
+            if returncode is None:
+                # Process has closed its output but is still running. It
+                # will be checked again after the next interval.
+                continue
+            self._entries.remove(entry)
+            _invoke(entry.on_exit, returncode,
+                    entry.reason or OutputReactor.EXITED)
+
+
+class _ProcessEntry:
+    """Bookkeeping for a single process registered to an OutputReactor.
+    """
+    __slots__ = "process", "on_line", "on_exit", "ct", "deadline", "reason", \
+                "streams"
+
+    def __init__(self, process: subprocess.Popen,
+                 on_line: Callable[[str], None],
+                 on_exit: Callable[[int, str], None],
+                 ct: Optional[CancellationToken],
+                 deadline: Optional[float]):
+        self.process = process
+        self.on_line = on_line
+        self.on_exit = on_exit
+        self.ct = ct
+        self.deadline = deadline
+        self.reason = None
+        self.streams = [
+            _Stream(file, on_line)
+            for file in (process.stdout, process.stderr) if file is not None
+        ]
+
+
+class _Stream:
+    """Decodes the raw output of a single pipe into lines.
+    """
+    __slots__ = "file", "_on_line", "_decoder", "_buffer"
+
+    def __init__(self, file, on_line: Callable[[str], None]):
+        self.file = file
+        self._on_line = on_line
+        # Use the same encoding as subprocess does in text mode
+        self._decoder = codecs.getincrementaldecoder(
+            locale.getpreferredencoding(False))(errors="replace")
+        self._buffer = ""
+
+    def feed(self, data: bytes):
+        """Decodes the data and passes on each complete line. Empty data
+        means that the pipe has ended so the remaining buffer is passed on
+        and the pipe is closed.
+        """
+        self._buffer += self._decoder.decode(data, final=not data)
+        *lines, self._buffer = self._buffer.split("\n")
+        if not data:
+            if self._buffer:
+                lines.append(self._buffer)
+            self._buffer = ""
+            self.file.close()
+        for line in lines:
+            _invoke(self._on_line, line.rstrip("\r"))
+
+
+def _invoke(func: Callable, *args):
+    """Invokes a callback so that an exception does not stop the reactor
+    thread.
+    """
+    try:
+        func(*args)
+    except Exception:
+        traceback.print_exc()
+
+
+_REACTOR: Optional[OutputReactor] = None
+_REACTOR_LOCK = threading.Lock()
+
+
+def get_output_reactor() -> OutputReactor:
+    """Returns the OutputReactor that is shared by all simulation processes.
+    """
+    global _REACTOR
+    with _REACTOR_LOCK:
+        if _REACTOR is None:
+            _REACTOR = OutputReactor()
+        return _REACTOR
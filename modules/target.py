@@ -28,13 +28,14 @@ __author__ = "Severi Jääskeläinen \n Samuel Kaiponen \n Heta Rekilä \n" \
              "Sinikka Siironen"
 __version__ = "2.0"
 
-import json
 import time
 
 from pathlib import Path
 from typing import Optional, Set
 from typing import List
 
+from . import persistence
+
 from .base import Serializable, AdjustableSettings
 from .element import Element
 from .layer import Layer
@@ -99,8 +100,7 @@ class Target(Serializable, AdjustableSettings):
             Returns a Target object with parameters read from files.
         """
 
-        with target_file_path.open("r") as tgt_file:
-            target = json.load(tgt_file)
+        target = persistence.read_json(target_file_path)
 
         target["modification_time"] = target.pop("modification_time_unix")
         target["scattering_element"] = Element.from_string(
@@ -121,11 +121,13 @@ class Target(Serializable, AdjustableSettings):
         # the __init__ method.
         return cls(**target, layers=layers)
 
-    def to_file(self, target_file: Path):
+    def to_file(self, target_file: Path, delay: Optional[float] = None):
         """Save target parameters into files.
 
         Args:
             target_file: File in which the target params will be saved.
+            delay: if given, the file is written after this many seconds
+                unless it is saved again before that.
         """
         timestamp = time.time()
         obj = {
@@ -152,8 +154,7 @@ class Target(Serializable, AdjustableSettings):
             }
             obj["layers"].append(layer_obj)
 
-        with target_file.open("w") as file:
-            json.dump(obj, file, indent=4)
+        persistence.write_json(target_file, obj, delay=delay)
 
     def _get_attrs(self) -> Set[str]:
         """Returns a set of attribute names. These Target attribute values
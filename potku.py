@@ -31,6 +31,7 @@ __author__ = "Jarkko Aalto \n Timo Konu \n Samuli Kärkkäinen \n Samuli " \
 __version__ = "2.0"
 
 import gc
+import multiprocessing
 import os
 import platform
 import shutil
@@ -42,21 +43,15 @@ import dialogs.dialog_functions as df
 import widgets.input_validation as iv
 import widgets.gui_utils as gutils
 
+from concurrent.futures import Future
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from datetime import timedelta
 from pathlib import Path
+from typing import List
+from typing import Tuple
 from typing import Union
 
-from dialogs.about import AboutDialog
-from dialogs.global_settings import GlobalSettingsDialog
-from dialogs.measurement.import_binary import ImportDialogBinary
-from dialogs.measurement.import_measurement import ImportMeasurementsDialog
-from dialogs.measurement.load_measurement import LoadMeasurementDialog
-from dialogs.new_request import RequestNewDialog
-from dialogs.request_settings import RequestSettingsDialog
-from dialogs.simulation.new_simulation import SimulationNewDialog
-from dialogs.file_dialogs import open_file_dialog
-
 from widgets.gui_utils import StatusBarHandler
 from widgets.icon_manager import IconManager
 from widgets.base_tab import BaseTab
@@ -64,19 +59,24 @@ from widgets.base_tab import BaseTab
 from modules.global_settings import GlobalSettings
 from modules.measurement import Measurement
 from modules.request import Request
+from modules.sample import Sample
 from modules.simulation import Simulation
-from modules.selection import Selector
 
 from PyQt5 import QtCore
 from PyQt5 import QtWidgets
-from PyQt5 import uic
 from PyQt5.QtCore import Qt
 from PyQt5.QtWidgets import QAbstractItemView
 from PyQt5.QtWidgets import QMenu
 from PyQt5.QtWidgets import QTreeWidgetItem
 
-from widgets.measurement.tab import MeasurementTabWidget
-from widgets.simulation.tab import SimulationTabWidget
+
+def _get_measurement_tab_widget():
+    """Returns the MeasurementTabWidget class. The measurement tab and its
+    plotting widgets are imported when they are first needed instead of when
+    Potku starts.
+    """
+    from widgets.measurement.tab import MeasurementTabWidget
+    return MeasurementTabWidget
 
 
 class Potku(QtWidgets.QMainWindow):
@@ -93,7 +93,7 @@ class Potku(QtWidgets.QMainWindow):
         """Init main window for Potku.
         """
         super().__init__()
-        uic.loadUi(gutils.get_ui_dir() / "ui_main_window.ui", self)
+        gutils.load_ui(gutils.get_ui_dir() / "ui_main_window.ui", self)
 
         self.title = self.windowTitle()
         self.treeWidget.setHeaderLabel("")
@@ -137,7 +137,7 @@ class Potku(QtWidgets.QMainWindow):
         self.actionGlobal_Settings.triggered.connect(self.open_global_settings)
         self.actionRequest_Settings.triggered.connect(
             self.open_request_settings)
-        self.actionAbout.triggered.connect(AboutDialog)
+        self.actionAbout.triggered.connect(self.open_about_dialog)
 
         self.actionNew_Request_2.triggered.connect(self.make_new_request)
         self.actionOpen_Request_2.triggered.connect(self.open_request)
@@ -418,7 +418,7 @@ class Potku(QtWidgets.QMainWindow):
         measurement tab widget.
         """
         widget = self.tabs.currentWidget()
-        if isinstance(widget, MeasurementTabWidget):
+        if isinstance(widget, _get_measurement_tab_widget()):
             widget.open_depth_profile()
         else:
             QtWidgets.QMessageBox.question(
@@ -431,7 +431,7 @@ class Potku(QtWidgets.QMainWindow):
         measurement tab widget.
         """
         widget = self.tabs.currentWidget()
-        if isinstance(widget, MeasurementTabWidget):
+        if isinstance(widget, _get_measurement_tab_widget()):
             widget.open_element_losses()
         else:
             QtWidgets.QMessageBox.question(
@@ -444,7 +444,7 @@ class Potku(QtWidgets.QMainWindow):
         measurement tab widget.
         """
         widget = self.tabs.currentWidget()
-        if isinstance(widget, MeasurementTabWidget):
+        if isinstance(widget, _get_measurement_tab_widget()):
             widget.open_energy_spectrum()
         else:
             QtWidgets.QMessageBox.question(
@@ -457,7 +457,7 @@ class Potku(QtWidgets.QMainWindow):
         to cut files.
         """
         widget = self.tabs.currentWidget()
-        if isinstance(widget, MeasurementTabWidget):
+        if isinstance(widget, _get_measurement_tab_widget()):
             widget.measurement_save_cuts()
         else:
             QtWidgets.QMessageBox.question(
@@ -471,7 +471,7 @@ class Potku(QtWidgets.QMainWindow):
         simulation tab widget.
         """
         widget = self.tabs.currentWidget()
-        if isinstance(widget, MeasurementTabWidget):
+        if isinstance(widget, _get_measurement_tab_widget()):
             widget.open_energy_spectrum()
         else:
             QtWidgets.QMessageBox.question(
@@ -549,6 +549,8 @@ class Potku(QtWidgets.QMainWindow):
                 connects the item to the corresponding MeasurementTabWidget
             *_: unused event args.
         """
+        from widgets.simulation.tab import SimulationTabWidget
+
         sbh = StatusBarHandler(self.statusbar)
         try:
             tab_id = clicked_item.tab_id
@@ -560,7 +562,9 @@ class Potku(QtWidgets.QMainWindow):
                     "settings_updated": self.settings_updated,
                     "ion_division": self.settings.get_ion_division(),
                     "min_presim_ions": self.settings.get_min_presim_ions(),
-                    "min_sim_ions": self.settings.get_min_simulation_ions()
+                    "min_sim_ions": self.settings.get_min_simulation_ions(),
+                    "target_precision":
+                        self.settings.get_simulation_target_precision()
                 }
             else:
                 kwargs = {}
@@ -569,7 +573,7 @@ class Potku(QtWidgets.QMainWindow):
                 **kwargs)
 
             name = tab.obj.name
-            if type(tab) is MeasurementTabWidget:
+            if type(tab) is _get_measurement_tab_widget():
                 master_mea = tab.obj.request.get_master()
                 if master_mea and tab.obj.name == master_mea.name:
                     name = f"{name} (master)"
@@ -589,6 +593,9 @@ class Potku(QtWidgets.QMainWindow):
 
         Import Pelletron's measurements from
         """
+        from dialogs.measurement.import_measurement import \
+            ImportMeasurementsDialog
+
         if not self.request:
             return
         # For loading measurements.
@@ -602,6 +609,8 @@ class Potku(QtWidgets.QMainWindow):
 
         Import binary measurements from
         """
+        from dialogs.measurement.import_binary import ImportDialogBinary
+
         if not self.request:
             return
         import_dialog = ImportDialogBinary(
@@ -617,24 +626,23 @@ class Potku(QtWidgets.QMainWindow):
                 importing measurements to the request.
             progress: a ProgressReporter object
         """
-        if measurements is None:
-            measurements = []
-        if measurements:
-            samples_with_measurements = measurements
-            load_data = True
-        else:
-            # a dict with the sample as a key, and measurements' info file paths
-            # in the value as a list
-            samples_with_measurements = \
-                self.request.samples.get_samples_and_measurements()
-            load_data = False
+        if not measurements:
+            # Measurements of the request are read in other threads while
+            # their tabs are created in the main thread
+            with ThreadPoolExecutor() as executor:
+                self.__add_tabs_from_futures(
+                    "measurement",
+                    self.request.samples.read_measurements(executor),
+                    progress=progress)
+            return
 
+        samples_with_measurements = measurements
         count = len(samples_with_measurements)
         dirtyinteger = 0
         for sample, measurements in samples_with_measurements.items():
             for measurement_file in measurements:
                 self.add_new_tab("measurement", measurement_file, sample,
-                                 dirtyinteger, count, load_data=load_data)
+                                 dirtyinteger, count, load_data=True)
 
                 if progress is not None:
                     progress.report(dirtyinteger / count * 100)
@@ -672,22 +680,23 @@ class Potku(QtWidgets.QMainWindow):
                 simulation to the request.
             progress: a ProgressReporter object
         """
-        if simulations is None:
-            simulations = []
-        if simulations:
-            samples_with_simulations = simulations
-            load_data = True
-        else:
-            samples_with_simulations = \
-                self.request.samples.get_samples_and_simulations()
-            load_data = False
+        if not simulations:
+            # Simulations of the request are read in other threads while
+            # their tabs are created in the main thread
+            with ThreadPoolExecutor() as executor:
+                self.__add_tabs_from_futures(
+                    "simulation",
+                    self.request.samples.read_simulations(executor),
+                    progress=progress)
+            return
 
+        samples_with_simulations = simulations
         count = len(samples_with_simulations)
         dirtyinteger = 0
         for sample, simulations in samples_with_simulations.items():
             for simulation_file in simulations:
                 self.add_new_tab("simulation", simulation_file, sample,
-                                 dirtyinteger, count, load_data=load_data)
+                                 dirtyinteger, count, load_data=True)
 
                 if progress is not None:
                     progress.report(dirtyinteger / count * 100)
@@ -696,9 +705,35 @@ class Potku(QtWidgets.QMainWindow):
         if progress is not None:
             progress.report(100)
 
+    def __add_tabs_from_futures(
+            self, tab_type: str,
+            futures: List[Tuple[Sample, Path, Future]], progress=None):
+        """Adds tabs for measurements or simulations that are being read in
+        other threads. The tabs are added in the given order as soon as
+        each object has been read. The GUI keeps updating while waiting.
+
+        Args:
+            tab_type: Either "measurement" or "simulation".
+            futures: sample, file and a Future that results in the
+                Measurement or Simulation read from the file
+            progress: a ProgressReporter object
+        """
+        count = len(futures)
+        for i, (sample, file, future) in enumerate(futures):
+            obj = gutils.wait_for_future(future)
+            self.add_new_tab(tab_type, file, sample, obj=obj)
+
+            if progress is not None:
+                progress.report((i + 1) / count * 100)
+
+        if progress is not None:
+            progress.report(100)
+
     def make_new_request(self):
         """Opens a dialog for creating a new request.
         """
+        from dialogs.new_request import RequestNewDialog
+
         if not self.are_simulations_stopped():
             return
         # The directory for request is already created after this
@@ -725,6 +760,8 @@ class Potku(QtWidgets.QMainWindow):
     def open_global_settings(self):
         """Opens global settings dialog.
         """
+        from dialogs.global_settings import GlobalSettingsDialog
+
         gsd = GlobalSettingsDialog(self.settings)
         gsd.settings_updated.connect(self.settings_updated[GlobalSettings].emit)
         gsd.exec_()
@@ -733,6 +770,9 @@ class Potku(QtWidgets.QMainWindow):
         """Opens file an open dialog and if filename is given opens new
         measurement from it.
         """
+        from dialogs.measurement.load_measurement import \
+            LoadMeasurementDialog
+
         if self.request is None:
             return
 
@@ -767,6 +807,8 @@ class Potku(QtWidgets.QMainWindow):
         """
         Opens a dialog for creating a new simulation.
         """
+        from dialogs.simulation.new_simulation import SimulationNewDialog
+
         dialog = SimulationNewDialog(self.request.samples.samples)
 
         simulation_name = dialog.name
@@ -894,6 +936,8 @@ class Potku(QtWidgets.QMainWindow):
     def open_request(self):
         """Shows a dialog to open a request.
         """
+        from dialogs.file_dialogs import open_file_dialog
+
         if not self.are_simulations_stopped():
             return
         file = open_file_dialog(
@@ -986,9 +1030,18 @@ class Potku(QtWidgets.QMainWindow):
 
         sbh.reporter.report(100)
 
+    def open_about_dialog(self):
+        """Opens the about dialog.
+        """
+        from dialogs.about import AboutDialog
+
+        AboutDialog()
+
     def open_request_settings(self):
         """Opens request settings dialog.
         """
+        from dialogs.request_settings import RequestSettingsDialog
+
         rsd = RequestSettingsDialog(self, self.request, self.icon_manager)
         rsd.settings_updated.connect(self.settings_updated.emit)
         rsd.exec_()
@@ -1046,7 +1099,7 @@ class Potku(QtWidgets.QMainWindow):
 
     def add_new_tab(self, tab_type, filepath: Path, sample, file_current=0,
                     file_count=1, load_data=False, object_name="",
-                    import_evnt_or_binary=False, progress=None):
+                    import_evnt_or_binary=False, progress=None, obj=None):
         """Add new tab into TabWidget.
 
         Adds a new tab into program's tabWidget. Makes a new measurement or
@@ -1068,7 +1121,12 @@ class Potku(QtWidgets.QMainWindow):
             import_evnt_or_binary: Whether evnt or lst data is being imported
                 or not.
             progress: a ProgressReporter object
+            obj: Measurement or Simulation that has already been read from
+                filepath. If None, the object is read or created here.
         """
+        from modules.selection import Selector
+        from widgets.simulation.tab import SimulationTabWidget
+
         try:
             cur_progress = (100 / file_count) * file_current
         except ZeroDivisionError:
@@ -1080,15 +1138,20 @@ class Potku(QtWidgets.QMainWindow):
             progress.report(cur_progress)
 
         if tab_type == "measurement":
-            measurement = \
-                self.request.samples.measurements.add_measurement_file(
-                    sample, filepath, self.tab_id, object_name,
-                    import_evnt_or_binary=import_evnt_or_binary,
-                    selector_cls=Selector)
+            if obj is None:
+                measurement = \
+                    self.request.samples.measurements.add_measurement_file(
+                        sample, filepath, self.tab_id, object_name,
+                        import_evnt_or_binary=import_evnt_or_binary,
+                        selector_cls=Selector)
+            else:
+                measurement = \
+                    self.request.samples.measurements.add_measurement(
+                        sample, obj, self.tab_id, selector_cls=Selector)
             if measurement is not None:
-                tab = MeasurementTabWidget(self.tab_id, measurement,
-                                           self.icon_manager,
-                                           statusbar=self.statusbar)
+                tab_cls = _get_measurement_tab_widget()
+                tab = tab_cls(self.tab_id, measurement, self.icon_manager,
+                              statusbar=self.statusbar)
                 tab.issueMaster.connect(self.__master_issue_commands)
 
                 tab.setAttribute(QtCore.Qt.WA_DeleteOnClose)
@@ -1118,8 +1181,13 @@ class Potku(QtWidgets.QMainWindow):
             return measurement
 
         if tab_type == "simulation":
-            simulation = self.request.samples.simulations.add_simulation_file(
-                sample, filepath, self.tab_id)
+            if obj is None:
+                simulation = \
+                    self.request.samples.simulations.add_simulation_file(
+                        sample, filepath, self.tab_id)
+            else:
+                simulation = self.request.samples.simulations.add_simulation(
+                    sample, obj, self.tab_id)
 
             if simulation is not None:
                 tab = SimulationTabWidget(self.request, self.tab_id, simulation,
@@ -1136,6 +1204,8 @@ class Potku(QtWidgets.QMainWindow):
                         ion_division=self.settings.get_ion_division(),
                         min_presim_ions=self.settings.get_min_presim_ions(),
                         min_sim_ions=self.settings.get_min_simulation_ions(),
+                        target_precision=(
+                            self.settings.get_simulation_target_precision()),
                         settings_updated=self.settings_updated
                     )
 
@@ -1490,6 +1560,8 @@ class Potku(QtWidgets.QMainWindow):
 def main():
     """Main function
     """
+    # Child processes of the frozen application must not start Potku again
+    multiprocessing.freeze_support()
     app = QtWidgets.QApplication(sys.argv)
     window = Potku()
     window.show()
@@ -26,16 +26,21 @@ __version__ = "2.0"
 
 import unittest
 import random
+import shutil
+import tempfile
 import tests.gui
 
 import widgets.gui_utils as gutils
 
+from pathlib import Path
 from unittest.mock import Mock
+from unittest.mock import patch
 
 from modules.element import Element
 from widgets.gui_utils import GUIReporter
 
 from PyQt5 import QtWidgets
+from PyQt5 import uic
 
 
 class TestGUIReporter(unittest.TestCase):
@@ -137,3 +142,43 @@ class TestMinMaxHandlers(unittest.TestCase):
             sb = random.choice([spinbox1, spinbox2])
             sb.setValue(random.randint(0, 100))
             self.assertTrue(spinbox1.value() <= spinbox2.value())
+
+
+class TestLoadUi(unittest.TestCase):
+    def test_same_widgets_as_load_ui(self):
+        for name, cls in (("ui_new_sample.ui", QtWidgets.QDialog),
+                          ("ui_request_detector_settings.ui",
+                           QtWidgets.QWidget)):
+            ui_file = gutils.get_ui_dir() / name
+            expected = cls()
+            uic.loadUi(ui_file, expected)
+            widget = cls()
+            gutils.load_ui(ui_file, widget)
+
+            self.assertEqual(set(vars(expected)), set(vars(widget)))
+            self.assertEqual(expected.windowTitle(), widget.windowTitle())
+
+    def test_cache(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            ui_file = Path(tmp_dir, "ui_new_sample.ui")
+            shutil.copy(gutils.get_ui_dir() / ui_file.name, ui_file)
+            self.assertEqual([ui_file], gutils.compile_ui_files(tmp_dir))
+            cached = list(Path(tmp_dir, "__pycache__").glob("*.py"))
+            self.assertEqual(1, len(cached))
+
+            # Compiled classes are reused in memory and from the disk
+            with patch.object(uic, "compileUi") as compile_ui:
+                gutils.load_ui(ui_file, QtWidgets.QDialog())
+                gutils._UI_CLASSES.clear()
+                gutils.load_ui(ui_file, QtWidgets.QDialog())
+                compile_ui.assert_not_called()
+
+            # A changed file is compiled again and the old code removed
+            ui_file.write_text(ui_file.read_text().replace(
+                "Create a new sample", "Changed sample"))
+            widget = QtWidgets.QDialog()
+            gutils.load_ui(ui_file, widget)
+            self.assertEqual("Changed sample", widget.windowTitle())
+            new_cached = list(Path(tmp_dir, "__pycache__").glob("*.py"))
+            self.assertEqual(1, len(new_cached))
+            self.assertNotEqual(cached, new_cached)
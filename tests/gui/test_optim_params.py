@@ -105,6 +105,18 @@ class TestRecoilParameters(unittest.TestCase):
         widget = OptimizationRecoilParameterWidget(optimize_recoil=False)
         self.assertIs(widget.optimization_type, OptimizationType.RECOIL)
 
+    def test_migration_params_enabled_with_islands(self):
+        widget = OptimizationRecoilParameterWidget()
+        self.assertFalse(widget.migrationIntervalSpinBox.isEnabled())
+        self.assertFalse(widget.migrationSizeSpinBox.isEnabled())
+
+        widget.islands = 3
+        self.assertTrue(widget.migrationIntervalSpinBox.isEnabled())
+        self.assertTrue(widget.migrationSizeSpinBox.isEnabled())
+
+        widget = OptimizationFluenceParameterWidget(islands=2)
+        self.assertTrue(widget.migrationSizeSpinBox.isEnabled())
+
     def test_get_properties(self):
         """Test that get_properties returns the default values of each type
         of optimization widget after initialization.
@@ -115,7 +127,10 @@ class TestRecoilParameters(unittest.TestCase):
             "cross_p": 0.9,
             "mut_p": 1.0,
             "check_time": 20,
-            "skip_simulation": False
+            "skip_simulation": False,
+            "islands": 1,
+            "migration_interval": 5,
+            "migration_size": 2
         }
         fluence_expected = {
             "stop_percent": 0.7,
@@ -138,6 +153,7 @@ class TestRecoilParameters(unittest.TestCase):
             "lower_limits": (0.01, 0.0001),
             "sol_size": 5,
             "recoil_type": "box",
+            "use_reweighting": False,
             "optimization_type": OptimizationType.RECOIL,
             "check_max": 600,
             "check_min": 0
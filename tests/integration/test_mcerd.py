@@ -27,6 +27,8 @@ __version__ = "2.0"
 
 import unittest
 import tempfile
+import sys
+import threading
 
 import tests.mock_objects as mo
 import tests.utils as utils
@@ -36,10 +38,13 @@ import modules.general_functions as gf
 from modules.enums import SimulationType
 from modules.enums import SimulationMode
 from modules.mcerd import MCERD
+from modules.concurrency import CancellationToken
 from modules.target import Target
 from modules.layer import Layer
 from modules.element import Element
 from pathlib import Path
+from rx import operators as ops
+from unittest.mock import patch
 
 
 class TestMCERD(unittest.TestCase):
@@ -177,3 +182,44 @@ class TestMCERD(unittest.TestCase):
         output = self.mcerd.get_recoil_file_contents()
 
         self.assertEqual(expected, output)
+
+    def run_with_command(self, script, **kwargs):
+        """Runs MCERD with a Python script in place of the mcerd binary and
+        returns the observed output.
+        """
+        obs = mo.MockObserver()
+        done = threading.Event()
+        cmd = sys.executable, "-c", script
+        with patch.object(MCERD, "get_command", return_value=cmd):
+            self.mcerd.run(print_output=False, **kwargs).pipe(
+                ops.finally_action(done.set)
+            ).subscribe(obs)
+        self.assertTrue(done.wait(5))
+        return obs
+
+    def test_run_parses_output(self):
+        obs = self.run_with_command(
+            "import sys\n"
+            "print('Calculated 50 of 100 ions (50%)', file=sys.stderr)\n"
+            "print('Opening target file xyz')\n"
+            "print('angave 25.6')\n")
+        self.assertEqual([], obs.errs)
+        self.assertEqual(50, obs.nexts[0]["calculated"])
+        self.assertFalse(obs.nexts[-1]["is_running"])
+        self.assertEqual(100, obs.nexts[-1]["percentage"])
+
+    def test_run_reports_exit_without_final_output(self):
+        obs = self.run_with_command("print('Starting simulation.')")
+        self.assertEqual([], obs.errs)
+        self.assertEqual(101, obs.nexts[-1]["seed"])
+        self.assertFalse(obs.nexts[-1]["is_running"])
+
+    def test_run_reports_error_code(self):
+        obs = self.run_with_command("import sys; sys.exit(10)")
+        self.assertEqual(1, len(obs.errs))
+
+    def test_run_stops_when_cancelled(self):
+        ct = CancellationToken()
+        ct.request_cancellation()
+        obs = self.run_with_command("import time; time.sleep(5)", ct=ct)
+        self.assertEqual("Simulation was stopped", obs.nexts[-1]["msg"])
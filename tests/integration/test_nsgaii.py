@@ -0,0 +1,217 @@
+# coding=utf-8
+"""
+Created on 18.10.2026
+
+Potku is a graphical user interface for analyzation and
+visualization of measurement data collected from a ToF-ERD
+telescope. For physics calculations Potku uses external
+analyzation components.
+Copyright (C) 2026 Potku developers
+
+This program is free software; you can redistribute it and/or
+modify it under the terms of the GNU General Public License
+as published by the Free Software Foundation; either version 2
+of the License, or (at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program (file named 'LICENCE').
+
+Compares the array based non-dominated sorting and crowding distance
+functions of Nsgaii to the original loop based implementations and
+benchmarks them with large populations.
+"""
+
+__author__ = "Potku developers"
+__version__ = "2.0"
+
+import unittest
+
+import numpy as np
+import modules.optimization as opt
+
+from modules.nsgaii import Nsgaii
+
+
+def reference_nd_sort(pop_obj, n, r_n=np.inf):
+    """Original loop based implementation of Nsgaii.nd_sort."""
+    if r_n == np.inf:
+        r_n = n
+    front_no = np.inf * np.ones(n)
+    fronts = 0
+    front_1 = []
+    added_solutions = 0
+    s_i = [i for i in range(n)]
+    n_i = np.zeros(n)
+    for i in range(len(pop_obj)):
+        p = pop_obj[i]
+        s_p = []
+        n_p = 0
+        for h in range(len(pop_obj)):
+            q = pop_obj[h]
+            if np.array_equal(p, q):
+                continue
+            if opt.dominates(p, q):
+                s_p.append((q, h))
+            elif opt.dominates(q, p):
+                n_p += 1
+        if n_p == 0:
+            front_no[i] = 1
+            front_1.append((p, i))
+            added_solutions += 1
+        s_i[i] = s_p
+        n_i[i] = n_p
+    fronts += 1
+
+    current_front = front_1
+    f_n = 1
+    while current_front:
+        if added_solutions >= r_n:
+            break
+        new_front = []
+        for j in range(len(current_front)):
+            p = current_front[j]
+            p_i = p[1]
+            s_p = s_i[p_i]
+            for k in range(len(s_p)):
+                q = s_p[k][0]
+                index = s_p[k][1]
+                n_q = n_i[index]
+                n_q -= 1
+                n_i[index] = n_q
+                if n_q == 0:
+                    front_no[index] = f_n + 1
+                    new_front.append((q, index))
+                    added_solutions += 1
+        f_n += 1
+        current_front = new_front
+        fronts += 1
+    return front_no, fronts
+
+
+def reference_crowding_distance(front_no, objective_values):
+    """Original loop based implementation of Nsgaii.crowding_distance."""
+    pop_obj = np.array(objective_values)
+    n, m = np.shape(pop_obj)
+    crowd_dis = np.zeros(n)
+    front_unique = np.unique(front_no)
+    fronts = front_unique[front_unique != np.inf]
+    for f in range(len(fronts)):
+        front = np.array(
+            [k for k in range(len(front_no)) if front_no[k] == fronts[f]])
+        f_max = pop_obj[front, :].max(0)
+        f_min = pop_obj[front, :].min(0)
+        for i in range(m):
+            rank = np.argsort(pop_obj[front, i])
+            crowd_dis[front[rank[0]]] = np.inf
+            crowd_dis[front[rank[-1]]] = np.inf
+            for j in range(1, len(front) - 1):
+                ind_pop = front[rank[j]]
+                ind_front_next = front[rank[j + 1]]
+                ind_front_prev = front[rank[j - 1]]
+                dist = pop_obj[(ind_front_next, i)] - \
+                    pop_obj[(ind_front_prev, i)]
+                if dist == 0:
+                    current_distance = 0
+                else:
+                    current_distance = dist / (f_max[i] - f_min[i])
+                crowd_dis[ind_pop] = crowd_dis[ind_pop] + current_distance
+    return crowd_dis
+
+
+def reference_new_population_selection(population, pop_size):
+    """Original loop based implementation of
+    Nsgaii.new_population_selection."""
+    pop_n, t = np.shape(population[0])
+    front_no, last_front_no = reference_nd_sort(
+        population[1], pop_n, pop_size)
+    include_in_next = [False for _ in range(front_no.size)]
+    for i in range(front_no.size):
+        if front_no[i] < last_front_no:
+            include_in_next[i] = True
+    crowd_dis = reference_crowding_distance(front_no, population[1])
+    last = [i for i in range(len(front_no)) if front_no[i] == last_front_no]
+    rank = np.argsort(-crowd_dis[last])
+    delta_n = rank[: (pop_size - int(np.sum(include_in_next)))]
+    rest = [last[i] for i in delta_n]
+    for i in rest:
+        include_in_next[i] = True
+    index = np.array(
+        [i for i in range(len(include_in_next)) if include_in_next[i]])
+    next_pop = [population[0][index, :], population[1][index, :]]
+    return next_pop, front_no[index], crowd_dis[index]
+
+
+def get_population(rng, n, m, with_ties=True):
+    """Returns random solutions and objective values. Objective values
+    contain duplicates and ties if with_ties is True.
+    """
+    sols = rng.random((n, 5))
+    if with_ties:
+        objs = rng.integers(0, 20, size=(n, m)).astype(float)
+        objs[rng.random(n) < 0.05] = np.inf
+    else:
+        objs = rng.random((n, m))
+    return [sols, objs]
+
+
+class TestVectorizedSorting(unittest.TestCase):
+    def setUp(self):
+        self.rng = np.random.default_rng(17)
+
+    def test_nd_sort_matches_reference(self):
+        for n, m in [(1, 2), (2, 2), (10, 2), (50, 3), (80, 5)]:
+            for with_ties in (True, False):
+                _, objs = get_population(self.rng, n, m, with_ties)
+                for r_n in (np.inf, n // 2, 1):
+                    expected = reference_nd_sort(objs, n, r_n)
+                    front_no, fronts = Nsgaii.nd_sort(objs, n, r_n)
+                    np.testing.assert_array_equal(expected[0], front_no)
+                    self.assertEqual(expected[1], fronts)
+
+    def test_crowding_distance_matches_reference(self):
+        for n, m in [(1, 2), (2, 2), (10, 2), (50, 3), (80, 5)]:
+            for with_ties in (True, False):
+                _, objs = get_population(self.rng, n, m, with_ties)
+                for r_n in (np.inf, n // 2):
+                    front_no, _ = reference_nd_sort(objs, n, r_n)
+                    np.testing.assert_array_equal(
+                        reference_crowding_distance(front_no, objs),
+                        Nsgaii.crowding_distance(front_no, objs))
+
+    def test_new_population_selection_matches_reference(self):
+        for n, m in [(4, 2), (20, 2), (100, 2), (100, 4)]:
+            for with_ties in (True, False):
+                pop = get_population(self.rng, n, m, with_ties)
+                pop_size = n // 2
+                expected = reference_new_population_selection(pop, pop_size)
+                result = Nsgaii.new_population_selection(pop, pop_size)
+                np.testing.assert_array_equal(expected[0][0], result[0][0])
+                np.testing.assert_array_equal(expected[0][1], result[0][1])
+                np.testing.assert_array_equal(expected[1], result[1])
+                np.testing.assert_array_equal(expected[2], result[2])
+
+    def test_domination_matrix(self):
+        objs = np.array([[0, 0], [1, 0], [0, 1], [1, 1], [1, 1], [2, -1]])
+        expected = np.array([
+            [opt.dominates(a, b) for b in objs] for a in objs])
+        np.testing.assert_array_equal(
+            expected, Nsgaii.domination_matrix(objs))
+
+    def test_large_population_selection_matches_reference(self):
+        for m in (2, 5):
+            pop = get_population(self.rng, 400, m, with_ties=False)
+            expected = reference_new_population_selection(pop, 200)
+            result = Nsgaii.new_population_selection(pop, 200)
+            np.testing.assert_array_equal(expected[0][0], result[0][0])
+            np.testing.assert_array_equal(expected[0][1], result[0][1])
+            np.testing.assert_array_equal(expected[1], result[1])
+            np.testing.assert_array_equal(expected[2], result[2])
+
+
+if __name__ == '__main__':
+    unittest.main()
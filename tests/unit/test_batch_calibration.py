@@ -0,0 +1,170 @@
+# coding=utf-8
+"""
+Created on 18.10.2026
+
+Potku is a graphical user interface for analyzation and
+visualization of measurement data collected from a ToF-ERD
+telescope. For physics calculations Potku uses external
+analyzation components.
+Copyright (C) 2026 Potku developers
+
+This program is free software; you can redistribute it and/or
+modify it under the terms of the GNU General Public License
+as published by the Free Software Foundation; either version 2
+of the License, or (at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program (file named 'LICENCE').
+"""
+__author__ = "Potku developers"
+__version__ = "2.0"
+
+import math
+import tempfile
+import unittest
+
+import numpy as np
+import tests.mock_objects as mo
+
+from modules.batch_calibration import calibrate_measurements
+from modules.batch_calibration import fit_cut_files
+from modules.calibration import TOFCalibrationPoint
+from modules.cut_file import CutFile
+from modules.element import Element
+
+from pathlib import Path
+from unittest.mock import patch
+
+_SLOPE = 2.5e-11
+_OFFSET = -1.5e-9
+
+_HEADER = """Count: {count}
+Type: ERD
+Weight Factor: 1.0
+Energy: 0
+Detector Angle: 0
+Scatter Element: 
+Element losses: False
+Split count: 1
+
+ToF, Energy, Event number
+"""
+
+
+def write_cut_file(file: Path, channel: float, count=20000, seed=0):
+    """Writes a cut file whose time of flight histogram has a leading edge
+    at the given channel.
+    """
+    rng = np.random.default_rng(seed)
+    tofs = channel + rng.uniform(0, 1000, count) + rng.normal(0, 10, count)
+    file.parent.mkdir(parents=True, exist_ok=True)
+    with file.open("w") as f:
+        f.write(_HEADER.format(count=count))
+        for i, tof in enumerate(tofs.astype(int)):
+            f.write(f"{tof} {1000 + i % 100} {i}\n")
+
+
+def get_channel(element: str, detector, run) -> float:
+    """Returns the channel in which the given element arrives according to
+    the test calibration.
+    """
+    cut = CutFile()
+    cut.element = Element.from_string(element)
+    tof = TOFCalibrationPoint(0, cut, detector, run).get_tof_seconds()
+    return (tof - _OFFSET) / _SLOPE
+
+
+# Carbon stopping requires an external program
+@patch("modules.general_functions.carbon_stopping", return_value=0)
+class TestBatchCalibration(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.directory = Path(self.tmp_dir.name)
+        self.detector = mo.get_detector()
+        self.run = mo.get_run()
+        request = mo.get_request()
+        self.measurements = [
+            mo.get_measurement(
+                request=request, path=self.directory / name / f"{name}.info")
+            for name in ("mesu1", "mesu2")
+        ]
+        for measurement in self.measurements:
+            measurement.use_request_settings = False
+            measurement.detector = self.detector
+            measurement.run = self.run
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def write_cut_files(self, measurement, elements, seed=0):
+        files = []
+        for i, element in enumerate(elements):
+            file = measurement.get_cuts_dir() / \
+                f"{measurement.name}.{element}.ERD.0.cut"
+            with patch("modules.general_functions.carbon_stopping",
+                       return_value=0):
+                channel = get_channel(element, self.detector, self.run)
+            write_cut_file(file, channel, seed=seed + i)
+            files.append(file)
+        return files
+
+    def test_calibrate_measurements(self, _):
+        self.write_cut_files(self.measurements[0], ("1H", "12C", "28Si"))
+        self.write_cut_files(self.measurements[1], ("7Li", "16O"), seed=10)
+
+        results = calibrate_measurements(
+            self.measurements, bin_width=2.0, workers=2)
+        self.assertEqual(self.measurements, list(results))
+
+        first = results[self.measurements[0]]
+        self.assertEqual(3, len(first.get_points()))
+        self.assertAlmostEqual(1, first.slope / _SLOPE, places=2)
+        self.assertAlmostEqual(_OFFSET, first.offset, delta=2e-10)
+        self.assertLess(0.999, first.r_squared)
+        self.assertLess(first.slope_error, abs(first.slope) * 0.01)
+        self.assertLess(first.rms_residual, 1e-10)
+        self.assertEqual(first.slope, first.tof_calibration.slope)
+        for cut in first.cuts:
+            self.assertLess(0.8, cut.edge_fit.r_squared)
+            self.assertLess(cut.edge_fit.errors[0], 2)
+            self.assertEqual([], cut.cut.data)
+
+        # Two points give a line but no error estimates
+        second = results[self.measurements[1]]
+        self.assertAlmostEqual(1, second.slope / _SLOPE, places=2)
+        self.assertTrue(math.isnan(second.slope_error))
+
+    def test_calibrate_without_points(self, _):
+        files = self.write_cut_files(self.measurements[0], ("1H",))
+        empty = self.measurements[0].get_cuts_dir() / "mesu1.4He.ERD.0.cut"
+        empty.write_text(_HEADER.format(count=0))
+
+        result = calibrate_measurements(
+            self.measurements[:1], cut_files={
+                self.measurements[0]: [*files, empty]
+            }, workers=1)[self.measurements[0]]
+        self.assertIsNone(result.slope)
+        self.assertIsNone(result.offset)
+        self.assertTrue(math.isnan(result.r_squared))
+        self.assertEqual(1, len(result.get_points()))
+        self.assertIsNone(result.cuts[1].edge_fit)
+        self.assertIsNone(result.cuts[1].point)
+
+    def test_fit_cut_files(self, _):
+        files = self.write_cut_files(self.measurements[0], ("12C", "28Si"))
+        serial = fit_cut_files(files, workers=1)
+        parallel = fit_cut_files(files, workers=2)
+        self.assertEqual(
+            [fit for _, fit in serial], [fit for _, fit in parallel])
+        self.assertEqual(
+            ["12C", "28Si"], [str(cut.element) for cut, _ in parallel])
+        self.assertEqual([], fit_cut_files([]))
+
+
+if __name__ == '__main__':
+    unittest.main()
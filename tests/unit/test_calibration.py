@@ -0,0 +1,112 @@
+# coding=utf-8
+"""
+Created on 18.10.2026
+
+Potku is a graphical user interface for analyzation and
+visualization of measurement data collected from a ToF-ERD
+telescope. For physics calculations Potku uses external
+analyzation components.
+Copyright (C) 2026 Potku developers
+
+This program is free software; you can redistribute it and/or
+modify it under the terms of the GNU General Public License
+as published by the Free Software Foundation; either version 2
+of the License, or (at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program (file named 'LICENCE').
+"""
+__author__ = "Potku developers"
+__version__ = "2.0"
+
+import unittest
+
+import numpy as np
+import modules.general_functions as gf
+
+from modules.calibration import TOFCalibrationHistogram
+from modules.calibration import get_histogram
+from modules.cut_file import CutFile
+
+
+def get_cut(values):
+    cut = CutFile()
+    cut.data = [[int(v), 0] for v in values]
+    return cut
+
+
+class TestTOFCalibrationHistogram(unittest.TestCase):
+    def setUp(self):
+        # Leading edge at channel 3000 followed by a slowly decreasing tail
+        rng = np.random.default_rng(1)
+        self.values = np.concatenate((
+            rng.normal(3000, 20, 5000),
+            3000 + rng.exponential(400, 20000),
+            rng.uniform(0, 6000, 100)
+        )).astype(int)
+
+    def test_get_histogram(self):
+        data = [[v] for v in self.values]
+        for width in (1, 2.5, 10):
+            x, y = get_histogram(self.values, width)
+            expected_x, expected_y = zip(*gf.hist(data, width=width))
+            np.testing.assert_allclose(expected_x, x)
+            np.testing.assert_array_equal(expected_y, y)
+
+        np.testing.assert_array_equal([-1.5, -0.5, 0.5], get_histogram(
+            [-1, 0], 1)[0])
+        self.assertEqual((0, 0), tuple(map(len, get_histogram([], 1))))
+
+    def test_find_leading_edge_borders(self):
+        histogram = TOFCalibrationHistogram(get_cut(self.values), 10)
+        start, end = histogram.find_leading_edge_borders()
+        self.assertLess(histogram.histogram_x[start], 3000)
+        self.assertLess(start, end)
+        self.assertLess(2950, histogram.histogram_x[end])
+
+        # Indexes point to the leading edge even if the same counts appear
+        # earlier in the histogram.
+        histogram.histogram_y = np.array(
+            [5, 0, 1, 5, 50, 90, 100, 100, 80, 60, 40] + [20] * 50,
+            dtype=float)
+        self.assertEqual((3, 6), histogram.find_leading_edge_borders())
+
+        histogram = TOFCalibrationHistogram(get_cut([]), 10)
+        self.assertEqual((0, 0), histogram.find_leading_edge_borders())
+        self.assertIsNone(histogram.get_error_function_parameters(0, 0))
+
+    def test_fit_error_function(self):
+        histogram = TOFCalibrationHistogram(get_cut(self.values), 10)
+        x = np.linspace(2800, 3200, 41)
+        y = histogram.error_function(x, (3010, 400, 35))
+        x0, a, k = histogram.fit_error_function(x, y, 3200, y[-1], 10)
+        self.assertAlmostEqual(3010, x0, places=4)
+        self.assertAlmostEqual(400, a, places=4)
+        self.assertAlmostEqual(35, k, places=4)
+
+        start, end = histogram.find_leading_edge_borders()
+        x0, _, _ = histogram.get_error_function_parameters(end, start)
+        self.assertAlmostEqual(3000, x0, delta=30)
+
+        self.assertIsNone(histogram.fit_error_function([1], [1], 1, 1, 1))
+
+    def test_error_function_jacobian(self):
+        histogram = TOFCalibrationHistogram(get_cut([]), 1)
+        x = np.linspace(-10, 10, 21)
+        params = np.array([1.5, 20.0, 3.0])
+        jacobian = histogram.error_function_jacobian(x, params)
+        for i in range(len(params)):
+            step = np.zeros(3)
+            step[i] = 1e-6
+            expected = (histogram.error_function(x, params + step) -
+                        histogram.error_function(x, params - step)) / 2e-6
+            np.testing.assert_allclose(expected, jacobian[:, i], atol=1e-6)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,143 @@
+# coding=utf-8
+"""
+Created on 18.10.2026
+
+Potku is a graphical user interface for analyzation and
+visualization of measurement data collected from a ToF-ERD
+telescope. For physics calculations Potku uses external
+analyzation components.
+Copyright (C) 2026 Potku developers
+
+This program is free software; you can redistribute it and/or
+modify it under the terms of the GNU General Public License
+as published by the Free Software Foundation; either version 2
+of the License, or (at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program (file named 'LICENCE').
+"""
+__author__ = "Potku developers"
+__version__ = "2.0"
+
+import math
+import tempfile
+import unittest
+import tests.utils as utils
+import tests.mock_objects as mo
+
+import numpy as np
+
+from modules.concurrency import CancellationToken
+from modules.convergence import SpectrumConvergenceMonitor
+from modules.element_simulation import ElementSimulation
+from modules.reweighting import EspeReweighter
+from modules.reweighting import parse_recoil_events
+
+from pathlib import Path
+from rx import operators as ops
+from unittest.mock import Mock
+from unittest.mock import patch
+
+_ERD_FILE = utils.get_resource_dir() / "C-Default.9997.erd"
+_RECOIL_FILE = utils.get_resource_dir() / "C-Default.recoil"
+
+
+class TestSpectrumConvergenceMonitor(unittest.TestCase):
+    def setUp(self):
+        with _RECOIL_FILE.open("r") as file:
+            self.distribution = EspeReweighter.parse_distribution(file)
+        self.line_counts = []
+
+    def get_monitor(self, erd_files, **kwargs):
+        return SpectrumConvergenceMonitor(
+            lambda: erd_files, toflen=0.6, channel_width=0.1,
+            distribution=self.distribution, **kwargs)
+
+    def test_only_new_lines_are_read(self):
+        lines = _ERD_FILE.read_bytes().splitlines(keepends=True)
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            erd_file = Path(tmp_dir, "C-Default.101.erd")
+            # Last line is still being written
+            erd_file.write_bytes(b"".join(lines[:10]) + lines[10][:20])
+            monitor = self.get_monitor([erd_file])
+            with patch("modules.convergence.parse_recoil_events",
+                       side_effect=self.count_lines):
+                monitor.update()
+                self.assertEqual([10], self.line_counts)
+                monitor.update()
+                self.assertEqual([10], self.line_counts)
+
+                with erd_file.open("ab") as file:
+                    file.write(lines[10][20:] + b"".join(lines[11:]))
+                monitor.update()
+                self.assertEqual([10, len(lines) - 10], self.line_counts)
+
+            full_monitor = self.get_monitor([_ERD_FILE])
+            full_monitor.update()
+            self.assertTrue(monitor.get_spectrum())
+            for (x1, y1), (x2, y2) in zip(
+                    full_monitor.get_spectrum(), monitor.get_spectrum()):
+                self.assertEqual(x1, x2)
+                self.assertAlmostEqual(y1, y2)
+
+    def count_lines(self, lines):
+        self.line_counts.append(len(lines))
+        return parse_recoil_events(lines)
+
+    def test_uncertainties(self):
+        monitor = self.get_monitor([])
+        self.assertEqual(math.inf, monitor.get_precision())
+        self.assertFalse(monitor.is_converged(1.0))
+
+        # Events fall into channels 10, 10, 20 and 40. Concentration is 1
+        # at the depth of the events.
+        weights = np.array([1.0, 1.0, 4.0, 0.1])
+        energies = np.array([1.0, 1.0, 2.0, 4.0])
+        with patch("modules.convergence.tof_to_energy",
+                   return_value=energies):
+            monitor.add_events(
+                np.ones(4), np.full(4, 10.0), weights, np.ones(4))
+
+        uncertainties = monitor.get_uncertainties()
+        self.assertAlmostEqual(math.sqrt(2) / 2, uncertainties[10])
+        self.assertAlmostEqual(1.0, uncertainties[20])
+        self.assertEqual(math.inf, uncertainties[15])
+        self.assertAlmostEqual(1.0, uncertainties[40])
+
+        # Channel 40 is not significant so the precision is determined
+        # by channel 20
+        self.assertAlmostEqual(1.0, monitor.get_precision())
+        self.assertTrue(monitor.is_converged(1.0))
+        self.assertFalse(monitor.is_converged(0.5))
+
+        with patch("modules.convergence.tof_to_energy",
+                   return_value=np.array([2.0])):
+            monitor.add_events(
+                np.ones(1), np.full(1, 10.0), np.full(1, 4.0), np.ones(1))
+        self.assertAlmostEqual(math.sqrt(2) / 2, monitor.get_precision())
+        self.assertEqual(
+            [(1.0, 2.0), (2.0, 8.0), (4.0, 0.1)], monitor.get_spectrum())
+
+
+class TestConvergenceCheck(unittest.TestCase):
+    def test_cancellation_is_requested_at_target_precision(self):
+        elem_sim = mo.get_element_simulation()
+        monitor = Mock()
+        monitor.update.side_effect = [1.0, 0.5, 0.01, 0.01]
+        ct = CancellationToken()
+        with patch.object(ElementSimulation, "get_convergence_monitor",
+                          return_value=monitor):
+            check = elem_sim._get_convergence_check(
+                elem_sim.get_main_recoil(), ct, 0.05, 0.01)
+        self.assertEqual([], check.pipe(ops.to_list()).run())
+        self.assertTrue(ct.is_cancellation_requested())
+        self.assertEqual(3, monitor.update.call_count)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -35,11 +35,14 @@ import tests.utils as utils
 import tests.mock_objects as mo
 
 import modules.file_paths as fp
+import modules.general_functions as gf
 
 from modules.recoil_element import RecoilElement
 from modules.element import Element
 from modules.element_simulation import ERDFileHandler
 from modules.element_simulation import ElementSimulation
+from modules.element_simulation import LineCounter
+from modules.element_simulation import SpectrumCache
 from modules.enums import OptimizationType
 
 from tests.utils import expected_failure_if
@@ -298,6 +301,91 @@ class TestErdFileHandler(unittest.TestCase):
         t.join()
 
 
+class TestLineCounter(unittest.TestCase):
+    def test_non_existing_file_has_no_lines(self):
+        counter = LineCounter(Path(tempfile.gettempdir(), "foo.101.erd"))
+        self.assertEqual(0, counter.count())
+
+    def test_counts_match_count_lines_in_file(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            file = Path(tmp_dir, "4He-Default.101.erd")
+            counter = LineCounter(file)
+            for text in ["", "foo\n", "bar", "\n", "baz\nqux", "\n\n"]:
+                with file.open("a") as f:
+                    f.write(text)
+                self.assertEqual(
+                    gf.count_lines_in_file(file), counter.count())
+
+    def test_only_appended_bytes_are_read(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            file = Path(tmp_dir, "4He-Default.101.erd")
+            write_line(file)
+            counter = LineCounter(file)
+            self.assertEqual(1, counter.count())
+
+            # Overwrite the already counted line without changing the file
+            # size. The counter does not notice the change.
+            with file.open("w") as f:
+                f.write("\n\n\n\n")
+            self.assertEqual(1, counter.count())
+
+            write_line(file)
+            self.assertEqual(2, counter.count())
+
+    def test_truncated_file_is_counted_again(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            file = Path(tmp_dir, "4He-Default.101.erd")
+            for _ in range(3):
+                write_line(file)
+            counter = LineCounter(file)
+            self.assertEqual(3, counter.count())
+
+            file.unlink()
+            self.assertEqual(0, counter.count())
+            write_line(file)
+            self.assertEqual(1, counter.count())
+
+
+class TestSpectrumCache(unittest.TestCase):
+    def test_least_recently_used_spectrum_is_discarded(self):
+        cache = SpectrumCache(maxsize=2)
+        cache.put(1, [(1, 1)])
+        cache.put(2, [(2, 2)])
+        self.assertEqual([(1, 1)], cache.get(1))
+        cache.put(3, [(3, 3)])
+        self.assertEqual(2, len(cache))
+        self.assertIsNone(cache.get(2))
+        self.assertEqual([(1, 1)], cache.get(1))
+        self.assertEqual([(3, 3)], cache.get(3))
+
+    def test_cached_spectrum_is_a_copy(self):
+        cache = SpectrumCache()
+        spectrum = [(1, 1)]
+        cache.put(1, spectrum)
+        spectrum.append((2, 2))
+        cache.get(1).append((3, 3))
+        self.assertEqual([(1, 1)], cache.get(1))
+
+    def test_key_changes_when_erd_files_change(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            params = {
+                "ch": 0.025,
+                "erd_file": Path(tmp_dir, "4He-Default.*.erd")
+            }
+            key1 = SpectrumCache.get_key(params, ["foo"])
+            self.assertEqual(key1, SpectrumCache.get_key(params, ["foo"]))
+            self.assertNotEqual(key1, SpectrumCache.get_key(params, ["bar"]))
+            self.assertNotEqual(
+                key1, SpectrumCache.get_key({**params, "ch": 0.1}, ["foo"]))
+
+            write_line(Path(tmp_dir, "4He-Default.101.erd"))
+            key2 = SpectrumCache.get_key(params, ["foo"])
+            self.assertNotEqual(key1, key2)
+
+            write_line(Path(tmp_dir, "4He-Default.101.erd"))
+            self.assertNotEqual(key2, SpectrumCache.get_key(params, ["foo"]))
+
+
 class TestElementSimulation(unittest.TestCase):
     def setUp(self):
         self.main_rec = mo.get_recoil_element()
@@ -468,6 +556,52 @@ class TestElementSimulation(unittest.TestCase):
 
             self.assertEqual(mock_run.call_count, 3)
 
+    @patch("modules.get_espe.GetEspe.calculate_simulated_spectrum")
+    def test_calculated_spectra_are_cached(self, mock_calc):
+        mock_calc.return_value = [(1.0, 2.0), (1.5, 3.0)]
+        self.elem_sim.simulation = mo.get_simulation()
+
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            self.elem_sim.directory = tmp_dir
+            espe, espe_file = self.elem_sim.calculate_espe(self.main_rec)
+            self.assertEqual(mock_calc.return_value, espe)
+            self.assertEqual(1, mock_calc.call_count)
+
+            # Spectrum and file contents come from the cache. The mocked
+            # calculation did not write the file.
+            self.assertFalse(espe_file.exists())
+            espe, _ = self.elem_sim.calculate_espe(self.main_rec)
+            self.assertEqual(mock_calc.return_value, espe)
+            self.assertEqual(1, mock_calc.call_count)
+            self.assertEqual(
+                "1.0 2.0\n1.5 3.0\n", espe_file.read_text())
+
+            self.elem_sim.calculate_espe(self.main_rec, ch=0.5)
+            self.assertEqual(2, mock_calc.call_count)
+
+            # New ERD data invalidates the cached spectrum
+            write_line(Path(
+                tmp_dir, f"{self.main_rec.get_full_name()}.101.erd"))
+            self.elem_sim.calculate_espe(self.main_rec)
+            self.assertEqual(3, mock_calc.call_count)
+
+    @patch("modules.get_espe.GetEspe.calculate_simulated_spectrum")
+    def test_calculate_espe_with_given_recoil_file(self, mock_calc):
+        mock_calc.return_value = []
+        self.elem_sim.simulation = mo.get_simulation()
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            self.elem_sim.directory = tmp_dir
+            recoil_file = Path(tmp_dir, "sub", "candidate-1.recoil")
+            recoil_file.parent.mkdir()
+            self.elem_sim.calculate_espe(
+                self.main_rec, recoil_file=recoil_file, write_to_file=False)
+            self.assertEqual(
+                recoil_file, mock_calc.call_args[1]["recoil_file"])
+            self.assertEqual(
+                "\n".join(self.main_rec.get_mcerd_params()),
+                recoil_file.read_text())
+            self.assertEqual([recoil_file.parent], list(Path(tmp_dir).iterdir()))
+
     def assert_files_equal(self, mock_get_espe, kwargs, rec_file, erd_file,
                            espe_file):
         _, file = self.elem_sim.calculate_espe(**kwargs)
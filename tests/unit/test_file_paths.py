@@ -59,6 +59,18 @@ class TestFilePaths(unittest.TestCase):
                           lambda: fp.get_erd_file_name(rec_elem, 101,
                                                        optim_mode="foo"))
 
+    def test_get_checkpoint_file_name(self):
+        rec_elem = RecoilElement(Element.from_string("He"), [], "red")
+
+        self.assertEqual(
+            "He-opt.checkpoint.npz",
+            fp.get_checkpoint_file_name(rec_elem, OptimizationType.RECOIL))
+        self.assertEqual(
+            "He-optfl.checkpoint.npz",
+            fp.get_checkpoint_file_name(rec_elem, OptimizationType.FLUENCE))
+        self.assertRaises(
+            ValueError, lambda: fp.get_checkpoint_file_name(rec_elem, None))
+
     def test_recoil_filter(self):
         filter_func = fp.recoil_filter("C")
 
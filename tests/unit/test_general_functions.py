@@ -23,16 +23,21 @@ along with this program (file named 'LICENCE').
 __author__ = "Juhani Sundell"
 __version__ = "2.0"
 
+import io
 import unittest
 import os
 import platform
+import sys
 import tempfile
 import modules.comparison as comp
 import random
+import threading
 import time
 import tests.utils as utils
 
+from contextlib import redirect_stderr
 from pathlib import Path
+from unittest.mock import patch
 
 from modules import general_functions as gf
 from modules.element import Element
@@ -474,6 +479,18 @@ class TestCoinc(unittest.TestCase):
             params["columns"] = ""
             self.assertEqual([], gf.coinc(**params))
 
+    def test_coinc_returns_empty_list_if_columns_are_invalid(self):
+        for columns in ("3,5", "$3,", "$0", "$a"):
+            params = dict(self.params)
+            params["columns"] = columns
+            self.assertEqual([], gf.coinc(**params))
+
+    def test_parse_columns(self):
+        self.assertEqual([2, 4], gf.parse_columns("$3,$5"))
+        self.assertEqual([3], gf.parse_columns(" $4 "))
+        self.assertRaises(ValueError, gf.parse_columns, "")
+        self.assertRaises(ValueError, gf.parse_columns, "$3,$-1")
+
     def test_coinc_returns_empty_list_if_no_timings(self):
         params = dict(self.params)
         params["timing"] = {}
@@ -505,6 +522,67 @@ class TestCoinc(unittest.TestCase):
             gf.coinc(output_file=output_file, **params)
             self.assertFalse(output_file.exists())
 
+    def test_output_file_is_removed_if_coinc_fails(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            output_file = Path(tmp_dir, "import_file.tmp")
+            cmd = sys.executable, "-c", "print('1 2 3 4 5'); exit(1)"
+            with patch("modules.general_functions._get_coinc_command",
+                       return_value=cmd):
+                self.assertEqual(
+                    [], gf.coinc(output_file=output_file, **self.params))
+            self.assertFalse(output_file.exists())
+
+
+class TestCoincFiles(unittest.TestCase):
+    def test_files_are_processed_concurrently(self):
+        running = []
+        max_running = [0]
+        lock = threading.Lock()
+
+        def coinc(input_file, output_file, **kwargs):
+            with lock:
+                running.append(input_file)
+                max_running[0] = max(max_running[0], len(running))
+            time.sleep(0.05)
+            if input_file.name != "bad":
+                output_file.write_text(f"{kwargs['columns']}\n")
+            with lock:
+                running.remove(input_file)
+
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            input_files = [Path(name) for name in ("a", "bad", "c", "d")]
+            output_files = [Path(tmp_dir, f"{i}.asc") for i in range(4)]
+            # Output files from earlier are not mistaken for results
+            output_files[1].write_text("old")
+            with patch("modules.general_functions.coinc", side_effect=coinc):
+                results = dict(gf.coinc_files(
+                    input_files, output_files, workers=2, columns="$3"))
+
+            self.assertEqual(
+                {0: True, 1: False, 2: True, 3: True}, results)
+            self.assertEqual(2, max_running[0])
+            self.assertEqual("$3\n", output_files[3].read_text())
+
+    def test_exception_does_not_stop_other_files(self):
+        def coinc(input_file, output_file, **_):
+            if input_file.name == "bad":
+                raise UnicodeDecodeError("utf-8", b"", 0, 1, "invalid")
+            output_file.write_text("1 2\n")
+
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            input_files = [Path(name) for name in ("a", "bad", "c")]
+            output_files = [Path(tmp_dir, f"{i}.asc") for i in range(3)]
+            with patch("modules.general_functions.coinc",
+                       side_effect=coinc), \
+                    redirect_stderr(io.StringIO()):
+                results = dict(gf.coinc_files(input_files, output_files))
+
+        self.assertEqual({0: True, 1: False, 2: True}, results)
+
+    def test_each_input_file_needs_an_output_file(self):
+        with self.assertRaises(ValueError):
+            list(gf.coinc_files([Path("a"), Path("b")], [Path("c")]))
+
 
 class TestDigitsToSuperscript(unittest.TestCase):
     def test_string_containing_no_digits_is_unchanged(self):
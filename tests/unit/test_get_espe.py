@@ -151,19 +151,14 @@ class TestGetEspeRun(unittest.TestCase):
             get_espe.run(verbose=False)
         )
 
-    def test_read_erd_data_returns_expected_data(self):
+    def test_get_erd_files_returns_files_matching_the_pattern(self):
         get_espe = GetEspe(**self.default_kwargs)
-        self.assertEqual(get_espe.erd_file, _ERD_FILE)
-        erd_data = list(get_espe.read_erd_files())
-        self.assertEqual(20, len(erd_data))
-        for line in erd_data:
-            self.assertIsInstance(line, str)
+        self.assertEqual(
+            [utils.get_resource_dir() / "C-Default.9997.erd"],
+            get_espe.get_erd_files())
 
-    def test_read_erd_data_returns_nothing_if_no_erd_files(self):
-        get_espe = GetEspe(**self.default_kwargs)
         get_espe.erd_file = Path.cwd() / "foo.bar.baz"
-        erd_data = list(get_espe.read_erd_files())
-        self.assertEqual([], erd_data)
+        self.assertEqual([], get_espe.get_erd_files())
 
 
 if __name__ == '__main__':
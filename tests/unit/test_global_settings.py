@@ -24,6 +24,7 @@ along with this program (file named 'LICENCE').
 __author__ = "Juhani Sundell"
 __version__ = "2.0"
 
+import os
 import unittest
 import tempfile
 import tests.mock_objects as mo
@@ -133,6 +134,20 @@ class TestGlobalSettings(unittest.TestCase):
         # The absolute minimum
         self.assertEqual(0.000001, self.gs.get_minimum_concentration())
 
+    def test_simulation_target_precision(self):
+        self.assertEqual(0.0, self.gs.get_simulation_target_precision())
+        self.gs.set_simulation_target_precision(0.05)
+        self.assertEqual(0.05, self.gs.get_simulation_target_precision())
+        self.gs.set_simulation_target_precision(-1)
+        self.assertEqual(0.0, self.gs.get_simulation_target_precision())
+
+    def test_import_workers(self):
+        self.assertEqual(os.cpu_count() or 1, self.gs.get_import_workers())
+        self.gs.set_import_workers(3)
+        self.assertEqual(3, self.gs.get_import_workers())
+        self.gs.set_import_workers(0)
+        self.assertEqual(1, self.gs.get_import_workers())
+
     def test_serialiazation(self):
         """Deserialized GlobalSettings object should have the same
         values as the serialized object.
@@ -0,0 +1,77 @@
+# coding=utf-8
+"""
+Created on 18.10.2026
+
+Potku is a graphical user interface for analyzation and
+visualization of measurement data collected from a ToF-ERD
+telescope. For physics calculations Potku uses external
+analyzation components.
+Copyright (C) 2026 Potku developers
+
+This program is free software; you can redistribute it and/or
+modify it under the terms of the GNU General Public License
+as published by the Free Software Foundation; either version 2
+of the License, or (at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program (file named 'LICENCE').
+"""
+__author__ = "Potku developers"
+__version__ = "2.0"
+
+import unittest
+
+import numpy as np
+
+from modules.histogram import IntegerHistogram
+
+
+class TestIntegerHistogram(unittest.TestCase):
+    def test_empty_histogram(self):
+        histogram = IntegerHistogram()
+        self.assertEqual(0, len(histogram))
+        self.assertRaises(ValueError, histogram.get_range)
+        histogram.add([])
+        self.assertEqual(0, len(histogram))
+
+    def test_values_are_added_incrementally(self):
+        histogram = IntegerHistogram([5, 3])
+        self.assertEqual((3, 5), histogram.get_range())
+        histogram.add(np.array([[-2], [7]]))
+        histogram.add([4, 4])
+        self.assertEqual(6, len(histogram))
+        self.assertEqual((-2, 7), histogram.get_range())
+
+        edges, counts = histogram.get_bins(3)
+        np.testing.assert_array_equal([-2, 1, 4, 7], edges)
+        np.testing.assert_array_equal([1, 1, 4], counts)
+
+    def test_bins_match_numpy_histogram(self):
+        rng = np.random.RandomState(1)
+        values = rng.randint(-500, 800, size=5000)
+        histogram = IntegerHistogram()
+        for chunk in np.array_split(values, 7):
+            histogram.add(chunk)
+
+        for bin_count in (1, 10, 200):
+            expected_counts, expected_edges = np.histogram(values, bin_count)
+            edges, counts = histogram.get_bins(bin_count)
+            np.testing.assert_allclose(expected_edges, edges)
+            np.testing.assert_array_equal(expected_counts, counts)
+
+    def test_bins_are_cached_until_values_are_added(self):
+        histogram = IntegerHistogram([1, 2, 3])
+        bins = histogram.get_bins(2)
+        self.assertIs(bins, histogram.get_bins(2))
+        histogram.add([3])
+        self.assertIsNot(bins, histogram.get_bins(2))
+        np.testing.assert_array_equal([1, 3], histogram.get_bins(2)[1])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -100,6 +100,27 @@ class TestMasses(unittest.TestCase):
 
         self.assertIsNone(masses.find_mass_of_isotope("foo", 42))
 
+        # Isotope numbers are rounded
+        self.assertEqual(masses.find_mass_of_isotope("H", 2),
+                         masses.find_mass_of_isotope("H", 1.8))
+        self.assertEqual(masses.find_mass_of_isotope("H", 2),
+                         masses.find_mass_of_isotope("H", 2.0))
+
+    def test_mutating_results(self):
+        # Mutating returned values does not change later results
+        isotopes = masses.get_isotopes("C")
+        expected = masses.get_isotopes("C")
+        isotopes[0][masses.MASS_KEY] = 0
+        isotopes.pop()
+        self.assertEqual(expected, masses.get_isotopes("C"))
+
+        most_common = masses.get_most_common_isotope("C")
+        most_common[masses.NUMBER_KEY] = 42
+        self.assertEqual(12, masses.get_most_common_isotope("C")[
+            masses.NUMBER_KEY])
+        self.assertAlmostEqual(12.0110, masses.get_standard_isotope("C"),
+                               places=5)
+
     def test_get_st_mass(self):
         self.assertAlmostEqual(1.00015, masses.get_standard_isotope("H"),
                                places=5)
@@ -33,8 +33,12 @@ import tests.utils as utils
 import tests.mock_objects as mo
 
 from pathlib import Path
+from unittest.mock import patch
 
+from modules import persistence
+from modules.cut_file import CutFile
 from modules.measurement import Measurement
+from modules.request import Request
 
 
 class TestFolderStructure(unittest.TestCase):
@@ -176,6 +180,84 @@ class TestFolderStructure(unittest.TestCase):
             )
 
 
+class _Selector:
+    """Selector that has one selection that contains every point.
+    """
+    def __init__(self, measurement, *_):
+        self.selection_file = measurement.get_data_dir() / "foo.selections"
+        self.axes_limits = self
+        selection = mo.get_selection()
+        selection.point_inside = lambda _: True
+        self.selections = [selection]
+
+    def is_inside(self, _):
+        return True
+
+    def is_empty(self):
+        return False
+
+    def count(self):
+        return len(self.selections)
+
+    def get_at(self, i):
+        return self.selections[i]
+
+    def update_selection_beams(self):
+        pass
+
+    def save(self):
+        persistence.write_text(self.selection_file, "selections")
+
+
+class TestSaveCuts(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        request = Request(
+            Path(self.tmp_dir.name), "request", mo.get_global_settings(),
+            save_on_creation=False, enable_logging=False)
+        path = request.directory / "Measurement_1-foo"
+        self.measurement = Measurement(
+            request, path / "foo.info", name="foo",
+            save_on_creation=False, enable_logging=False)
+        self.measurement.create_folder_structure(path)
+        self.data_file = self.measurement.get_data_dir() / "foo.asc"
+        self.data_file.write_text("1 2\n3 4\n")
+        self.measurement.measurement_file = self.data_file
+        self.measurement.data = [[1, 2, 1], [3, 4, 2]]
+        self.measurement.selector = _Selector(self.measurement)
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def save_cuts(self):
+        with patch.object(CutFile, "save", side_effect=CutFile.save,
+                          autospec=True) as mock_save:
+            self.measurement.save_cuts()
+        return mock_save.call_count
+
+    def test_up_to_date_cuts_are_not_saved_again(self):
+        self.assertEqual(1, self.save_cuts())
+        cut_file, = self.measurement.get_cut_files()[0]
+        self.assertEqual(0, self.save_cuts())
+        self.assertTrue(cut_file.exists())
+
+        # Changed data
+        self.data_file.write_text("1 2\n3 4\n5 6\n")
+        self.assertEqual(1, self.save_cuts())
+        self.assertEqual(0, self.save_cuts())
+
+        # Removed cut file
+        cut_file.unlink()
+        self.assertEqual(1, self.save_cuts())
+        self.assertTrue(cut_file.exists())
+
+        # Changed selections
+        self.measurement.selector.selections[0].weight_factor = 2.0
+        self.measurement.selector.save = lambda: persistence.write_text(
+            self.measurement.selector.selection_file, "new selections")
+        self.assertEqual(1, self.save_cuts())
+
+
 def get_extected_folder_structure(root, name):
     return {
         root: {
@@ -26,14 +26,28 @@ __version__ = "2.0"
 
 import unittest
 import random
+import threading
+import time
 import tests.mock_objects as mo
 import tempfile
 
+import numpy as np
+import rx
+
 from pathlib import Path
+from unittest.mock import Mock
 from unittest.mock import patch
 
 from modules.nsgaii import Nsgaii
+from modules.nsgaii import Checkpoint
 from modules.nsgaii import pick_final_solutions
+from modules.nsgaii import scale_espe
+from modules.nsgaii import save_checkpoint
+from modules.nsgaii import load_checkpoint
+from modules.element_simulation import ElementSimulation
+from modules.enums import OptimizationType
+from modules.concurrency import CancellationToken
+from modules.mcerd import MCERD
 
 
 class TestPickFinalSolutions(unittest.TestCase):
@@ -103,5 +117,413 @@ class TestPickFinalSolutions(unittest.TestCase):
                           lambda: pick_final_solutions([], [], count=4))
 
 
+class TestFluenceEvaluation(unittest.TestCase):
+    def test_scale_espe(self):
+        espe = [(1.0, 2.0), (1.5, 0.0), (2.0, 3.0)]
+        self.assertEqual(
+            [(1.0, 1.0), (1.5, 0.0), (2.0, 1.5)], scale_espe(espe, 0.5))
+        self.assertEqual([(1.0, 2.0), (1.5, 0.0), (2.0, 3.0)], espe)
+        self.assertEqual([], scale_espe([], 2))
+
+    def test_spectrum_is_calculated_once_per_evaluation(self):
+        elem_sim = mo.get_element_simulation()
+        nsgaii = Nsgaii(
+            gen=1, element_simulation=elem_sim, pop_size=3, sol_size=1,
+            optimization_type=OptimizationType.FLUENCE,
+            cut_file=Path(tempfile.gettempdir(), "foo.cut"))
+        nsgaii.measured_espe = [(1.0, 1.0), (2.0, 2.0)]
+        reference = [(1.0, 1.0), (2.0, 2.0)]
+        with patch("modules.element_simulation.ElementSimulation."
+                   "calculate_espe",
+                   return_value=(reference, None)) as mock_calc:
+            pop = nsgaii.evaluate_solutions([[1.0e12], [2.0e12], [5.0e11]])
+
+        self.assertEqual(1, mock_calc.call_count)
+        self.assertEqual(
+            Nsgaii.REFERENCE_FLUENCE, mock_calc.call_args[1]["fluence"])
+        self.assertEqual(3, len(pop.objective_values))
+        # Solution with a fluence of 1e12 matches the measurement exactly
+        self.assertEqual((0, 0), tuple(pop.objective_values[0]))
+        self.assertGreater(pop.objective_values[1].sum_distance, 0)
+        self.assertGreater(pop.objective_values[2].sum_distance, 0)
+
+
+class TestParallelEvaluation(unittest.TestCase):
+    def setUp(self):
+        self.elem_sim = mo.get_element_simulation()
+        self.nsgaii = Nsgaii(
+            gen=1, element_simulation=self.elem_sim, pop_size=4, sol_size=5,
+            optimization_type=OptimizationType.RECOIL,
+            cut_file=Path(tempfile.gettempdir(), "foo.cut"),
+            use_reweighting=False, evaluation_workers=4)
+        self.nsgaii.measured_espe = [(1.0, 1.0), (1.025, 1.0)]
+        # Solutions differ by the concentration of the box
+        self.solutions = [
+            [0.0, c, 50.0, 0.0, 100.0] for c in (1.0, 0.75, 0.5, 0.25)
+        ]
+        self.recoil_files = []
+        self.threads = set()
+        self.lock = threading.Lock()
+
+    def calculate_espe(self, recoil, recoil_file=None, **kwargs):
+        with self.lock:
+            self.recoil_files.append(recoil_file)
+            self.threads.add(threading.get_ident())
+        time.sleep(0.05)
+        c = recoil.get_points()[0].get_y()
+        return [(1.0, c), (1.025, c)], None
+
+    def test_solutions_are_evaluated_in_order(self):
+        with patch("modules.element_simulation.ElementSimulation."
+                   "calculate_espe", side_effect=self.calculate_espe):
+            pop = self.nsgaii.evaluate_solutions(self.solutions)
+
+        self.assertEqual(
+            [0, 0.5, 1.0, 1.5],
+            [obj.sum_distance for obj in pop.objective_values])
+        self.assertEqual(4, len(self.recoil_files))
+        # Without reweighting, each recoil is written to its own file
+        self.assertEqual(4, len(set(self.recoil_files)))
+        self.assertGreater(len(self.threads), 1)
+        for file in self.recoil_files:
+            self.assertFalse(file.parent.exists())
+
+    def test_cancelled_solutions_are_not_evaluated(self):
+        ct = CancellationToken()
+
+        def calculate_espe(*args, **kwargs):
+            ct.request_cancellation()
+            return self.calculate_espe(*args, **kwargs)
+
+        self.nsgaii.evaluation_workers = 1
+        with patch("modules.element_simulation.ElementSimulation."
+                   "calculate_espe", side_effect=calculate_espe):
+            pop = self.nsgaii.evaluate_solutions(
+                self.solutions, cancellation_token=ct)
+
+        self.assertEqual(1, len(self.recoil_files))
+        self.assertEqual(0, pop.objective_values[0].sum_distance)
+        for obj in pop.objective_values[1:]:
+            self.assertEqual(float("inf"), obj.sum_distance)
+
+
+class TestEvaluationCache(unittest.TestCase):
+    def setUp(self):
+        self.elem_sim = mo.get_element_simulation()
+        self.measured_espe = [(1.0, 1.0), (1.025, 1.0)]
+        self.espe_calls = 0
+
+    def get_nsgaii(self, optimization_type):
+        nsgaii = Nsgaii(
+            gen=1, element_simulation=self.elem_sim, pop_size=4, sol_size=5,
+            optimization_type=optimization_type,
+            cut_file=Path(tempfile.gettempdir(), "foo.cut"),
+            use_reweighting=False, evaluation_workers=1)
+        nsgaii.measured_espe = self.measured_espe
+        return nsgaii
+
+    def calculate_espe(self, recoil, **kwargs):
+        self.espe_calls += 1
+        if kwargs.get("fluence") is not None:
+            return [(1.0, 1.0), (1.025, 1.0)], None
+        c = recoil.get_points()[0].get_y()
+        return [(1.0, c), (1.025, c)], None
+
+    def test_duplicate_recoils_are_evaluated_once(self):
+        nsgaii = self.get_nsgaii(OptimizationType.RECOIL)
+        sols = [
+            [0.0, 1.0, 50.0, 0.0, 100.0],
+            [0.0, 0.5, 50.0, 0.0, 100.0],
+            [0.0, 1.0, 50.0, 0.0, 100.0],
+            # Same recoil as the first one as x coordinates are sorted
+            [0.0, 1.0, 100.0, 0.0, 50.0],
+        ]
+        with patch("modules.element_simulation.ElementSimulation."
+                   "calculate_espe", side_effect=self.calculate_espe):
+            pop = nsgaii.evaluate_solutions(sols)
+            self.assertEqual(2, self.espe_calls)
+            self.assertEqual((2, 2), (nsgaii.cache_hits, nsgaii.cache_misses))
+            self.assertEqual(
+                [0, 1.0, 0, 0],
+                [obj.sum_distance for obj in pop.objective_values])
+            self.assertEqual(4, len(self.elem_sim.optimization_recoils))
+
+            pop = nsgaii.evaluate_solutions(
+                [sols[1], [0.0, 0.25, 50.0, 0.0, 100.0]])
+            self.assertEqual(3, self.espe_calls)
+            self.assertEqual((3, 3), (nsgaii.cache_hits, nsgaii.cache_misses))
+            self.assertEqual(
+                [1.0, 1.5],
+                [obj.sum_distance for obj in pop.objective_values])
+
+    def test_duplicate_fluences_are_evaluated_once(self):
+        nsgaii = self.get_nsgaii(OptimizationType.FLUENCE)
+        with patch("modules.element_simulation.ElementSimulation."
+                   "calculate_espe", side_effect=self.calculate_espe):
+            nsgaii.evaluate_solutions([[1.0e12], [1.00001e12], [2.0e12]])
+            self.assertEqual(1, self.espe_calls)
+            self.assertEqual((1, 2), (nsgaii.cache_hits, nsgaii.cache_misses))
+
+            # Nothing new to evaluate so get_espe is not run
+            nsgaii.evaluate_solutions([[2.0e12]])
+            self.assertEqual(1, self.espe_calls)
+            self.assertEqual((2, 2), (nsgaii.cache_hits, nsgaii.cache_misses))
+
+    def test_cancelled_evaluations_are_not_cached(self):
+        nsgaii = self.get_nsgaii(OptimizationType.RECOIL)
+        sols = [[0.0, 1.0, 50.0, 0.0, 100.0]]
+        ct = CancellationToken()
+        ct.request_cancellation()
+        with patch("modules.element_simulation.ElementSimulation."
+                   "calculate_espe", side_effect=self.calculate_espe):
+            pop = nsgaii.evaluate_solutions(sols, cancellation_token=ct)
+            self.assertEqual(float("inf"), pop.objective_values[0].area)
+
+            pop = nsgaii.evaluate_solutions(sols)
+            self.assertEqual(0, pop.objective_values[0].area)
+            self.assertEqual(1, self.espe_calls)
+
+
+class OptimizationTestCase(unittest.TestCase):
+    """Base class for tests that run a fluence optimization without
+    simulating anything.
+    """
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.directory = Path(self.tmp_dir.name)
+        self.elem_sim = ElementSimulation(
+            self.directory, mo.get_request(), [mo.get_recoil_element()],
+            save_on_creation=False)
+        spectra_dir = self.directory / "espe"
+        spectra_dir.mkdir()
+        with (spectra_dir / "foo.no_foil.hist").open("w") as file:
+            file.write("1.0 5.0\n1.025 10.0\n1.05 5.0\n")
+        self.measurement = Mock()
+        self.measurement.get_energy_spectra_dir.return_value = spectra_dir
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def get_nsgaii(self, gen=5, skip_simulation=True, **kwargs):
+        return Nsgaii(
+            gen=gen, element_simulation=self.elem_sim, pop_size=6, sol_size=1,
+            upper_limits=1.0e13, lower_limits=0.0,
+            optimization_type=OptimizationType.FLUENCE,
+            measurement=self.measurement,
+            cut_file=self.directory / "foo.cut",
+            skip_simulation=skip_simulation, **kwargs)
+
+    def run_optimization(self, nsgaii, **kwargs):
+        def calculate_espe(*_, **__):
+            return [(1.0, 5.0e-12), (1.025, 1.0e-11), (1.05, 5.0e-12)], None
+
+        with patch("modules.nsgaii.EnergySpectrum."
+                   "calculate_measured_spectra"), \
+                patch("modules.element_simulation.ElementSimulation."
+                      "optimization_results_to_file"), \
+                patch("modules.element_simulation.ElementSimulation."
+                      "calculate_espe", side_effect=calculate_espe) as mock:
+            nsgaii.start_optimization(**kwargs)
+        return mock.call_count
+
+
+class TestCheckpoint(OptimizationTestCase):
+    def test_save_and_load(self):
+        np.random.seed(1)
+        checkpoint = Checkpoint(
+            optimization_type=OptimizationType.RECOIL,
+            solutions=np.array([[0.0, 1.0], [0.5, 0.5], [1.0, 0.0]]),
+            objective_values=np.array([[1, 2], [3, 4], [2, 1]]),
+            front_no=np.array([1, 2, 1]),
+            crowd_dis=np.array([np.inf, 0.5, np.inf]),
+            evaluations_left=100,
+            rng_state=np.random.get_state())
+        expected_random = np.random.random(5)
+
+        file = self.directory / "foo.checkpoint.npz"
+        save_checkpoint(file, checkpoint)
+        loaded = load_checkpoint(file)
+
+        self.assertIs(OptimizationType.RECOIL, loaded.optimization_type)
+        self.assertEqual(100, loaded.evaluations_left)
+        np.testing.assert_array_equal(
+            checkpoint.objective_values, loaded.objective_values)
+        np.testing.assert_array_equal(
+            checkpoint.crowd_dis, loaded.crowd_dis)
+        np.testing.assert_array_equal(
+            [[0.0, 1.0], [1.0, 0.0]], loaded.get_pareto_front())
+
+        np.random.set_state(loaded.rng_state)
+        np.testing.assert_array_equal(
+            expected_random, np.random.random(5))
+        self.assertEqual([file], list(self.directory.glob("*.npz")))
+
+    def test_invalid_checkpoint(self):
+        file = self.directory / "foo.checkpoint.npz"
+        np.savez(file, solutions=np.zeros(2))
+        self.assertRaises(ValueError, lambda: load_checkpoint(file))
+        self.assertRaises(OSError, lambda: load_checkpoint(
+            self.directory / "bar.checkpoint.npz"))
+
+    def test_resumed_optimization_matches_uninterrupted(self):
+        np.random.seed(2)
+        nsgaii = self.get_nsgaii()
+        self.run_optimization(nsgaii)
+        expected = nsgaii.population
+        finished = nsgaii.load_checkpoint()
+        self.assertEqual(0, finished.evaluations_left)
+
+        # Interrupt the same optimization during the fourth evaluation.
+        # Last checkpoint is then written after the second generation.
+        np.random.seed(2)
+        ct = CancellationToken()
+        nsgaii = self.get_nsgaii()
+        calls = 0
+
+        def calculate_espe(*_, **__):
+            nonlocal calls
+            calls += 1
+            if calls == 4:
+                ct.request_cancellation()
+            return [(1.0, 5.0e-12), (1.025, 1.0e-11), (1.05, 5.0e-12)], None
+
+        with patch("modules.nsgaii.EnergySpectrum."
+                   "calculate_measured_spectra"), \
+                patch("modules.element_simulation.ElementSimulation."
+                      "optimization_results_to_file"), \
+                patch("modules.element_simulation.ElementSimulation."
+                      "calculate_espe", side_effect=calculate_espe):
+            nsgaii.start_optimization(cancellation_token=ct)
+
+        checkpoint = nsgaii.load_checkpoint()
+        self.assertEqual(3 * 6, checkpoint.evaluations_left)
+
+        np.random.seed(3)
+        nsgaii = self.get_nsgaii()
+        # Initial population is not evaluated again
+        self.assertEqual(3, self.run_optimization(
+            nsgaii, checkpoint=checkpoint))
+        np.testing.assert_array_equal(expected[0], nsgaii.population[0])
+        np.testing.assert_array_equal(expected[1], nsgaii.population[1])
+
+    def test_checkpoint_is_evaluated_again_after_simulation(self):
+        nsgaii = self.get_nsgaii(gen=1)
+        self.run_optimization(nsgaii)
+        checkpoint = nsgaii.load_checkpoint()._replace(
+            evaluations_left=6,
+            objective_values=np.zeros_like(nsgaii.population[1]))
+
+        # The optimization's events no longer exist, so they are simulated
+        # again and the restored objective values are out of date.
+        nsgaii = self.get_nsgaii(gen=2, skip_simulation=False)
+        with patch("modules.nsgaii.Nsgaii.has_simulated_events",
+                   return_value=False), \
+                patch("modules.element_simulation.ElementSimulation.start",
+                      return_value=rx.empty()), \
+                patch("modules.element_simulation.ElementSimulation."
+                      "_clean_up"), \
+                patch("modules.nsgaii.rx.merge",
+                      return_value=rx.of({MCERD.IS_RUNNING: False})), \
+                patch("modules.nsgaii.Nsgaii.evaluate_solutions",
+                      side_effect=nsgaii.evaluate_solutions) as mock:
+            self.run_optimization(nsgaii, checkpoint=checkpoint)
+        # Restored population and one generation of offspring
+        self.assertEqual(2, mock.call_count)
+        np.testing.assert_array_equal(
+            checkpoint.solutions, mock.call_args_list[0][0][0])
+        self.assertFalse(np.any(nsgaii.population[1] == 0))
+        self.assertEqual(0, nsgaii.load_checkpoint().evaluations_left)
+
+    def test_incompatible_checkpoint(self):
+        nsgaii = self.get_nsgaii(gen=1)
+        self.run_optimization(nsgaii)
+        nsgaii = Nsgaii(
+            gen=1, element_simulation=self.elem_sim, pop_size=4, sol_size=1,
+            optimization_type=OptimizationType.FLUENCE,
+            cut_file=self.directory / "foo.cut")
+        self.assertRaises(ValueError, nsgaii.load_checkpoint)
+
+    def test_pareto_front_as_starting_solutions(self):
+        nsgaii = self.get_nsgaii(gen=1)
+        self.run_optimization(nsgaii)
+        front = nsgaii.load_checkpoint().get_pareto_front()
+
+        nsgaii = self.get_nsgaii(gen=1)
+        with patch("modules.nsgaii.Nsgaii.evaluate_solutions",
+                   side_effect=nsgaii.evaluate_solutions) as mock:
+            self.run_optimization(nsgaii, starting_solutions=front)
+        initial_pop = mock.call_args_list[0][0][0]
+        self.assertEqual((6, 1), initial_pop.shape)
+        for sol in front:
+            self.assertIn(sol, initial_pop)
+
+
+
+class TestIslands(OptimizationTestCase):
+    def test_migration(self):
+        nsgaii = self.get_nsgaii(islands=3, migration_size=1)
+        nsgaii.pop_size = 3
+        solutions = np.arange(9, dtype=float).reshape(9, 1)
+        objective_values = np.array([
+            [1, 1], [2, 2], [3, 3],
+            [5, 5], [4, 4], [6, 6],
+            [9, 9], [8, 8], [7, 7],
+        ], dtype=float)
+        front_no, crowd_dis = nsgaii.sort_islands(objective_values)
+        np.testing.assert_array_equal([1, 2, 3, 2, 1, 3, 3, 2, 1], front_no)
+
+        front_no, crowd_dis = nsgaii.migrate(
+            solutions, objective_values, front_no, crowd_dis)
+
+        # Best solution of each island replaces the worst solution of the
+        # next island
+        np.testing.assert_array_equal(
+            [0, 1, 8, 3, 4, 0, 4, 7, 8], solutions[:, 0])
+        np.testing.assert_array_equal(
+            [[1, 1], [2, 2], [7, 7], [5, 5], [4, 4], [1, 1], [4, 4], [8, 8],
+             [7, 7]], objective_values)
+        np.testing.assert_array_equal([1, 2, 3, 3, 2, 1, 1, 3, 2], front_no)
+        self.assertEqual(9, len(crowd_dis))
+
+    def test_islands_are_evaluated_together(self):
+        nsgaii = self.get_nsgaii(gen=4, islands=3, migration_interval=2)
+        self.assertEqual(4 * 6 * 3, nsgaii.evaluations)
+
+        # Initial population and each generation of all islands are
+        # evaluated in one batch
+        with patch("modules.nsgaii.Nsgaii.evaluate_solutions",
+                   side_effect=nsgaii.evaluate_solutions) as mock:
+            self.run_optimization(nsgaii)
+        self.assertEqual(5, mock.call_count)
+        for call in mock.call_args_list:
+            self.assertEqual((18, 1), np.shape(call[0][0]))
+
+        self.assertEqual((18, 1), nsgaii.population[0].shape)
+        self.assertEqual((18, 2), nsgaii.population[1].shape)
+        self.assertIsNotNone(self.elem_sim.optimized_fluence)
+
+        checkpoint = nsgaii.load_checkpoint()
+        self.assertEqual(0, checkpoint.evaluations_left)
+        self.assertEqual(18, len(checkpoint.front_no))
+
+        self.assertRaises(
+            ValueError, self.get_nsgaii(islands=2).load_checkpoint)
+
+
+class TestStartOptimization(OptimizationTestCase):
+    def test_clean_up_after_error(self):
+        nsgaii = self.get_nsgaii()
+        temp_file = self.directory / "foo-opt.recoil"
+        temp_file.write_text("")
+        ct = CancellationToken()
+        with patch("modules.nsgaii.Nsgaii.variation",
+                   side_effect=RuntimeError):
+            self.assertRaises(
+                RuntimeError, self.run_optimization, nsgaii,
+                cancellation_token=ct)
+        self.assertTrue(ct.is_cancellation_requested())
+        self.assertFalse(temp_file.exists())
+
+
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,113 @@
+# coding=utf-8
+"""
+Created on 18.10.2026
+
+Potku is a graphical user interface for analyzation and
+visualization of measurement data collected from a ToF-ERD
+telescope. For physics calculations Potku uses external
+analyzation components.
+Copyright (C) 2026 Potku developers
+
+This program is free software; you can redistribute it and/or
+modify it under the terms of the GNU General Public License
+as published by the Free Software Foundation; either version 2
+of the License, or (at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program (file named 'LICENCE').
+"""
+__author__ = "Potku developers"
+__version__ = "2.0"
+
+import copy
+import math
+import random
+import unittest
+
+import modules.general_functions as gf
+import modules.math_functions as mf
+import modules.objectives as objectives
+
+
+def get_random_espe(ch, offset=0.0):
+    start = random.randint(0, 100)
+    return [
+        (round((start + i + offset) * ch, 4),
+         random.choice([0.0, random.uniform(0, 100)]))
+        for i in range(random.randint(2, 40))
+    ]
+
+
+class TestAlignSpectra(unittest.TestCase):
+    def test_spectra_are_padded_with_zeros(self):
+        espe1 = [(1.0, 1.0), (1.025, 2.0)]
+        espe2 = [(0.975, 3.0), (1.0, 4.0), (1.025, 5.0), (1.05, 6.0)]
+        x1, y1, x2, y2 = objectives.align_spectra(espe1, espe2, 0.025)
+        self.assertEqual([0.975, 1.0, 1.025, 1.05], list(x1))
+        self.assertEqual([0.0, 1.0, 2.0, 0.0], list(y1))
+        self.assertEqual([0.975, 1.0, 1.025, 1.05], list(x2))
+        self.assertEqual([3.0, 4.0, 5.0, 6.0], list(y2))
+
+        # Original spectra are not modified
+        self.assertEqual([(1.0, 1.0), (1.025, 2.0)], espe1)
+
+    def test_matches_uniform_espe_lists(self):
+        random.seed(7)
+        for _ in range(200):
+            ch = random.choice([0.01, 0.025, 0.1])
+            espe1 = get_random_espe(ch)
+            espe2 = get_random_espe(ch, offset=random.choice([0, 0.5]))
+            u1, u2 = gf.uniform_espe_lists(
+                copy.deepcopy(espe1), copy.deepcopy(espe2), channel_width=ch)
+            x1, y1, x2, y2 = objectives.align_spectra(espe1, espe2, ch)
+            self.assertEqual(u1, list(zip(x1, y1)))
+            self.assertEqual(u2, list(zip(x2, y2)))
+
+
+class TestObjectiveValues(unittest.TestCase):
+    def test_empty_spectrum_has_infinite_values(self):
+        self.assertEqual(
+            (math.inf, math.inf),
+            objectives.get_objective_values([], [(1.0, 1.0), (1.1, 1.0)]))
+
+    def test_objective_values(self):
+        espe = [(1.0, 0.0), (1.1, 2.0), (1.2, 0.0)]
+        measured = [(1.0, 0.0), (1.1, 0.0), (1.2, 0.0)]
+        values = objectives.get_objective_values(espe, measured, 0.1)
+        self.assertAlmostEqual(0.2, values.area)
+        self.assertAlmostEqual(2.0, values.sum_distance)
+
+    def test_matches_polygon_area(self):
+        random.seed(11)
+        for _ in range(200):
+            ch = random.choice([0.01, 0.025, 0.1])
+            espe1 = get_random_espe(ch)
+            espe2 = get_random_espe(ch, offset=random.choice([0, 0.5]))
+            u1, u2 = gf.uniform_espe_lists(
+                copy.deepcopy(espe1), copy.deepcopy(espe2), channel_width=ch)
+            values = objectives.get_objective_values(espe1, espe2, ch)
+            self.assertAlmostEqual(
+                mf.calculate_area(u1, u2), values.area, places=6)
+            self.assertAlmostEqual(
+                sum(abs(p1[1] - p2[1]) for p1, p2 in zip(u1, u2)),
+                values.sum_distance, places=6)
+
+
+class TestCalculateChange(unittest.TestCase):
+    def test_calculate_change(self):
+        self.assertEqual(math.inf, objectives.calculate_change([], [], 0.1))
+        self.assertEqual(math.inf, objectives.calculate_change(
+            [(1.0, 0.0)], [(1.0, 0.0), (1.1, 0.0)], 0.1))
+        # Channels that are empty in both spectra are ignored
+        self.assertAlmostEqual(1.5, objectives.calculate_change(
+            [(1.0, 1.0), (1.1, 0.0), (1.2, 3.0)],
+            [(1.1, 0.0), (1.2, 1.0), (1.3, 0.0)], 0.1))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,203 @@
+# coding=utf-8
+"""
+Created on 18.10.2026
+
+Potku is a graphical user interface for analyzation and
+visualization of measurement data collected from a ToF-ERD
+telescope. For physics calculations Potku uses external
+analyzation components.
+Copyright (C) 2026 Potku developers
+
+This program is free software; you can redistribute it and/or
+modify it under the terms of the GNU General Public License
+as published by the Free Software Foundation; either version 2
+of the License, or (at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program (file named 'LICENCE').
+"""
+__author__ = "Potku developers"
+__version__ = "2.0"
+
+import json
+import os
+import tempfile
+import time
+import unittest
+
+import modules.general_functions as gf
+import modules.persistence as persistence
+import tests.mock_objects as mo
+
+from modules.persistence import Persistence
+from modules.target import Target
+
+from pathlib import Path
+from unittest.mock import patch
+
+
+class TestContentHash(unittest.TestCase):
+    def test_modification_times_are_ignored(self):
+        obj1 = {
+            "name": "foo",
+            "general": {"modification_time_unix": 1, "description": ""},
+            "layers": [{"modification_time": "a", "density": 1.0}],
+        }
+        obj2 = {
+            "layers": [{"modification_time": "b", "density": 1.0}],
+            "general": {"description": "", "modification_time_unix": 2},
+            "name": "foo",
+        }
+        self.assertEqual(
+            persistence.content_hash(obj1), persistence.content_hash(obj2))
+        obj2["layers"][0]["density"] = 2.0
+        self.assertNotEqual(
+            persistence.content_hash(obj1), persistence.content_hash(obj2))
+
+
+class TestPersistence(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.directory = Path(self.tmp_dir.name)
+        self.file = self.directory / "foo.json"
+        self.persistence = Persistence()
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_write_json(self):
+        obj = {"a": [1, 2], "modification_time_unix": 1}
+        self.assertTrue(self.persistence.write_json(self.file, obj))
+        self.assertEqual(json.dumps(obj, indent=4), self.file.read_text())
+        self.assertEqual(["foo.json"], os.listdir(self.directory))
+
+    def test_unchanged_content_is_not_written(self):
+        self.persistence.write_json(self.file, {"a": 1})
+        with patch("modules.persistence.write_atomically") as mock_write:
+            self.assertFalse(self.persistence.write_json(
+                self.file, {"a": 1, "modification_time_unix": 2}))
+            mock_write.assert_not_called()
+
+            self.assertTrue(self.persistence.write_json(self.file, {"a": 2}))
+            mock_write.assert_called_once()
+
+    def test_modified_file_is_written(self):
+        self.persistence.write_text(self.file, "foo")
+        self.file.write_text("bar, baz")
+        self.assertTrue(self.persistence.write_text(self.file, "foo"))
+        self.assertEqual("foo", self.file.read_text())
+
+        self.file.unlink()
+        self.assertTrue(self.persistence.write_text(self.file, "foo"))
+        self.assertEqual("foo", self.file.read_text())
+
+    def test_failed_write_keeps_old_file(self):
+        self.file.write_text("foo")
+        with self.assertRaises(TypeError):
+            persistence.write_atomically(self.file, None)
+        self.assertEqual("foo", self.file.read_text())
+        self.assertEqual(["foo.json"], os.listdir(self.directory))
+
+    def test_delayed_writes_are_coalesced(self):
+        with patch("modules.persistence.write_atomically") as mock_write:
+            for i in range(5):
+                self.persistence.write_text(self.file, str(i), delay=60)
+            self.assertTrue(self.persistence.is_pending(self.file))
+            mock_write.assert_not_called()
+            self.persistence.flush()
+            mock_write.assert_called_once_with(self.file.absolute(), "4")
+        self.assertFalse(self.persistence.is_pending(self.file))
+
+    def test_delayed_write_is_written_by_thread(self):
+        self.persistence.write_text(self.file, "foo", delay=0.01)
+        for _ in range(500):
+            if not self.persistence.is_pending(self.file):
+                break
+            time.sleep(0.01)
+        self.assertEqual("foo", self.file.read_text())
+
+    def test_immediate_write_replaces_delayed_write(self):
+        self.persistence.write_text(self.file, "foo", delay=60)
+        self.persistence.write_text(self.file, "bar")
+        self.assertFalse(self.persistence.is_pending(self.file))
+        self.persistence.flush()
+        self.assertEqual("bar", self.file.read_text())
+
+    def test_delayed_write_of_same_content_stays_pending(self):
+        self.persistence.write_text(self.file, "foo")
+        self.persistence.write_text(self.file, "bar", delay=60)
+        self.assertTrue(self.persistence.write_text(
+            self.file, "bar", delay=60))
+        self.assertTrue(self.persistence.is_pending(self.file))
+        self.assertEqual("foo", self.file.read_text())
+        self.persistence.flush()
+        self.assertEqual("bar", self.file.read_text())
+
+    def test_immediate_write_of_pending_content_is_written(self):
+        self.persistence.write_text(self.file, "foo")
+        self.persistence.write_text(self.file, "bar", delay=60)
+        self.assertTrue(self.persistence.write_text(self.file, "bar"))
+        self.assertFalse(self.persistence.is_pending(self.file))
+        self.assertEqual("bar", self.file.read_text())
+
+    def test_write_of_content_on_disk_cancels_pending_write(self):
+        self.persistence.write_text(self.file, "foo")
+        self.persistence.write_text(self.file, "bar", delay=60)
+        self.assertFalse(self.persistence.write_text(self.file, "foo"))
+        self.assertFalse(self.persistence.is_pending(self.file))
+        self.persistence.flush()
+        self.assertEqual("foo", self.file.read_text())
+
+    def test_read_returns_pending_content(self):
+        self.persistence.write_json(self.file, {"a": 1})
+        self.persistence.write_json(self.file, {"a": 2}, delay=60)
+        self.assertEqual({"a": 2}, self.persistence.read_json(self.file))
+        self.persistence.cancel(self.file)
+        self.assertEqual({"a": 1}, self.persistence.read_json(self.file))
+
+        self.file.unlink()
+        self.assertRaises(OSError, self.persistence.read_text, self.file)
+
+    def test_cancel(self):
+        self.persistence.write_text(self.file, "foo", delay=60)
+        self.persistence.cancel(self.file)
+        self.persistence.flush()
+        self.assertFalse(self.file.exists())
+
+    def test_to_file_skips_unchanged_target(self):
+        target = Target(name="foo")
+        target.to_file(self.file)
+        mtime_ns = os.stat(self.file).st_mtime_ns
+        target.to_file(self.file)
+        self.assertEqual(mtime_ns, os.stat(self.file).st_mtime_ns)
+
+        target.description = "bar"
+        target.to_file(self.file)
+        with self.file.open("r") as file:
+            self.assertEqual("bar", json.load(file)["description"])
+
+    def test_target_is_read_from_pending_write(self):
+        target = Target(name="foo")
+        target.to_file(self.file, delay=60)
+        try:
+            self.assertFalse(self.file.exists())
+            self.assertEqual(
+                "foo", Target.from_file(self.file, mo.get_request()).name)
+        finally:
+            persistence.cancel(self.file)
+
+    def test_removed_file_is_not_written(self):
+        persistence.write_text(self.file, "foo", delay=60)
+        gf.remove_files(self.file)
+        self.assertFalse(persistence.get_persistence().is_pending(self.file))
+        persistence.flush()
+        self.assertFalse(self.file.exists())
+
+
+if __name__ == '__main__':
+    unittest.main()
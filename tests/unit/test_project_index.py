@@ -0,0 +1,151 @@
+# coding=utf-8
+"""
+Created on 18.10.2026
+
+Potku is a graphical user interface for analyzation and
+visualization of measurement data collected from a ToF-ERD
+telescope. For physics calculations Potku uses external
+analyzation components.
+Copyright (C) 2026 Potku developers
+
+This program is free software; you can redistribute it and/or
+modify it under the terms of the GNU General Public License
+as published by the Free Software Foundation; either version 2
+of the License, or (at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program (file named 'LICENCE').
+"""
+__author__ = "Potku developers"
+__version__ = "2.0"
+
+import os
+import tempfile
+import unittest
+
+import modules.general_functions as gf
+
+from modules.project_index import ProjectIndex
+
+from pathlib import Path
+from unittest.mock import patch
+
+
+def set_mtime(path: Path, seconds_ago: float):
+    """Sets the modification time of a path to the past so that the index
+    trusts it.
+    """
+    stat = os.stat(path)
+    mtime_ns = stat.st_mtime_ns - int(seconds_ago * 1e9)
+    os.utime(path, ns=(stat.st_atime_ns, mtime_ns))
+
+
+class TestProjectIndex(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.directory = Path(self.tmp_dir.name).resolve()
+        self.sample_dir = self.directory / "Sample_01-foo"
+        self.sample_dir.mkdir()
+        for name in ("b.measurement", "a.profile", "c.target"):
+            (self.sample_dir / name).write_text(name)
+        (self.sample_dir / "Detector").mkdir()
+        set_mtime(self.sample_dir, 10)
+        self.index = ProjectIndex(self.directory)
+
+    def tearDown(self):
+        self.index.close()
+        self.tmp_dir.cleanup()
+
+    def test_get_entries(self):
+        entries = self.index.get_entries(self.sample_dir)
+        self.assertEqual(
+            ["Detector", "a.profile", "b.measurement", "c.target"],
+            [entry.name for entry in entries])
+        self.assertEqual(
+            [True, False, False, False], [entry.is_dir for entry in entries])
+        self.assertEqual(len("a.profile"), entries[1].size)
+        self.assertTrue(self.index.file.exists())
+
+        self.assertEqual(
+            gf.find_files_by_extension(
+                self.sample_dir, ".profile", ".target", ".detector"),
+            gf.find_files_by_extension(
+                self.sample_dir, ".profile", ".target", ".detector",
+                index=self.index))
+
+        with self.assertRaises(OSError):
+            self.index.get_entries(self.directory / "foo")
+
+    def test_unchanged_directories_are_not_listed(self):
+        self.index.get_entries(self.sample_dir)
+        self.index.close()
+
+        # A new index reads the listing from the database
+        index = ProjectIndex(self.directory)
+        with patch("modules.project_index._list_directory") as mock_list:
+            self.assertEqual(
+                ["Detector", "a.profile", "b.measurement", "c.target"],
+                index.list_dir(self.sample_dir))
+            mock_list.assert_not_called()
+        index.close()
+
+    def test_changed_directories_are_listed_again(self):
+        self.index.get_entries(self.sample_dir)
+        (self.sample_dir / "a.profile").unlink()
+        (self.sample_dir / "d.profile").write_text("")
+        self.assertEqual(
+            ["Detector", "b.measurement", "c.target", "d.profile"],
+            self.index.list_dir(self.sample_dir))
+
+        # Recently modified directories are listed again even if their
+        # modification time stays the same
+        (self.sample_dir / "e.profile").write_text("")
+        self.assertIn("e.profile", self.index.list_dir(self.sample_dir))
+        stat = os.stat(self.sample_dir)
+        (self.sample_dir / "e.profile").unlink()
+        os.utime(self.sample_dir, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+        self.assertNotIn("e.profile", self.index.list_dir(self.sample_dir))
+
+    def test_directories_outside_of_root(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            Path(tmp_dir, "foo.erd").write_text("")
+            self.assertEqual(["foo.erd"], self.index.list_dir(Path(tmp_dir)))
+            self.assertEqual({}, self.index._get_listings())
+
+    def test_invalid_database(self):
+        self.index.close()
+        self.index.file.write_text("not a database")
+        index = ProjectIndex(self.directory)
+        self.assertEqual(4, len(index.get_entries(self.sample_dir)))
+        index.close()
+
+        # Index works without the database
+        index = ProjectIndex(self.directory, file=self.directory / "x" / "y")
+        self.assertEqual(4, len(index.get_entries(self.sample_dir)))
+
+    def test_derived_files(self):
+        source = self.sample_dir / "b.measurement"
+        artifact = self.sample_dir / "foo.cut"
+        self.assertFalse(self.index.is_up_to_date(artifact))
+
+        artifact.write_text("cut")
+        self.index.record_derived(artifact, [source, None, Path("missing")])
+        self.assertEqual([source], self.index.get_sources(artifact))
+        self.assertTrue(self.index.is_up_to_date(artifact))
+
+        source.write_text("changed contents")
+        self.assertFalse(self.index.is_up_to_date(artifact))
+        self.index.record_derived(artifact, [source])
+        self.assertTrue(self.index.is_up_to_date(artifact))
+
+        artifact.unlink()
+        self.assertFalse(self.index.is_up_to_date(artifact))
+
+
+if __name__ == '__main__':
+    unittest.main()
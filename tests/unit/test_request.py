@@ -30,9 +30,16 @@ import os
 import tests.utils as utils
 import tests.mock_objects as mo
 
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
+from modules.element import Element
+from modules.measurement import Measurement
+from modules.point import Point
+from modules.project_index import ProjectIndex
+from modules.recoil_element import RecoilElement
 from modules.request import Request
+from modules.simulation import Simulation
 
 
 class TestInit(unittest.TestCase):
@@ -57,7 +64,8 @@ class TestInit(unittest.TestCase):
                 "errors.log": None
             },
             "request.log": None,
-            f"{self.folder_name}.request": None
+            f"{self.folder_name}.request": None,
+            ProjectIndex.FILE_NAME: None
         }
 
     def test_folder_structure(self):
@@ -80,6 +88,71 @@ class TestInit(unittest.TestCase):
             utils.disable_logging()
 
 
+class TestReadConcurrently(unittest.TestCase):
+    def test_read_measurements_and_simulations(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            path = Path(tmp_dir, "request").resolve()
+            request = Request(path, "foo", mo.get_global_settings(),
+                              save_on_creation=True, enable_logging=False)
+            sample = request.samples.add_sample(name="bar")
+            data_file = Path(tmp_dir, "data.asc")
+            data_file.write_text("1 2\n")
+            for i, name in enumerate(("mesu_a", "mesu_b")):
+                request.samples.measurements.add_measurement_file(
+                    sample, data_file, i, name, import_evnt_or_binary=False)
+            sim_dir = path / sample.directory / \
+                f"{Simulation.DIRECTORY_PREFIX}01-sim"
+            sim = request.samples.simulations.add_simulation_file(
+                sample, sim_dir / "sim.simulation", 2)
+            sim.add_element_simulation(RecoilElement(
+                Element.from_string("Fe"), [Point((1, 1))], name="rec"))
+            utils.disable_logging()
+
+            request = Request.from_file(
+                request.request_file, mo.get_global_settings())
+            for sample_path in request.get_samples_files():
+                request.samples.add_sample(sample_path=sample_path)
+            sample = request.samples.samples[0]
+
+            with ThreadPoolExecutor(2) as executor:
+                measurements = request.samples.read_measurements(executor)
+                simulations = request.samples.read_simulations(executor)
+
+                self.assertEqual(
+                    [sample, sample], [s for s, _, _ in measurements])
+                self.assertEqual(
+                    ["mesu_a.info", "mesu_b.info"],
+                    [file.name for _, file, _ in measurements])
+                read = [f.result() for _, _, f in measurements]
+                self.assertEqual(
+                    ["mesu_a", "mesu_b"], [m.name for m in read])
+                self.assertEqual([1, 2], [m.serial_number for m in read])
+                self.assertTrue(all(isinstance(m, Measurement) for m in read))
+
+                (_, sim_file, future), = simulations
+                self.assertEqual(sim_dir / "sim.simulation", sim_file)
+                sim = future.result()
+                self.assertEqual("sim", sim.name)
+                self.assertEqual(
+                    ["Fe-Default"],
+                    [e.get_full_name() for e in sim.element_simulations])
+
+            # Reading does not add the objects to the samples
+            self.assertTrue(request.samples.measurements.is_empty())
+            self.assertTrue(sample.simulations.is_empty())
+
+            request.samples.measurements.add_measurement(sample, read[1], 5)
+            request.samples.simulations.add_simulation(sample, sim, 6)
+            self.assertIs(read[1], sample.measurements.get_key_value(5))
+            self.assertIs(
+                read[1], request.samples.measurements.get_key_value(5))
+            self.assertEqual(5, read[1].tab_id)
+            self.assertIs(sim, sample.simulations.get_key_value(6))
+            self.assertEqual(6, sim.tab_id)
+
+            utils.disable_logging()
+
+
 class TestSerialization(unittest.TestCase):
     def test_serialization(self):
         with tempfile.TemporaryDirectory() as tmp_dir:
@@ -0,0 +1,300 @@
+# coding=utf-8
+"""
+Created on 18.10.2026
+
+Potku is a graphical user interface for analyzation and
+visualization of measurement data collected from a ToF-ERD
+telescope. For physics calculations Potku uses external
+analyzation components.
+Copyright (C) 2026 Potku developers
+
+This program is free software; you can redistribute it and/or
+modify it under the terms of the GNU General Public License
+as published by the Free Software Foundation; either version 2
+of the License, or (at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program (file named 'LICENCE').
+"""
+__author__ = "Potku developers"
+__version__ = "2.0"
+
+import platform
+import shutil
+import tempfile
+import unittest
+import tests.utils as utils
+import tests.mock_objects as mo
+
+import numpy as np
+import modules.file_paths as fp
+import modules.general_functions as gf
+import modules.reweighting as reweighting
+
+from modules.enums import OptimizationType
+from modules.get_espe import GetEspe
+from modules.nsgaii import Nsgaii
+from modules.reweighting import EspeReweighter
+from modules.reweighting import get_recoil_distribution
+
+from pathlib import Path
+from unittest.mock import patch
+
+resource_dir = utils.get_resource_dir()
+_RECOIL_FILE = resource_dir / "C-Default.recoil"
+_ERD_FILE = resource_dir / "C-Default.9997.erd"
+_EXPECTED_SPECTRUM_FILE = resource_dir / "C-Default-expected.simu"
+
+del resource_dir
+
+
+def get_espe_exists():
+    if platform.system() == "Windows":
+        return (gf.get_bin_dir() / "get_espe.exe").exists()
+    return (gf.get_bin_dir() / "get_espe").exists()
+
+
+def get_mean_energy(espe):
+    espe = np.array(espe)
+    return (espe[:, 0] * espe[:, 1]).sum() / espe[:, 1].sum()
+
+
+def get_ks_distance(espe1, espe2):
+    """Returns the largest difference between the normalized cumulative
+    intensities of two spectra.
+    """
+    grid = np.unique([x for x, _ in espe1] + [x for x, _ in espe2])
+    cumulative = []
+    for espe in espe1, espe2:
+        espe = np.array(espe)
+        values = np.cumsum(espe[:, 1]) / espe[:, 1].sum()
+        cumulative.append(
+            np.interp(grid, espe[:, 0], values, left=0, right=1))
+    return np.abs(cumulative[0] - cumulative[1]).max()
+
+
+class TestEspeReweighter(unittest.TestCase):
+    def setUp(self):
+        self.detector = mo.get_detector()
+        self.reweighter = EspeReweighter.from_erd_files(
+            [_ERD_FILE], toflen=self.detector.calculate_tof_length(),
+            timeres=self.detector.timeres, channel_width=0.025)
+        self.dist = EspeReweighter.parse_distribution(
+            _RECOIL_FILE.read_text().splitlines())
+        self.expected = GetEspe.read_espe_file(_EXPECTED_SPECTRUM_FILE)
+
+    def test_only_recoils_are_read(self):
+        self.assertEqual(12, len(self.reweighter.energies))
+        self.assertEqual(12, len(self.reweighter.depths))
+
+    def test_parse_distribution(self):
+        x, y = EspeReweighter.parse_distribution(
+            ["0.00 0.000001\n10.00 0.000001", "10.01 0.5", "11.0 0.0\n"])
+        np.testing.assert_array_equal([0, 10, 10.01, 11], x)
+        np.testing.assert_array_equal([0.000001, 0.000001, 0.5, 0], y)
+
+        x, y = EspeReweighter.parse_distribution([])
+        self.assertEqual(0, x.size)
+        self.assertEqual([], self.reweighter.calculate_espe(x, y))
+
+    def test_matches_get_espe_without_time_resolution(self):
+        """get_espe adds random noise to the time-of-flight of each event.
+        Without noise, the events fall into the same channels as in the
+        get_espe output, apart from one event that the noise has shifted
+        to the next channel.
+        """
+        self.reweighter.sigmas[:] = 0
+        self.assertTrue(self.reweighter.calibrate(self.expected, *self.dist))
+        espe = self.reweighter.calculate_espe(*self.dist)
+
+        self.assertEqual(
+            [x for x, _ in self.expected], [x for x, _ in espe])
+        differences = [
+            (x, y1, y2) for (x, y1), (_, y2) in zip(self.expected, espe)
+            if abs(y1 - y2) > 1e-3
+        ]
+        self.assertEqual([
+            (3.925, 0.0, 666.977),
+            (3.95, 666.977, 0.0),
+        ], [(x, y1, round(y2, 3)) for x, y1, y2 in differences])
+
+    def test_time_resolution_spreads_events(self):
+        self.assertTrue(self.reweighter.calibrate(self.expected, *self.dist))
+        espe = self.reweighter.calculate_espe(*self.dist)
+
+        self.assertAlmostEqual(
+            sum(y for _, y in self.expected), sum(y for _, y in espe), 6)
+        self.assertAlmostEqual(
+            get_mean_energy(self.expected), get_mean_energy(espe), 2)
+        self.assertGreater(
+            sum(1 for _, y in espe if y), sum(1 for _, y in self.expected if y))
+
+    def test_spectrum_is_linear_in_concentration(self):
+        self.reweighter.calibrate(self.expected, *self.dist)
+        x, y = self.dist
+        espe = self.reweighter.calculate_espe(x, y)
+        espe_half = self.reweighter.calculate_espe(x, y / 2)
+        for (x1, y1), (x2, y2) in zip(espe, espe_half):
+            self.assertEqual(x1, x2)
+            self.assertAlmostEqual(y1 / 2, y2)
+
+    def test_events_outside_distribution_are_left_out(self):
+        self.reweighter.sigmas[:] = 0
+        self.reweighter.calibrate(self.expected, *self.dist)
+        # Only the recoil from 1.0957 nm is inside the distribution
+        espe = self.reweighter.calculate_espe(
+            np.array([0.0, 10.0]), np.array([1.0, 1.0]))
+        self.assertEqual([
+            (4.05, 0.0), (4.075, 674.076), (4.1, 0.0)
+        ], [(x, round(y, 3)) for x, y in espe])
+
+    def test_events_with_huge_deviations_are_left_out(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            erd_file = Path(tmp_dir, "C-Default.9998.erd")
+            erd_file.write_text(
+                "R V R   1.8665   6  12.00   249.1059  1.6288824e+04    "
+                "111.529  -1.02   -3.77\n"
+                "R V R   1.8665   6  12.00   249.1059  1.6288824e+04    "
+                "0.050  -1.02   -3.77\n")
+            reweighter = EspeReweighter.from_erd_files(
+                [erd_file], toflen=self.detector.calculate_tof_length(),
+                timeres=self.detector.timeres, channel_width=0.025)
+        self.assertEqual(1, len(reweighter.energies))
+        self.assertEqual(1, len(reweighter.sigmas))
+
+    def test_events_are_spread_over_their_own_windows(self):
+        reweighter = EspeReweighter(
+            depths=[1.0, 2.0], weights=[1.0, 2.0], energies=[10.0, 20.0],
+            sigmas=[0.0025, 12.5], channel_width=0.025)
+        with patch("modules.reweighting._get_channel_probabilities",
+                   wraps=reweighting._get_channel_probabilities) as mock:
+            channels, values = reweighter.get_histogram(np.array([1.0, 2.0]))
+        self.assertEqual(
+            [(1, 5), (1, 4097)],
+            sorted(call[0][0].shape for call in mock.call_args_list))
+        self.assertAlmostEqual(3.0, values.sum(), 3)
+        self.assertEqual(len(channels), len(values))
+        self.assertAlmostEqual(1.0, values[channels == 400][0], 2)
+
+    def test_calibration_fails_without_events(self):
+        self.assertFalse(self.reweighter.calibrate([], *self.dist))
+        self.assertFalse(self.reweighter.calibrate(
+            self.expected, np.array([2000.0, 3000.0]), np.array([1.0, 1.0])))
+
+    def test_fidelity_against_recorded_get_espe_output(self):
+        """Compares the reweighted spectrum with the spectrum that get_espe
+        calculated for the same distribution and events. Calibration only
+        fixes the total intensity, so the shape of the spectrum must come
+        from the reweighting itself.
+        """
+        self.assertTrue(self.reweighter.calibrate(self.expected, *self.dist))
+        espe = self.reweighter.calculate_espe(*self.dist)
+
+        self.assertAlmostEqual(
+            get_mean_energy(self.expected), get_mean_energy(espe), 2)
+        self.assertLess(get_ks_distance(self.expected, espe), 0.05)
+
+        # Moving the whole distribution deeper than the events leaves the
+        # spectrum empty, as it does with get_espe
+        x, y = self.dist
+        deeper = self.reweighter.calculate_espe(x + 2000, y)
+        self.assertEqual(0, sum(y for _, y in deeper))
+
+    @unittest.skipUnless(get_espe_exists(), "get_espe is not available")
+    def test_regression_against_get_espe(self):
+        """Compares reweighted spectra with get_espe spectra calculated for
+        a distribution that differs from the calibration distribution.
+        """
+        beam, target = mo.get_beam(), mo.get_target()
+        kwargs = {
+            "beam": beam, "detector": self.detector, "target": target,
+            "erd_file": _ERD_FILE, "ch": 0.025, "fluence": 5.00e+11,
+            "reference_density": 4.98e22, "verbose": False
+        }
+        self.reweighter.calibrate(self.expected, *self.dist)
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            recoil_file = Path(tmp_dir, "C-Default.recoil")
+            recoil_file.write_text(
+                "0.00 1.0\n100.00 1.0\n100.01 0.25\n200.00 0.25\n"
+                "200.01 0.0\n200.02 0.0\n")
+            espe = GetEspe.calculate_simulated_spectrum(
+                recoil_file=recoil_file, **kwargs)
+            dist = EspeReweighter.parse_distribution(
+                recoil_file.read_text().splitlines())
+
+        reweighted = self.reweighter.calculate_espe(*dist)
+        self.assertAlmostEqual(
+            sum(y for _, y in espe) / sum(y for _, y in reweighted), 1, 3)
+        self.assertAlmostEqual(
+            get_mean_energy(espe), get_mean_energy(reweighted), 1)
+
+
+class TestNsgaiiReweighting(unittest.TestCase):
+    def setUp(self):
+        self.elem_sim = mo.get_element_simulation()
+        self.elem_sim.simulation = mo.get_simulation()
+        self.expected = GetEspe.read_espe_file(_EXPECTED_SPECTRUM_FILE)
+        self.solutions = [
+            [0.0, 1.0, 500.0, 0.0, 1090.0],
+            [0.0, 1.0, 100.0, 0.5, 200.0],
+            [0.0, 0.5, 100.0, 0.0, 200.0],
+        ]
+
+    def evaluate(self, tmp_dir, use_reweighting=True):
+        self.elem_sim.directory = Path(tmp_dir)
+        nsgaii = Nsgaii(
+            gen=1, element_simulation=self.elem_sim, pop_size=3, sol_size=5,
+            optimization_type=OptimizationType.RECOIL,
+            cut_file=Path(tmp_dir, "foo.cut"),
+            use_reweighting=use_reweighting)
+        nsgaii.measured_espe = list(self.expected)
+        erd_file = fp.get_erd_file_name(
+            self.elem_sim.get_main_recoil(), "combined",
+            optim_mode=OptimizationType.RECOIL)
+        shutil.copy(_ERD_FILE, Path(tmp_dir, erd_file))
+        with patch("modules.element_simulation.ElementSimulation."
+                   "calculate_espe",
+                   return_value=(self.expected, None)) as mock_calc:
+            pop = nsgaii.evaluate_solutions(self.solutions)
+        return nsgaii, pop, mock_calc
+
+    def test_get_espe_is_run_once(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            nsgaii, pop, mock_calc = self.evaluate(tmp_dir)
+
+        self.assertEqual(1, mock_calc.call_count)
+        self.assertIsNotNone(nsgaii._reweighter)
+        self.assertEqual(3, len(pop.objective_values))
+        # The calibration candidate is also scored with the reweighter
+        reweighted = nsgaii._reweighter.calculate_espe(
+            *get_recoil_distribution(nsgaii.form_recoil(self.solutions[0])))
+        self.assertEqual(
+            nsgaii.get_objective_values(reweighted), pop.objective_values[0])
+        self.assertNotEqual(
+            nsgaii.get_objective_values(self.expected),
+            pop.objective_values[0])
+        for obj in pop.objective_values[1:]:
+            self.assertGreater(obj.area, 0)
+            self.assertGreater(obj.sum_distance, 0)
+
+    def test_reweighting_is_not_used_by_default(self):
+        nsgaii = Nsgaii(
+            gen=1, element_simulation=self.elem_sim, pop_size=3, sol_size=5,
+            cut_file=Path("foo.cut"))
+        self.assertFalse(nsgaii.use_reweighting)
+
+    def test_get_espe_is_run_for_each_recoil_without_reweighting(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            nsgaii, _, mock_calc = self.evaluate(tmp_dir, use_reweighting=False)
+
+        self.assertEqual(3, mock_calc.call_count)
+        self.assertIsNone(nsgaii._reweighter)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,253 @@
+# coding=utf-8
+"""
+Created on 18.10.2026
+
+Potku is a graphical user interface for analyzation and
+visualization of measurement data collected from a ToF-ERD
+telescope. For physics calculations Potku uses external
+analyzation components.
+Copyright (C) 2026 Potku developers
+
+This program is free software; you can redistribute it and/or
+modify it under the terms of the GNU General Public License
+as published by the Free Software Foundation; either version 2
+of the License, or (at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program (file named 'LICENCE').
+"""
+__author__ = "Potku developers"
+__version__ = "2.0"
+
+import os
+import subprocess
+import sys
+import tempfile
+import time
+import unittest
+import tests.mock_objects as mo
+
+from modules.element_simulation import ElementSimulation
+from modules.spool import JobSpool
+from modules.spool import SpoolJob
+from modules.spool import run_worker
+
+from pathlib import Path
+from unittest.mock import patch
+
+# Stands in for MCERD. Checks that the input files exist, logs the seed
+# and writes one recoil event into the .erd file.
+_FAKE_MCERD = """
+import sys
+from pathlib import Path
+
+command_file = Path(sys.argv[-1])
+lines = dict(
+    line.split(": ", 1) for line in command_file.read_text().splitlines())
+for key in ("Target description file", "Detector description file",
+            "Recoiling material distribution"):
+    if not Path(lines[key]).is_file():
+        sys.exit(1)
+seed = lines["Seed number of the random number generator"]
+with open(sys.argv[1], "a") as log:
+    log.write(seed + "\\n")
+with open(f"{command_file}.{seed}.erd", "w") as erd:
+    erd.write(f"R V R 4.00 4.00 10.0 1.0 20.0 {seed}\\n")
+"""
+
+
+class TestSpool(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.directory = Path(self.tmp_dir.name)
+        request = mo.get_request()
+        self.elem_sim = ElementSimulation(
+            self.directory, request, [mo.get_recoil_element()],
+            simulation=mo.get_simulation(request), save_on_creation=False)
+        self.recoil = self.elem_sim.get_main_recoil()
+        self.spool = self.elem_sim.get_spool()
+
+        self.log_file = self.directory / "mcerd.log"
+        script = self.directory / "fake_mcerd.py"
+        script.write_text(_FAKE_MCERD)
+        self.command = sys.executable, str(script), str(self.log_file)
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def get_logged_seeds(self):
+        with self.log_file.open("r") as file:
+            return sorted(int(line) for line in file)
+
+    def test_spool_simulation(self):
+        jobs = self.elem_sim.spool_simulation(3, start_value=201)
+        self.assertEqual([
+            self.directory / "spool" / "pending" / f"He-Default.{s}.erd.json"
+            for s in (201, 202, 203)
+        ], jobs)
+        self.assertEqual(jobs, self.spool.get_jobs())
+        self.assertEqual(203, self.spool.get_max_seed(self.recoil))
+
+        job = SpoolJob.from_file(jobs[0])
+        self.assertEqual(201, job.seed)
+        self.assertEqual("He-Default.201.erd", job.result_file)
+        self.assertEqual(job.output_file, job.result_file)
+        self.assertIn(job.command_file, job.files)
+        self.assertNotIn(str(self.directory), "".join(job.files.values()))
+
+        # Seeds of new jobs continue from the seeds of existing jobs
+        jobs = self.elem_sim.spool_simulation(1, start_value=101)
+        self.assertEqual("He-Default.204.erd.json", jobs[0].name)
+
+    def test_claim(self):
+        self.elem_sim.spool_simulation(2)
+        first = self.spool.claim()
+        second = self.spool.claim()
+        self.assertEqual("He-Default.101.erd.json", first.name)
+        self.assertEqual("He-Default.102.erd.json", second.name)
+        self.assertEqual(self.directory / "spool" / "claimed", first.parent)
+        self.assertIsNone(self.spool.claim())
+        self.assertEqual([], self.spool.get_jobs())
+
+    def test_run_worker(self):
+        self.elem_sim.spool_simulation(2)
+        self.assertEqual(2, run_worker(
+            self.spool.directory, command=self.command))
+
+        self.assertEqual([101, 102], self.get_logged_seeds())
+        self.assertEqual(2, len(self.spool.get_jobs(JobSpool.DONE)))
+        self.assertEqual([], self.spool.get_jobs(JobSpool.FAILED))
+        self.assertEqual(
+            ["He-Default.101.erd", "He-Default.102.erd"],
+            sorted(f.name for f in self.directory.glob("*.erd")))
+
+        # Results are picked up by the ElementSimulation
+        self.assertEqual(0, self.elem_sim.get_atom_count())
+        self.assertEqual(2, self.elem_sim.collect_spooled_results())
+        self.assertEqual(0, self.elem_sim.collect_spooled_results())
+        self.assertEqual(2, self.elem_sim.get_atom_count())
+        self.assertEqual(102, self.elem_sim.get_max_seed())
+
+    def test_failed_job(self):
+        self.elem_sim.spool_simulation(1)
+        self.assertEqual(1, run_worker(
+            self.spool.directory, command=(sys.executable, "-c", "exit(3)")))
+        self.assertEqual(1, len(self.spool.get_jobs(JobSpool.FAILED)))
+        self.assertEqual([], list(self.directory.glob("*.erd")))
+
+    def test_several_workers(self):
+        self.elem_sim.spool_simulation(12)
+        workers = [
+            subprocess.Popen(
+                [sys.executable, "-m", "modules.spool",
+                 str(self.spool.directory), "--mcerd", *self.command],
+                cwd=Path(__file__).parents[2],
+                stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+            for _ in range(3)
+        ]
+        for worker in workers:
+            self.assertEqual(0, worker.wait(timeout=60))
+
+        # Each job has been run exactly once
+        self.assertEqual(list(range(101, 113)), self.get_logged_seeds())
+        self.assertEqual(12, len(self.spool.get_jobs(JobSpool.DONE)))
+        self.assertEqual(12, self.elem_sim.get_current_status()[
+            ElementSimulation.ATOMS])
+
+    def test_results_are_collected_while_jobs_are_unfinished(self):
+        with patch.object(ElementSimulation, "collect_spooled_results",
+                          return_value=0) as mock:
+            self.elem_sim.get_current_status()
+            mock.assert_not_called()
+
+            self.elem_sim.spool_simulation(1)
+            self.elem_sim.get_current_status()
+            self.assertEqual(1, mock.call_count)
+
+            run_worker(self.spool.directory, command=self.command)
+            # Once more after the jobs have finished
+            self.elem_sim.get_current_status()
+            self.elem_sim.get_current_status()
+            self.assertEqual(2, mock.call_count)
+
+    def test_stale_jobs_are_requeued(self):
+        self.elem_sim.spool_simulation(2)
+        stale = self.spool.claim()
+        fresh = self.spool.claim()
+        self.assertEqual(0, self.spool.requeue_stale_jobs(60))
+
+        old = time.time() - 120
+        os.utime(stale, (old, old))
+        self.assertEqual(1, self.spool.requeue_stale_jobs(60))
+        self.assertEqual([fresh], self.spool.get_jobs(JobSpool.CLAIMED))
+        self.assertEqual(
+            [stale.name], [job.name for job in self.spool.get_jobs()])
+
+        # Worker of the requeued job can still finish it, which removes the
+        # pending copy
+        done = self.spool.finish(stale)
+        self.assertEqual([done], self.spool.get_jobs(JobSpool.DONE))
+        self.assertEqual([], self.spool.get_jobs())
+        self.assertEqual([fresh], self.spool.get_jobs(JobSpool.CLAIMED))
+
+    def test_job_requeued_while_running_is_not_run_again(self):
+        self.elem_sim.spool_simulation(1)
+        run_job = JobSpool.run_job
+        requeued = []
+
+        def run_and_requeue(spool, job_file, **kwargs):
+            result = run_job(spool, job_file, **kwargs)
+            if not requeued:
+                # Another worker considers the job abandoned before it
+                # has been finished
+                requeued.append(spool.requeue_stale_jobs(-1))
+            return result
+
+        with patch.object(JobSpool, "run_job", autospec=True,
+                          side_effect=run_and_requeue):
+            self.assertEqual(1, run_worker(
+                self.spool.directory, command=self.command))
+
+        self.assertEqual([1], requeued)
+        self.assertEqual([101], self.get_logged_seeds())
+        self.assertEqual([], self.spool.get_jobs())
+        self.assertEqual([], self.spool.get_jobs(JobSpool.CLAIMED))
+        self.assertEqual(1, len(self.spool.get_jobs(JobSpool.DONE)))
+
+    def test_worker_requeues_stale_jobs(self):
+        self.elem_sim.spool_simulation(1)
+        job = self.spool.claim()
+        old = time.time() - 120
+        os.utime(job, (old, old))
+        self.assertEqual(1, run_worker(
+            self.spool.directory, command=self.command, stale_after=60))
+        self.assertEqual([101], self.get_logged_seeds())
+        self.assertEqual([], self.spool.get_jobs(JobSpool.CLAIMED))
+
+    def test_running_job_is_kept_fresh(self):
+        self.elem_sim.spool_simulation(1)
+        job = self.spool.claim()
+        old = time.time() - 120
+        os.utime(job, (old, old))
+        with self.assertRaises(subprocess.CalledProcessError):
+            self.spool.run_job(
+                job, command=(sys.executable, "-c",
+                              "import time; time.sleep(0.3); exit(3)"),
+                heartbeat_interval=0.05)
+        self.assertGreater(os.stat(job).st_mtime, old + 60)
+
+    def test_remove_pending_jobs(self):
+        self.elem_sim.spool_simulation(3)
+        self.spool.claim()
+        self.elem_sim.delete_simulation_results()
+        self.assertEqual([], self.spool.get_jobs())
+        self.assertEqual(1, len(self.spool.get_jobs(JobSpool.CLAIMED)))
+
+
+if __name__ == '__main__':
+    unittest.main()
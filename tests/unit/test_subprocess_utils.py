@@ -24,14 +24,22 @@ along with this program (file named 'LICENCE').
 __author__ = "Juhani Sundell"
 __version__ = "2.0"
 
+import io
+import os
 import unittest
 import tempfile
 import subprocess
 import time
 import platform
+import sys
+import threading
+from contextlib import redirect_stderr
 from pathlib import Path
+from unittest.mock import patch
 import tests.utils as utils
 
+from modules.concurrency import CancellationToken
+
 from modules.subprocess_utils import StdoutStream
 import modules.subprocess_utils as sutils
 
@@ -330,6 +338,62 @@ class TestProcessOutput(unittest.TestCase):
                 self.assertTrue(proc.stdout.closed)
 
 
+class TestColumnSelection(unittest.TestCase):
+    def test_select_columns(self):
+        lines = b"1 2 3 4\n5 6 7 8\n"
+        self.assertEqual(b"3 1\n7 5\n", sutils.select_columns(lines, [2, 0]))
+        self.assertEqual(b"2\n6\n", sutils.select_columns(lines, [1]))
+        self.assertEqual(b"", sutils.select_columns(b"", [1]))
+
+    def test_missing_columns_are_empty(self):
+        lines = b"1\t2  3\r\n\n4 5\n"
+        self.assertEqual(
+            b"1 3\n \n4 \n", sutils.select_columns(lines, [0, 2]))
+        self.assertEqual(b"3\n\n\n", sutils.select_columns(lines, [2]))
+
+    def test_iter_line_blocks(self):
+        stream = io.BytesIO(b"10 20\n30 40\n50 60")
+        blocks = list(sutils.iter_line_blocks(stream, block_size=4))
+        self.assertEqual(b"10 20\n30 40\n50 60\n", b"".join(blocks))
+        self.assertTrue(all(block.endswith(b"\n") for block in blocks))
+        self.assertEqual(
+            [], list(sutils.iter_line_blocks(io.BytesIO(b""))))
+
+    @unittest.skipIf(platform.system() == "Windows",
+                     "Windows does not have printf")
+    def test_process_columns(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            file = Path(tmp_dir, "output")
+            with subprocess.Popen(
+                    ["printf", "1 2 3\n4 5 6\n"],
+                    stdout=subprocess.PIPE) as proc:
+                lines = sutils.process_columns(proc, [2, 1], file=file)
+            self.assertEqual(["3 2\n", "6 5\n"], lines)
+            with file.open("r") as f:
+                self.assertEqual(lines, f.readlines())
+
+    @unittest.skipIf(platform.system() == "Windows",
+                     "Windows does not have printf")
+    def test_iter_column_arrays(self):
+        with subprocess.Popen(
+                ["printf", "1 2 3\n4 -5 6\n"],
+                stdout=subprocess.PIPE) as proc:
+            arrays = list(sutils.iter_column_arrays(proc, [1, 0]))
+        self.assertEqual(1, len(arrays))
+        self.assertEqual([[2, 1], [-5, 4]], arrays[0].tolist())
+
+        with subprocess.Popen(
+                ["printf", "\n1 2\n \n\n3 4\n"],
+                stdout=subprocess.PIPE) as proc:
+            arrays = list(sutils.iter_column_arrays(proc, [1, 0]))
+        self.assertEqual([[2, 1], [4, 3]], arrays[0].tolist())
+
+        with subprocess.Popen(
+                ["printf", "1 2\n3\n"], stdout=subprocess.PIPE) as proc:
+            with self.assertRaises(ValueError):
+                list(sutils.iter_column_arrays(proc, [1]))
+
+
 class TestKillProcess(unittest.TestCase):
     @classmethod
     def setUpClass(cls):
@@ -353,5 +417,147 @@ class TestKillProcess(unittest.TestCase):
             self.assertEqual(0, proc.poll())
 
 
+class TestCopyFilesToPipe(unittest.TestCase):
+    def test_files_are_written_to_stdin_as_is(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            files = [Path(tmp_dir, f"{i}.erd") for i in range(3)]
+            for i, file in enumerate(files):
+                with file.open("wb") as f:
+                    f.write(f"line {i}\r\nfoo".encode() * (10 ** 4 * i))
+            with subprocess.Popen(
+                    ["cat"], stdin=subprocess.PIPE,
+                    stdout=subprocess.PIPE) as proc:
+                reader = threading.Thread(
+                    target=lambda: self.output.append(proc.stdout.read()))
+                self.output = []
+                reader.start()
+                with proc.stdin as stdin:
+                    sutils.copy_files_to_pipe(files, stdin)
+                reader.join()
+
+            expected = b"".join(file.read_bytes() for file in files)
+            self.assertEqual([expected], self.output)
+
+    def test_non_existing_file_raises_error(self):
+        with subprocess.Popen(
+                ["cat"], stdin=subprocess.PIPE,
+                stdout=subprocess.DEVNULL) as proc:
+            with proc.stdin as stdin:
+                self.assertRaises(
+                    OSError,
+                    lambda: sutils.copy_files_to_pipe(
+                        [Path("foo.bar.baz")], stdin))
+
+
+class TestOutputReactor(unittest.TestCase):
+    def setUp(self):
+        self.reactor = sutils.OutputReactor(check_interval=0.01)
+        self.lines = []
+        self.exits = []
+        self.exited = threading.Event()
+
+    def on_exit(self, returncode, reason):
+        self.exits.append((returncode, reason))
+        self.exited.set()
+
+    def register(self, cmd, **kwargs):
+        proc = subprocess.Popen(
+            cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+        self.reactor.register(
+            proc, on_line=self.lines.append, on_exit=self.on_exit, **kwargs)
+        return proc
+
+    def test_lines_from_stdout_and_stderr_are_passed_on(self):
+        self.register([
+            sys.executable, "-c",
+            "import sys; print('hello'); print('world', file=sys.stderr)"])
+        self.assertTrue(self.exited.wait(5))
+        self.assertEqual({"hello", "world"}, set(self.lines))
+        self.assertEqual([(0, sutils.OutputReactor.EXITED)], self.exits)
+
+    def test_unterminated_last_line_is_passed_on(self):
+        self.register([
+            sys.executable, "-c", "print('foo\\nbar', end='')"])
+        self.assertTrue(self.exited.wait(5))
+        self.assertEqual(["foo", "bar"], self.lines)
+
+    def test_error_code_is_passed_to_exit_callback(self):
+        self.register([sys.executable, "-c", "import sys; sys.exit(3)"])
+        self.assertTrue(self.exited.wait(5))
+        self.assertEqual([(3, sutils.OutputReactor.EXITED)], self.exits)
+
+    def test_requesting_cancellation_kills_the_process(self):
+        ct = CancellationToken()
+        proc = self.register(["sleep", "5"], ct=ct)
+        self.assertFalse(self.exited.wait(0.1))
+        ct.request_cancellation()
+        self.assertTrue(self.exited.wait(5))
+        self.assertNotEqual(0, proc.poll())
+        self.assertEqual(
+            sutils.OutputReactor.CANCELLED, self.exits[0][1])
+
+    def test_process_is_killed_after_max_time(self):
+        ct = CancellationToken()
+        proc = self.register(["sleep", "5"], ct=ct, max_time=0.05)
+        self.assertTrue(self.exited.wait(5))
+        self.assertNotEqual(0, proc.poll())
+        self.assertEqual(
+            [(proc.returncode, sutils.OutputReactor.TIMED_OUT)], self.exits)
+        self.assertTrue(ct.is_cancellation_requested())
+
+    def test_multiple_processes_share_a_single_thread(self):
+        thread_count = threading.active_count()
+        events = []
+        for i in range(10):
+            event = threading.Event()
+            events.append(event)
+            proc = subprocess.Popen(
+                [sys.executable, "-c", f"print({i})"],
+                stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+            self.reactor.register(
+                proc, on_line=self.lines.append,
+                on_exit=lambda *_, e=event: e.set())
+        if platform.system() != "Windows":
+            self.assertEqual(thread_count + 1, threading.active_count())
+        for event in events:
+            self.assertTrue(event.wait(5))
+        self.assertEqual(
+            sorted(str(i) for i in range(10)), sorted(self.lines))
+
+    @unittest.skipIf(platform.system() == "Windows", "uses select")
+    def test_read_error_ends_the_stream(self):
+        os_read = os.read
+
+        def read(fd, n):
+            if fd == self.reactor._wake_r:
+                return os_read(fd, n)
+            raise OSError("foo")
+
+        proc = subprocess.Popen(
+            [sys.executable, "-c", "print('foo')"], stdout=subprocess.PIPE)
+        with patch("os.read", read), redirect_stderr(io.StringIO()):
+            self.reactor.register(
+                proc, on_line=self.lines.append, on_exit=self.on_exit)
+            self.assertTrue(self.exited.wait(5))
+        self.assertEqual([], self.lines)
+        # The process may fail to write to the closed pipe
+        self.assertEqual(sutils.OutputReactor.EXITED, self.exits[0][1])
+
+    def test_thread_is_restarted_after_an_error(self):
+        with patch.object(self.reactor, "_wait", side_effect=RuntimeError), \
+                redirect_stderr(io.StringIO()):
+            self.register([sys.executable, "-c", "print('foo')"])
+            self.reactor._thread.join(5)
+        self.assertFalse(self.reactor._thread.is_alive())
+        self.register([sys.executable, "-c", "print('bar')"])
+        for _ in range(500):
+            if len(self.exits) == 2:
+                break
+            time.sleep(0.01)
+        # Both processes are handled by the new thread
+        self.assertEqual(["bar", "foo"], sorted(self.lines))
+        self.assertEqual(2, len(self.exits))
+
+
 if __name__ == '__main__':
     unittest.main()
@@ -47,7 +47,6 @@ from modules.request import Request
 from modules.enums import DetectorType
 
 from PyQt5 import QtWidgets
-from PyQt5 import uic
 from PyQt5.QtCore import QLocale
 from PyQt5 import QtCore
 
@@ -88,7 +87,7 @@ class DetectorSettingsWidget(QtWidgets.QWidget, bnd.PropertyTrackingWidget,
               run: Run object. None if detector is default detector.
         """
         super().__init__()
-        uic.loadUi(
+        gutils.load_ui(
             gutils.get_ui_dir() / "ui_request_detector_settings.ui", self)
 
         self.obj = obj
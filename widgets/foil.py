@@ -30,7 +30,6 @@ __version__ = "2.0"
 import widgets.binding as bnd
 import widgets.gui_utils as gutils
 
-from PyQt5 import uic
 from PyQt5 import QtWidgets
 from PyQt5.QtCore import QLocale
 from PyQt5.QtCore import pyqtSignal
@@ -57,7 +56,7 @@ class FoilWidget(QtWidgets.QWidget):
             foil: foil object
         """
         super().__init__()
-        uic.loadUi(gutils.get_ui_dir() / "ui_foil_widget.ui", self)
+        gutils.load_ui(gutils.get_ui_dir() / "ui_foil_widget.ui", self)
 
         locale = QLocale.c()
         self.distanceDoubleSpinBox.setLocale(locale)
@@ -25,13 +25,20 @@ __author__ = "Juhani Sundell"
 __version__ = "2.0"
 
 import abc
+import hashlib
+import io
+import logging
 import platform
 import functools
 import modules.general_functions as gf
 
+from concurrent import futures
 from pathlib import Path
+from typing import Dict
 from typing import Iterable
+from typing import List
 from typing import Optional
+from typing import Tuple
 from typing import Union
 from typing import Any
 from typing import Callable
@@ -44,6 +51,7 @@ from modules.global_settings import GlobalSettings
 
 from PyQt5 import QtCore
 from PyQt5 import QtWidgets
+from PyQt5 import uic
 from PyQt5.QtCore import QSettings
 
 NumSpinBox = Union[QtWidgets.QSpinBox, QtWidgets.QDoubleSpinBox]
@@ -114,6 +122,99 @@ def get_ui_dir() -> Path:
     return gf.get_root_dir() / "ui_files"
 
 
+def load_ui(ui_file: Path, widget: QtWidgets.QWidget):
+    """Sets up the given widget from a .ui file like uic.loadUi does, and
+    adds the child widgets of the .ui file as attributes of the widget.
+
+    The .ui file is compiled into Python code only when it has changed.
+    The code is cached in the __pycache__ directory of the .ui file (see
+    compile_ui_files) and the compiled class is kept in memory, so a dialog
+    that is opened again does not parse the .ui file at all.
+
+    Args:
+        ui_file: path to a .ui file
+        widget: widget to set up
+    """
+    ui = _get_ui_class(Path(ui_file))()
+    ui.setupUi(widget)
+    for name, value in vars(ui).items():
+        setattr(widget, name, value)
+
+
+def compile_ui_files(ui_dir: Optional[Path] = None) -> List[Path]:
+    """Compiles the .ui files of a directory into the cache that load_ui
+    uses, so that the first use of each .ui file is also fast. Can be run
+    when Potku is installed.
+
+    Args:
+        ui_dir: directory that contains .ui files. Defaults to get_ui_dir().
+
+    Return:
+        compiled .ui files
+    """
+    if ui_dir is None:
+        ui_dir = get_ui_dir()
+    ui_files = sorted(Path(ui_dir).glob("*.ui"))
+    for ui_file in ui_files:
+        _get_ui_class(ui_file)
+    return ui_files
+
+
+# Compiled .ui classes by the paths of the .ui files
+_UI_CLASSES: Dict[Path, Tuple[str, type]] = {}
+
+
+def _get_ui_class(ui_file: Path) -> type:
+    """Returns the Ui_ class that uic generates from a .ui file. Generated
+    code is read from the cache if the .ui file has not changed since it
+    was compiled, otherwise it is compiled and stored in the cache.
+    """
+    ui_file = ui_file.resolve()
+    stat = ui_file.stat()
+    # Icon paths are stored as absolute paths in the generated code, so the
+    # location of the .ui file is a part of the key
+    key = hashlib.sha1(
+        f"{ui_file}|{stat.st_size}|{stat.st_mtime_ns}|"
+        f"{QtCore.PYQT_VERSION_STR}".encode()).hexdigest()[:16]
+    cached = _UI_CLASSES.get(ui_file)
+    if cached is not None and cached[0] == key:
+        return cached[1]
+
+    cache_file = ui_file.parent / "__pycache__" / f"{ui_file.stem}.{key}.py"
+    try:
+        source = cache_file.read_text(encoding="utf-8")
+    except OSError:
+        buffer = io.StringIO()
+        uic.compileUi(str(ui_file), buffer)
+        source = buffer.getvalue()
+        _write_ui_cache(cache_file, source)
+
+    namespace = {}
+    exec(compile(source, str(cache_file), "exec"), namespace)
+    ui_class = next(
+        value for name, value in namespace.items() if name.startswith("Ui_"))
+    _UI_CLASSES[ui_file] = key, ui_class
+    return ui_class
+
+
+def _write_ui_cache(cache_file: Path, source: str):
+    """Writes generated code to the cache and removes code generated from
+    earlier versions of the same .ui file. The cache is not used if it
+    cannot be written to.
+    """
+    try:
+        cache_file.parent.mkdir(exist_ok=True)
+        for old_file in cache_file.parent.glob(
+                f"{cache_file.name.split('.')[0]}.*.py"):
+            old_file.unlink()
+        tmp_file = cache_file.with_suffix(".tmp")
+        tmp_file.write_text(source, encoding="utf-8")
+        tmp_file.replace(cache_file)
+    except OSError as e:
+        logging.getLogger(__name__).debug(
+            f"Could not cache compiled {cache_file.name}: {e}")
+
+
 def get_icon_dir() -> Path:
     """Returns absolute path to directory that contains Potku's icons.
     """
@@ -142,6 +243,25 @@ else:
         pass
 
 
+def wait_for_future(future: futures.Future, interval: float = 0.05) -> Any:
+    """Waits for a Future that runs in another thread and returns its
+    result. Events of the main thread, apart from user input, are processed
+    while waiting so that the GUI keeps updating.
+
+    Args:
+        future: Future to wait for
+        interval: seconds between processing the events
+
+    Return:
+        result of the Future. Exceptions raised by the Future are raised.
+    """
+    while not future.done():
+        QtCore.QCoreApplication.processEvents(
+            QtCore.QEventLoop.ExcludeUserInputEvents)
+        futures.wait([future], timeout=interval)
+    return future.result()
+
+
 def process_event_loop(func):
     """Decorator that processes QCoreApplication's event loop.
     after the function has been called.
@@ -233,6 +353,17 @@ class StatusBarHandler:
         if value > 99:
             self.remove_progress_bar()
 
+    @process_event_loop
+    def show_message(self, message: str, timeout: int = 5000):
+        """Shows a message in the status bar.
+
+        Args:
+            message: message to show
+            timeout: milliseconds after which the message is hidden
+        """
+        if self.statusbar is not None:
+            self.statusbar.showMessage(message, timeout)
+
     @process_event_loop
     def remove_progress_bar(self):
         """Removes progress bar from status bar.
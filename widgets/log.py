@@ -31,7 +31,6 @@ __version__ = "2.0"
 
 import widgets.gui_utils as gutils
 
-from PyQt5 import uic
 from PyQt5 import QtCore
 from PyQt5 import QtWidgets
 
@@ -47,7 +46,7 @@ class LogWidget(QtWidgets.QWidget):
         """Initializes the LogHandler widget.
         """
         super().__init__()
-        uic.loadUi(gutils.get_ui_dir() / "ui_log_widget.ui", self)
+        gutils.load_ui(gutils.get_ui_dir() / "ui_log_widget.ui", self)
         # This is used to ensure that the window can't be closed.        
         self.want_to_close = False
         self.hideButton.clicked.connect(self.minimize_window)
@@ -72,6 +72,9 @@ class MatplotlibCalibrationCurveFittingWidget(MatplotlibWidget):
         self.tof_calibration = tof_calibration
 
         self.tof_histogram = None
+        # Histograms and fit parameters by cut, bin width and column so that
+        # switching between cuts does not refit them.
+        self.__fits = {}
         self.tof_calibration_point = None
         self.selected_tof = None
         self.selection_given_manually = False
@@ -156,15 +159,7 @@ class MatplotlibCalibrationCurveFittingWidget(MatplotlibWidget):
             self.axes.axvline(x=self.selected_tof)
 
         if self.cut.element:
-            self.tof_histogram = TOFCalibrationHistogram(
-                self.cut, self.bin_width, self.use_column)
-
-            # Get some value between the cut data's both edges.
-            # middle = self.tof_histogram.find_middle()
-            # params = self.tof_histogram.get_error_function_parameters(middle)
-            err_start, err_end = self.tof_histogram.find_leading_edge_borders()
-            params = self.tof_histogram.get_error_function_parameters(
-                err_end, err_start)
+            self.tof_histogram, params = self.__get_fit()
 
             if not params:
                 self.canvas.draw()
@@ -211,6 +206,20 @@ class MatplotlibCalibrationCurveFittingWidget(MatplotlibWidget):
         # Draw magic
         self.canvas.draw()
 
+    def __get_fit(self):
+        """Returns the histogram of the current cut and the parameters of the
+        error function fitted to its leading edge.
+        """
+        key = self.cut, self.bin_width, self.use_column
+        if key not in self.__fits:
+            tof_histogram = TOFCalibrationHistogram(
+                self.cut, self.bin_width, self.use_column)
+            err_start, err_end = tof_histogram.find_leading_edge_borders()
+            params = tof_histogram.get_error_function_parameters(
+                err_end, err_start)
+            self.__fits[key] = tof_histogram, params
+        return self.__fits[key]
+
     def toggle_clicks(self):
         """Toggle between manual ToF channel (x axis) selection.
         """
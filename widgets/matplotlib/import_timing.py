@@ -32,19 +32,20 @@ from PyQt5 import QtWidgets
 from widgets.matplotlib.base import MatplotlibWidget
 from widgets.matplotlib import mpl_utils
 
-from modules.parsing import CSVParser
+from modules.histogram import IntegerHistogram
 
 
 class MatplotlibImportTimingWidget(MatplotlibWidget):
     """
     A MatplotlibImportTimingWidget class.
     """
-    def __init__(self, parent, data, icon_manager, timing):
+    def __init__(self, parent, histogram: IntegerHistogram, icon_manager,
+                 timing):
         """Inits import timings widget
 
         Args:
             parent: An ImportTimingGraphDialog class object.
-            data: Time difference data as a List.
+            histogram: Histogram of time differences.
             icon_manager: An IconManager class object.
             timing: A tuple representing low & high timing limits.
         """
@@ -63,12 +64,8 @@ class MatplotlibImportTimingWidget(MatplotlibWidget):
             self.__limit_high,
             timing_key))
         self.__limit_prev = 0
-        parser = CSVParser((0, int))
-        self.data = [
-            timediff for timediff, in
-            parser.parse_strs(
-                data, separator="\t", method=parser.ROW, ignore=parser.EMPTY)
-        ]
+        self.histogram = histogram
+        self.__limit_lines = []
         self.on_draw()
 
     def on_draw(self):
@@ -76,18 +73,31 @@ class MatplotlibImportTimingWidget(MatplotlibWidget):
         """
         self.axes.clear()
 
-        self.axes.hist(self.data, 200, facecolor='green', histtype='stepfilled')
+        # Binned counts are drawn as weights of the bins so that matplotlib
+        # does not need the original values.
+        edges, counts = self.histogram.get_bins(200)
+        self.axes.hist(edges[:-1], edges, weights=counts, facecolor='green',
+                       histtype='stepfilled')
         self.axes.set_yscale('log', nonposy='clip')
 
         self.axes.set_xlabel("Timedifference (µs?)")
         self.axes.set_ylabel("Count (?)")
 
-        if self.__limit_low:
-            self.axes.axvline(self.__limit_low, linestyle="--")
-        if self.__limit_high:
-            self.axes.axvline(self.__limit_high, linestyle="--")
+        self.__limit_lines = []
+        self.draw_limits()
 
         self.remove_axes_ticks()
+
+    def draw_limits(self):
+        """Draws the timing limits on top of the histogram. The histogram
+        itself is not redrawn.
+        """
+        for line in self.__limit_lines:
+            line.remove()
+        self.__limit_lines = [
+            self.axes.axvline(limit, linestyle="--")
+            for limit in (self.__limit_low, self.__limit_high) if limit
+        ]
         self.canvas.draw_idle()
 
     def on_click(self, event):
@@ -119,7 +129,7 @@ class MatplotlibImportTimingWidget(MatplotlibWidget):
                 self.__title,
                 self.__limit_low,
                 self.__limit_high))
-            self.on_draw()
+            self.draw_limits()
 
     def __fork_toolbar_buttons(self):
         """Custom toolbar buttons be here.
@@ -28,10 +28,10 @@ __author__ = "Severi Jääskeläinen \n Samuel Kaiponen \n Heta Rekilä " \
 __version__ = "2.0"
 
 import matplotlib
-import os
 import widgets
 
 import dialogs.dialog_functions as df
+import modules.general_functions as gf
 
 from widgets.matplotlib import mpl_utils
 from pathlib import Path
@@ -463,6 +463,9 @@ class TargetCompositionWidget(_CompositionWidget):
     layers to the user. Using this widget user can also modify the layers of the
     target.
     """
+    # Seconds to wait for further edits before the target is saved
+    AUTO_SAVE_DELAY = 1.0
+
     def __init__(self, parent, target, icon_manager, simulation):
         """Initializes a TargetCompositionWidget object.
 
@@ -494,18 +497,19 @@ class TargetCompositionWidget(_CompositionWidget):
         if dialog.isOk:
             old_target = Path(self.simulation.directory,
                               f"{self.target.name}.target")
-            os.remove(old_target)
+            gf.remove_files(old_target)
             self.target.name = dialog.name
             self.target.description = dialog.description
             self.parent.targetNameLabel.setText(self.target.name)
             self._save_target()
 
     def _save_target(self):
-        """Saves the Target object to a file.
+        """Saves the Target object to a file. The file is written after a
+        delay so that consecutive edits are written together.
         """
         target_path = Path(self.simulation.directory,
                            f"{self.target.name}.target")
-        self.target.to_file(target_path)
+        self.target.to_file(target_path, delay=self.AUTO_SAVE_DELAY)
 
 
 class FoilCompositionWidget(_CompositionWidget):
@@ -794,26 +794,31 @@ class RecoilAtomDistributionWidget(MatplotlibWidget):
                 error_box.setWindowTitle("Error")
                 error_box.exec()
 
-    def save_mcsimu_rec_profile(self, directory: Path, progress=None):
+    def save_mcsimu_rec_profile(self, directory: Path, progress=None,
+                                delay: Optional[float] = None):
         """Save information to .mcsimu and .profile files.
 
         Args:
             directory: Directory where to save to.
             progress: ProgressReporter.
+            delay: if given, the files are written after this many seconds
+                unless they are saved again before that.
         """
         length = len(self.element_manager.element_simulations)
         for i, element_simulation in enumerate(
                 self.element_manager.element_simulations):
 
             element_simulation.to_file(
-                Path(directory, f"{element_simulation.get_full_name()}.mcsimu")
+                Path(directory, f"{element_simulation.get_full_name()}.mcsimu"),
+                delay=delay
             )
             for recoil_element in element_simulation.recoil_elements:
-                recoil_element.to_file(directory)
+                recoil_element.to_file(directory, delay=delay)
 
             element_simulation.profile_to_file(
                 Path(directory,
-                     f"{element_simulation.name_prefix}.profile"))
+                     f"{element_simulation.name_prefix}.profile"),
+                delay=delay)
 
             if progress is not None:
                 progress.report((i / length) * 100)
@@ -50,7 +50,6 @@ from widgets.preset_widget import PresetWidget
 from dialogs.element_selection import ElementSelectionDialog
 
 from PyQt5 import QtWidgets
-from PyQt5 import uic
 from PyQt5 import QtGui
 from PyQt5.QtCore import QLocale
 from PyQt5.QtCore import Qt
@@ -129,7 +128,8 @@ class MeasurementSettingsWidget(QtWidgets.QWidget,
                 Simulation.
         """
         super().__init__()
-        uic.loadUi(gutils.get_ui_dir() / "ui_measurement_settings_tab.ui", self)
+        gutils.load_ui(
+            gutils.get_ui_dir() / "ui_measurement_settings_tab.ui", self)
         self.fluenceDoubleSpinBox = ScientificSpinBox()
         image = gf.get_root_dir() / "images" / "measurement_setup_angles.png"
         pixmap = QtGui.QPixmap(str(image))
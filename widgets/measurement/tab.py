@@ -50,7 +50,6 @@ from modules.enums import DepthProfileUnit
 
 from PyQt5 import QtCore
 from PyQt5 import QtWidgets
-from PyQt5 import uic
 
 from widgets.base_tab import BaseTab
 from widgets.measurement.tofe_histogram import TofeHistogramWidget
@@ -73,7 +72,7 @@ class MeasurementTabWidget(QtWidgets.QWidget, BaseTab):
             statusbar: A QtGui.QMainWindow's QStatusBar.
         """
         super().__init__()
-        uic.loadUi(gutils.get_ui_dir() / "ui_measurement_tab.ui", self)
+        gutils.load_ui(gutils.get_ui_dir() / "ui_measurement_tab.ui", self)
 
         self.tab_id = tab_id
         self.obj = measurement
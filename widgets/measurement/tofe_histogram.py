@@ -32,7 +32,6 @@ __version__ = "2.0"
 import widgets.gui_utils as gutils
 
 from PyQt5 import QtCore
-from PyQt5 import uic
 from PyQt5 import QtWidgets
 
 from widgets.matplotlib.measurement.tofe_histogram import \
@@ -52,7 +51,7 @@ class TofeHistogramWidget(QtWidgets.QWidget):
             tab: A MeasurementTabWidget.
         """
         super().__init__()
-        uic.loadUi(gutils.get_ui_dir() / "ui_histogram_widget.ui", self)
+        gutils.load_ui(gutils.get_ui_dir() / "ui_histogram_widget.ui", self)
 
         self.measurement = measurement
         self.tab = tab
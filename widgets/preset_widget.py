@@ -46,7 +46,6 @@ from PyQt5.QtCore import QEvent
 from PyQt5.QtCore import Qt
 from PyQt5.QtCore import pyqtSignal
 from PyQt5.QtGui import QFocusEvent
-from PyQt5 import uic
 
 
 class PresetWidget(QWidget, bnd.PropertyBindingWidget,
@@ -72,7 +71,7 @@ class PresetWidget(QWidget, bnd.PropertyBindingWidget,
                 index changes.
         """
         QWidget.__init__(self)
-        uic.loadUi(gutils.get_ui_dir() / "ui_preset_widget.ui", self)
+        gutils.load_ui(gutils.get_ui_dir() / "ui_preset_widget.ui", self)
 
         self._folder = folder
         self._prefix = prefix
@@ -37,7 +37,6 @@ from modules.measurement import Measurement
 from widgets.preset_widget import PresetWidget
 
 from PyQt5 import QtWidgets
-from PyQt5 import uic
 from PyQt5.QtCore import QLocale
 
 
@@ -81,7 +80,8 @@ class ProfileSettingsWidget(QtWidgets.QWidget, bnd.PropertyTrackingWidget,
             measurement: Measurement object.
         """
         super().__init__()
-        uic.loadUi(gutils.get_ui_dir() / "ui_profile_settings_tab.ui", self)
+        gutils.load_ui(
+            gutils.get_ui_dir() / "ui_profile_settings_tab.ui", self)
         self.measurement = measurement
         self._original_properties = {}
 
@@ -38,7 +38,6 @@ from typing import Union
 from typing import Tuple
 
 from PyQt5 import QtWidgets
-from PyQt5 import uic
 
 
 class ScientificSpinBox(QtWidgets.QWidget):
@@ -60,7 +59,7 @@ class ScientificSpinBox(QtWidgets.QWidget):
                 are shown.
         """
         super().__init__()
-        uic.loadUi(
+        gutils.load_ui(
             gutils.get_ui_dir() / "ui_scientific_spinbox_widget.ui", self)
         self._value = Decimal(str(value))
         self.minimum = minimum
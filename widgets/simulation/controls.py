@@ -44,7 +44,6 @@ from widgets.gui_utils import GUIObserver
 
 from PyQt5 import QtWidgets
 from PyQt5 import QtCore
-from PyQt5 import uic
 from PyQt5.QtCore import Qt
 
 
@@ -89,7 +88,7 @@ class SimulationControlsWidget(QtWidgets.QWidget, GUIObserver):
     def __init__(self, element_simulation: ElementSimulation,
                  recoil_dist_widget, recoil_name_changed=None,
                  settings_updated=None, ion_division=IonDivision.BOTH,
-                 min_presim_ions=0, min_sim_ions=0):
+                 min_presim_ions=0, min_sim_ions=0, target_precision=0.0):
         """
         Initializes a SimulationControlsWidget.
 
@@ -99,10 +98,13 @@ class SimulationControlsWidget(QtWidgets.QWidget, GUIObserver):
              recoil_name_changed: signal that indicates that a recoil name
                 has changed.
             ion_division: ion division mode
+            target_precision: relative statistical uncertainty of the
+                simulated spectrum at which the simulation is stopped. 0
+                means that the simulation runs until all ions are simulated.
         """
         super().__init__()
         GUIObserver.__init__(self)
-        uic.loadUi(gutils.get_ui_dir() / "ui_simulation_controls.ui", self)
+        gutils.load_ui(gutils.get_ui_dir() / "ui_simulation_controls.ui", self)
 
         self.element_simulation = element_simulation
         self.element_simulation.subscribe(self)
@@ -118,6 +120,7 @@ class SimulationControlsWidget(QtWidgets.QWidget, GUIObserver):
         self.run_button.setIcon(icons.get_reinhardt_icon("player_play.svg"))
         self.stop_button.clicked.connect(self.stop_simulation)
         self.stop_button.setIcon(icons.get_reinhardt_icon("player_stop.svg"))
+        self.spool_button.clicked.connect(self.spool_simulation)
         self.enable_buttons()
 
         self.mcerd_error_lbl.hide()
@@ -128,6 +131,7 @@ class SimulationControlsWidget(QtWidgets.QWidget, GUIObserver):
         self._ion_division = ion_division
         self._min_presim_ions = min_presim_ions
         self._min_sim_ions = min_sim_ions
+        self._target_precision = target_precision
         self.show_ion_settings_label()
 
         self.processes_spinbox.valueChanged.connect(
@@ -180,6 +184,7 @@ class SimulationControlsWidget(QtWidgets.QWidget, GUIObserver):
                 self.element_simulation.is_optimization_running())
         self.run_button.setEnabled(start_enabled)
         self.stop_button.setEnabled(stop_enabled)
+        self.spool_button.setEnabled(start_enabled)
         self.processes_spinbox.setEnabled(start_enabled)
 
     def start_simulation(self):
@@ -225,7 +230,8 @@ class SimulationControlsWidget(QtWidgets.QWidget, GUIObserver):
 
         observable = self.element_simulation.start(
             self.process_count, use_old_erd_files=use_old_erd_files,
-            ion_division=self._ion_division
+            ion_division=self._ion_division,
+            target_precision=self._target_precision or None
         )
         if observable is not None:
             self.__unsub = observable.pipe(
@@ -240,6 +246,26 @@ class SimulationControlsWidget(QtWidgets.QWidget, GUIObserver):
                                "recoil element"
             self.mcerd_error_lbl.show()
 
+    def spool_simulation(self):
+        """Writes simulation jobs into the spool directory of the simulation
+        so that spool workers can run them. Results appear in the simulation
+        when the workers finish.
+        """
+        try:
+            jobs = self.element_simulation.spool_simulation(
+                self.process_count, ion_division=self._ion_division)
+        except OSError as e:
+            self.mcerd_error = f"Could not write simulation jobs: {e}"
+            self.mcerd_error_lbl.show()
+            return
+        self.mcerd_error_lbl.hide()
+        spool_dir = self.element_simulation.get_spool().directory
+        QtWidgets.QMessageBox.information(
+            self, "Simulation jobs",
+            f"Wrote {len(jobs)} simulation jobs into\n{spool_dir}\n\n"
+            f"Run them with:\npython -m modules.spool \"{spool_dir}\"",
+            QtWidgets.QMessageBox.Ok, QtWidgets.QMessageBox.Ok)
+
     def show_status(self, status):
         """Updates the status of simulation in the GUI
 
@@ -257,6 +283,8 @@ class SimulationControlsWidget(QtWidgets.QWidget, GUIObserver):
             self._ion_division = settings.get_ion_division()
             self._min_presim_ions = settings.get_min_presim_ions()
             self._min_sim_ions = settings.get_min_simulation_ions()
+            self._target_precision = \
+                settings.get_simulation_target_precision()
         self.show_ion_settings_label()
 
     def show_ion_settings_label(self):
@@ -38,7 +38,6 @@ from widgets.gui_utils import QtABCMeta
 from widgets.scientific_spinbox import ScientificSpinBox
 
 from PyQt5 import QtWidgets
-from PyQt5 import uic
 from PyQt5.QtCore import QLocale
 from PyQt5.QtCore import Qt
 
@@ -98,6 +97,9 @@ class OptimizationParameterWidget(QtWidgets.QWidget,
     check_max = bnd.bind("maxTimeEdit")
     check_min = bnd.bind("minTimeEdit")
     skip_simulation = bnd.bind("skip_sim_chk_box")
+    islands = bnd.bind("islandsSpinBox")
+    migration_interval = bnd.bind("migrationIntervalSpinBox")
+    migration_size = bnd.bind("migrationSizeSpinBox")
 
     @abc.abstractmethod
     def optimization_type(self) -> OptimizationType:
@@ -111,7 +113,7 @@ class OptimizationParameterWidget(QtWidgets.QWidget,
             kwargs: values to show in the widget
         """
         super().__init__()
-        uic.loadUi(ui_file, self)
+        gutils.load_ui(ui_file, self)
 
         locale = QLocale.c()
         self.crossoverProbDoubleSpinBox.setLocale(locale)
@@ -119,7 +121,9 @@ class OptimizationParameterWidget(QtWidgets.QWidget,
         self.percentDoubleSpinBox.setLocale(locale)
 
         self.skip_sim_chk_box.stateChanged.connect(self.enable_sim_params)
+        self.islandsSpinBox.valueChanged.connect(self.enable_migration_params)
         self.set_properties(**kwargs)
+        self.enable_migration_params()
 
     def enable_sim_params(self, *_):
         """Either enables or disables simulation parameters depending on the
@@ -130,6 +134,16 @@ class OptimizationParameterWidget(QtWidgets.QWidget,
         """
         self.simGroupBox.setEnabled(not self.skip_simulation)
 
+    def enable_migration_params(self, *_):
+        """Enables migration parameters if there are several islands.
+
+        Args:
+            *_: not used
+        """
+        enabled = self.islands > 1
+        self.migrationIntervalSpinBox.setEnabled(enabled)
+        self.migrationSizeSpinBox.setEnabled(enabled)
+
 
 class OptimizationRecoilParameterWidget(OptimizationParameterWidget):
     """
@@ -149,6 +163,7 @@ class OptimizationRecoilParameterWidget(OptimizationParameterWidget):
                         fset=sol_size_to_combobox)
     recoil_type = bnd.bind("recoilTypeComboBox", fget=recoil_from_combobox,
                            twoway=False)
+    use_reweighting = bnd.bind("reweightingCheckBox")
 
     @property
     def optimization_type(self) -> OptimizationType:
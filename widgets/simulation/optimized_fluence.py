@@ -37,7 +37,6 @@ from modules.concurrency import CancellationToken
 from widgets.gui_utils import GUIObserver
 
 from PyQt5 import QtWidgets
-from PyQt5 import uic
 
 
 class OptimizedFluenceWidget(QtWidgets.QWidget, GUIObserver):
@@ -47,9 +46,12 @@ class OptimizedFluenceWidget(QtWidgets.QWidget, GUIObserver):
                  ct: Optional[CancellationToken] = None):
         # TODO common base class for optim result widgets
         super().__init__()
-        uic.loadUi(gutils.get_ui_dir() / "ui_optimized_fluence_widget.ui", self)
+        gutils.load_ui(
+            gutils.get_ui_dir() / "ui_optimized_fluence_widget.ui", self)
 
         self.element_simulation = element_simulation
+        # Files of an optimization that is resumed are kept
+        self.delete_results_on_close = True
         if self.element_simulation.optimized_fluence:
             self.show_fluence()
 
@@ -66,8 +68,9 @@ class OptimizedFluenceWidget(QtWidgets.QWidget, GUIObserver):
         """
         if self.cancellation_token is not None:
             self.cancellation_token.request_cancellation()
-        self.element_simulation.delete_optimization_results(
-            optim_mode=OptimizationType.FLUENCE)
+        if self.delete_results_on_close:
+            self.element_simulation.delete_optimization_results(
+                optim_mode=OptimizationType.FLUENCE)
 
         super().closeEvent(evnt)
 
@@ -37,7 +37,6 @@ from modules.target import Target
 from widgets.gui_utils import GUIObserver
 
 from PyQt5 import QtWidgets
-from PyQt5 import uic
 from PyQt5.QtCore import pyqtSignal
 
 from widgets.matplotlib.simulation.recoil_atom_optimization import \
@@ -62,10 +61,12 @@ class OptimizedRecoilsWidget(QtWidgets.QWidget, GUIObserver):
         # TODO change the push button to radio group
         super().__init__()
         GUIObserver.__init__(self)
-        uic.loadUi(
+        gutils.load_ui(
             gutils.get_ui_dir() / "ui_optimization_results_widget.ui", self)
 
         self.element_simulation = element_simulation
+        # Files of an optimization that is resumed are kept
+        self.delete_results_on_close = True
         _, run, _ = self.element_simulation.get_mcerd_params()
 
         self.setWindowTitle(f"Optimization Results: "
@@ -104,19 +105,22 @@ class OptimizedRecoilsWidget(QtWidgets.QWidget, GUIObserver):
         results_accepted signal.
         """
         # TODO stop optimization
-        self.element_simulation.delete_optimization_results(
-            optim_mode=OptimizationType.RECOIL)
+        if self.delete_results_on_close:
+            self.element_simulation.delete_optimization_results(
+                optim_mode=OptimizationType.RECOIL)
         try:
             self.results_accepted.disconnect()
         except (TypeError, AttributeError):
             pass
         super().closeEvent(evnt)
 
-    def update_progress(self, evaluations, state):
+    def update_progress(self, evaluations, state, cache_hits=None):
         """
         Show calculated solutions in the widget.
         """
         text = f"{evaluations} evaluations left. {state}."
+        if cache_hits:
+            text += f" {cache_hits} repeated solutions reused."
         self.progressLabel.setText(text)
 
     def show_results(self, evaluations):
@@ -128,7 +132,8 @@ class OptimizedRecoilsWidget(QtWidgets.QWidget, GUIObserver):
 
     def on_next_handler(self, msg):
         if "evaluations_left" in msg:
-            self.update_progress(msg["evaluations_left"], msg["state"])
+            self.update_progress(
+                msg["evaluations_left"], msg["state"], msg.get("cache_hits"))
         if "pareto_front" in msg:
             self.pareto_front.update_pareto_front(msg["pareto_front"])
 
@@ -39,7 +39,6 @@ from typing import Tuple
 from typing import Dict
 
 from PyQt5 import QtWidgets
-from PyQt5 import uic
 from PyQt5.QtCore import Qt
 
 from widgets.simulation.circle import Circle
@@ -74,7 +73,7 @@ class PercentageWidget(QtWidgets.QWidget):
             icon_manager: Icon manager.
         """
         super().__init__()
-        uic.loadUi(gutils.get_ui_dir() / "ui_percentage_widget.ui", self)
+        gutils.load_ui(gutils.get_ui_dir() / "ui_percentage_widget.ui", self)
 
         # Stores the PercentageRow objects for each recoil
         self._percentage_rows = {
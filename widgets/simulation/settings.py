@@ -45,7 +45,6 @@ from widgets.gui_utils import QtABCMeta
 from widgets.preset_widget import PresetWidget
 
 from PyQt5 import QtWidgets
-from PyQt5 import uic
 from PyQt5.QtCore import QLocale
 from PyQt5.QtCore import pyqtSignal
 
@@ -88,7 +87,7 @@ class SimulationSettingsWidget(QtWidgets.QWidget, PropertyTrackingWidget,
             element_simulation: Element simulation object.
         """
         super().__init__()
-        uic.loadUi(
+        gutils.load_ui(
             gutils.get_ui_dir() / "ui_request_simulation_settings.ui", self)
 
         # By default, disable the widget, so caller has to enable it. Without
@@ -41,7 +41,6 @@ from dialogs.simulation.optimization import OptimizationDialog
 from dialogs.simulation.settings import SimulationSettingsDialog
 
 from PyQt5 import QtWidgets
-from PyQt5 import uic
 
 from widgets.simulation.optimized_fluence import OptimizedFluenceWidget
 from widgets.simulation.optimized_recoils import OptimizedRecoilsWidget
@@ -75,7 +74,7 @@ class SimulationTabWidget(QtWidgets.QWidget, BaseTab):
             statusbar: A QtGui.QMainWindow's QStatusBar.
         """
         super().__init__()
-        uic.loadUi(gutils.get_ui_dir() / "ui_simulation_tab.ui", self)
+        gutils.load_ui(gutils.get_ui_dir() / "ui_simulation_tab.ui", self)
 
         self.request = request
         self.tab_id = tab_id
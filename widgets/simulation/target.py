@@ -28,8 +28,6 @@ __author__ = "Severi Jääskeläinen \n Samuel Kaiponen \n Heta Rekilä " \
 __version__ = "2.0"
 
 import platform
-import threading
-import time
 
 import widgets.gui_utils as gutils
 
@@ -44,7 +42,6 @@ from modules.observing import ProgressReporter
 
 from PyQt5 import QtCore
 from PyQt5 import QtWidgets
-from PyQt5 import uic
 from PyQt5.QtCore import pyqtSignal
 
 from widgets.icon_manager import IconManager
@@ -61,6 +58,10 @@ class TargetWidget(QtWidgets.QWidget):
     """
     results_accepted = pyqtSignal(ElementSimulation)
 
+    # Seconds to wait for further changes before automatically saved files
+    # are written
+    AUTO_SAVE_DELAY = 1.0
+
     def __init__(self, tab: BaseTab, simulation: Simulation, target: Target,
                  icon_manager: IconManager, settings: GlobalSettings,
                  progress: Optional[ProgressReporter] = None,
@@ -79,7 +80,7 @@ class TargetWidget(QtWidgets.QWidget):
             auto_save: whether automatic saving is enabled.
         """
         super().__init__()
-        uic.loadUi(gutils.get_ui_dir() / "ui_target_widget.ui", self)
+        gutils.load_ui(gutils.get_ui_dir() / "ui_target_widget.ui", self)
 
         if progress is not None:
             progress.report(0)
@@ -141,18 +142,18 @@ class TargetWidget(QtWidgets.QWidget):
             progress.report(100)
 
         self.stop_saving = False
-        self.thread = None
+        self.save_timer = None
 
         if auto_save:
             self.add_automatic_saving()
 
     def add_automatic_saving(self):
         """Add this target widget to be saved (target and recoils) every 1
-        minute in a thread.
+        minute. Files whose contents have not changed are not written.
         """
-        self.thread = threading.Thread(target=self.timed_save)
-        self.thread.daemon = True
-        self.thread.start()
+        self.save_timer = QtCore.QTimer(self)
+        self.save_timer.timeout.connect(self.timed_save)
+        self.save_timer.start(60 * 1000)
 
     def switch_to_target(self):
         """
@@ -190,18 +191,14 @@ class TargetWidget(QtWidgets.QWidget):
 
     def timed_save(self):
         """
-        Save target and recoils every 1 minute.
+        Save target and recoils. Called by the save timer in the GUI thread
+        so that the files are not written while they are being edited.
         """
-        while True:
-            # TODO it might be better to just save when something changes
-            #  instead of automatically doing it every 60 seconds. This might
-            #  cause a situation where files are being written or read at the
-            #  same time by different threads.
-            if self.stop_saving:
-                break
-            if self.target:
-                self.__save_target_and_recoils(True)
-            time.sleep(60)
+        if self.stop_saving:
+            self.save_timer.stop()
+            return
+        if self.target:
+            self.__save_target_and_recoils(True)
 
     def __save_target_and_recoils(self, thread=False):
         """
@@ -222,8 +219,13 @@ class TargetWidget(QtWidgets.QWidget):
         else:
             target_name = "temp"
 
+        if thread:
+            delay = self.AUTO_SAVE_DELAY
+        else:
+            delay = None
+
         target_path = Path(self.simulation.directory, f"{target_name}.target")
-        self.target.to_file(target_path)
+        self.target.to_file(target_path, delay=delay)
 
         if not thread and reporter is not None:
             reporter.report(50)
@@ -232,7 +234,7 @@ class TargetWidget(QtWidgets.QWidget):
             sub_reporter = None
 
         self.recoil_distribution_widget.save_mcsimu_rec_profile(
-            self.simulation.directory, progress=sub_reporter)
+            self.simulation.directory, progress=sub_reporter, delay=delay)
 
         if reporter is not None:
             reporter.report(100)